@@ -3,19 +3,61 @@
 #
 # SPDX-License-Identifier: GPL-2.0-or-later
 
+import asyncio
 import json
 import logging
-import socket
-import time
 
 LOG = logging.getLogger("lava-coordinator")
 
 
+class Connection:
+    """
+    Connection to a client, as seen by the request handlers.
+
+    Handlers are synchronous and only queue the response: it's sent by the
+    event loop once the handler returns. As the event loop runs a single
+    handler at a time, the group data is never accessed concurrently.
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.data = b""
+        self.closed = False
+
+    def send(self, data):
+        self.data += data
+
+    def close(self):
+        # Pending data is flushed before closing the socket
+        self.closed = True
+
+    def getpeername(self):
+        return self.writer.get_extra_info("peername")
+
+    def response(self):
+        """
+        Return the response queued by the handler or None
+        """
+        try:
+            return json.loads(self.data[8:].decode("utf-8"))
+        except (UnicodeDecodeError, ValueError):
+            return None
+
+
 class LavaCoordinator:
     running = False
     delay = 1
     rpc_delay = 2
     blocksize = 4 * 1024
+    # Pending connections
+    backlog = 1024
+    # Time allowed to a client to send a request or read the response
+    timeout = 60
+    # On persistent connections, these requests are held until they can be
+    # answered instead of being answered with "wait".
+    wakeup_requests = {"group_data", "lava_sync", "lava_wait", "lava_wait_all"}
+    # Maximum time a request is held before answering "wait"
+    wakeup_timeout = 20
     all_groups = {}
     # All data handling for each connection happens on this local reference into the
     # all_groups dict with a new group looked up each time.
@@ -36,16 +78,28 @@ class LavaCoordinator:
         self.host = host
         self.group_port = port
         self.blocksize = blocksize
+        # Requests held for each group: {group_name: {future: json_data}}
+        self.parked = {}
 
     def run(self):
-        s = None
-        while 1:
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        asyncio.run(self.serve())
+
+    async def start(self, host="0.0.0.0"):
+        """
+        Start serving connections and return the asyncio.Server
+        """
+        # TODO: use self.host
+        server = await asyncio.start_server(
+            self.handle, host, self.group_port, backlog=self.backlog
+        )
+        self.running = True
+        return server
+
+    async def serve(self):
+        while True:
             try:
-                # TODO: use self.host
                 LOG.info("[BTSP] binding to %s:%s", "0.0.0.0", self.group_port)
-                s.bind(("0.0.0.0", self.group_port))
+                server = await self.start()
                 break
             except OSError as e:
                 LOG.warning(
@@ -53,36 +107,146 @@ class LavaCoordinator:
                     self.delay,
                     str(e),
                 )
-                time.sleep(self.delay)
+                await asyncio.sleep(self.delay)
                 self.delay *= 2
-        s.listen(1)
-        self.running = True
-        while self.running:
-            LOG.info("Ready to accept new connections")
-            self.conn, _ = s.accept()
-            # read the header to get the size of the message to follow
-            data = self.conn.recv(8).decode("utf-8")  # 32bit limit
+        LOG.info("Ready to accept new connections")
+        async with server:
+            await server.serve_forever()
+
+    async def handle(self, reader, writer):
+        """
+        Read the requests from the client and reply.
+        Each client is served concurrently: a slow or stalled client does not
+        delay the other clients.
+
+        A client setting "persistent" in its requests keeps the connection
+        open for the next requests. On such connections, a request that would
+        be answered with "wait" is held until a change in the group allows to
+        answer it: the client does not have to poll.
+        """
+        peer = writer.get_extra_info("peername")
+        persistent = False
+        try:
+            while True:
+                json_data = await self._read_request(reader, peer, persistent)
+                if json_data is None:
+                    return
+                persistent = bool(json_data.get("persistent"))
+                data = await self._reply(writer, json_data, persistent)
+                # Nothing to send back, like for "complete"
+                if not data:
+                    return
+                writer.write(data)
+                if not persistent:
+                    return
+                await asyncio.wait_for(writer.drain(), self.timeout)
+        except (asyncio.IncompleteReadError, OSError, TimeoutError) as exc:
+            LOG.warning("Unable to read the request from %s: %s", peer, exc)
+        finally:
+            writer.close()
             try:
-                count = int(data, 16)
-            except ValueError:
-                LOG.warning(
-                    "Invalid message: %s from %s", data, self.conn.getpeername()[0]
-                )
-                self.conn.close()
-                continue
-            c = 0
-            data = ""
-            # get the message itself
-            while c < count:
-                data += self.conn.recv(self.blocksize).decode("utf-8")
-                c += self.blocksize
+                await asyncio.wait_for(writer.wait_closed(), self.timeout)
+            except TimeoutError:
+                # The client does not read the response
+                writer.transport.abort()
+            except OSError:
+                pass
+
+    async def _read_request(self, reader, peer, persistent):
+        """
+        Read one request or return None if the request is invalid or if the
+        client closed the persistent connection.
+        """
+        # read the header to get the size of the message to follow.
+        # Persistent connections are idle between two requests.
+        try:
+            header = await asyncio.wait_for(
+                reader.readexactly(8), None if persistent else self.timeout
+            )
+        except asyncio.IncompleteReadError as exc:
+            if persistent and not exc.partial:
+                return None
+            raise
+        try:
+            count = int(header.decode("utf-8"), 16)  # 32bit limit
+        except (UnicodeDecodeError, ValueError):
+            LOG.warning("Invalid message: %r from %s", header, peer[0])
+            return None
+        # get the message itself
+        data = await asyncio.wait_for(reader.readexactly(count), self.timeout)
+        try:
+            json_data = json.loads(data.decode("utf-8"))
+        except (UnicodeDecodeError, ValueError):
+            LOG.warning("JSON error for '%s'", data[:100])
+            return None
+        if not isinstance(json_data, dict):
+            LOG.warning("Invalid request '%s'", data[:100])
+            return None
+        return json_data
+
+    async def _reply(self, writer, json_data, persistent):
+        """
+        Handle the request and return the response to send
+        """
+        self.conn = conn = Connection(writer)
+        self.dataReceived(json_data)
+        response = conn.response() if persistent else None
+
+        group_name = json_data.get("group_name")
+        future = None
+        if (
+            response is not None
+            and response.get("response") == "wait"
+            and json_data["request"] in self.wakeup_requests
+        ):
+            future = asyncio.get_running_loop().create_future()
+            self.parked.setdefault(group_name, {})[future] = json_data
+        # The request might have changed the group data
+        self._wakeup(group_name)
+        if response is None:
+            return conn.data
+
+        if future is not None:
             try:
-                json_data = json.loads(data)
-            except ValueError:
-                LOG.warning("JSON error for '%s'", data[:100])
-                self.conn.close()
-                continue
-            self.dataReceived(json_data)
+                response = await asyncio.wait_for(future, self.wakeup_timeout)
+            except TimeoutError:
+                # Let the client check its own timeout and ask again
+                pass
+            finally:
+                parked = self.parked.get(group_name, {})
+                parked.pop(future, None)
+                if not parked:
+                    self.parked.pop(group_name, None)
+            if response is None:
+                return b""
+
+        # Tell the client that the connection is kept open
+        msgdata = self._formatMessage({**response, "persistent": True})
+        if msgdata is None:
+            return b""
+        return msgdata[0] + msgdata[1]
+
+    def _wakeup(self, group_name):
+        """
+        Retry the requests held for this group.
+        Answering a request can unblock other requests (like the last lava_sync
+        of a barrier), so retry until no more requests can be answered.
+        """
+        parked = self.parked.get(group_name)
+        progress = True
+        while parked and progress and group_name in self.all_groups:
+            progress = False
+            for future, json_data in list(parked.items()):
+                if future.done():
+                    del parked[future]
+                    continue
+                self.conn = conn = Connection(None)
+                self.dataReceived(json_data)
+                response = conn.response()
+                if response is None or response.get("response") != "wait":
+                    future.set_result(response)
+                    del parked[future]
+                    progress = True
 
     def _updateData(self, json_data):
         """
@@ -34,6 +34,14 @@ RCLONE_DOWNLOAD_CHUNK_SIZE = 32768
 # Files here are for download using the Apache /tmp alias.
 DISPATCHER_DOWNLOAD_DIR = "/var/lib/lava/dispatcher/tmp"
 
+# gzip compression level of the lava overlay tarball
+# The overlay is compressed once and extracted once, favor speed over size.
+OVERLAY_COMPRESSION_LEVEL = 6
+
+# Minimal interval, in seconds, between two fetches of a git mirror
+# Can be overridden by git_mirror_interval in the dispatcher configuration.
+GIT_MIRROR_INTERVAL = 5 * 60
+
 # Distinctive prompt characters which can
 # help distinguish status messages from shell prompts.
 DISTINCTIVE_PROMPT_CHARACTERS = "\\:"
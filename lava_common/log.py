@@ -12,6 +12,7 @@ import multiprocessing
 import os
 import signal
 import sys
+import threading
 import time
 from queue import Empty
 from typing import TYPE_CHECKING, TypedDict
@@ -387,6 +388,8 @@ class YAMLLogger:
         self.markers: dict[str, dict[str, int]] = {}
         self.line = 0
         self.secrets_mask: set[str] = set()
+        # Some actions are logging from background threads
+        self.lock = threading.Lock()
 
     def add_http_handler(
         self, url: str, token: str, interval: int, job_id: str
@@ -418,8 +421,6 @@ class YAMLLogger:
     def log_message(
         self, level_name: str, message: object, *args: Any, **kwargs: Any
     ) -> None:
-        # Increment the line count
-        self.line += 1
         # Build the dictionary
         data: dict[str, Any] = {
             "dt": datetime.datetime.now(datetime.UTC).isoformat(),
@@ -435,7 +436,10 @@ class YAMLLogger:
             data["ns"] = kwargs["namespace"]
 
         data_str = dump(data, self.secrets_mask)
-        self._log(data_str)
+        with self.lock:
+            # Increment the line count
+            self.line += 1
+            self._log(data_str)
 
     def exception(self, exc: object, *args: Any, **kwargs: Any) -> None:
         self.log_message("exception", exc, *args, **kwargs)
@@ -7,6 +7,7 @@
 from __future__ import annotations
 
 import importlib
+from functools import cache, lru_cache
 
 from voluptuous import (
     All,
@@ -78,22 +79,43 @@ CONTEXT_VARIABLES = [
 ]
 
 
-def validate_action(name, index, data, strict=True):
-    # Import the module
+# The action names come from the job definitions: bound the cache so that
+# unknown names cannot make it grow without limit. Large enough to keep every
+# known action schema, strict or not.
+@lru_cache(maxsize=256)
+def action_schema(name: str, strict: bool) -> Schema | None:
+    """
+    Return the compiled schema for the given action type or None if the
+    action type is unknown.
+
+    Schemas are built once per process: compiling the schema costs far more
+    than validating a job definition.
+    """
     try:
         module = importlib.import_module("lava_common.schemas." + name)
-        Schema(module.schema(), extra=not strict)(data)
     except ImportError:
+        return None
+    return Schema(module.schema(), extra=not strict)
+
+
+@cache
+def job_schema(strict: bool, extra_context_variables: tuple[str, ...]) -> Schema:
+    return Schema(job(list(extra_context_variables)), extra=not strict)
+
+
+def validate_action(name, index, data, strict=True):
+    schema = action_schema(name, strict)
+    if schema is None:
         raise Invalid("unknown action type", path=["actions"] + name.split("."))
+    try:
+        schema(data)
     except MultipleInvalid as exc:
         path = ["actions[%d]" % index] + name.split(".") + exc.path
         raise Invalid(exc.msg, path=path) from exc
 
 
 def validate(data, strict=True, extra_context_variables: list[str] | None = None):
-    if extra_context_variables is None:
-        extra_context_variables = []
-    schema = Schema(job(extra_context_variables), extra=not strict)
+    schema = job_schema(strict, tuple(extra_context_variables or ()))
     schema(data)
     for index, action in enumerate(data["actions"]):
         # The job schema does already check the we have only one key
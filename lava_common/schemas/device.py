@@ -6,6 +6,7 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 
 import contextlib
+from functools import cache
 
 from voluptuous import All, Any, Invalid, Length, Optional, Required, Schema
 
@@ -135,6 +136,10 @@ def extra_checks(data):
                     )
 
 
+@cache
+def device_schema():
+    return Schema(All(device(), extra_checks), extra=True)
+
+
 def validate(data):
-    schema = Schema(All(device(), extra_checks), extra=True)
-    schema(data)
+    device_schema()(data)
@@ -5,6 +5,8 @@
 #
 # SPDX-License-Identifier: GPL-2.0-or-later
 
+from functools import cache
+
 from voluptuous import ALLOW_EXTRA, Any, Match, Optional, Required, Schema
 
 
@@ -43,6 +45,10 @@ def testdef():
     }
 
 
+@cache
+def testdef_schema():
+    return Schema(testdef(), extra=ALLOW_EXTRA)
+
+
 def validate(data):
-    schema = Schema(testdef(), extra=ALLOW_EXTRA)
-    schema(data)
+    testdef_schema()(data)
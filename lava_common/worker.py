@@ -85,6 +85,12 @@ def get_parser(docker_worker: bool = False) -> argparse.ArgumentParser:
             action="store_true",
             help="Wait for jobs to finish prior to exit",
         )
+        parser.add_argument(
+            "--zygote",
+            action="store_true",
+            default=False,
+            help="Fork jobs from a preloaded lava-run instead of starting a new lava-run for each job",
+        )
 
     storage = parser.add_argument_group("storage")
     storage.add_argument(
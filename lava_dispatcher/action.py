@@ -5,9 +5,14 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 from __future__ import annotations
 
+import codecs
 import contextlib
 import copy
+import io
+import os
+import select
 import subprocess  # nosec - internal
+import threading
 import time
 import traceback
 import warnings
@@ -15,9 +20,6 @@ from itertools import chain
 from shlex import split as shlex_split
 from typing import TYPE_CHECKING
 
-import pexpect
-from pexpect.popen_spawn import PopenSpawn as PexpectPopenSpawn
-
 from lava_common.decorators import nottest
 from lava_common.exceptions import (
     InfrastructureError,
@@ -29,6 +31,7 @@ from lava_common.exceptions import (
 )
 from lava_common.log import YAMLLogger
 from lava_common.timeout import Timeout
+from lava_dispatcher.utils import profiling
 from lava_dispatcher.utils.strings import seconds_to_str
 
 if TYPE_CHECKING:
@@ -41,6 +44,34 @@ if TYPE_CHECKING:
     TAction = TypeVar("TAction", bound="Action")
 
 
+# Values shared by get_namespace_data() without being copied
+_IMMUTABLE_TYPES = frozenset(
+    {str, bytes, int, float, bool, complex, type(None), range, frozenset}
+)
+
+
+def _copy_namespace_value(value: Any) -> Any:
+    """
+    Return a copy of a namespace data value that can be modified without
+    altering the stored value.
+    Immutable values are shared and the lists and dictionaries are copied
+    without the overhead of copy.deepcopy(). Other objects are deep copied.
+    """
+    kind = type(value)
+    if kind in _IMMUTABLE_TYPES:
+        return value
+    if kind is dict:
+        return {key: _copy_namespace_value(item) for key, item in value.items()}
+    if kind is list:
+        return [_copy_namespace_value(item) for item in value]
+    if kind is tuple:
+        items = tuple(_copy_namespace_value(item) for item in value)
+        return value if all(a is b for a, b in zip(items, value)) else items
+    if kind is set:
+        return set(value)
+    return copy.deepcopy(value)
+
+
 class InternalObject:
     """
     An object within the dispatcher pipeline which should not be included in
@@ -224,9 +255,12 @@ class Pipeline:
         connection: ShellSession,
         max_end_time: float | None,
     ) -> ShellSession:
+        profiler = profiling.current()
         for action in self.actions:
             failed = False
             namespace = action.parameters.get("namespace", "common")
+            if profiler is not None:
+                profiler.start(action)
             # Begin the action
             try:
                 parent = self.parent if self.parent else self.job
@@ -278,6 +312,8 @@ class Pipeline:
                     action.logger.info(msg)
                 else:
                     action.logger.debug(msg)
+                if profiler is not None:
+                    action.results = {"profile": profiler.stop(action)}
                 # set results including retries and failed actions
                 action.log_action_results(fail=failed)
 
@@ -311,11 +347,24 @@ class Pipeline:
 class CommandLogger:
     """
     Grab output of a command line tool and stream it to the logger
+
+    Partial lines longer than MAX_LINE_LENGTH are logged in pieces, so that
+    progress bars do not accumulate in memory. Lines are logged at RATE_LIMIT
+    lines per second on average, with bursts of RATE_BURST lines: the lines
+    over the limit are counted and reported instead.
     """
 
-    def __init__(self, logger: YAMLLogger):
+    MAX_LINE_LENGTH = 4096
+    RATE_LIMIT = 100
+    RATE_BURST = 1000
+
+    def __init__(self, logger: YAMLLogger, fmt: str = ">> %s"):
         self.line = ""
         self.logger = logger
+        self.fmt = fmt
+        self.tokens = float(self.RATE_BURST)
+        self.last = time.monotonic()
+        self.skipped = 0
 
     def write(self, new_line: str) -> None:
         if not isinstance(new_line, str):
@@ -328,13 +377,37 @@ class CommandLogger:
             self.line = lines[last_ret + 1 :]
             lines = lines[:last_ret]
             for line in lines.split("\n"):
-                self.logger.debug(">> %s", line)
+                self.log(line)
         else:
             self.line = lines
 
+        while len(self.line) > self.MAX_LINE_LENGTH:
+            self.log(self.line[: self.MAX_LINE_LENGTH])
+            self.line = self.line[self.MAX_LINE_LENGTH :]
+
+    def log(self, line: str) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.RATE_BURST, self.tokens + (now - self.last) * self.RATE_LIMIT
+        )
+        self.last = now
+        if self.tokens < 1:
+            self.skipped += 1
+            return
+        self.tokens -= 1
+        self.report_skipped()
+        self.logger.debug(self.fmt, line)
+
+    def report_skipped(self) -> None:
+        if self.skipped:
+            self.logger.warning("%d lines of output were not logged", self.skipped)
+            self.skipped = 0
+
     def flush(self, force: bool = False) -> None:
-        if force and self.line:
-            self.write("\n")
+        if force:
+            if self.line:
+                self.write("\n")
+            self.report_skipped()
 
 
 class Action:
@@ -548,7 +621,8 @@ class Action:
         and strip embedded newlines / whitespace where practical.
         Returns the output of the command (after logging the output)
         Includes default support for proxy settings in the environment.
-        Blocks until the command returns then processes & logs the output.
+        Blocks until the command returns. The output is logged while the
+        command runs.
 
         Note: logs the returncode in all circumstances as a result in the lava test suite.
 
@@ -568,20 +642,25 @@ class Action:
         output = ""
         command_list = [str(s) for s in command_list]
         self.logger.debug("%s", " ".join(command_list))
+        cmd_logger = CommandLogger(self.logger, "output: %s")
         try:
-            output = subprocess.run(
-                args=command_list,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                cwd=cwd,
-                timeout=self.timeout.duration,
-                check=True,
+            returncode, output = self._run_streaming(
+                command_list,
+                cmd_logger,
+                keep_output=True,
+                stdin=subprocess.PIPE if input is not None else None,
                 input=input,
+                cwd=cwd,
                 env=env,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-            ).stdout
+            )
+            if returncode is None:
+                raise subprocess.TimeoutExpired(
+                    command_list, self.timeout.duration, output=output
+                )
+            if returncode:
+                raise subprocess.CalledProcessError(
+                    returncode, command_list, output=output
+                )
             if allow_fail:
                 self.results = {"returncode": "0"}
                 self.results = {"output_len": len(output)}
@@ -636,24 +715,92 @@ class Action:
                 self.logger.error(msg)
                 # if not allow_fail, fail the command with the specified exception.
                 raise self.command_exception(exc) from exc
+        finally:
+            cmd_logger.flush(force=True)
 
-        for line in output.split("\n"):
-            self.logger.debug("output: %s", line)
         return output
 
     _SUBPROCESS_SIGTERM_TIMEOUT = 3.0
 
-    def _run_pexpect_popen(
+    def _run_streaming(
         self,
-        pexpect_popen: PexpectPopenSpawn[str],
-        start: float,
-    ) -> int | None:
-        proc = pexpect_popen.proc
+        command_list: list[str],
+        cmd_logger: CommandLogger,
+        keep_output: bool = False,
+        stdin: int | None = subprocess.PIPE,
+        input: str | None = None,
+        cwd: str | None = None,
+        env: dict[str, str] | None = None,
+    ) -> tuple[int | None, str]:
+        """
+        Run the command, sending its output to cmd_logger as it comes.
 
-        def terminate_or_kill_proc() -> None:
-            if proc.returncode is not None:
-                return
+        Return the return code, or None if the action timed out, and the
+        output when keep_output is set. The output is decoded like
+        subprocess.run(text=True, errors="replace") would.
+        """
+        start = time.monotonic()
+        deadline = start + self.timeout.duration
+        decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder("utf-8")(errors="replace"), translate=True
+        )
+        chunks: list[str] = []
+
+        def process(text: str) -> None:
+            if text:
+                cmd_logger.write(text)
+                if keep_output:
+                    chunks.append(text)
+
+        with (
+            profiling.timed("subprocess_time"),
+            subprocess.Popen(
+                command_list,
+                stdin=stdin,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                cwd=cwd,
+                env=env,
+            ) as proc,
+        ):
+            if input is not None:
+                # Written by a thread so that a command writing more than a
+                # pipe buffer before reading its input cannot block us.
+                def feed(data: bytes) -> None:
+                    with contextlib.suppress(BrokenPipeError):
+                        proc.stdin.write(data)
+                        proc.stdin.close()
+
+                threading.Thread(
+                    target=feed, args=(input.encode("utf-8"),), daemon=True
+                ).start()
+
+            fd = proc.stdout.fileno()
+            timed_out = False
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    timed_out = True
+                    break
+                ready, _, _ = select.select([fd], [], [], remaining)
+                if not ready:
+                    continue
+                data = os.read(fd, 65536)
+                if not data:
+                    break
+                process(decoder.decode(data))
+            process(decoder.decode(b"", final=True))
+
+            if not timed_out:
+                with contextlib.suppress(subprocess.TimeoutExpired):
+                    return (
+                        proc.wait(max(deadline - time.monotonic(), 0)),
+                        "".join(chunks),
+                    )
 
+            self.logger.error(
+                "Timed out after %s seconds", int(time.monotonic() - start)
+            )
             try:
                 proc.terminate()
                 proc.wait(self._SUBPROCESS_SIGTERM_TIMEOUT)
@@ -661,20 +808,7 @@ class Action:
                 # Subprocess ignores SIGTERM. Kill it with SIGKILL.
                 proc.kill()
                 # The process context manager will wait killed process.
-
-        with contextlib.ExitStack() as exit_stack:
-            exit_stack.enter_context(proc)
-            exit_stack.callback(terminate_or_kill_proc)
-            try:
-                pexpect_popen.expect(pexpect.EOF)
-                # wait for the process and record the return value
-                return proc.wait()
-            except pexpect.TIMEOUT:
-                self.logger.error(
-                    "Timed out after %s seconds", int(time.monotonic() - start)
-                )
-
-        return None
+        return None, "".join(chunks)
 
     def run_cmd(
         self,
@@ -710,20 +844,8 @@ class Action:
         cmd_logger = CommandLogger(self.logger)
         ret: int | None = None
         try:
-            proc = PexpectPopenSpawn(
-                cmd=command_list,
-                cwd=cwd,
-                encoding="utf-8",
-                codec_errors="replace",
-                logfile=cmd_logger,
-                timeout=self.timeout.duration,
-                searchwindowsize=10,
-                # Debian type hits have too restrictive env= typing
-                # https://github.com/python/typeshed/issues/14915
-                env=env,  # type: ignore[arg-type,unused-ignore]
-            )
-            ret = self._run_pexpect_popen(proc, start)
-        except (OSError, pexpect.ExceptionPexpect) as exc:
+            ret, _ = self._run_streaming(command_list, cmd_logger, cwd=cwd, env=env)
+        except OSError as exc:
             self.logger.error("Unable to run: %s", exc)
 
         cmd_logger.flush(force=True)
@@ -778,15 +900,16 @@ class Action:
         command_list = [str(s) for s in command_list]
         self.logger.debug("%s", " ".join(command_list))
         try:
-            log = subprocess.run(
-                command_list,
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                cwd=cwd,
-                encoding="utf-8",
-                errors="replace",
-            ).stdout
+            with profiling.timed("subprocess_time"):
+                log = subprocess.run(
+                    command_list,
+                    check=True,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    cwd=cwd,
+                    encoding="utf-8",
+                    errors="replace",
+                ).stdout
         except subprocess.CalledProcessError as exc:
             # the errors property doesn't support removing errors
             errors = []
@@ -924,6 +1047,7 @@ class Action:
         Get a namespaced data value from dynamic job data using the specified key.
         By default, returns a deep copy of the value instead of a reference to allow actions to
         manipulate lists and dicts based on common data without altering the values used by other actions.
+        Immutable values (strings, numbers, ...) are never copied.
         :param action: Name of the action which set the data or a commonly shared string used to
             correlate disparate actions
         :param label: Arbitrary label used by many actions to sub-divide similar keys with distinct
@@ -941,7 +1065,7 @@ class Action:
         value = self.data.get(namespace, {}).get(action, {}).get(label, {}).get(key)
         if value is None:
             return None
-        return copy.deepcopy(value) if deepcopy else value
+        return _copy_namespace_value(value) if deepcopy else value
 
     def set_namespace_data(
         self,
@@ -19,6 +19,7 @@ from lava_dispatcher.actions.boot.environment import ExportDeviceEnvironment
 from lava_dispatcher.connections.serial import QemuSession
 from lava_dispatcher.logical import RetryAction
 from lava_dispatcher.shell import ExpectShellSession
+from lava_dispatcher.utils.cache import BaseImageStore
 from lava_dispatcher.utils.docker import DockerRun
 from lava_dispatcher.utils.network import dispatcher_ip
 from lava_dispatcher.utils.shell import which
@@ -240,6 +241,8 @@ class CallQemuAction(Action):
 
         self.sub_command = self.base_sub_command.copy()
         # Generate the sub command
+        commands = self.commands.copy()
+        base_images = []
         substitutions = {}
         for label in self.get_namespace_keys("download-action"):
             if label in ["offset", "available_loops", "uefi", "nfsrootfs"]:
@@ -250,12 +253,27 @@ class CallQemuAction(Action):
             action_arg = self.get_namespace_data(
                 action="download-action", label=label, key="file"
             )
+            base_image = self.get_namespace_data(
+                action="download-action", label=label, key="base_image"
+            )
+            if image_arg is not None and base_image and image_arg in commands:
+                # The base image is shared with other jobs: boot on a
+                # copy-on-write overlay
+                action_arg = os.path.join(self.mkdtemp(), f"{label}.qcow2")
+                self.logger.debug(
+                    "Creating qcow2 overlay %s of %s", action_arg, base_image
+                )
+                BaseImageStore.overlay(base_image, action_arg)
+                base_images.append(base_image)
+                commands[commands.index(image_arg)] = BaseImageStore.image_arg(
+                    image_arg, label
+                )
             if image_arg is not None:
                 substitutions["{%s}" % label] = action_arg
         substitutions["{NFS_SERVER_IP}"] = dispatcher_ip(
             self.job.parameters["dispatcher"], "nfs"
         )
-        self.sub_command.extend(substitute(self.commands, substitutions))
+        self.sub_command.extend(substitute(commands, substitutions))
         uefi_dir = self.get_namespace_data(
             action="deployimages", label="image", key="uefi_dir"
         )
@@ -340,6 +358,9 @@ class CallQemuAction(Action):
             if "QEMU_AUDIO_DRV" in os.environ:
                 docker.environment("QEMU_AUDIO_DRV", os.environ["QEMU_AUDIO_DRV"])
             docker.bind_mount(DISPATCHER_DOWNLOAD_DIR)
+            # The overlays reference the base images by their absolute path
+            for base_image in base_images:
+                docker.bind_mount(base_image, read_only=True)
             docker.add_device("/dev/kvm", skip_missing=True)
             docker.add_device("/dev/net/tun", skip_missing=True)
             docker.add_docker_run_options("--network=host", "--cap-add=NET_ADMIN")
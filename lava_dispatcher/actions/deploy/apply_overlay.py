@@ -5,16 +5,18 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 from __future__ import annotations
 
+import contextlib
 import os
 import shutil
+import threading
 import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
 from functools import partial
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 from lava_common.constants import RAMDISK_FNAME, UBOOT_DEFAULT_HEADER_LENGTH
 from lava_common.exceptions import InfrastructureError, JobError, LAVABug
-from lava_common.utils import debian_filename_version
 from lava_dispatcher.action import Action, Pipeline
 from lava_dispatcher.actions.deploy.prepare import PrepareKernelAction
 from lava_dispatcher.utils.compression import (
@@ -31,13 +33,13 @@ from lava_dispatcher.utils.filesystem import (
     _resolve_backend,
     copy_in_overlay,
     copy_overlay_to_sparse_fs,
-    is_sparse_image,
     mkdtemp,
     prepare_guestfs,
 )
 from lava_dispatcher.utils.installers import add_late_command, add_to_kickstart
 from lava_dispatcher.utils.network import dispatcher_ip, rpcinfo_nfs
 from lava_dispatcher.utils.shell import which
+from lava_dispatcher.utils.sparse import SparseImage
 from lava_dispatcher.utils.strings import (
     substitute,
     substitute_address_with_static_info,
@@ -111,78 +113,61 @@ class ApplyOverlayGuest(Action):
         return connection
 
 
-class ApplyOverlayImage(Action):
-    name = "apply-overlay-image"
-    description = "apply overlay via guestfs to the test image"
-    summary = "apply overlay to test image"
-    timeout_exception = InfrastructureError
+_overlay_executor: ThreadPoolExecutor | None = None
+_overlay_executor_pid: int | None = None
+_overlay_executor_lock = threading.Lock()
 
-    def __init__(self, job: Job, image_key="image", use_root_partition=True):
-        super().__init__(job)
-        self.image_key = image_key
-        self.use_root_partition = use_root_partition
 
-    def run(self, connection, max_end_time):
-        overlay_file = self.get_namespace_data(
-            action="compress-overlay", label="output", key="file"
-        )
-        if overlay_file:
-            self.logger.debug("Overlay: %s", overlay_file)
-            decompressed_image = self.get_namespace_data(
-                action="download-action", label=self.image_key, key="file"
+def get_overlay_executor() -> ThreadPoolExecutor:
+    """
+    Return the executor applying the overlays in the background
+    """
+    global _overlay_executor, _overlay_executor_pid
+    with _overlay_executor_lock:
+        if _overlay_executor is None or _overlay_executor_pid != os.getpid():
+            _overlay_executor = ThreadPoolExecutor(
+                max_workers=min(4, os.cpu_count() or 1),
+                thread_name_prefix="apply-overlay",
             )
-            self.logger.debug("Image: %s", decompressed_image)
-            root_partition = None
+            _overlay_executor_pid = os.getpid()
+        return _overlay_executor
 
-            if self.use_root_partition:
-                if (
-                    self.image_key not in self.parameters
-                    and "images" in self.parameters
-                ):
-                    if self.image_key in self.parameters["images"]:
-                        root_partition = self.parameters["images"][self.image_key].get(
-                            "root_partition"
-                        )
-                    else:
-                        raise JobError(
-                            f"Unable to find image configuration for {self.image_key!r}"
-                        )
-                else:
-                    root_partition = self.parameters[self.image_key].get(
-                        "root_partition"
-                    )
 
-                if root_partition is None:
-                    raise JobError(
-                        "Unable to apply the overlay image without 'root_partition'"
-                    )
-                self.logger.debug("root_partition: %s", root_partition)
+def wait_for_overlays(action: Action, image_key: str | None = None) -> None:
+    """
+    Wait for the overlays applied in the background to the given image, or to
+    every image when image_key is None.
+    """
+    if action.job.pipeline is None:
+        return
+    namespace = action.parameters.get("namespace")
+    for overlay in action.job.pipeline.find_all_actions(ApplyOverlayImageBase):
+        if overlay.parameters.get("namespace") != namespace:
+            continue
+        if image_key is None or overlay.image_key == image_key:
+            overlay.wait()
 
-            copy_in_overlay(self, decompressed_image, root_partition, overlay_file)
-        else:
-            self.logger.debug("No overlay to deploy")
-        return connection
 
+class ApplyOverlayImageBase(Action):
+    """
+    Apply the overlay to a downloaded image.
+
+    With background set, the overlay is applied by a thread while the next
+    actions are running: the deployment can download, prepare and flash the
+    other images meanwhile. The actions using the image should call
+    wait_for_overlays() first.
+    """
 
-class ApplyOverlaySparseImage(Action):
-    name = "apply-overlay-sparse-image"
-    description = "apply overlay to sparse image"
-    summary = "apply overlay to sparse image"
-    command_exception = InfrastructureError
     timeout_exception = InfrastructureError
 
-    def __init__(self, job: Job, image_key):
+    def __init__(self, job: Job, image_key, background=False):
         super().__init__(job)
-        self.image_key = image_key  # the sparse image key in the parameters
+        self.image_key = image_key
+        self.background = background
+        self.future: Future | None = None
 
-    def validate(self):
-        super().validate()
-        binary = which("simg2img")
-        self.logger.info(debian_filename_version(binary))
-        which("mount")
-        which("umount")
-        binary = which("img2simg")
-        self.logger.info(debian_filename_version(binary))
+    def apply(self, image: str, overlay_file: str) -> None:
+        raise LAVABug("'apply' function unimplemented")
 
     def run(self, connection, max_end_time):
         overlay_file = self.get_namespace_data(
@@ -192,26 +177,93 @@ class ApplyOverlaySparseImage(Action):
             self.logger.debug("No overlay to deploy")
             return connection
         self.logger.debug("Overlay: %s", overlay_file)
-        decompressed_image = self.get_namespace_data(
+        image = self.get_namespace_data(
             action="download-action", label=self.image_key, key="file"
         )
-        self.logger.debug("Image: %s", decompressed_image)
-        ext4_img = decompressed_image + ".ext4"
-        # Check if the given image is an Android sparse image
-        if not is_sparse_image(decompressed_image):
-            raise JobError(
-                "Image is not an Android sparse image: %s" % decompressed_image
-            )
-        command_list = ["/usr/bin/simg2img", decompressed_image, ext4_img]
-        self.run_cmd(
-            command_list, error_msg="simg2img failed for %s" % decompressed_image
+        self.logger.debug("Image: %s", image)
+        if self.background:
+            self.logger.debug("Applying the overlay in the background")
+            self.future = get_overlay_executor().submit(self.apply, image, overlay_file)
+        else:
+            self.apply(image, overlay_file)
+        return connection
+
+    def wait(self) -> None:
+        if self.future is None:
+            return
+        future, self.future = self.future, None
+        if not future.done():
+            self.logger.debug("Waiting for the overlay of %r", self.image_key)
+        future.result()
+
+    def cleanup(self, connection):
+        if self.future is not None and not self.future.cancel():
+            # Do not remove the files used by the thread
+            with contextlib.suppress(Exception):
+                self.future.result()
+        self.future = None
+        super().cleanup(connection)
+
+
+class ApplyOverlayImage(ApplyOverlayImageBase):
+    name = "apply-overlay-image"
+    description = "apply overlay via guestfs to the test image"
+    summary = "apply overlay to test image"
+
+    def __init__(
+        self, job: Job, image_key="image", use_root_partition=True, background=False
+    ):
+        super().__init__(job, image_key, background=background)
+        self.use_root_partition = use_root_partition
+        self.root_partition = None
+
+    def run(self, connection, max_end_time):
+        overlay_file = self.get_namespace_data(
+            action="compress-overlay", label="output", key="file"
         )
+        if overlay_file and self.use_root_partition:
+            if self.image_key not in self.parameters and "images" in self.parameters:
+                if self.image_key in self.parameters["images"]:
+                    self.root_partition = self.parameters["images"][self.image_key].get(
+                        "root_partition"
+                    )
+                else:
+                    raise JobError(
+                        f"Unable to find image configuration for {self.image_key!r}"
+                    )
+            else:
+                self.root_partition = self.parameters[self.image_key].get(
+                    "root_partition"
+                )
+
+            if self.root_partition is None:
+                raise JobError(
+                    "Unable to apply the overlay image without 'root_partition'"
+                )
+        return super().run(connection, max_end_time)
+
+    def apply(self, image: str, overlay_file: str) -> None:
+        if self.use_root_partition:
+            self.logger.debug("root_partition: %s", self.root_partition)
+        copy_in_overlay(self, image, self.root_partition, overlay_file)
+
+
+class ApplyOverlaySparseImage(ApplyOverlayImageBase):
+    name = "apply-overlay-sparse-image"
+    description = "apply overlay to sparse image"
+    summary = "apply overlay to sparse image"
+    command_exception = InfrastructureError
+
+    def apply(self, image: str, overlay_file: str) -> None:
+        ext4_img = image + ".ext4"
+        # Raises a JobError if the given image is not an Android sparse image
+        sparse_image = SparseImage(image)
+        sparse_image.unsparse(ext4_img)
         self.logger.debug("Copying overlay")
         copy_overlay_to_sparse_fs(self, ext4_img, overlay_file)
-        command_list = ["/usr/bin/img2simg", ext4_img, decompressed_image]
-        self.run_cmd(command_list, error_msg="img2simg failed for %s" % ext4_img)
+        sparse_image.resparse(ext4_img, image + ".sparse")
+        os.replace(image + ".sparse", image)
         os.remove(ext4_img)
-        return connection
 
 
 class PrepareOverlayTftp(Action):
@@ -600,6 +652,11 @@ class ExtractRamdisk(Action):
                 self.run_command(cmd)
             except Exception:
                 raise LAVABug("Unable to remove uboot header: %s" % ramdisk)
+        elif os.stat(ramdisk).st_nlink > 1:
+            # The ramdisk is shared with other jobs through the artifact
+            # store: work on a private copy as the ramdisk is decompressed in
+            # place (and gunzip or unxz refuse files with other links).
+            shutil.copyfile(ramdisk, ramdisk_compressed_data)
         else:
             # give the file a predictable name
             shutil.move(ramdisk, ramdisk_compressed_data)
@@ -961,10 +1018,11 @@ class AppendOverlays(Action):
         partition = self.params.get("partition", None)
         self.logger.info("Modifying %r", image)
 
+        sparse_image = None
         if self.params.get("sparse", False):
-            self.logger.debug("Calling simg2img on %r", image)
-            command_list = ["/usr/bin/simg2img", image, f"{image}.non-sparse"]
-            self.run_cmd(command_list, error_msg="simg2img failed for %s" % image)
+            self.logger.debug("Expanding sparse image %r", image)
+            sparse_image = SparseImage(image)
+            sparse_image.unsparse(f"{image}.non-sparse")
             os.replace(f"{image}.non-sparse", image)
 
         target_image = image
@@ -1017,10 +1075,9 @@ class AppendOverlays(Action):
             if partition is not None:
                 write_partition_back(image, target_image, start, sector_size)
 
-        if self.params.get("sparse", False):
-            self.logger.debug("Calling img2simg on %r", image)
-            command_list = ["/usr/bin/img2simg", image, f"{image}.sparse"]
-            self.run_cmd(command_list, error_msg="img2simg failed for %s" % image)
+        if sparse_image is not None:
+            self.logger.debug("Building sparse image %r", image)
+            sparse_image.resparse(image, f"{image}.sparse")
             os.replace(f"{image}.sparse", image)
 
     def update_guestfs(self):
@@ -1030,10 +1087,11 @@ class AppendOverlays(Action):
         partition = self.params.get("partition", None)
         self.logger.info("Modifying %r", image)
 
+        sparse_image = None
         if self.params.get("sparse", False):
-            self.logger.debug("Calling simg2img on %r", image)
-            command_list = ["/usr/bin/simg2img", image, f"{image}.non-sparse"]
-            self.run_cmd(command_list, error_msg="simg2img failed for %s" % image)
+            self.logger.debug("Expanding sparse image %r", image)
+            sparse_image = SparseImage(image)
+            sparse_image.unsparse(f"{image}.non-sparse")
             os.replace(f"{image}.non-sparse", image)
 
         import guestfs
@@ -1090,10 +1148,9 @@ class AppendOverlays(Action):
         guest.umount(device)
         guest.shutdown()
 
-        if self.params.get("sparse", False):
-            self.logger.debug("Calling img2simg on %r", image)
-            command_list = ["/usr/bin/img2simg", image, f"{image}.sparse"]
-            self.run_cmd(command_list, error_msg="img2simg failed for %s" % image)
+        if sparse_image is not None:
+            self.logger.debug("Building sparse image %r", image)
+            sparse_image.resparse(image, f"{image}.sparse")
             os.replace(f"{image}.sparse", image)
 
 
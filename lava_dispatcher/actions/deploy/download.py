@@ -37,6 +37,8 @@ from lava_dispatcher.actions.deploy.overlay import CreateOverlay, OverlayAction
 from lava_dispatcher.connections.serial import ConnectDevice
 from lava_dispatcher.logical import RetryAction
 from lava_dispatcher.power import ResetDevice
+from lava_dispatcher.utils import profiling
+from lava_dispatcher.utils.cache import ArtifactStore, BaseImageStore
 from lava_dispatcher.utils.compression import untar_file
 from lava_dispatcher.utils.network import requests_retry
 from lava_dispatcher.utils.shell import which
@@ -138,6 +140,11 @@ class DownloadHandler(Action):
     summary = "download-action"
     timeout_exception = InfrastructureError
 
+    # Files that are only read (or replaced) by the deploy and boot actions.
+    # The job runs as root: the actions modifying one of these files in place
+    # should first make a private copy, like ExtractRamdisk does.
+    shared_artifacts = ("kernel", "dtb", "ramdisk", "tee", "modules", "nfsrootfs")
+
     # Supported decompression commands
     decompress_command_map = {
         "bz2": "bunzip2",
@@ -180,6 +187,57 @@ class DownloadHandler(Action):
             return False
         return self.params.get("compression", False)
 
+    def _base_images(self) -> BaseImageStore | None:
+        """
+        Return the store of the QEMU base images when the image can be shared
+        with other jobs: the image is verified and never written by the job.
+        """
+        if self.parameters.get("to") != "tmpfs":
+            return None
+        if self.params.get("sha256sum") is None:
+            return None
+        if any(self.params.get(key) for key in ("archive", "overlay", "overlays")):
+            return None
+        image_arg = self.params.get("image_arg")
+        if not image_arg or BaseImageStore.image_arg(image_arg, self.key) is None:
+            return None
+        return BaseImageStore.from_config(
+            self.job.parameters.get("dispatcher"), self.logger
+        )
+
+    def _artifacts(self) -> ArtifactStore | None:
+        """
+        Return the store of the TFTP and NFS artifacts when the file can be
+        shared with other jobs: the file is never written by the job.
+        """
+        if self.parameters.get("to") not in ("tftp", "nbd", "nfs"):
+            return None
+        if self.key not in self.shared_artifacts and not self.key.startswith("dtbo"):
+            return None
+        if any(self.params.get(key) for key in ("archive", "overlay", "overlays")):
+            return None
+        return ArtifactStore.from_config(
+            self.job.parameters.get("dispatcher"), self.logger
+        )
+
+    def _set_base_image(self, base_image: str) -> None:
+        for label, key in ((self.key, "file"), ("file", self.key)):
+            self.set_namespace_data(
+                action="download-action", label=label, key=key, value=base_image
+            )
+        self.set_namespace_data(
+            action="download-action",
+            label=self.key,
+            key="base_image",
+            value=base_image,
+        )
+        self.set_namespace_data(
+            action="download-action",
+            label=self.key,
+            key="sha256",
+            value=self.params["sha256sum"],
+        )
+
     def _url_to_fname(self) -> str:
         compression = self._compression()
         filename = os.path.basename(self.url.path)
@@ -264,7 +322,12 @@ class DownloadHandler(Action):
         self.results = {"fail": {algorithm: expected, "download": actual}}
         raise JobError(f"{algorithm} for '{self.url.geturl()}' does not match.")
 
-    def run(self, connection, max_end_time):
+    def _fetch(self, compression, hash_constructors) -> int:
+        """
+        Download the file, decompressing it on the fly, and return the size of
+        the downloaded data.
+        """
+
         def progress_unknown_total(downloaded_sz, last_val, last_update):
             """Compute progress when the size is unknown"""
             condition = (
@@ -299,36 +362,6 @@ class DownloadHandler(Action):
                 ),
             )
 
-        connection = super().run(connection, max_end_time)
-        # self.cookies = self.job.context.config.lava_cookies  # FIXME: work out how to restore
-
-        # Create a fresh directory if the old one has been removed by a previous cleanup
-        # (when retrying inside a RetryAction)
-        try:
-            os.makedirs(self.path, 0o755, exist_ok=True)
-        except OSError as exc:
-            raise InfrastructureError(f"Unable to create {self.path}: {exc}")
-
-        compression = self._compression()
-        if self.key == "ramdisk":
-            self.logger.debug("Not decompressing ramdisk as can be used compressed.")
-
-        self.set_namespace_data(
-            action="download-action",
-            label=self.key,
-            key="decompressed",
-            value=bool(compression),
-        )
-
-        md5sum = self.params.get("md5sum")
-        sha256sum = self.params.get("sha256sum")
-        sha512sum = self.params.get("sha512sum")
-
-        sha256 = hashlib.sha256()
-        md5 = hashlib.md5() if md5sum is not None else None
-        sha512 = hashlib.sha512() if sha512sum is not None else None
-        hash_constructors = tuple(h for h in (md5, sha256, sha512) if h is not None)
-
         if os.path.isdir(self.fname):
             raise JobError("Download '%s' is a directory, not a file" % self.fname)
         if os.path.exists(self.fname):
@@ -408,6 +441,7 @@ class DownloadHandler(Action):
             round(ending - beginning, 2),
             round(downloaded_size / (1024 * 1024 * (ending - beginning)), 2),
         )
+        profiling.add("downloaded_bytes", downloaded_size)
 
         # If the remote server uses "Content-Encoding: gzip", this calculation will be wrong
         # because requests will decompress the file on the fly, creating a larger file than
@@ -417,6 +451,71 @@ class DownloadHandler(Action):
                 "Download finished (%i bytes) but was not expected size (%i bytes), check your networking."
                 % (downloaded_size, self.size)
             )
+        return downloaded_size
+
+    def run(self, connection, max_end_time):
+        connection = super().run(connection, max_end_time)
+        # self.cookies = self.job.context.config.lava_cookies  # FIXME: work out how to restore
+
+        # Create a fresh directory if the old one has been removed by a previous cleanup
+        # (when retrying inside a RetryAction)
+        try:
+            os.makedirs(self.path, 0o755, exist_ok=True)
+        except OSError as exc:
+            raise InfrastructureError(f"Unable to create {self.path}: {exc}")
+
+        compression = self._compression()
+        if self.key == "ramdisk":
+            self.logger.debug("Not decompressing ramdisk as can be used compressed.")
+
+        self.set_namespace_data(
+            action="download-action",
+            label=self.key,
+            key="decompressed",
+            value=bool(compression),
+        )
+
+        md5sum = self.params.get("md5sum")
+        sha256sum = self.params.get("sha256sum")
+        sha512sum = self.params.get("sha512sum")
+
+        base_images = self._base_images()
+        if base_images is not None:
+            base_key = base_images.key("qemu", sha256sum, compression)
+            base_image = base_images.lookup(base_key)
+            if base_image is not None:
+                self.logger.info(
+                    "Using the base image of %s: %s", self.params["url"], base_image
+                )
+                self._set_base_image(base_image)
+                self.results = {
+                    "label": self.key,
+                    "base_image": base_image,
+                    "sha256sum": sha256sum,
+                }
+                return connection
+
+        sha256 = hashlib.sha256()
+        md5 = hashlib.md5() if md5sum is not None else None
+        sha512 = hashlib.sha512() if sha512sum is not None else None
+        hash_constructors = tuple(h for h in (md5, sha256, sha512) if h is not None)
+
+        artifacts = self._artifacts()
+        stored = False
+        if artifacts is not None and sha256sum is not None:
+            artifact_key = artifacts.key("artifact", sha256sum, compression)
+            stored = artifacts.link(artifact_key, self.fname)
+        if stored:
+            self.logger.info(
+                "Using the stored artifact of %s: %s",
+                self.params["url"],
+                artifacts.artifact(artifact_key),
+            )
+            downloaded_size = 0
+            sha256_hex = sha256sum
+        else:
+            downloaded_size = self._fetch(compression, hash_constructors)
+            sha256_hex = sha256.hexdigest()
 
         # set the dynamic data into the context
         self.set_namespace_data(
@@ -429,7 +528,7 @@ class DownloadHandler(Action):
             action="download-action",
             label=self.key,
             key="sha256",
-            value=sha256.hexdigest(),
+            value=sha256_hex,
         )
 
         # handle archive files
@@ -454,13 +553,26 @@ class DownloadHandler(Action):
                 value=target_fname_path,
             )
 
-        if md5sum is not None:
+        # Stored artifacts were verified by the job that downloaded them
+        if md5sum is not None and not stored:
             self._check_checksum("md5", md5.hexdigest(), md5sum)
-        if sha256sum is not None:
-            self._check_checksum("sha256", sha256.hexdigest(), sha256sum)
-        if sha512sum is not None:
+        if sha256sum is not None and not stored:
+            self._check_checksum("sha256", sha256_hex, sha256sum)
+        if sha512sum is not None and not stored:
             self._check_checksum("sha512", sha512.hexdigest(), sha512sum)
 
+        # The artifact is verified: share it with the next jobs
+        if artifacts is not None and not stored:
+            artifacts.store(
+                artifacts.key("artifact", sha256_hex, compression), self.fname
+            )
+
+        # The image is verified: keep it for the next jobs
+        if base_images is not None:
+            base_image = base_images.store(base_key, self.fname)
+            if base_image is not None:
+                self._set_base_image(base_image)
+
         # certain deployments need prefixes set
         # TFTP deploy base dir suffix (e.g., "job_id/tftp-deploy-uid") will be used as
         # the TFTP file loading path prefix.
@@ -15,6 +15,7 @@ from lava_dispatcher.actions.boot.u_boot import UBootEnterFastbootAction
 from lava_dispatcher.actions.deploy.apply_overlay import (
     ApplyOverlayImage,
     ApplyOverlaySparseImage,
+    wait_for_overlays,
 )
 from lava_dispatcher.actions.deploy.download import DownloaderAction
 from lava_dispatcher.actions.deploy.environment import DeployDeviceEnvironment
@@ -57,15 +58,22 @@ class FastbootAction(OptionalContainerFastbootAction):  # pylint:disable=too-man
             )
             if image_params.get("apply-overlay", False):
                 if self.test_needs_overlay(parameters):
+                    # Applied in the background: the next images are
+                    # downloaded and the first ones flashed meanwhile
                     if image_params.get("sparse", True):
                         self.pipeline.add_action(
-                            ApplyOverlaySparseImage(self.job, image_key)
+                            ApplyOverlaySparseImage(
+                                self.job, image_key, background=True
+                            )
                         )
                     else:
                         use_root_part = image_params.get("root_partition", False)
                         self.pipeline.add_action(
                             ApplyOverlayImage(
-                                self.job, image_key, use_root_partition=use_root_part
+                                self.job,
+                                image_key,
+                                use_root_partition=use_root_part,
+                                background=True,
                             )
                         )
 
@@ -103,8 +111,6 @@ class FastbootFlashOrderAction(OptionalContainerFastbootAction):
 
     def __init__(self, job: Job):
         super().__init__(job)
-        self.retries = 3
-        self.sleep = 10
         self.interrupt_prompt = None
         self.interrupt_string = None
         self.reboot = None
@@ -136,6 +142,12 @@ class FastbootFlashOrderAction(OptionalContainerFastbootAction):
                 self.pipeline.add_action(PDUReboot(self.job))
                 self.pipeline.add_action(ReadFeedback(self.job, repeat=True))
 
+    def run(self, connection, max_end_time):
+        connection = super().run(connection, max_end_time)
+        # Images that were not flashed might still be used by the boot action
+        wait_for_overlays(self)
+        return connection
+
     def validate(self):
         super().validate()
         self.set_namespace_data(
@@ -174,8 +186,6 @@ class FastbootFlashAction(OptionalContainerFastbootAction):
 
     def __init__(self, job: Job, cmd=None):
         super().__init__(job)
-        self.retries = 3
-        self.sleep = 10
         self.command = cmd
         self.interrupt_prompt = None
         self.interrupt_string = None
@@ -197,6 +207,8 @@ class FastbootFlashAction(OptionalContainerFastbootAction):
     def run(self, connection, max_end_time):
         connection = super().run(connection, max_end_time)
 
+        # The earlier images were flashed while the overlay was applied
+        wait_for_overlays(self, self.command)
         src = self.get_namespace_data(
             action="download-action", label=self.command, key="file"
         )
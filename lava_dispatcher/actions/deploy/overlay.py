@@ -10,9 +10,11 @@ import os
 import shlex
 import shutil
 import stat
+import subprocess  # nosec - internal use.
 import tarfile
 from typing import TYPE_CHECKING
 
+from lava_common.constants import OVERLAY_COMPRESSION_LEVEL
 from lava_common.exceptions import InfrastructureError, JobError, LAVABug
 from lava_dispatcher.action import Action, Pipeline
 from lava_dispatcher.actions.deploy.testdef import TestDefinitionAction
@@ -475,14 +477,35 @@ class CompressOverlay(Action):
         # The overlay working directory will be "/foo/bar/lava-12345".
         # The tar archive will contain this directory as "lava-12345"
         lava_path = os.path.abspath(f"{location}/{lava_test_results_dir}")
+        root_dir = os.path.join(location, "root")
+        pigz = shutil.which("pigz")
         try:
-            with tarfile.open(output, "w:gz") as tar:
-                tar.add(lava_path, lava_test_results_dir)
-                # ssh authorization support
-                root_dir = os.path.join(location, "root")
-                if os.path.exists(root_dir):
-                    tar.add(root_dir, "./root")
-        except tarfile.TarError as exc:
+            if pigz:
+                # Same gzip format, compressed on every core
+                self.logger.debug("Compressing overlay with %s", pigz)
+                with open(output, "wb") as fout:
+                    proc = subprocess.Popen(  # nosec - internal use.
+                        [pigz, f"-{OVERLAY_COMPRESSION_LEVEL}", "-c"],
+                        stdin=subprocess.PIPE,
+                        stdout=fout,
+                    )
+                    try:
+                        with tarfile.open(fileobj=proc.stdin, mode="w|") as tar:
+                            self._add_overlay(tar, lava_path, root_dir)
+                    finally:
+                        proc.stdin.close()
+                        ret = proc.wait()
+                if ret != 0:
+                    raise InfrastructureError(
+                        "Unable to compress lava overlay tarball: %s exited with %d"
+                        % (pigz, ret)
+                    )
+            else:
+                with tarfile.open(
+                    output, "w:gz", compresslevel=OVERLAY_COMPRESSION_LEVEL
+                ) as tar:
+                    self._add_overlay(tar, lava_path, root_dir)
+        except (OSError, tarfile.TarError) as exc:
             raise InfrastructureError("Unable to create lava overlay tarball") from exc
 
         self.set_namespace_data(
@@ -490,6 +513,15 @@ class CompressOverlay(Action):
         )
         return connection
 
+    def _add_overlay(self, tar, lava_path, root_dir):
+        lava_test_results_dir = self.get_namespace_data(
+            action="test", label="results", key="lava_test_results_dir"
+        )
+        tar.add(lava_path, lava_test_results_dir)
+        # ssh authorization support
+        if os.path.exists(root_dir):
+            tar.add(root_dir, "./root")
+
 
 class SshAuthorize(Action):
     """
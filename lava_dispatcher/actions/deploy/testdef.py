@@ -18,12 +18,16 @@ from lava_common.decorators import nottest
 from lava_common.exceptions import InfrastructureError, JobError, LAVABug, TestError
 from lava_common.yaml import yaml_safe_dump, yaml_safe_load
 from lava_dispatcher.action import Action, Pipeline
+from lava_dispatcher.utils.cache import LayerCache
 from lava_dispatcher.utils.compression import untar_file
 from lava_dispatcher.utils.vcs import GitHelper
 
 if TYPE_CHECKING:
     from lava_dispatcher.job import Job
 
+# A full commit hash pins the content of a checkout
+GIT_COMMIT_ID = re.compile(r"^[0-9a-f]{40}$")
+
 
 @nottest
 def identify_test_definitions(test_info, namespace):
@@ -261,7 +265,11 @@ class GitRepoAction(RepoAction):
             self.errors_add("Path to YAML file not specified in the job definition")
         if not self.valid:
             return
-        self.vcs = GitHelper(self.parameters["repository"], self.logger)
+        self.vcs = GitHelper.from_config(
+            self.parameters["repository"],
+            self.logger,
+            self.job.parameters.get("dispatcher"),
+        )
         super().validate()
 
     @classmethod
@@ -306,15 +314,33 @@ class GitRepoAction(RepoAction):
 
         # clone submodules if recursive is set
         recursive = self.parameters.get("recursive", False)
+        history = self.parameters.get("history", True)
 
-        commit_id = self.vcs.clone(
-            runner_path,
-            shallow=shallow,
-            revision=revision,
-            branch=branch,
-            history=self.parameters.get("history", True),
-            recursive=recursive,
+        # Checkouts pinned to a commit are immutable and can be shared
+        # between jobs through the overlay cache.
+        cache = LayerCache.from_config(
+            self.job.parameters.get("dispatcher"), self.logger
         )
+        cache_key = None
+        if cache is not None and revision and GIT_COMMIT_ID.match(str(revision)):
+            cache_key = cache.key(
+                "git", self.parameters["repository"], revision, recursive, history
+            )
+
+        if cache_key is not None and cache.extract(cache_key, runner_path):
+            self.logger.info("Using cached checkout of %s", revision)
+            commit_id = revision
+        else:
+            commit_id = self.vcs.clone(
+                runner_path,
+                shallow=shallow,
+                revision=revision,
+                branch=branch,
+                history=history,
+                recursive=recursive,
+            )
+            if cache_key is not None and commit_id == revision:
+                cache.store(cache_key, runner_path)
         if commit_id is None:
             raise InfrastructureError(
                 "Unable to get test definition from %s (%s)"
@@ -865,7 +891,9 @@ class TestInstallAction(TestOverlayAction):
                     ".git", "", len(repo) - 1
                 )  # drop .git from the end, if present
                 dest_path = os.path.join(runner_path, os.path.basename(subdir))
-                commit_id = GitHelper(repo, self.logger).clone(dest_path)
+                commit_id = GitHelper.from_config(
+                    repo, self.logger, self.job.parameters.get("dispatcher")
+                ).clone(dest_path)
             elif isinstance(repo, dict):
                 # TODO: We use 'skip_by_default' to check if this
                 # specific repository should be skipped. The value
@@ -893,9 +921,9 @@ class TestInstallAction(TestOverlayAction):
                         raise TestError(
                             "Cannot mix string and url forms for the same repository."
                         )
-                    commit_id = GitHelper(url, self.logger).clone(
-                        dest_path, branch=branch
-                    )
+                    commit_id = GitHelper.from_config(
+                        url, self.logger, self.job.parameters.get("dispatcher")
+                    ).clone(dest_path, branch=branch)
             else:
                 raise TestError("Unrecognised git-repos block.")
             if commit_id is None:
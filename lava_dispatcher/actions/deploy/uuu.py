@@ -10,6 +10,7 @@ from lava_dispatcher.action import Action, Pipeline
 from lava_dispatcher.actions.deploy.apply_overlay import (
     ApplyOverlayImage,
     ApplyOverlaySparseImage,
+    wait_for_overlays,
 )
 from lava_dispatcher.actions.deploy.download import DownloaderAction
 from lava_dispatcher.actions.deploy.overlay import OverlayAction
@@ -53,9 +54,13 @@ class UUUAction(Action):
                     use_root_part = (
                         images_param[image].get("root_partition") is not None
                     )
+                    # Applied in the background while the next images are
+                    # downloaded
                     if images_param[image].get("sparse", False):
                         self.pipeline.add_action(
-                            ApplyOverlaySparseImage(self.job, image_key=image)
+                            ApplyOverlaySparseImage(
+                                self.job, image_key=image, background=True
+                            )
                         )
                     else:
                         self.pipeline.add_action(
@@ -63,5 +68,12 @@ class UUUAction(Action):
                                 self.job,
                                 image_key=image,
                                 use_root_partition=use_root_part,
+                                background=True,
                             )
                         )
+
+    def run(self, connection, max_end_time):
+        connection = super().run(connection, max_end_time)
+        # The images are only read by the boot action
+        wait_for_overlays(self)
+        return connection
@@ -187,7 +187,11 @@ class TestServiceAction(Action):
         # clone/untar
         if repo_from == "git":
             self.logger.info(f"Fetching {self.parameters['repository']} ...")
-            vcs = GitHelper(self.parameters["repository"], self.logger)
+            vcs = GitHelper.from_config(
+                self.parameters["repository"],
+                self.logger,
+                self.job.parameters.get("dispatcher"),
+            )
             if revision := self.parameters.get("revision"):
                 shallow = False
             else:
@@ -667,7 +667,9 @@ class TestShellAction(ReportMixin, Action):
             self.logger.info(
                 "Test case result pattern: %r" % self.patterns["test_case_results"]
             )
-        retval = test_connection.expect(list(self.patterns.values()), timeout=timeout)
+        retval = test_connection.expect_combined(
+            list(self.patterns.values()), timeout=timeout
+        )
         return self.check_patterns(list(self.patterns.keys())[retval], test_connection)
 
     def cleanup(self, connection, max_end_time=None):
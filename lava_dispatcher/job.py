@@ -22,7 +22,7 @@ from lava_dispatcher.logical import PipelineContext
 from lava_dispatcher.protocols.multinode import (  # pylint: disable=unused-import
     MultinodeProtocol,
 )
-from lava_dispatcher.utils import filesystem
+from lava_dispatcher.utils import filesystem, profiling
 
 if TYPE_CHECKING:
     from typing import Any
@@ -221,6 +221,10 @@ class Job:
                 self.logger.exception(msg)
                 raise JobError(msg)
 
+        profiling.activate(
+            profiling.Profiler.from_config(self.parameters.get("dispatcher"))
+        )
+
         # Run the pipeline and wait for exceptions
         with self.timeout(None, None) as max_end_time:
             self.pipeline.run_actions(self.connection, max_end_time)
@@ -235,9 +239,42 @@ class Job:
         try:
             self._run()
         finally:
+            self._log_profile()
             # Cleanup now
             self.cleanup(self.connection)
 
+    def _log_profile(self):
+        """
+        Summarize the counters of the actions when profiling is enabled.
+        """
+        profiler = profiling.current()
+        if profiler is None:
+            return
+        profiling.activate(None)
+        summary = profiler.summary()
+        self.logger.info("Slowest actions:")
+        for profile in summary["slowest"]:
+            self.logger.info(
+                "%s %s: %.02fs (cpu %.02fs, subprocesses %.02fs, expect %.02fs, "
+                "downloaded %d bytes, written %d bytes)",
+                profile["level"],
+                profile["name"],
+                profile["duration"],
+                profile["cpu"],
+                profile["subprocess_time"],
+                profile["expect_time"],
+                profile["downloaded_bytes"],
+                profile["written_bytes"],
+            )
+        self.logger.results(
+            {
+                "definition": "lava",
+                "case": "profile",
+                "result": "pass",
+                "extra": summary,
+            }
+        )
+
     def cleanup(self, connection):
         self.timeout.name = "job-cleanup"
         with self.timeout(None, time.monotonic() + CLEANUP_TIMEOUT) as max_end_time:
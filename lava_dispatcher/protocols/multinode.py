@@ -43,6 +43,8 @@ class MultinodeProtocol(Protocol):
         )
         self.settings = None
         self.sock = None
+        # Connection kept open with the Coordinator, if supported
+        self.persistent_sock = None
         self.base_message = None
         self.delayed_start = False
         params = parameters["protocols"][self.name]
@@ -82,6 +84,7 @@ class MultinodeProtocol(Protocol):
             "blocksize": 4 * 1024,
             "poll_delay": 1,
             "coordinator_hostname": "localhost",
+            "persistent": True,
         }
         json_default = {}
         with open(filename) as stream:
@@ -100,6 +103,8 @@ class MultinodeProtocol(Protocol):
             settings["poll_delay"] = json_default["poll_delay"]
         if "coordinator_hostname" in json_default:
             settings["coordinator_hostname"] = json_default["coordinator_hostname"]
+        if "persistent" in json_default:
+            settings["persistent"] = bool(json_default["persistent"])
         return settings
 
     def _connect(self, delay):
@@ -181,6 +186,65 @@ class MultinodeProtocol(Protocol):
             return json.dumps({"response": "wait"})
         return response
 
+    def _recv_exactly(self, count):
+        data = b""
+        while len(data) < count:
+            chunk = self.persistent_sock.recv(min(self.blocks, count - len(data)))
+            if not chunk:
+                raise ConnectionError("connection closed by the Coordinator")
+            data += chunk
+        return data
+
+    def _close_persistent(self):
+        if self.persistent_sock is not None:
+            self.persistent_sock.close()
+            self.persistent_sock = None
+
+    def _persistent_poll(self, message, timeout):
+        """
+        Send the message over the connection kept open with the Coordinator.
+        Instead of answering "wait", the Coordinator holds the request and
+        answers as soon as the other nodes of the group allow it.
+        :return: a JSON string of the response or None if the persistent
+        connection cannot be used, in which case the caller falls back to polling.
+        """
+        data = json.loads(message)
+        data["persistent"] = True
+        request = json.dumps(data).encode("utf-8")
+        start = time.monotonic()
+        while True:
+            try:
+                if self.persistent_sock is None:
+                    self.persistent_sock = socket.create_connection(
+                        (self.settings["coordinator_hostname"], self.settings["port"]),
+                        timeout=60,
+                    )
+                self.persistent_sock.sendall(b"%08X" % len(request) + request)
+                header = self._recv_exactly(8)
+                response = self._recv_exactly(int(header, 16)).decode("utf-8")
+                json_data = json.loads(response)
+            except (OSError, ValueError) as exc:
+                self.logger.debug("Persistent connection failed: %s", exc)
+                self._close_persistent()
+                return None
+            if not json_data.get("persistent"):
+                # Older Coordinators answer and close the connection
+                self.logger.debug(
+                    "The Coordinator does not support persistent connections"
+                )
+                self.settings["persistent"] = False
+                self._close_persistent()
+                if json_data.get("response") == "wait":
+                    return None
+                return response
+            if json_data["response"] != "wait":
+                return response
+            # The Coordinator regularly answers "wait" to let the timeout apply
+            if time.monotonic() - start > timeout:
+                self._close_persistent()
+                self.finalise_protocol()
+                raise MultinodeProtocolTimeoutError("protocol %s timed out" % self.name)
+
     def poll(self, message, timeout=None):
         """
         Blocking, synchronous polling of the Coordinator on the configured port.
@@ -208,6 +272,10 @@ class MultinodeProtocol(Protocol):
             self.settings["port"],
             timeout,
         )
+        if self.settings.get("persistent"):
+            response = self._persistent_poll(message, timeout)
+            if response is not None:
+                return response
         while True:
             c_iter += self.settings["poll_delay"]
             if self._connect(delay):
@@ -353,6 +421,7 @@ class MultinodeProtocol(Protocol):
                 "group_size": self.parameters["protocols"][self.name]["group_size"],
             }
             self._send(fin_msg, True)
+        self._close_persistent()
         self.logger.debug("%s protocol finalised.", self.name)
 
     def _check_data(self, data):
@@ -10,13 +10,16 @@ import time
 import typing
 from contextlib import contextmanager
 from os import killpg as os_killpg
-from re import Match
+from re import Match, Pattern
+from re import compile as re_compile
 from re import error as re_error
+from re import search as re_search
 from re import split as re_split
 from signal import SIGKILL
 from typing import TYPE_CHECKING
 
 import pexpect
+from pexpect.expect import searcher_re
 
 from lava_common.constants import LINE_SEPARATOR
 from lava_common.exceptions import (
@@ -28,6 +31,7 @@ from lava_common.exceptions import (
 )
 from lava_common.timeout import Timeout
 from lava_dispatcher.action import Action
+from lava_dispatcher.utils import profiling
 from lava_dispatcher.utils.strings import seconds_to_str
 
 if TYPE_CHECKING:
@@ -80,6 +84,90 @@ class ShellLogger:
             self.write("\n")
 
 
+class CombinedSearcher(searcher_re):
+    """
+    pexpect searcher that looks for several regular expressions at once.
+
+    searcher_re scans the search window once for every pattern. The
+    CombinedSearcher compiles the patterns starting with a literal character,
+    like the LAVA signals, into a single alternation. The regular expression
+    engine then factors out their common prefix and the window is scanned
+    once for all of them. Other patterns are searched for separately, as
+    combining them would be slower.
+
+    The semantic of searcher_re is kept: the pattern with the leftmost match
+    wins and ties go to the first pattern in the list. The winning pattern is
+    matched again at that position, so that match.groups() and
+    match.groupdict() are the ones of the pattern alone.
+    """
+
+    def __init__(self, patterns: list[typing.Any]):
+        super().__init__(patterns)
+        # List of (regex, [(index, pattern), ...]) scanned in turn
+        self.groups: list[tuple[Pattern[str], list[tuple[int, Pattern[str]]]]] = []
+
+        combinable: dict[int, list[tuple[int, Pattern[str]]]] = {}
+        for index, pattern in self._searches:
+            if self._combinable(pattern):
+                combinable.setdefault(pattern.flags, []).append((index, pattern))
+            else:
+                self.groups.append((pattern, [(index, pattern)]))
+        for flags, members in combinable.items():
+            if len(members) > 1:
+                with contextlib.suppress(re_error):
+                    regex = re_compile(
+                        "|".join(f"(?:{pattern.pattern})" for _, pattern in members),
+                        flags,
+                    )
+                    self.groups.append((regex, members))
+                    continue
+            self.groups.extend((pattern, [(i, pattern)]) for i, pattern in members)
+
+    @staticmethod
+    def _combinable(pattern: Pattern[str]) -> bool:
+        if not isinstance(pattern.pattern, str) or not pattern.pattern:
+            return False
+        # Only patterns starting with a literal benefit from the combination
+        if pattern.pattern[0] in "\\.^$*+?{}[]|()":
+            return False
+        # Group numbers are shifted in the alternation
+        return re_search(r"\\[1-9]|\(\?\(\d", pattern.pattern) is None
+
+    def search(
+        self, buffer: str, freshlen: int, searchwindowsize: int | None = None
+    ) -> int:
+        searchstart = 0
+        if searchwindowsize is not None:
+            searchstart = max(0, len(buffer) - searchwindowsize)
+
+        best_index = best_match = None
+        for regex, members in self.groups:
+            match = regex.search(buffer, searchstart)
+            if match is None:
+                continue
+            start = match.start()
+            if best_match is not None and start > best_match.start():
+                continue
+            if len(members) == 1:
+                index = members[0][0]
+            else:
+                # First pattern of the alternation matching at this position
+                for index, pattern in members:
+                    if (match := pattern.match(buffer, start)) is not None:
+                        break
+                else:
+                    raise LAVABug(f"Unable to match {regex.pattern!r} again")
+            if best_match is None or start < best_match.start() or index < best_index:
+                best_index, best_match = index, match
+
+        if best_match is None:
+            return -1
+        self.start = best_match.start()
+        self.match = best_match
+        self.end = best_match.end()
+        return best_index
+
+
 class ShellSession:
     name = "ShellSession"
 
@@ -149,6 +237,7 @@ class ShellSession:
         self.__prompt_str__: str | None = None
         self.timeout = lava_timeout
         self.logger = logger
+        self._searchers: dict[tuple[typing.Any, ...], CombinedSearcher] = {}
 
     def _sendline_wrapper(self, s: str = "", delay: float = 0.0) -> None:
         """
@@ -192,7 +281,8 @@ class ShellSession:
         the TestShellAction make much more useful reports of what was matched
         """
         try:
-            yield None
+            with profiling.timed("expect_time"):
+                yield None
         except re_error as exc:
             msg = f"Invalid regular expression {exc.pattern!r}: {exc.msg}"
             raise TestError(msg)
@@ -331,6 +421,21 @@ class ShellSession:
         with self._expect_exc_wrapper():
             return self.raw_connection.expect(*args, **kwargs)
 
+    def expect_combined(self, patterns: list[typing.Any], timeout: float) -> int:
+        """
+        Same as expect(patterns) but the patterns are searched for at once,
+        see CombinedSearcher. The searcher is kept for the next calls with the
+        same patterns.
+        """
+        with self._expect_exc_wrapper():
+            key = tuple(patterns)
+            if (searcher := self._searchers.get(key)) is None:
+                searcher = CombinedSearcher(
+                    self.raw_connection.compile_pattern_list(patterns)
+                )
+                self._searchers[key] = searcher
+            return self.raw_connection.expect_loop(searcher, timeout=timeout)
+
     def readline(self) -> str:
         return self.raw_connection.readline()
 
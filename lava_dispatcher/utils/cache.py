@@ -0,0 +1,433 @@
+# Copyright (C) 2026 Linaro Limited
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+from __future__ import annotations
+
+import contextlib
+import errno
+import fcntl
+import glob
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+from typing import TYPE_CHECKING
+
+from lava_common.exceptions import InfrastructureError, JobError
+from lava_dispatcher.utils.compression import create_tarfile, untar_file
+from lava_dispatcher.utils.filesystem import rmtree
+
+if TYPE_CHECKING:
+    from typing import Any, ClassVar
+
+    from lava_common.log import YAMLLogger
+
+
+class LayerCache:
+    """
+    Content-addressed cache of overlay layers, kept on the worker.
+
+    Each layer is stored as an uncompressed tarball named after the sha256 of
+    the parts of its key. Layers are immutable: a given key always maps to the
+    same content, so concurrent jobs can share them without locking. Layers
+    are written to a temporary file and renamed into place.
+
+    The modification time of a layer is refreshed on each hit so that
+    administrators can expire unused layers with find(1).
+    """
+
+    def __init__(self, path: str, logger: YAMLLogger):
+        self.path = path
+        self.logger = logger
+
+    @classmethod
+    def from_config(
+        cls, dispatcher_config: dict[str, Any] | None, logger: YAMLLogger
+    ) -> LayerCache | None:
+        """
+        Return the cache configured with the overlay_cache_dir key of the
+        dispatcher configuration or None when caching is disabled.
+        """
+        path = (dispatcher_config or {}).get("overlay_cache_dir")
+        if not path:
+            return None
+        return cls(path, logger)
+
+    @staticmethod
+    def key(*parts: object) -> str:
+        sha256 = hashlib.sha256()
+        for part in parts:
+            sha256.update(str(part).encode("utf-8"))
+            sha256.update(b"\0")
+        return sha256.hexdigest()
+
+    def layer(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], f"{key}.tar")
+
+    def extract(self, key: str, dest: str) -> bool:
+        """
+        Extract the layer into dest. Return False if the layer is not cached.
+        """
+        layer = self.layer(key)
+        if not os.path.exists(layer):
+            return False
+        self.logger.debug("Extracting cached layer %s into %s", key, dest)
+        try:
+            untar_file(layer, dest)
+        except JobError as exc:
+            # A corrupted layer should not fail the job: drop it and let the
+            # caller rebuild it.
+            self.logger.warning("Dropping corrupted layer %s: %s", key, exc)
+            os.unlink(layer)
+            if os.path.exists(dest):
+                rmtree(dest)
+            return False
+        os.utime(layer)
+        return True
+
+    def store(self, key: str, src: str) -> None:
+        layer = self.layer(key)
+        if os.path.exists(layer):
+            return
+        self.logger.debug("Storing %s as layer %s", src, key)
+        try:
+            os.makedirs(os.path.dirname(layer), mode=0o755, exist_ok=True)
+            fd, tmp_layer = tempfile.mkstemp(
+                dir=os.path.dirname(layer), prefix=".", suffix=".tar"
+            )
+            os.close(fd)
+        except OSError as exc:
+            self.logger.warning("Unable to store layer %s: %s", key, exc)
+            return
+        try:
+            create_tarfile(src, tmp_layer, arcname=".")
+            os.chmod(tmp_layer, 0o644)
+            os.replace(tmp_layer, layer)
+        except (InfrastructureError, OSError) as exc:
+            self.logger.warning("Unable to store layer %s: %s", key, exc)
+            if os.path.exists(tmp_layer):
+                os.unlink(tmp_layer)
+
+
+class BaseImageStore:
+    """
+    Read-only base images of the QEMU disk images, kept on the worker.
+
+    A base image is an image downloaded (and decompressed) by a previous job,
+    named after the sha256sum given in the job definition and checked by the
+    download. Base images are never written: each job boots a thin qcow2
+    overlay backed by the base image, created in the job directory.
+
+    When the total size of the base images is larger than the quota, the
+    least recently used base images are removed. The base images used by a
+    job are locked (shared) until the end of the lava-run process, so they are
+    never removed while a job is using them.
+    """
+
+    # Locked base images of this process: path to file descriptor
+    _pinned: ClassVar[dict[str, int]] = {}
+
+    def __init__(self, path: str, logger: YAMLLogger, quota: int = 0):
+        self.path = path
+        self.logger = logger
+        # In bytes, 0 means no limit
+        self.quota = quota
+
+    @classmethod
+    def from_config(
+        cls, dispatcher_config: dict[str, Any] | None, logger: YAMLLogger
+    ) -> BaseImageStore | None:
+        """
+        Return the store configured with the qemu_base_image_dir and
+        qemu_base_image_quota (in MB) keys of the dispatcher configuration or
+        None when disabled.
+        """
+        dispatcher_config = dispatcher_config or {}
+        path = dispatcher_config.get("qemu_base_image_dir")
+        if not path:
+            return None
+        quota = int(dispatcher_config.get("qemu_base_image_quota", 0))
+        return cls(path, logger, quota * 1024 * 1024)
+
+    key = staticmethod(LayerCache.key)
+
+    def image(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], f"{key}.img")
+
+    def lookup(self, key: str) -> str | None:
+        image = self.image(key)
+        if not self.pin(image):
+            return None
+        os.utime(image)
+        return image
+
+    @classmethod
+    def pin(cls, image: str) -> bool:
+        """
+        Lock the base image until the end of the process. Return False if the
+        image does not exist or was just evicted.
+        """
+        if image in cls._pinned:
+            return True
+        try:
+            fd = os.open(image, os.O_RDONLY)
+        except FileNotFoundError:
+            return False
+        fcntl.flock(fd, fcntl.LOCK_SH)
+        if os.fstat(fd).st_nlink == 0:
+            # Removed by evict() while we were waiting for the lock
+            os.close(fd)
+            return False
+        cls._pinned[image] = fd
+        return True
+
+    @classmethod
+    def unpin(cls) -> None:
+        """
+        Release the locks taken by this process.
+        """
+        for fd in cls._pinned.values():
+            os.close(fd)
+        cls._pinned.clear()
+
+    def store(self, key: str, src: str) -> str | None:
+        """
+        Move src into the store and return the path of the base image or None
+        if the image cannot be stored.
+        """
+        image = self.image(key)
+        self.logger.debug("Storing %s as base image %s", src, key)
+        try:
+            os.makedirs(os.path.dirname(image), mode=0o755, exist_ok=True)
+            fd, tmp_image = tempfile.mkstemp(
+                dir=os.path.dirname(image), prefix=".", suffix=".img"
+            )
+            os.close(fd)
+        except OSError as exc:
+            self.logger.warning("Unable to store base image %s: %s", key, exc)
+            return None
+        fd = None
+        try:
+            # Cheap rename when the store and the job directory share the
+            # same filesystem
+            shutil.move(src, tmp_image)
+            os.chmod(tmp_image, 0o444)
+            # Lock the image before publishing it so a concurrent evict()
+            # cannot remove it
+            fd = os.open(tmp_image, os.O_RDONLY)
+            fcntl.flock(fd, fcntl.LOCK_SH)
+            os.replace(tmp_image, image)
+        except OSError as exc:
+            self.logger.warning("Unable to store base image %s: %s", key, exc)
+            if fd is not None:
+                os.close(fd)
+            # Leave the download in place for the job
+            if os.path.exists(tmp_image) and not os.path.exists(src):
+                shutil.move(tmp_image, src)
+            elif os.path.exists(tmp_image):
+                os.unlink(tmp_image)
+            return None
+        # The previously pinned image (if any) was replaced
+        with contextlib.suppress(KeyError):
+            os.close(self._pinned.pop(image))
+        self._pinned[image] = fd
+        self.evict(keep=image)
+        return image
+
+    def evict(self, keep: str) -> None:
+        if not self.quota:
+            return
+        images = []
+        for image in glob.glob(os.path.join(self.path, "*", "*.img")):
+            try:
+                st = os.stat(image)
+            except FileNotFoundError:
+                continue
+            images.append((st.st_mtime, st.st_size, image))
+        total = sum(size for (_, size, _) in images)
+        for _, size, image in sorted(images):
+            if total <= self.quota:
+                break
+            if image == keep:
+                continue
+            try:
+                fd = os.open(image, os.O_RDONLY)
+            except FileNotFoundError:
+                total -= size
+                continue
+            try:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    # Used by a running job
+                    continue
+                self.logger.debug("Evicting base image %s", image)
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(image)
+                total -= size
+            finally:
+                os.close(fd)
+
+    @staticmethod
+    def overlay(base: str, dest: str) -> None:
+        """
+        Create a qcow2 overlay backed by the base image.
+        """
+        try:
+            subprocess.run(
+                ["qemu-img", "create", "-f", "qcow2", "-F", "raw", "-b", base, dest],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+        except (OSError, subprocess.CalledProcessError) as exc:
+            stderr = getattr(exc, "stderr", None) or str(exc)
+            raise InfrastructureError("qemu-img create failed: %s" % stderr[:500])
+
+    @staticmethod
+    def image_arg(image_arg: str, label: str) -> str | None:
+        """
+        Return the image_arg booting a qcow2 overlay instead of the raw image
+        of label or None if the image is not used by a -drive option with
+        format=raw. Without format, qemu probes the format of the image: the
+        image may not be a raw image.
+        """
+        args = image_arg.split(" ")
+        for index in range(1, len(args)):
+            if args[index - 1] != "-drive":
+                continue
+            options = args[index].split(",")
+            if "file={%s}" % label not in options:
+                continue
+            formats = [o for o in options if o.startswith("format=")]
+            if formats != ["format=raw"]:
+                return None
+            options[options.index("format=raw")] = "format=qcow2"
+            args[index] = ",".join(options)
+            return " ".join(args)
+        return None
+
+
+class ArtifactStore:
+    """
+    Content-addressed store of the artifacts deployed over TFTP and NFS
+    (kernels, DTBs, ramdisks, NFS root filesystem tarballs...).
+
+    An artifact is named after the sha256 of the downloaded data and the
+    decompression applied. Jobs get a hardlink to the stored artifact in their
+    own directory, so concurrent jobs using the same artifact share the same
+    blocks. When the store and the job directory are on different
+    filesystems, the artifact is copied (reflinked when supported).
+
+    The hardlinks are the reference count: an artifact with a single link is
+    not used by any job and can be removed when the total size of the store
+    is larger than the quota, least recently used first.
+    """
+
+    def __init__(self, path: str, logger: YAMLLogger, quota: int = 0):
+        self.path = path
+        self.logger = logger
+        # In bytes, 0 means no limit
+        self.quota = quota
+
+    @classmethod
+    def from_config(
+        cls, dispatcher_config: dict[str, Any] | None, logger: YAMLLogger
+    ) -> ArtifactStore | None:
+        """
+        Return the store configured with the artifact_store_dir and
+        artifact_store_quota (in MB) keys of the dispatcher configuration or
+        None when disabled.
+        """
+        dispatcher_config = dispatcher_config or {}
+        path = dispatcher_config.get("artifact_store_dir")
+        if not path:
+            return None
+        quota = int(dispatcher_config.get("artifact_store_quota", 0))
+        return cls(path, logger, quota * 1024 * 1024)
+
+    key = staticmethod(LayerCache.key)
+
+    def artifact(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], key)
+
+    @staticmethod
+    def _link(src: str, dest: str) -> None:
+        try:
+            os.link(src, dest)
+        except OSError as exc:
+            # Not on the same filesystem or not allowed to link
+            if exc.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+                raise
+            subprocess.run(
+                ["cp", "--reflink=auto", src, dest],
+                check=True,
+                capture_output=True,
+            )
+
+    def link(self, key: str, dest: str) -> bool:
+        """
+        Make dest a view of the stored artifact. Return False if the artifact
+        is not in the store.
+        """
+        artifact = self.artifact(key)
+        tmp_dest = "%s.%d" % (dest, os.getpid())
+        try:
+            self._link(artifact, tmp_dest)
+            os.replace(tmp_dest, dest)
+        except (OSError, subprocess.CalledProcessError):
+            # Missing or removed concurrently
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(tmp_dest)
+            return False
+        with contextlib.suppress(OSError):
+            os.utime(artifact)
+        return True
+
+    def store(self, key: str, src: str) -> None:
+        """
+        Add src to the store. When the artifact is already stored, src is
+        replaced by a view of the stored artifact.
+        """
+        artifact = self.artifact(key)
+        if self.link(key, src):
+            self.logger.debug("Sharing %s with artifact %s", src, key)
+            return
+        self.logger.debug("Storing %s as artifact %s", src, key)
+        tmp_artifact = os.path.join(
+            os.path.dirname(artifact), ".%s.%d" % (key, os.getpid())
+        )
+        try:
+            os.makedirs(os.path.dirname(artifact), mode=0o755, exist_ok=True)
+            self._link(src, tmp_artifact)
+            os.chmod(tmp_artifact, 0o444)
+            os.replace(tmp_artifact, artifact)
+        except (OSError, subprocess.CalledProcessError) as exc:
+            self.logger.warning("Unable to store artifact %s: %s", key, exc)
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(tmp_artifact)
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        if not self.quota:
+            return
+        artifacts = []
+        for artifact in glob.glob(os.path.join(self.path, "*", "*")):
+            try:
+                st = os.stat(artifact)
+            except FileNotFoundError:
+                continue
+            artifacts.append((st.st_mtime, st.st_size, st.st_nlink, artifact))
+        total = sum(size for (_, size, _, _) in artifacts)
+        for _, size, nlink, artifact in sorted(artifacts):
+            if total <= self.quota:
+                break
+            # Still used by a job
+            if nlink > 1:
+                continue
+            self.logger.debug("Evicting artifact %s", artifact)
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(artifact)
+            total -= size
@@ -17,7 +17,7 @@ from lava_common.device_mappings import (
 from lava_common.exceptions import InfrastructureError, LAVABug
 from lava_dispatcher.action import Action, InternalObject
 from lava_dispatcher.utils.decorator import retry
-from lava_dispatcher.utils.docker import DockerContainer, DockerRun
+from lava_dispatcher.utils.docker import DockerContainer, DockerRun, get_docker_pool
 from lava_dispatcher.utils.udev import get_udev_devices
 
 if TYPE_CHECKING:
@@ -174,11 +174,15 @@ class DockerDriver(NullDriver):
         docker = self.build(DockerRun, copy_files)
         return docker.cmdline()
 
-    def run(self, cmd):
+    def start_container(self):
+        """
+        Return a started helper container and whether it is kept warm.
+
+        With "docker_warm_containers" set in the dispatcher configuration, the
+        container is kept running after the command and reused by the next
+        commands of the job needing the same container.
+        """
         docker = self.build(DockerContainer)
-        name = self.get_container_name()
-        docker.name(name)
-        self.action.containers.append(docker)
         docker_test_method_conf = (
             self.action.job.device["actions"]
             .get("test", {})
@@ -186,36 +190,46 @@ class DockerDriver(NullDriver):
             .get("docker", {})
         )
         docker.add_device_docker_method_options(docker_test_method_conf)
+
+        pool = get_docker_pool()
+        warm = self.action.job.parameters["dispatcher"].get(
+            "docker_warm_containers", False
+        )
+        key = tuple(docker.cmdline())
+        if warm and (container := pool.get(key)) is not None:
+            self.action.logger.debug(
+                f"Reusing docker container {container._container_name}"
+            )
+            return container, warm
+
+        docker.name(self.get_container_name())
+        self.action.containers.append(docker)
         docker.start(self.action)
+        if warm:
+            pool.put(key, docker)
+        return docker, warm
+
+    def run(self, cmd):
+        docker, warm = self.start_container()
         try:
-            self.__map_devices__(name, docker)
+            self.__map_devices__(docker._container_name, docker)
             docker.run(cmd, self.action)
         finally:
             remove_device_container_mappings(self.job_dir)
             self.action.logger.debug("Removed device container mappings")
-            docker.stop(self.action)
+            if not warm:
+                docker.stop(self.action)
 
     def get_output(self, cmd):
-        # FIXME duplicates most of run()
-        docker = self.build(DockerContainer)
-        name = self.get_container_name()
-        docker.name(name)
-        self.action.containers.append(docker)
-        docker_test_method_conf = (
-            self.action.job.device["actions"]
-            .get("test", {})
-            .get("methods", {})
-            .get("docker", {})
-        )
-        docker.add_device_docker_method_options(docker_test_method_conf)
-        docker.start(self.action)
+        docker, warm = self.start_container()
         try:
-            self.__map_devices__(name, docker)
+            self.__map_devices__(docker._container_name, docker)
             return docker.get_output(cmd, self.action)
         finally:
             remove_device_container_mappings(self.job_dir)
             self.action.logger.debug("Removed device container mappings")
-            docker.stop(self.action)
+            if not warm:
+                docker.stop(self.action)
 
     def maybe_copy_to_container(self, src):
         if src not in self.copied_files:
@@ -7,7 +7,9 @@ from __future__ import annotations
 
 import os
 import random
+import select
 import subprocess
+import threading
 import time
 from pathlib import Path
 from typing import TYPE_CHECKING
@@ -21,6 +23,69 @@ if TYPE_CHECKING:
     from lava_dispatcher.shell import ShellSession
 
 
+# Script waiting inside the container for a file to appear. "$2" is the
+# number of 0.1s steps to wait for, or a negative number to wait forever.
+WAIT_FILE_SCRIPT = (
+    'n="$2"; while [ ! -e "$1" ]; do '
+    '[ "$n" -ne 0 ] || exit 1; n=$((n - 1)); sleep 0.1; done'
+)
+
+
+class DockerPool:
+    """
+    Images and containers shared by the docker-backed actions of a job.
+
+    Images are pulled and checked once per job. When enabled, helper
+    containers are kept running after a command and reused by the next
+    command that needs a container with the same options.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+        self.images: set[tuple[tuple[str, ...], str]] = set()
+        self.containers: dict[tuple[str, ...], DockerContainer] = {}
+
+    def is_prepared(self, docker_options: list[str], image: str) -> bool:
+        with self.lock:
+            return (tuple(docker_options), image) in self.images
+
+    def prepared(self, docker_options: list[str], image: str) -> None:
+        with self.lock:
+            self.images.add((tuple(docker_options), image))
+
+    def get(self, key: tuple[str, ...]) -> DockerContainer | None:
+        with self.lock:
+            return self.containers.get(key)
+
+    def put(self, key: tuple[str, ...], container: DockerContainer) -> None:
+        with self.lock:
+            self.containers[key] = container
+
+    def forget(self, container: DockerContainer) -> None:
+        with self.lock:
+            self.containers = {
+                key: value
+                for key, value in self.containers.items()
+                if value is not container
+            }
+
+
+_docker_pool: DockerPool | None = None
+_docker_pool_lock = threading.Lock()
+
+
+def get_docker_pool() -> DockerPool:
+    """
+    Return the docker pool of this process
+    """
+    global _docker_pool
+    with _docker_pool_lock:
+        if _docker_pool is None or _docker_pool.pid != os.getpid():
+            _docker_pool = DockerPool()
+        return _docker_pool
+
+
 class DockerLogin:
     def __init__(self, registry: str, user: str, password: str):
         self.registry = registry
@@ -224,6 +289,10 @@ class DockerRun:
             return action.run_cmd(cmd, error_msg=error_msg)
 
     def prepare(self, action: Action):
+        pool = get_docker_pool()
+        if pool.is_prepared(self._docker_options, self.image):
+            return
+
         pull = not self._is_local_image
         if self._is_local_image:
             if action.run_cmd(
@@ -253,32 +322,129 @@ class DockerRun:
                 env=docker_pull_env,
             )
         self._check_image_arch(action)
+        pool.prepared(self._docker_options, self.image)
 
-    def wait(self, shell: ShellSession | None = None):
-        delay = 1
-        while True:
-            try:
-                # If possible, check that docker's shell command didn't exit
-                # yet.
-                if shell and not shell.raw_connection.isalive():
-                    raise InfrastructureError("Docker container unexpectedly exited")
-                subprocess.check_call(
+    def _running(self) -> bool:
+        try:
+            return (
+                subprocess.check_output(
                     [
                         "docker",
                         *self._docker_options,
                         "inspect",
-                        "--format=.",
+                        "--format={{.State.Running}}",
                         self._container_name,
                     ],
-                    stdout=subprocess.DEVNULL,
                     stderr=subprocess.DEVNULL,
-                )
+                    text=True,
+                ).strip()
+                == "true"
+            )
+        except subprocess.CalledProcessError:
+            return False
+
+    def wait(self, shell: ShellSession | None = None):
+        """
+        Wait for the container to be started.
+
+        The container events are followed instead of polling "docker
+        inspect", so the wait ends as soon as the container is started.
+        """
+        # Events since this point are replayed, so the container cannot be
+        # started between the check and the subscription unnoticed.
+        since = str(int(time.time()) - 1)
+        if self._running():
+            return
+
+        if self._wait_event(since, shell):
+            return
+
+        delay = 1
+        while True:
+            if shell and not shell.raw_connection.isalive():
+                raise InfrastructureError("Docker container unexpectedly exited")
+            time.sleep(delay)
+            delay = delay * 2  # exponential backoff
+            if self._running():
                 return
-            except subprocess.CalledProcessError:
-                time.sleep(delay)
-                delay = delay * 2  # exponential backoff
+
+    def _wait_event(self, since: str, shell: ShellSession | None) -> bool:
+        """
+        Follow the container events until the container is started. Return
+        False if the events are not available.
+        """
+        try:
+            events = subprocess.Popen(
+                [
+                    "docker",
+                    *self._docker_options,
+                    "events",
+                    "--since",
+                    since,
+                    "--filter",
+                    f"container={self._container_name}",
+                    "--filter",
+                    "event=start",
+                    "--format",
+                    "{{.Status}}",
+                ],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+            )
+        except OSError:
+            return False
+
+        try:
+            while True:
+                # If possible, check that docker's shell command didn't exit
+                # yet.
+                if shell and not shell.raw_connection.isalive():
+                    raise InfrastructureError("Docker container unexpectedly exited")
+                ready, _, _ = select.select([events.stdout], [], [], 1)
+                if ready:
+                    # An empty line: "docker events" exited
+                    return bool(events.stdout.readline())
+        finally:
+            events.kill()
+            events.wait()
+            events.stdout.close()
 
     def wait_file(self, filename: str, timeout: int | None = None) -> None:
+        """
+        Wait for a file to appear in the container.
+
+        A single "docker exec" waits inside the container. When it fails
+        (images without a shell, container not running yet...), fall back to
+        polling with "docker exec test".
+        """
+        steps = -1 if timeout is None else int(timeout * 10)
+        start = time.monotonic()
+        try:
+            subprocess.check_call(
+                [
+                    "docker",
+                    *self._docker_options,
+                    "exec",
+                    self._container_name,
+                    "sh",
+                    "-c",
+                    WAIT_FILE_SCRIPT,
+                    "sh",
+                    filename,
+                    str(steps),
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            return
+        except subprocess.CalledProcessError:
+            pass
+        if timeout is not None:
+            timeout = max(timeout - (time.monotonic() - start), 0)
+        self._poll_file(filename, timeout)
+
+    def _poll_file(self, filename: str, timeout: float | None = None) -> None:
         delay = 1
         start = time.monotonic()
         while True:
@@ -385,4 +551,9 @@ class DockerContainer(DockerRun):
         self._started = True
 
     def stop(self, action):
+        get_docker_pool().forget(self)
         action.run_cmd(["docker", *self._docker_options, "stop", self._container_name])
+
+    def destroy(self):
+        get_docker_pool().forget(self)
+        super().destroy()
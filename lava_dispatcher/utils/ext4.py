@@ -4,11 +4,14 @@
 from __future__ import annotations
 
 import json
+import lzma
 import os
 import re
+import shutil
 import subprocess
 import tarfile
 import tempfile
+import zlib
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -21,6 +24,10 @@ if TYPE_CHECKING:
 DEBUGFS_BATCH_SIZE = 256
 DD_BLOCK_SIZE = "4M"
 
+# tarfile stream modes: the overlays are read in a single pass, without
+# decompressing them to disk first
+_TAR_STREAM_MODES = {None: "r|*", "gzip": "r|gz", "xz": "r|xz"}
+
 _DEBUGFS_ERROR_RE = re.compile(
     r"^(debugfs|ext2fs_\w+|mkdir|write|ln|symlink|dump|sif|close|Fatal error):"
 )
@@ -111,19 +118,34 @@ def _ext4_free_bytes(image: str) -> int | None:
     return free_blocks * block_size
 
 
+def _member_payload_bytes(member: tarfile.TarInfo) -> int:
+    """File-content bytes of a tar member, rounded up to 4 KiB blocks."""
+    if member.isfile():
+        return (member.size + 4095) & ~4095
+    return 0
+
+
 def _tar_payload_bytes(tar_path: str) -> int:
     """Sum the file-content bytes in a tar, rounded up to 4 KiB blocks."""
     total = 0
     try:
-        with tarfile.open(tar_path) as tar:
+        with tarfile.open(tar_path, "r|*") as tar:
             for member in tar:
-                if member.isfile():
-                    total += (member.size + 4095) & ~4095
-    except (tarfile.TarError, OSError):
+                total += _member_payload_bytes(member)
+    except (tarfile.TarError, OSError, EOFError):
         return 0
     return total
 
 
+def _check_free_space(image: str, needed_bytes: int, free_bytes: int | None) -> None:
+    if free_bytes is not None and free_bytes < needed_bytes:
+        raise JobError(
+            "Not enough free space in %s: need ~%d MiB, have %d MiB. "
+            "Increase the image size or drop the overlay."
+            % (image, needed_bytes // (1024 * 1024), free_bytes // (1024 * 1024))
+        )
+
+
 def _run_debugfs_batched(
     image: str, commands: list[str], batch_size: int = DEBUGFS_BATCH_SIZE
 ) -> None:
@@ -217,16 +239,67 @@ def _q(path: str) -> str:
     return '"%s"' % path
 
 
+def _extract_tar_files(
+    tar_path: str,
+    tmpdir: str,
+    compress: str | None = None,
+    image: str | None = None,
+    free_bytes: int | None = None,
+) -> list[tarfile.TarInfo]:
+    """Extract the regular files of the tar into tmpdir, in a single pass.
+
+    The tar (compressed or not) is read as a stream. The space needed in the
+    image is accounted from the member headers, before extracting their
+    content: a JobError is raised as soon as it exceeds free_bytes.
+    """
+    tmpdir_base = Path(tmpdir).resolve()
+    members: list[tarfile.TarInfo] = []
+    needed_bytes = 0
+    try:
+        tar = tarfile.open(tar_path, _TAR_STREAM_MODES[compress])
+    except (tarfile.TarError, OSError) as exc:
+        raise JobError(f"Failed to open tar {tar_path}: {exc}") from exc
+
+    try:
+        for member in tar:
+            _validate_tar_member(member)
+            members.append(member)
+            if not member.isfile():
+                continue
+            needed_bytes += _member_payload_bytes(member)
+            if image is not None:
+                _check_free_space(image, needed_bytes, free_bytes)
+
+            host_path = os.path.join(tmpdir, member.name)
+            resolved_host = Path(host_path).resolve()
+            if not resolved_host.is_relative_to(tmpdir_base):
+                raise JobError("Path traversal in tar member: %s" % member.name)
+            os.makedirs(os.path.dirname(host_path), exist_ok=True)
+            src = tar.extractfile(member)
+            with open(host_path, "wb") as dst:
+                if src is not None:
+                    shutil.copyfileobj(src, dst, 65536)
+                    src.close()
+    except (tarfile.TarError, EOFError, zlib.error, lzma.LZMAError) as exc:
+        raise JobError(f"Failed to read tar {tar_path}: {exc}") from exc
+    finally:
+        tar.close()
+    return members
+
+
 def _tar_to_debugfs_commands(
     action: Action,
     tar_path: str,
     target_path: str,
     tmpdir: str,
     image: str | None = None,
+    compress: str | None = None,
+    free_bytes: int | None = None,
 ) -> list[str]:
+    members = _extract_tar_files(tar_path, tmpdir, compress, image, free_bytes)
+
     commands: list[str] = []
     seen_dirs: set[str] = set()
-    tmpdir_base = Path(tmpdir).resolve()
     symlink_cache: dict[str, str] = {}
 
     def resolve(p: str) -> str:
@@ -243,99 +316,66 @@ def _tar_to_debugfs_commands(
         resolved = _resolve_symlink(image, parent, symlink_cache)
         return resolved.rstrip("/") + "/" + base
 
-    try:
-        tar = tarfile.open(tar_path)
-    except tarfile.TarError as exc:
-        raise JobError(f"Failed to open tar {tar_path}: {exc}") from exc
-
-    try:
-        members = sorted(tar.getmembers(), key=lambda m: m.name)
-        for member in members:
-            _validate_tar_member(member)
-
-            raw_path = os.path.normpath(os.path.join(target_path, member.name))
-            if raw_path == ".":
-                raw_path = "/"
-            if not raw_path.startswith("/"):
-                raw_path = "/" + raw_path
+    for member in sorted(members, key=lambda m: m.name):
+        raw_path = os.path.normpath(os.path.join(target_path, member.name))
+        if raw_path == ".":
+            raw_path = "/"
+        if not raw_path.startswith("/"):
+            raw_path = "/" + raw_path
+
+        if member.isdir():
+            ext4_path = resolve(raw_path)
+        else:
+            ext4_path = resolve_parent(raw_path)
+
+        parent = os.path.dirname(ext4_path)
+        if parent and parent != "/" and parent not in seen_dirs:
+            for part in _path_parents(parent):
+                if part in seen_dirs:
+                    continue
+                seen_dirs.add(part)
+                if image is not None and _stat_path(image, part) is not None:
+                    # Already present in the image — don't mkdir it.
+                    continue
+                commands.append("mkdir %s" % _q(part))
 
-            if member.isdir():
-                ext4_path = resolve(raw_path)
-            else:
-                ext4_path = resolve_parent(raw_path)
-
-            parent = os.path.dirname(ext4_path)
-            if parent and parent != "/" and parent not in seen_dirs:
-                for part in _path_parents(parent):
-                    if part in seen_dirs:
-                        continue
-                    seen_dirs.add(part)
-                    if image is not None and _stat_path(image, part) is not None:
-                        # Already present in the image — don't mkdir it.
-                        continue
-                    commands.append("mkdir %s" % _q(part))
-
-            if member.isdir():
-                if ext4_path not in seen_dirs:
-                    seen_dirs.add(ext4_path)
-                    already = (
-                        image is not None and _stat_path(image, ext4_path) is not None
-                    )
-                    if not already:
-                        commands.append("mkdir %s" % _q(ext4_path))
-                mode = 0o040000 | (member.mode & 0o7777)
-                commands.append(f"sif {_q(ext4_path)} mode 0{mode:o}")
-                commands.append("sif %s uid %d" % (_q(ext4_path), member.uid))
-                commands.append("sif %s gid %d" % (_q(ext4_path), member.gid))
-
-            elif member.issym():
-                commands.append(f"symlink {_q(ext4_path)} {_q(member.linkname)}")
-                commands.append("sif %s uid %d" % (_q(ext4_path), member.uid))
-                commands.append("sif %s gid %d" % (_q(ext4_path), member.gid))
-
-            elif member.isfile():
-                host_path = os.path.join(tmpdir, member.name)
-                resolved_host = Path(host_path).resolve()
-                if not resolved_host.is_relative_to(tmpdir_base):
-                    raise JobError("Path traversal in tar member: %s" % member.name)
-                host_dir = os.path.dirname(host_path)
-                os.makedirs(host_dir, exist_ok=True)
-                src = tar.extractfile(member)
-                if src is not None:
-                    with open(host_path, "wb") as dst:
-                        while True:
-                            chunk = src.read(65536)
-                            if not chunk:
-                                break
-                            dst.write(chunk)
-                    src.close()
-                else:
-                    with open(host_path, "wb") as dst:
-                        pass
-
-                commands.append("rm %s" % _q(ext4_path))
-                commands.append(f"write {_q(host_path)} {_q(ext4_path)}")
-                mode = 0o100000 | (member.mode & 0o7777)
-                commands.append(f"sif {_q(ext4_path)} mode 0{mode:o}")
-                commands.append("sif %s uid %d" % (_q(ext4_path), member.uid))
-                commands.append("sif %s gid %d" % (_q(ext4_path), member.gid))
-
-            elif member.islnk():
-                target_raw = os.path.normpath(
-                    os.path.join(target_path, member.linkname)
-                )
-                commands.append(f"ln {_q(resolve_parent(target_raw))} {_q(ext4_path)}")
+        if member.isdir():
+            if ext4_path not in seen_dirs:
+                seen_dirs.add(ext4_path)
+                already = image is not None and _stat_path(image, ext4_path) is not None
+                if not already:
+                    commands.append("mkdir %s" % _q(ext4_path))
+            mode = 0o040000 | (member.mode & 0o7777)
+            commands.append(f"sif {_q(ext4_path)} mode 0{mode:o}")
+            commands.append("sif %s uid %d" % (_q(ext4_path), member.uid))
+            commands.append("sif %s gid %d" % (_q(ext4_path), member.gid))
+
+        elif member.issym():
+            commands.append(f"symlink {_q(ext4_path)} {_q(member.linkname)}")
+            commands.append("sif %s uid %d" % (_q(ext4_path), member.uid))
+            commands.append("sif %s gid %d" % (_q(ext4_path), member.gid))
+
+        elif member.isfile():
+            host_path = os.path.join(tmpdir, member.name)
+            commands.append("rm %s" % _q(ext4_path))
+            commands.append(f"write {_q(host_path)} {_q(ext4_path)}")
+            mode = 0o100000 | (member.mode & 0o7777)
+            commands.append(f"sif {_q(ext4_path)} mode 0{mode:o}")
+            commands.append("sif %s uid %d" % (_q(ext4_path), member.uid))
+            commands.append("sif %s gid %d" % (_q(ext4_path), member.gid))
+
+        elif member.islnk():
+            target_raw = os.path.normpath(os.path.join(target_path, member.linkname))
+            commands.append(f"ln {_q(resolve_parent(target_raw))} {_q(ext4_path)}")
+
+        elif member.isblk() or member.ischr():
+            action.logger.warning(
+                "Skipping device node %s (unsupported by debugfs batch mode)",
+                member.name,
+            )
 
-            elif member.isblk() or member.ischr():
-                action.logger.warning(
-                    "Skipping device node %s (unsupported by debugfs batch mode)",
-                    member.name,
-                )
-
-            elif member.isfifo():
-                action.logger.warning("Skipping FIFO %s", member.name)
-    finally:
-        tar.close()
+        elif member.isfifo():
+            action.logger.warning("Skipping FIFO %s", member.name)
 
     return commands
 
@@ -435,60 +475,34 @@ def inject_tar(
     target_path: str = "/",
     compress: str | None = None,
 ) -> None:
-    if compress is not None and compress not in ("gzip", "xz"):
+    if compress not in _TAR_STREAM_MODES:
         raise JobError("inject_tar: unsupported compression %r" % compress)
 
-    actual_tar = tar_path
-    decompressed = None
-
-    if compress == "gzip" or (compress is None and tar_path.endswith(".gz")):
-        from lava_dispatcher.utils.compression import decompress_file
-
-        if os.path.exists(tar_path[:-3]):
-            os.unlink(tar_path[:-3])
-        actual_tar = decompress_file(tar_path, "gz")
-        decompressed = actual_tar
-    elif compress == "xz" or (compress is None and tar_path.endswith(".xz")):
-        from lava_dispatcher.utils.compression import decompress_file
-
-        if os.path.exists(tar_path[:-3]):
-            os.unlink(tar_path[:-3])
-        actual_tar = decompress_file(tar_path, "xz")
-        decompressed = actual_tar
-
-    action.logger.debug("Injecting %s into %s at %s", actual_tar, image, target_path)
+    action.logger.debug("Injecting %s into %s at %s", tar_path, image, target_path)
 
+    # The compressed tar is extracted on the fly and the space is accounted
+    # before writing to the image.
     free_bytes = _ext4_free_bytes(image)
-    needed_bytes = _tar_payload_bytes(actual_tar)
-    if free_bytes is not None and needed_bytes and free_bytes < needed_bytes:
-        raise JobError(
-            "Not enough free space in %s: need ~%d MiB, have %d MiB. "
-            "Increase the image size or drop the overlay."
-            % (image, needed_bytes // (1024 * 1024), free_bytes // (1024 * 1024))
-        )
-
     with tempfile.TemporaryDirectory(prefix="lava-ext4-") as tmpdir:
         commands = _tar_to_debugfs_commands(
-            action, actual_tar, target_path, tmpdir, image
+            action,
+            tar_path,
+            target_path,
+            tmpdir,
+            image,
+            compress=compress,
+            free_bytes=free_bytes,
         )
         if commands:
             action.logger.debug(
-                "Running %d debugfs commands on %s in batches of %d (need %d MiB, "
-                "have %s MiB free)",
+                "Running %d debugfs commands on %s in batches of %d (%s MiB free)",
                 len(commands),
                 image,
                 DEBUGFS_BATCH_SIZE,
-                needed_bytes // (1024 * 1024),
                 (str(free_bytes // (1024 * 1024)) if free_bytes is not None else "?"),
             )
             _run_debugfs_batched(image, commands)
 
-    if decompressed and decompressed != tar_path:
-        try:
-            os.unlink(decompressed)
-        except OSError:
-            pass
-
 
 def inject_file(action: Action, image: str, src_path: str, dest_path: str) -> None:
     symlink_cache: dict[str, str] = {}
@@ -5,7 +5,6 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 from __future__ import annotations
 
-import time
 from typing import TYPE_CHECKING
 
 from lava_common.exceptions import FastbootDeviceNotFound, JobError
@@ -75,7 +74,7 @@ class DetectFastbootDevice(OptionalContainerFastbootAction):
                 self.job.device["device_info"] = [{"board_id": sn}]
                 self.logger.info(f"'device_info[0].board_id' is set to {sn}")
 
-    @retry(exception=FastbootDeviceNotFound, retries=10, delay=3)
+    @retry(exception=FastbootDeviceNotFound, retries=30, delay=1)
     def detect(self):
         # 'fastboot devices' output line example: a2c22e48\tfastboot\n
         output = self.get_output_maybe_in_container(["fastboot", "devices"])
@@ -101,9 +100,7 @@ class DetectFastbootDevice(OptionalContainerFastbootAction):
     def run(self, connection, max_end_time):
         connection = super().run(connection, max_end_time)
 
-        # Wait a while for the device to enter fastboot.
-        time.sleep(3)
-        # Try the detection up to 10 times.
+        # Poll until the device enters fastboot.
         self.detect()
 
         return connection
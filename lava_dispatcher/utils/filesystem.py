@@ -16,7 +16,6 @@ from typing import TYPE_CHECKING
 
 from lava_common.constants import DISPATCHER_DOWNLOAD_DIR
 from lava_common.exceptions import InfrastructureError, JobError, LAVABug
-from lava_dispatcher.utils.compression import decompress_file
 from lava_dispatcher.utils.decorator import replace_exception
 
 if TYPE_CHECKING:
@@ -297,19 +296,15 @@ def copy_in_overlay(
             write_partition_back,
         )
 
-        if os.path.exists(overlay[:-3]):
-            os.unlink(overlay[:-3])
-        decompressed_overlay = decompress_file(overlay, "gz")
-
         if root_partition is not None:
             with tempfile.TemporaryDirectory(prefix="lava-part-") as tmpdir:
                 part_file, start, sector_size = extract_partition(
                     image, int(root_partition), tmpdir
                 )
-                inject_tar(action, part_file, decompressed_overlay)
+                inject_tar(action, part_file, overlay)
                 write_partition_back(image, part_file, start, sector_size)
         else:
-            inject_tar(action, image, decompressed_overlay)
+            inject_tar(action, image, overlay)
         return
 
     import guestfs
@@ -330,13 +325,7 @@ def copy_in_overlay(
             raise InfrastructureError("Unable to prepare guestfs")
         guest.mount(devices[0], "/")
 
-    # FIXME: max message length issues when using tar_in
-    # on tar.gz.  Works fine with tar so decompressing
-    # overlay first.
-    if os.path.exists(overlay[:-3]):
-        os.unlink(overlay[:-3])
-    decompressed_overlay = decompress_file(overlay, "gz")
-    guest.tar_in(decompressed_overlay, "/")
+    _guestfs_tar_in(guest, image, overlay)
 
     if root_partition is not None:
         guest.umount(guest_partition)
@@ -357,6 +346,20 @@ def dispatcher_download_dir(dispatcher_config: dict[str, Any]) -> str:
         return DISPATCHER_DOWNLOAD_DIR
 
 
+def _guestfs_tar_in(guest: Any, image: str, overlay: str) -> None:
+    """
+    Extract the compressed overlay at the root of the mounted image.
+    The space needed is computed from the tar headers before writing.
+    """
+    from lava_dispatcher.utils.ext4 import _check_free_space, _tar_payload_bytes
+
+    stat = guest.statvfs("/")
+    _check_free_space(
+        image, _tar_payload_bytes(overlay), stat["bavail"] * stat["bsize"]
+    )
+    guest.tar_in(overlay, "/", compress="gzip")
+
+
 @replace_exception(RuntimeError, JobError)
 def copy_overlay_to_sparse_fs(action: Action, image: str, overlay: str) -> None:
     """copy_overlay_to_sparse_fs
@@ -367,31 +370,7 @@ def copy_overlay_to_sparse_fs(action: Action, image: str, overlay: str) -> None:
     if _resolve_backend(action.parameters) == "e2fsprogs":
         from lava_dispatcher.utils.ext4 import inject_tar
 
-        if os.path.exists(overlay[:-3]):
-            os.unlink(overlay[:-3])
-        decompressed_overlay = decompress_file(overlay, "gz")
-        inject_tar(action, image, decompressed_overlay)
-
-        result = subprocess.run(
-            ["dumpe2fs", "-h", image], capture_output=True, text=True, check=False
-        )
-        if result.returncode != 0:
-            action.logger.warning(
-                "dumpe2fs failed for %s (rc=%d), skipping free space check",
-                image,
-                result.returncode,
-            )
-            return
-        free_blocks = 0
-        block_size = 4096
-        for line in result.stdout.splitlines():
-            if line.startswith("Free blocks:"):
-                free_blocks = int(line.split(":")[1].strip())
-            elif line.startswith("Block size:"):
-                block_size = int(line.split(":")[1].strip())
-        available_kb = (free_blocks * block_size) // 1024
-        if available_kb == 0:
-            raise JobError("No space in image after applying overlay: %s" % image)
+        inject_tar(action, image, overlay)
         return
 
     import guestfs
@@ -403,21 +382,9 @@ def copy_overlay_to_sparse_fs(action: Action, image: str, overlay: str) -> None:
     if not devices:
         raise InfrastructureError("Unable to prepare guestfs")
     guest.mount(devices[0], "/")
-    # FIXME: max message length issues when using tar_in
-    # on tar.gz.  Works fine with tar so decompressing
-    # overlay first.
-    if os.path.exists(overlay[:-3]):
-        os.unlink(overlay[:-3])
-    decompressed_overlay = decompress_file(overlay, "gz")
-    guest.tar_in(decompressed_overlay, "/")
-    # Check if we have space left on the mounted image.
-    output = guest.df()
-    action.logger.debug(output)
-    _, _, _, available, percent, _ = output.split("\n")[1].split()
+    _guestfs_tar_in(guest, image, overlay)
     guest.umount(devices[0])
     guest.close()
-    if int(available) == 0 or percent == "100%":
-        raise JobError("No space in image after applying overlay: %s" % image)
 
 
 def copy_directory_contents(action: Action, root_dir: str, dst_dir: str) -> None:
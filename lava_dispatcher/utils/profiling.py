@@ -0,0 +1,189 @@
+# Copyright (C) 2026 Linaro Limited
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+"""
+Per-action resource profiling, enabled with the action_profiling key of the
+dispatcher configuration.
+
+Like the duration, the counters of an action include the counters of its
+sub-actions:
+- cpu: CPU time (user and system) of lava-run, threads included
+- subprocess_cpu: CPU time of the subprocesses that exited during the action
+- subprocess_time: wall time spent waiting for the commands run on the worker
+- expect_time: wall time spent blocked in pexpect waits
+- downloaded_bytes: bytes downloaded
+- written_bytes: bytes written to the storage by lava-run and its subprocesses
+"""
+
+from __future__ import annotations
+
+import contextlib
+import resource
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from typing import Any
+
+    from lava_dispatcher.action import Action
+
+COUNTERS = (
+    "duration",
+    "cpu",
+    "subprocess_cpu",
+    "subprocess_time",
+    "expect_time",
+    "downloaded_bytes",
+    "written_bytes",
+)
+# Number of actions listed in the job summary
+SUMMARY_SIZE = 10
+
+# Profiler of the running job, if any
+_profiler: Profiler | None = None
+
+
+def _write_bytes() -> int:
+    try:
+        with open("/proc/self/io", encoding="utf-8") as f_in:
+            for line in f_in:
+                if line.startswith("write_bytes:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def _snapshot() -> dict[str, float]:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        "duration": time.monotonic(),
+        "cpu": usage.ru_utime + usage.ru_stime,
+        "subprocess_cpu": children.ru_utime + children.ru_stime,
+        # ru_oublock is counted in 512 bytes blocks
+        "written_bytes": _write_bytes() + children.ru_oublock * 512,
+    }
+
+
+class Profiler:
+    """
+    Collect the counters of the actions run by Pipeline.run_actions().
+
+    The counters measured at the start and at the end of the action are
+    snapshots of the process resources. The other counters are added by the
+    code doing the work, for all the actions being run.
+    """
+
+    def __init__(self) -> None:
+        # Profiles of the actions that ended, in the order they started
+        self.profiles: dict[str, dict[str, Any]] = {}
+        self._stack: list[tuple[dict[str, float], dict[str, float]]] = []
+
+    @classmethod
+    def from_config(cls, dispatcher_config: dict[str, Any] | None) -> Profiler | None:
+        """
+        Return a profiler when action_profiling is set in the dispatcher
+        configuration.
+        """
+        if not (dispatcher_config or {}).get("action_profiling", False):
+            return None
+        return cls()
+
+    def start(self, action: Action) -> None:
+        self.profiles.setdefault(action.level, {})
+        self._stack.append(
+            (
+                _snapshot(),
+                {"subprocess_time": 0.0, "expect_time": 0.0, "downloaded_bytes": 0},
+            )
+        )
+
+    def stop(self, action: Action) -> dict[str, Any]:
+        """
+        Return the counters of the action.
+        """
+        before, counters = self._stack.pop()
+        after = _snapshot()
+        profile = {
+            key: round(after[key] - before[key], 3)
+            for key in ("duration", "cpu", "subprocess_cpu")
+        }
+        profile["subprocess_time"] = round(counters["subprocess_time"], 3)
+        profile["expect_time"] = round(counters["expect_time"], 3)
+        profile["downloaded_bytes"] = counters["downloaded_bytes"]
+        profile["written_bytes"] = int(after["written_bytes"] - before["written_bytes"])
+        self.profiles[action.level] = {
+            "name": action.name,
+            "leaf": action.pipeline is None,
+            **profile,
+        }
+        return profile
+
+    def add(self, counter: str, value: float) -> None:
+        for _, counters in self._stack:
+            counters[counter] += value
+
+    def summary(self) -> dict[str, Any]:
+        """
+        Return the counters of the root actions, their total and the leaf
+        actions that took the most time.
+        """
+        actions = [
+            {"level": level, **profile}
+            for level, profile in self.profiles.items()
+            if profile and "." not in level
+        ]
+        total = {key: sum(action[key] for action in actions) for key in COUNTERS}
+        slowest = sorted(
+            (
+                {"level": level, **profile}
+                for level, profile in self.profiles.items()
+                if profile.get("leaf")
+            ),
+            key=lambda profile: profile["duration"],
+            reverse=True,
+        )[:SUMMARY_SIZE]
+        for profile in actions + slowest:
+            del profile["leaf"]
+        return {
+            "total": {key: round(value, 3) for key, value in total.items()},
+            "actions": actions,
+            "slowest": slowest,
+        }
+
+
+def activate(profiler: Profiler | None) -> None:
+    """
+    Set the profiler of the running job, or disable profiling with None.
+    """
+    global _profiler
+    _profiler = profiler
+
+
+def current() -> Profiler | None:
+    return _profiler
+
+
+def add(counter: str, value: float) -> None:
+    """
+    Add the value to the counter of the running actions.
+    """
+    if _profiler is not None:
+        _profiler.add(counter, value)
+
+
+@contextlib.contextmanager
+def timed(counter: str) -> Iterator[None]:
+    """
+    Add the wall time of the block to the counter of the running actions.
+    """
+    if _profiler is None:
+        yield
+        return
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        add(counter, time.monotonic() - start)
@@ -0,0 +1,322 @@
+# Copyright (C) 2026 Linaro Limited
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+"""
+Android sparse images, without simg2img and img2simg.
+
+The raw image is written as a sparse file: the "don't care" and zero filled
+chunks become holes, so only the data of the image is written to the disk.
+After the overlay is applied, the new sparse image is built from the data
+extents of the raw image, skipping the holes without reading them.
+"""
+
+from __future__ import annotations
+
+import errno
+import os
+import struct
+from typing import TYPE_CHECKING, NamedTuple
+
+from lava_common.exceptions import JobError
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from typing import BinaryIO
+
+SPARSE_HEADER_MAGIC = 0xED26FF3A
+
+CHUNK_TYPE_RAW = 0xCAC1
+CHUNK_TYPE_FILL = 0xCAC2
+CHUNK_TYPE_DONT_CARE = 0xCAC3
+CHUNK_TYPE_CRC32 = 0xCAC4
+
+# magic, major_version, minor_version, file_hdr_sz, chunk_hdr_sz, blk_sz,
+# total_blks, total_chunks, image_checksum
+FILE_HEADER = struct.Struct("<IHHHHIIII")
+# chunk_type, reserved, chunk_sz (in blocks), total_sz (in bytes)
+CHUNK_HEADER = struct.Struct("<HHII")
+
+# Largest raw chunk written, in bytes
+MAX_RAW_CHUNK_SIZE = 16 * 1024 * 1024
+# Size of the reads and writes, in bytes
+IO_SIZE = 1024 * 1024
+
+
+class Chunk(NamedTuple):
+    kind: int
+    # First block of the chunk in the raw image
+    block: int
+    blocks: int
+    # Offset of the data in the sparse image
+    offset: int
+    # Pattern of the fill chunks
+    fill: bytes
+
+
+def is_sparse(path: str) -> bool:
+    with open(path, "rb") as f_in:
+        data = f_in.read(4)
+    return len(data) == 4 and struct.unpack("<I", data)[0] == SPARSE_HEADER_MAGIC
+
+
+class SparseImage:
+    def __init__(self, path: str):
+        self.path = path
+        self.chunks: list[Chunk] = []
+        with open(path, "rb") as f_in:
+            header = f_in.read(FILE_HEADER.size)
+            if len(header) != FILE_HEADER.size:
+                raise JobError("Image is not an Android sparse image: %s" % path)
+            (
+                magic,
+                major,
+                _,
+                file_hdr_sz,
+                chunk_hdr_sz,
+                self.block_size,
+                self.total_blocks,
+                total_chunks,
+                _,
+            ) = FILE_HEADER.unpack(header)
+            if magic != SPARSE_HEADER_MAGIC or major != 1:
+                raise JobError("Image is not an Android sparse image: %s" % path)
+            if self.block_size == 0 or self.block_size % 4:
+                raise JobError("Invalid block size %d in %s" % (self.block_size, path))
+
+            offset = file_hdr_sz
+            block = 0
+            for _ in range(total_chunks):
+                f_in.seek(offset)
+                header = f_in.read(CHUNK_HEADER.size)
+                if len(header) != CHUNK_HEADER.size:
+                    raise JobError("Truncated sparse image: %s" % path)
+                kind, _, blocks, total_sz = CHUNK_HEADER.unpack(header)
+                data = offset + chunk_hdr_sz
+                fill = b""
+                if kind == CHUNK_TYPE_RAW:
+                    if total_sz - chunk_hdr_sz != blocks * self.block_size:
+                        raise JobError("Invalid raw chunk in %s" % path)
+                elif kind == CHUNK_TYPE_FILL:
+                    f_in.seek(data)
+                    fill = f_in.read(4)
+                elif kind not in (CHUNK_TYPE_DONT_CARE, CHUNK_TYPE_CRC32):
+                    raise JobError("Unknown chunk type 0x%04x in %s" % (kind, path))
+                if kind != CHUNK_TYPE_CRC32:
+                    self.chunks.append(Chunk(kind, block, blocks, data, fill))
+                    block += blocks
+                offset += total_sz
+            if block != self.total_blocks:
+                raise JobError("Truncated sparse image: %s" % path)
+
+    @property
+    def size(self) -> int:
+        return self.total_blocks * self.block_size
+
+    def zero_fills(self) -> list[tuple[int, int]]:
+        """
+        Return the ranges of blocks filled with zeros, as (start, end).
+        """
+        return [
+            (chunk.block, chunk.block + chunk.blocks)
+            for chunk in self.chunks
+            if chunk.kind == CHUNK_TYPE_FILL and chunk.fill == b"\0\0\0\0"
+        ]
+
+    def unsparse(self, raw: str) -> None:
+        """
+        Write the raw image. Zero filled and "don't care" chunks are left as
+        holes.
+        """
+        with open(self.path, "rb") as f_in, open(raw, "wb") as f_out:
+            f_out.truncate(self.size)
+            for chunk in self.chunks:
+                f_out.seek(chunk.block * self.block_size)
+                if chunk.kind == CHUNK_TYPE_RAW:
+                    f_in.seek(chunk.offset)
+                    remaining = chunk.blocks * self.block_size
+                    while remaining:
+                        data = f_in.read(min(remaining, IO_SIZE))
+                        if not data:
+                            raise JobError("Truncated sparse image: %s" % self.path)
+                        f_out.write(data)
+                        remaining -= len(data)
+                elif chunk.kind == CHUNK_TYPE_FILL and chunk.fill != b"\0\0\0\0":
+                    data = chunk.fill * (IO_SIZE // 4)
+                    remaining = chunk.blocks * self.block_size
+                    while remaining:
+                        f_out.write(data[: min(remaining, IO_SIZE)])
+                        remaining -= min(remaining, IO_SIZE)
+
+    def resparse(self, raw: str, dest: str) -> None:
+        """
+        Build the sparse image of the raw image, using the block size of this
+        image. The holes of the raw image are written as zero filled chunks
+        where this image was zero filled and as "don't care" chunks elsewhere.
+        """
+        size = os.path.getsize(raw)
+        if size % self.block_size:
+            raise JobError(
+                "Size of %s is not a multiple of %d" % (raw, self.block_size)
+            )
+        writer = _SparseWriter(self.block_size, size // self.block_size)
+        zero_fills = self.zero_fills()
+        with open(raw, "rb") as f_in, open(dest, "wb") as f_out:
+            writer.start(f_out)
+            block = 0
+            for start, end in _data_blocks(f_in, size, self.block_size):
+                _write_hole(writer, f_out, zero_fills, block, start)
+                f_in.seek(start * self.block_size)
+                remaining = (end - start) * self.block_size
+                while remaining:
+                    data = f_in.read(min(remaining, IO_SIZE))
+                    if not data:
+                        raise JobError("Unable to read %s" % raw)
+                    writer.add_data(f_out, data)
+                    remaining -= len(data)
+                block = end
+            _write_hole(writer, f_out, zero_fills, block, writer.total_blocks)
+            writer.finish(f_out)
+
+
+def _write_hole(
+    writer: _SparseWriter,
+    f_out: BinaryIO,
+    zero_fills: list[tuple[int, int]],
+    start: int,
+    end: int,
+) -> None:
+    for fill_start, fill_end in zero_fills:
+        if fill_end <= start or fill_start >= end:
+            continue
+        if fill_start > start:
+            writer.add_dont_care(f_out, fill_start - start)
+            start = fill_start
+        fill_end = min(fill_end, end)
+        writer.add_fill(f_out, b"\0\0\0\0", fill_end - start)
+        start = fill_end
+    if end > start:
+        writer.add_dont_care(f_out, end - start)
+
+
+class _SparseWriter:
+    """
+    Write the chunks of a sparse image, merging the consecutive chunks of the
+    same kind.
+    """
+
+    def __init__(self, block_size: int, total_blocks: int):
+        self.block_size = block_size
+        self.total_blocks = total_blocks
+        self.total_chunks = 0
+        self.blocks = 0
+        # Pending chunk: kind, number of blocks and data or fill pattern
+        self.kind: int | None = None
+        self.count = 0
+        self.pending = bytearray()
+        self.fill = b""
+
+    def start(self, f_out: BinaryIO) -> None:
+        f_out.write(b"\0" * FILE_HEADER.size)
+
+    def add_dont_care(self, f_out: BinaryIO, blocks: int) -> None:
+        if self.kind != CHUNK_TYPE_DONT_CARE:
+            self.flush(f_out)
+            self.kind = CHUNK_TYPE_DONT_CARE
+        self.count += blocks
+
+    def add_fill(self, f_out: BinaryIO, fill: bytes, blocks: int) -> None:
+        if self.kind != CHUNK_TYPE_FILL or self.fill != fill:
+            self.flush(f_out)
+            self.kind = CHUNK_TYPE_FILL
+            self.fill = fill
+        self.count += blocks
+
+    def add_data(self, f_out: BinaryIO, data: bytes) -> None:
+        view = memoryview(data)
+        block_size = self.block_size
+        repeat = block_size // 4
+        for index in range(0, len(view), block_size):
+            block = view[index : index + block_size]
+            pattern = bytes(block[:4])
+            if block == pattern * repeat:
+                self.add_fill(f_out, pattern, 1)
+                continue
+            if (
+                self.kind != CHUNK_TYPE_RAW
+                or len(self.pending) + block_size > MAX_RAW_CHUNK_SIZE
+            ):
+                self.flush(f_out)
+                self.kind = CHUNK_TYPE_RAW
+            self.pending += block
+            self.count += 1
+
+    def flush(self, f_out: BinaryIO) -> None:
+        if self.kind is None or not self.count:
+            self.kind = None
+            return
+        if self.kind == CHUNK_TYPE_RAW:
+            payload = bytes(self.pending)
+        elif self.kind == CHUNK_TYPE_FILL:
+            payload = self.fill
+        else:
+            payload = b""
+        f_out.write(
+            CHUNK_HEADER.pack(
+                self.kind, 0, self.count, CHUNK_HEADER.size + len(payload)
+            )
+        )
+        f_out.write(payload)
+        self.total_chunks += 1
+        self.blocks += self.count
+        self.kind = None
+        self.count = 0
+        self.pending = bytearray()
+
+    def finish(self, f_out: BinaryIO) -> None:
+        self.flush(f_out)
+        if self.blocks != self.total_blocks:
+            raise JobError(
+                "Sparse image has %d blocks instead of %d"
+                % (self.blocks, self.total_blocks)
+            )
+        f_out.seek(0)
+        f_out.write(
+            FILE_HEADER.pack(
+                SPARSE_HEADER_MAGIC,
+                1,
+                0,
+                FILE_HEADER.size,
+                CHUNK_HEADER.size,
+                self.block_size,
+                self.total_blocks,
+                self.total_chunks,
+                0,
+            )
+        )
+
+
+def _data_blocks(
+    f_in: BinaryIO, size: int, block_size: int
+) -> Iterator[tuple[int, int]]:
+    """
+    Yield the ranges of blocks holding data, as (start, end).
+    The whole file is returned when the filesystem cannot report the holes.
+    """
+    fd = f_in.fileno()
+    offset = 0
+    while offset < size:
+        try:
+            start = os.lseek(fd, offset, os.SEEK_DATA)
+        except OSError as exc:
+            if exc.errno == errno.ENXIO:
+                # No more data
+                return
+            if exc.errno == errno.EINVAL and offset == 0:
+                yield (0, size // block_size)
+                return
+            raise
+        end = os.lseek(fd, start, os.SEEK_HOLE)
+        first = start // block_size
+        last = min(-(-end // block_size), size // block_size)
+        yield (first, last)
+        offset = last * block_size
@@ -7,8 +7,12 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 from __future__ import annotations
 
+import functools
+import os
 import select
+import threading
 import time
+from collections import deque
 from typing import TYPE_CHECKING
 
 import pyudev
@@ -283,8 +287,7 @@ def get_device_properties(device):
     return props
 
 
-def match(device, match_dict, devicepath):
-    device_props = get_device_properties(device)
+def match_properties(device_props, match_dict, devicepath):
     same = _dict_compare(device_props, match_dict)
     if same == set(match_dict.keys()):
         if devicepath:
@@ -297,18 +300,210 @@ def match(device, match_dict, devicepath):
     return False
 
 
-def wait_udev_event_setup(devicepath, devtype, match_dict, subsystem, source="udev"):
+def match(device, match_dict, devicepath):
+    return match_properties(get_device_properties(device), match_dict, devicepath)
+
+
+def match_subsystem(device, subsystem, devtype):
+    if subsystem and device.subsystem != subsystem:
+        return False
+    if devtype and device.device_type != devtype:
+        return False
+    return True
+
+
+class UdevIndex:
     """
-    Setup pyudev internals for use by wait_udev_event and wait_udev_change_event methods
-    :param devicepath:
-    :param devtype:
-    :param match_dict:
-    :param subsystem:
-    :param source: netlink source ("udev" or "kernel")
-    :return: (context, match_dict, monitor)
-        context is a pyudev.Context instance
-        match_dict from input parameter (initialized to dict if unset)
-        monitor is pyudev.Monitor instance
+    Index of the udev devices by serial, vendor and product IDs and
+    filesystem label.
+
+    The devices are enumerated once. Once started, netlink monitors keep the
+    index current and wake up the threads waiting for a device, so neither
+    lookups nor waits have to enumerate the devices again.
+    """
+
+    # Number of events kept for the waiting threads
+    max_events = 1024
+
+    def __init__(self, context=None):
+        self.context = pyudev.Context() if context is None else context
+        self.pid = os.getpid()
+        self.changed = threading.Condition()
+        # {sys_path: (device, properties)}
+        self.devices = {}
+        # {key: {sys_path: (device, properties)}}
+        self.by_serial = {}
+        self.by_vendor_product = {}
+        self.by_fs_label = {}
+        # (seqnum, device, properties) of the latest events
+        self.events = deque(maxlen=self.max_events)
+        self.seqnum = 0
+        self.observers = []
+
+    @property
+    def monitoring(self):
+        return bool(self.observers)
+
+    def _keys(self, props):
+        vendor_id = props.get("ID_VENDOR_ID")
+        model_id = props.get("ID_MODEL_ID")
+        return (
+            (self.by_serial, props.get("ID_SERIAL_SHORT")),
+            (
+                self.by_vendor_product,
+                (vendor_id, model_id) if vendor_id and model_id else None,
+            ),
+            (self.by_fs_label, props.get("ID_FS_LABEL")),
+        )
+
+    def _add(self, device, props):
+        self._remove(device.sys_path)
+        entry = (device, props)
+        self.devices[device.sys_path] = entry
+        for table, key in self._keys(props):
+            if key:
+                table.setdefault(key, {})[device.sys_path] = entry
+
+    def _remove(self, sys_path):
+        entry = self.devices.pop(sys_path, None)
+        if entry is None:
+            return
+        for table, key in self._keys(entry[1]):
+            if key:
+                bucket = table[key]
+                del bucket[sys_path]
+                if not bucket:
+                    del table[key]
+
+    def _event(self, source, device):
+        props = get_device_properties(device)
+        with self.changed:
+            if props.get("DEVPATH_OLD"):
+                self._remove(self.context.sys_path + props["DEVPATH_OLD"])
+            if device.action == "remove":
+                self._remove(device.sys_path)
+            elif source == "kernel" and device.sys_path in self.devices:
+                # Kernel events do not carry the properties set by the udev
+                # rules, which might have been received first.
+                old_device, old_props = self.devices[device.sys_path]
+                props = {**old_props, **props}
+                self._add(old_device, props)
+            else:
+                self._add(device, props)
+            self.seqnum += 1
+            self.events.append((self.seqnum, device, props))
+            self.changed.notify_all()
+
+    def refresh(self):
+        """
+        Enumerate all the devices again
+        """
+        # Events received meanwhile are applied after the enumeration
+        with self.changed:
+            self.devices.clear()
+            self.by_serial.clear()
+            self.by_vendor_product.clear()
+            self.by_fs_label.clear()
+            for device in self.context.list_devices():
+                self._add(device, get_device_properties(device))
+
+    def start(self):
+        """
+        Start the netlink monitors and enumerate the devices.
+        Return False when the monitors are not available: the index is then
+        only updated by refresh().
+        """
+        try:
+            for source in ("udev", "kernel"):
+                monitor = pyudev.Monitor.from_netlink(self.context, source=source)
+                observer = pyudev.MonitorObserver(
+                    monitor,
+                    callback=functools.partial(self._event, source),
+                    name=f"udev-index-{source}",
+                )
+                observer.start()
+                self.observers.append(observer)
+        except OSError:
+            self.stop()
+        self.refresh()
+        return self.monitoring
+
+    def stop(self):
+        for observer in self.observers:
+            observer.send_stop()
+        self.observers = []
+
+    def sync(self):
+        """
+        Make sure that the index is current before a lookup
+        """
+        if not self.monitoring:
+            self.refresh()
+
+    def find(self, serial=None, vendor_id=None, product_id=None, fs_label=None):
+        """
+        Return the devices matching all the given values
+        """
+        with self.changed:
+            if serial:
+                entries = self.by_serial.get(serial, {})
+            elif vendor_id and product_id:
+                entries = self.by_vendor_product.get((vendor_id, product_id), {})
+            elif fs_label:
+                entries = self.by_fs_label.get(fs_label, {})
+            else:
+                return []
+            return [
+                device
+                for device, props in entries.values()
+                if (not vendor_id or props.get("ID_VENDOR_ID") == vendor_id)
+                and (not product_id or props.get("ID_MODEL_ID") == product_id)
+                and (not fs_label or props.get("ID_FS_LABEL") == fs_label)
+            ]
+
+    def wait(self, match_event, match_present=None):
+        """
+        Block until match_event(device, properties) is True for a new event.
+        If match_present is set, return at once when match_present(device,
+        properties) is True for a device already in the index.
+        """
+        with self.changed:
+            if match_present is not None and any(
+                match_present(device, props) for device, props in self.devices.values()
+            ):
+                return
+            seqnum = self.seqnum
+            while True:
+                self.changed.wait()
+                for event_seqnum, device, props in list(self.events):
+                    if event_seqnum <= seqnum:
+                        continue
+                    seqnum = event_seqnum
+                    if match_event(device, props):
+                        return
+
+
+_udev_index = None
+_udev_index_lock = threading.Lock()
+
+
+def get_udev_index():
+    """
+    Return the udev index of this process, started on first use
+    """
+    global _udev_index
+    with _udev_index_lock:
+        # The monitor threads do not survive a fork
+        if _udev_index is None or _udev_index.pid != os.getpid():
+            _udev_index = UdevIndex()
+            _udev_index.start()
+        return _udev_index
+
+
+def check_wait_parameters(devicepath, devtype, match_dict, subsystem):
+    """
+    Check the parameters of wait_udev_event and wait_udev_changed_event
+    :return: match_dict (initialized to dict if unset)
     """
     if match_dict:
         if not isinstance(match_dict, dict):
@@ -322,6 +517,23 @@ def wait_udev_event_setup(devicepath, devtype, match_dict, subsystem, source="ud
             raise LAVABug("Neither match_dict nor devicepath were set")
     if devtype and not subsystem:
         raise LAVABug("Cannot filter udev by devtype without a subsystem")
+    return match_dict
+
+
+def wait_udev_event_setup(devicepath, devtype, match_dict, subsystem, source="udev"):
+    """
+    Setup pyudev internals for use by wait_udev_event and wait_udev_change_event methods
+    :param devicepath:
+    :param devtype:
+    :param match_dict:
+    :param subsystem:
+    :param source: netlink source ("udev" or "kernel")
+    :return: (context, match_dict, monitor)
+        context is a pyudev.Context instance
+        match_dict from input parameter (initialized to dict if unset)
+        monitor is pyudev.Monitor instance
+    """
+    match_dict = check_wait_parameters(devicepath, devtype, match_dict, subsystem)
     # Create and configure the monitor
     context = pyudev.Context()
     monitor = pyudev.Monitor.from_netlink(context, source=source)
@@ -332,7 +544,28 @@ def wait_udev_event_setup(devicepath, devtype, match_dict, subsystem, source="ud
     return context, match_dict, monitor
 
 
+def wait_udev_index_event(action, match_dict, subsystem, devtype, devicepath, present):
+    match_dict = check_wait_parameters(devicepath, devtype, match_dict, subsystem)
+    event_dict = dict(match_dict, ACTION=action)
+
+    def match_present(device, props):
+        return match_properties(props, match_dict, devicepath)
+
+    def match_event(device, props):
+        return match_subsystem(device, subsystem, devtype) and match_properties(
+            props, event_dict, devicepath
+        )
+
+    get_udev_index().wait(match_event, match_present if present else None)
+
+
 def wait_udev_event(match_dict=None, subsystem=None, devtype=None, devicepath=None):
+    if get_udev_index().monitoring:
+        wait_udev_index_event(
+            "add", match_dict, subsystem, devtype, devicepath, present=True
+        )
+        return
+
     context, match_dict, udev_monitor = wait_udev_event_setup(
         devicepath, devtype, match_dict, subsystem, source="udev"
     )
@@ -361,6 +594,12 @@ def wait_udev_event(match_dict=None, subsystem=None, devtype=None, devicepath=No
 def wait_udev_changed_event(
     match_dict=None, subsystem=None, devtype=None, devicepath=None
 ):
+    if get_udev_index().monitoring:
+        wait_udev_index_event(
+            "change", match_dict, subsystem, devtype, devicepath, present=False
+        )
+        return
+
     _, match_dict, udev_monitor = wait_udev_event_setup(
         devicepath, devtype, match_dict, subsystem, source="udev"
     )
@@ -381,6 +620,38 @@ def wait_udev_changed_event(
                 return
 
 
+def find_udev_devices(index, usb_device):
+    """
+    Return the udev devices matching a device_info entry and the value
+    recorded as found.
+    """
+    board_id = str(usb_device.get("board_id", ""))
+    usb_vendor_id = str(usb_device.get("usb_vendor_id", ""))
+    usb_product_id = str(usb_device.get("usb_product_id", ""))
+    usb_fs_label = str(usb_device.get("fs_label", ""))
+    # try with all parameters such as board id, usb_vendor_id and
+    # usb_product_id
+    if board_id and usb_vendor_id and usb_product_id:
+        found = index.find(
+            serial=board_id, vendor_id=usb_vendor_id, product_id=usb_product_id
+        )
+        return found, board_id
+    elif board_id and usb_vendor_id and not usb_product_id:
+        # try with parameters such as board id, usb_vendor_id
+        return index.find(serial=board_id, vendor_id=usb_vendor_id), board_id
+    elif board_id and not usb_vendor_id and not usb_product_id:
+        # try with board id alone
+        return index.find(serial=board_id), board_id
+    elif usb_vendor_id and usb_product_id:
+        # try with vendor and product id
+        found = index.find(vendor_id=usb_vendor_id, product_id=usb_product_id)
+        return found, usb_product_id
+    elif usb_fs_label:
+        # Just restrict by filesystem label.
+        return index.find(fs_label=usb_fs_label), usb_fs_label
+    return [], None
+
+
 def get_udev_devices(job=None, logger=None, device_info=None, required=False):
     """
     Get udev device nodes based on serial, vendor and product ID
@@ -388,7 +659,6 @@ def get_udev_devices(job=None, logger=None, device_info=None, required=False):
     tty devices can be added to the container.
     The ID to match is controlled by the lab admin.
     """
-    context = pyudev.Context()
     device_paths = set()
     devices = []
     if job:
@@ -398,75 +668,20 @@ def get_udev_devices(job=None, logger=None, device_info=None, required=False):
         devices = device_info
     if not devices:
         return []
+    index = get_udev_index()
+    # check if device is already connected
+    index.sync()
     added = set()
     for usb_device in devices:
-        board_id = str(usb_device.get("board_id", ""))
-        usb_vendor_id = str(usb_device.get("usb_vendor_id", ""))
-        usb_product_id = str(usb_device.get("usb_product_id", ""))
-        usb_fs_label = str(usb_device.get("fs_label", ""))
-        # check if device is already connected
-        # try with all parameters such as board id, usb_vendor_id and
-        # usb_product_id
-        for udev_device in context.list_devices():
-            udev_device_properties = udev_device.properties
-            if board_id and usb_vendor_id and usb_product_id:
-                if (
-                    (udev_device_properties.get("ID_SERIAL_SHORT") == board_id)
-                    and (udev_device_properties.get("ID_VENDOR_ID") == usb_vendor_id)
-                    and (udev_device_properties.get("ID_MODEL_ID") == usb_product_id)
-                ):
-                    device_paths.add(udev_device.device_node)
-                    added.add(board_id)
-                    for child in udev_device.children:
-                        if child.device_node:
-                            device_paths.add(child.device_node)
-                    for link in udev_device.device_links:
-                        device_paths.add(link)
-            elif board_id and usb_vendor_id and not usb_product_id:
-                # try with parameters such as board id, usb_vendor_id
-                if (udev_device_properties.get("ID_SERIAL_SHORT") == board_id) and (
-                    udev_device_properties.get("ID_VENDOR_ID") == usb_vendor_id
-                ):
-                    device_paths.add(udev_device.device_node)
-                    added.add(board_id)
-                    for child in udev_device.children:
-                        if child.device_node:
-                            device_paths.add(child.device_node)
-                    for link in udev_device.device_links:
-                        device_paths.add(link)
-            elif board_id and not usb_vendor_id and not usb_product_id:
-                # try with board id alone
-                if udev_device_properties.get("ID_SERIAL_SHORT") == board_id:
-                    device_paths.add(udev_device.device_node)
-                    added.add(board_id)
-                    for child in udev_device.children:
-                        if child.device_node:
-                            device_paths.add(child.device_node)
-                    for link in udev_device.device_links:
-                        device_paths.add(link)
-            elif usb_vendor_id and usb_product_id:
-                # try with vendor and product id
-                if (
-                    udev_device_properties.get("ID_VENDOR_ID") == usb_vendor_id
-                    and udev_device_properties.get("ID_MODEL_ID") == usb_product_id
-                ):
-                    device_paths.add(udev_device.device_node)
-                    added.add(usb_product_id)
-                    for child in udev_device.children:
-                        if child.device_node:
-                            device_paths.add(child.device_node)
-                    for link in udev_device.device_links:
-                        device_paths.add(link)
-            elif usb_fs_label:
-                # Just restrict by filesystem label.
-                if udev_device_properties.get("ID_FS_LABEL") == usb_fs_label:
-                    device_paths.add(udev_device.device_node)
-                    added.add(usb_fs_label)
-                    for child in udev_device.children:
-                        if child.device_node:
-                            device_paths.add(child.device_node)
-                    for link in udev_device.device_links:
-                        device_paths.add(link)
+        found, value = find_udev_devices(index, usb_device)
+        for udev_device in found:
+            device_paths.add(udev_device.device_node)
+            added.add(value)
+            for child in udev_device.children:
+                if child.device_node:
+                    device_paths.add(child.device_node)
+            for link in udev_device.device_links:
+                device_paths.add(link)
     if device_info and required:
         for static_device in device_info:
             for _, value in static_device.items():
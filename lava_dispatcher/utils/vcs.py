@@ -5,17 +5,30 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 from __future__ import annotations
 
+import fcntl
+import hashlib
 import os
+import re
 import shutil
 import subprocess  # nosec - internal use.
+import time
+from contextlib import contextmanager
+from pathlib import Path
 from typing import TYPE_CHECKING
 
+from lava_common.constants import GIT_MIRROR_INTERVAL
 from lava_common.exceptions import InfrastructureError
 from lava_dispatcher.utils.decorator import retry
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from typing import Any
+
     from lava_common.log import YAMLLogger
 
+# SHA-1 or SHA-256 object names
+FULL_COMMIT_HASH = re.compile(r"[0-9a-f]{40}|[0-9a-f]{64}")
+
 
 class VCSHelper:
     def __init__(self, url: str, logger: YAMLLogger):
@@ -43,12 +56,39 @@ class GitHelper(VCSHelper):
       commit_id = git.clone('destination')
       commit_id = git.clone('destination2, 'hash')
 
+    When mirror_dir is set, the repository is first mirrored into a bare
+    repository shared by every job on the worker and the clone is made from
+    that mirror. The mirror is fetched at most once every mirror_interval
+    seconds, unless the requested revision is missing.
+
     This helper will raise a InfrastructureError for any error encountered.
     """
 
-    def __init__(self, url: str, logger: YAMLLogger):
+    def __init__(
+        self,
+        url: str,
+        logger: YAMLLogger,
+        mirror_dir: str | None = None,
+        mirror_interval: int = GIT_MIRROR_INTERVAL,
+    ):
         super().__init__(url, logger)
         self.binary = "/usr/bin/git"
+        self.mirror_dir = mirror_dir
+        self.mirror_interval = mirror_interval
+
+    @classmethod
+    def from_config(
+        cls, url: str, logger: YAMLLogger, dispatcher_config: dict[str, Any] | None
+    ) -> GitHelper:
+        dispatcher_config = dispatcher_config or {}
+        return cls(
+            url,
+            logger,
+            mirror_dir=dispatcher_config.get("git_mirror_dir"),
+            mirror_interval=dispatcher_config.get(
+                "git_mirror_interval", GIT_MIRROR_INTERVAL
+            ),
+        )
 
     @retry(exception=InfrastructureError, retries=6, delay=5)
     def clone(
@@ -65,38 +105,42 @@ class GitHelper(VCSHelper):
             shutil.rmtree(dest_path)
 
         try:
-            cmd_args: list[str] = [self.binary, "clone"]
-            if recursive:
-                cmd_args.append("--recurse-submodules")
-            if branch is not None:
-                cmd_args.extend(["-b", branch])
-            if shallow:
-                cmd_args.append("--depth=1")
-            cmd_args.extend([self.url, dest_path])
-
-            self.logger.debug("Running '%s'", " ".join(cmd_args))
-            # Replace shell variables by the corresponding environment variable
-            cmd_args[-2] = os.path.expandvars(cmd_args[-2])
-
-            try:
+            if self.mirror_dir is None:
+                self._clone(self.url, dest_path, shallow, branch, recursive)
+            else:
+                with self._mirror(revision) as mirror:
+                    # Local clones hardlink the objects, use file:// to keep
+                    # shallow clones shallow.
+                    source = f"file://{mirror}" if shallow else mirror
+                    self._clone(source, dest_path, shallow, branch, False)
+                # Point the clone at the real repository, so that relative
+                # submodule urls are resolved against it.
                 subprocess.check_output(  # nosec - internal use.
-                    cmd_args, stderr=subprocess.STDOUT
+                    [
+                        self.binary,
+                        "-C",
+                        dest_path,
+                        "remote",
+                        "set-url",
+                        "origin",
+                        os.path.expandvars(self.url),
+                    ],
+                    stderr=subprocess.STDOUT,
                 )
-            except subprocess.CalledProcessError as exc:
-                if (
-                    exc.stdout
-                    and "does not support shallow capabilities"
-                    in exc.stdout.decode("utf-8", errors="replace")
-                ):
-                    self.logger.warning(
-                        "Tried shallow clone, but server doesn't support it. Retrying without..."
-                    )
-                    cmd_args.remove("--depth=1")
+                if recursive:
+                    self.logger.debug("Running '%s submodule update'", self.binary)
                     subprocess.check_output(  # nosec - internal use.
-                        cmd_args, stderr=subprocess.STDOUT
+                        [
+                            self.binary,
+                            "-C",
+                            dest_path,
+                            "submodule",
+                            "update",
+                            "--init",
+                            "--recursive",
+                        ],
+                        stderr=subprocess.STDOUT,
                     )
-                else:
-                    raise
 
             if revision is not None:
                 self.logger.debug("Running '%s checkout %s", self.binary, str(revision))
@@ -125,6 +169,135 @@ class GitHelper(VCSHelper):
 
         return commit_id.decode("utf-8", errors="replace")
 
+    def _clone(
+        self,
+        source: str,
+        dest_path: str,
+        shallow: bool,
+        branch: str | None,
+        recursive: bool,
+    ) -> None:
+        cmd_args: list[str] = [self.binary, "clone"]
+        if recursive:
+            cmd_args.append("--recurse-submodules")
+        if branch is not None:
+            cmd_args.extend(["-b", branch])
+        if shallow:
+            cmd_args.append("--depth=1")
+        cmd_args.extend([source, dest_path])
+
+        self.logger.debug("Running '%s'", " ".join(cmd_args))
+        # Replace shell variables by the corresponding environment variable
+        cmd_args[-2] = os.path.expandvars(cmd_args[-2])
+
+        try:
+            subprocess.check_output(  # nosec - internal use.
+                cmd_args, stderr=subprocess.STDOUT
+            )
+        except subprocess.CalledProcessError as exc:
+            if (
+                exc.stdout
+                and "does not support shallow capabilities"
+                in exc.stdout.decode("utf-8", errors="replace")
+            ):
+                self.logger.warning(
+                    "Tried shallow clone, but server doesn't support it. Retrying without..."
+                )
+                cmd_args.remove("--depth=1")
+                subprocess.check_output(  # nosec - internal use.
+                    cmd_args, stderr=subprocess.STDOUT
+                )
+            else:
+                raise
+
+    def _has_commit(self, mirror: str, revision: str) -> bool:
+        ret = subprocess.run(  # nosec - internal use.
+            [
+                self.binary,
+                f"--git-dir={mirror}",
+                "rev-parse",
+                "--quiet",
+                "--verify",
+                f"{revision}^{{commit}}",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False,
+        )
+        return ret.returncode == 0
+
+    @contextmanager
+    def _mirror(self, revision: str | None) -> Iterator[str]:
+        """
+        Create or refresh the mirror of the repository and hold a shared
+        lock on it while the caller clones from it.
+        """
+        assert self.mirror_dir is not None  # nosec - checked by the caller
+        key = hashlib.sha256(self.url.encode("utf-8")).hexdigest()
+        mirror = os.path.join(self.mirror_dir, f"{key}.git")
+        stamp = os.path.join(mirror, "lava-last-fetch")
+        os.makedirs(self.mirror_dir, mode=0o755, exist_ok=True)
+
+        with open(f"{mirror}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            url = os.path.expandvars(self.url)
+            if not os.path.exists(stamp):
+                self.logger.debug("Mirroring %s into %s", self.url, mirror)
+                if os.path.exists(mirror):
+                    shutil.rmtree(mirror)
+                subprocess.check_output(  # nosec - internal use.
+                    [self.binary, "clone", "--mirror", url, mirror],
+                    stderr=subprocess.STDOUT,
+                )
+                # Do not keep expanded credentials on disk
+                subprocess.check_output(  # nosec - internal use.
+                    [
+                        self.binary,
+                        f"--git-dir={mirror}",
+                        "config",
+                        "remote.origin.url",
+                        self.url,
+                    ],
+                    stderr=subprocess.STDOUT,
+                )
+                Path(stamp).touch()
+            elif (
+                revision is not None
+                and FULL_COMMIT_HASH.fullmatch(revision)
+                and self._has_commit(mirror, revision)
+            ):
+                # Only full hashes: branches and tags may have moved
+                self.logger.debug("Found %s in mirror %s", revision, mirror)
+            elif revision is not None or (
+                time.time() - os.stat(stamp).st_mtime >= self.mirror_interval
+            ):
+                self.logger.debug("Fetching %s into %s", self.url, mirror)
+                try:
+                    subprocess.check_output(  # nosec - internal use.
+                        [
+                            self.binary,
+                            f"--git-dir={mirror}",
+                            "fetch",
+                            "--prune",
+                            url,
+                            "+refs/*:refs/*",
+                        ],
+                        stderr=subprocess.STDOUT,
+                    )
+                    Path(stamp).touch()
+                except subprocess.CalledProcessError as exc:
+                    # The requested revision is unknown: this is fatal.
+                    if revision is not None:
+                        raise
+                    self.logger.warning(
+                        "Unable to refresh mirror of '%s', using it as is: %s",
+                        self.url,
+                        exc.stdout.decode("utf-8", errors="replace"),
+                    )
+            # Allow concurrent clones but prevent fetches while cloning
+            fcntl.flock(lock, fcntl.LOCK_SH)
+            yield mirror
+
 
 class TarHelper(VCSHelper):
     # TODO: implement TarHelper
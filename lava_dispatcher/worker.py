@@ -39,6 +39,7 @@ from lava_common.exceptions import LAVABug
 from lava_common.version import __version__
 from lava_common.worker import get_parser, init_sentry_sdk
 from lava_common.yaml import yaml_safe_load
+from lava_dispatcher.zygote import Zygote
 
 if TYPE_CHECKING:
     from argparse import Namespace as argparse_ns
@@ -63,6 +64,7 @@ FORMAT = "%(asctime)-15s %(levelname)7s %(message)s"
 
 ping_interval = 20
 debug = False
+zygote: Zygote | None = None
 tmp_dir = WORKER_DIR / "tmp"
 
 # Stale configuration
@@ -210,6 +212,12 @@ def start_job(
         if env_dut:
             args.append("--env-dut=%s" % (base_dir / "env-dut.yaml"))
 
+        if zygote is not None:
+            try:
+                return zygote.spawn(args, env, out_file, err_file)
+            except OSError as exc:
+                LOG.warning("[%d] Unable to use the zygote: %s", job_id, exc)
+
         proc = subprocess.Popen(
             args, stdout=out_file, stderr=err_file, env=env, process_group=0
         )
@@ -862,6 +870,17 @@ async def main() -> None:
     # Setup debugging if needed
     global debug
     debug = options.debug
+    # Prefork lava-run if requested
+    if options.zygote:
+        global zygote
+        zygote = Zygote.create()
+        if zygote is None:
+            LOG.warning("[INIT] Unable to use the zygote, starting lava-run")
+        else:
+            try:
+                zygote.start()
+            except OSError as exc:
+                LOG.warning("[INIT] Unable to start the zygote: %s", exc)
 
     # Setup timeout
     global TIMEOUT
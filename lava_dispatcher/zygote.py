@@ -0,0 +1,259 @@
+# Copyright (C) 2026 Linaro Limited
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+"""
+Preforked lava-run.
+
+The zygote imports the dispatcher, the lava-run script and every action module
+once, then forks a new process for each job. The forked process calls the
+lava-run main() with the arguments, environment, stdout and stderr of the job,
+exactly as if the worker had executed lava-run.
+
+Jobs are double forked so that the zygote never owns them: the job process is
+re-parented to the worker, which is a child subreaper. The worker therefore
+waits for, signals and kills its jobs as it does for a lava-run process it
+spawned itself.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import ctypes
+import importlib
+import json
+import os
+import pkgutil
+import runpy
+import shutil
+import socket
+import subprocess
+import sys
+import traceback
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import IO, Any, NoReturn
+
+PR_SET_CHILD_SUBREAPER = 36
+# Maximum size of a request (job arguments and environment)
+MAX_REQUEST_SIZE = 1024 * 1024
+# The first request has to wait for the zygote to import the dispatcher
+TIMEOUT = 60
+
+# Packages imported by the zygote before forking
+PRELOAD_PACKAGES = [
+    "lava_dispatcher.actions",
+    "lava_dispatcher.connections",
+    "lava_dispatcher.protocols",
+]
+
+
+def set_child_subreaper() -> bool:
+    """
+    Make the current process the reaper of its orphaned descendants.
+    """
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        return libc.prctl(PR_SET_CHILD_SUBREAPER, 1, 0, 0, 0) == 0
+    except (AttributeError, OSError):
+        return False
+
+
+class Zygote:
+    """
+    Worker side of the zygote: start it and ask it for new jobs.
+    """
+
+    def __init__(self, lava_run: str) -> None:
+        self.lava_run = lava_run
+        self.proc: subprocess.Popen[bytes] | None = None
+        self.sock: socket.socket | None = None
+
+    @classmethod
+    def create(cls) -> Zygote | None:
+        """
+        Return a zygote or None when lava-run cannot be preforked on this host.
+        """
+        lava_run = shutil.which("lava-run")
+        if lava_run is None:
+            return None
+        if not set_child_subreaper():
+            return None
+        return cls(lava_run)
+
+    def start(self) -> None:
+        sock, child_sock = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        try:
+            self.proc = subprocess.Popen(
+                [
+                    sys.executable,
+                    "-m",
+                    "lava_dispatcher.zygote",
+                    f"--fd={child_sock.fileno()}",
+                    self.lava_run,
+                ],
+                pass_fds=[child_sock.fileno()],
+                stdin=subprocess.DEVNULL,
+                process_group=0,
+            )
+        except Exception:
+            sock.close()
+            raise
+        finally:
+            child_sock.close()
+        self.sock = sock
+        self.sock.settimeout(TIMEOUT)
+
+    def stop(self) -> None:
+        # Closing the socket is enough for the zygote to exit
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+        if self.proc is not None:
+            with contextlib.suppress(subprocess.TimeoutExpired):
+                self.proc.wait(timeout=1)
+            self.proc = None
+
+    def spawn(
+        self, args: list[str], env: dict[str, str], stdout: IO[Any], stderr: IO[Any]
+    ) -> int:
+        """
+        Start lava-run with the given arguments and return its pid.
+
+        Raise OSError when the zygote is unable to start the job.
+        """
+        if self.sock is None:
+            self.start()
+        assert self.sock is not None  # nosec - set by start()
+        try:
+            request = json.dumps({"args": args, "env": env}).encode("utf-8")
+            socket.send_fds(self.sock, [request], [stdout.fileno(), stderr.fileno()])
+            reply = self.sock.recv(MAX_REQUEST_SIZE)
+            if not reply:
+                raise OSError("the zygote exited")
+            data = json.loads(reply)
+        except (OSError, ValueError) as exc:
+            # The zygote is in an unknown state: start a new one next time
+            self.stop()
+            raise OSError(f"zygote failure: {exc}") from exc
+        if "error" in data:
+            raise OSError(data["error"])
+        return data["pid"]
+
+
+def preload(lava_run: str) -> Callable[[], int]:
+    """
+    Import the dispatcher and return the lava-run main function.
+    """
+    for name in PRELOAD_PACKAGES:
+        package = importlib.import_module(name)
+        for module in pkgutil.walk_packages(package.__path__, f"{name}."):
+            # Some modules depend on optional packages
+            with contextlib.suppress(ImportError):
+                importlib.import_module(module.name)
+    return runpy.run_path(lava_run, run_name="lava_run")["main"]
+
+
+def run_job(
+    main: Callable[[], int], args: list[str], env: dict[str, str], fds: list[int]
+) -> NoReturn:
+    code = 1
+    try:
+        # Same isolation as Popen(..., process_group=0)
+        os.setpgid(0, 0)
+        os.dup2(fds[0], 1)
+        os.dup2(fds[1], 2)
+        for fd in fds:
+            os.close(fd)
+        os.environ.clear()
+        os.environ.update(env)
+        sys.argv = args
+        code = main()
+    except SystemExit as exc:
+        if exc.code is None:
+            code = 0
+        elif isinstance(exc.code, int):
+            code = exc.code
+        else:
+            print(exc.code, file=sys.stderr)
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        with contextlib.suppress(Exception):
+            sys.stdout.flush()
+            sys.stderr.flush()
+        os._exit(code)
+
+
+def fork_job(
+    sock: socket.socket,
+    main: Callable[[], int],
+    args: list[str],
+    env: dict[str, str],
+    fds: list[int],
+) -> int:
+    """
+    Double fork the job and return the pid of the job process.
+    """
+    read_fd, write_fd = os.pipe()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.close(read_fd)
+            sock.close()
+            if (job_pid := os.fork()) == 0:
+                os.close(write_fd)
+                run_job(main, args, env, fds)
+            os.write(write_fd, str(job_pid).encode("utf-8"))
+        finally:
+            os._exit(0)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd, "rb") as pipe:
+        data = pipe.read()
+    os.waitpid(pid, 0)
+    if not data:
+        raise OSError("unable to fork the job")
+    return int(data)
+
+
+def serve(sock: socket.socket, main: Callable[[], int]) -> None:
+    while True:
+        try:
+            request, fds, _, _ = socket.recv_fds(sock, MAX_REQUEST_SIZE, 2)
+        except OSError:
+            return
+        # The worker closed the socket
+        if not request:
+            return
+        try:
+            data = json.loads(request)
+            if len(fds) != 2:
+                raise ValueError("expected stdout and stderr")
+            reply = {"pid": fork_job(sock, main, data["args"], data["env"], fds)}
+        except (KeyError, OSError, ValueError) as exc:
+            reply = {"error": str(exc)}
+        finally:
+            for fd in fds:
+                os.close(fd)
+        sock.send(json.dumps(reply).encode("utf-8"))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Preforked lava-run")
+    parser.add_argument("--fd", type=int, required=True, help="Worker socket")
+    parser.add_argument("lava_run", help="Path to lava-run")
+    options = parser.parse_args()
+
+    # The worker stops the zygote by closing the socket
+    sock = socket.socket(fileno=options.fd)
+    serve(sock, preload(options.lava_run))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
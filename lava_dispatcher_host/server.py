@@ -6,13 +6,15 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 
 import asyncio
+import contextlib
 import json
 import logging
 import os
 import socket
 from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
 
-from lava_dispatcher_host.utils import share_device_with_container
+from lava_dispatcher_host.utils import find_mapping, share_device_with_container
 
 SOCKET = "/run/lava-dispatcher-host.sock"
 
@@ -38,8 +40,17 @@ def encode_result(result, exception=None):
 
 
 class ServerWrapper:
-    def __init__(self, socket=SOCKET):
+    """
+    Requests are handled concurrently in a thread pool. The requests for the
+    same container are handled one at a time, in the order they were
+    received.
+    """
+
+    def __init__(self, socket=SOCKET, max_workers=None):
         self.socket = socket
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        # {container: [lock, number of requests using it]}
+        self.locks: dict[str | None, list] = {}
 
     def exit(self, signal):
         logger.info(f"Exiting due to {signal}")
@@ -77,8 +88,14 @@ class ServerWrapper:
 
         if not result:
             try:
-                handler = CommandHandler()
-                handler.handle(command)
+                # No await before taking the lock: the requests queue up in
+                # the order they were received.
+                data, _ = find_mapping(command.options)
+                container = data["container"] if data else None
+                async with self.container_lock(container):
+                    await asyncio.get_running_loop().run_in_executor(
+                        self.executor, CommandHandler().handle, command
+                    )
                 result = encode_result("OK")
             except Exception as ex:
                 logger.warning(repr(ex))
@@ -92,6 +109,18 @@ class ServerWrapper:
         except ConnectionResetError as ex:
             logger.warning(repr(ex))
 
+    @contextlib.asynccontextmanager
+    async def container_lock(self, container):
+        entry = self.locks.setdefault(container, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self.locks[container]
+
 
 class Client:
     def __init__(self, socket=SOCKET):
@@ -8,8 +8,10 @@ from __future__ import annotations
 import logging
 import logging.handlers
 import os
+import shlex
 import stat
 import subprocess
+import threading
 from pathlib import Path
 
 import pyudev
@@ -39,14 +41,49 @@ def match_mapping(device_info, options):
     return matched
 
 
+class MappingIndex:
+    """
+    In-memory index of the device/container mappings of the running jobs.
+
+    Jobs register and unregister their mappings by writing and removing their
+    mapping file, so a file is only parsed again when it is added or changed.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # {path: (stat key, mappings)}
+        self.files: dict[Path, tuple[tuple[int, int, int], list]] = {}
+
+    def refresh(self):
+        files = {}
+        for path in iter_mapping_paths():
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                # Removed by the job in the meantime
+                continue
+            key = (st.st_ino, st.st_mtime_ns, st.st_size)
+            cached = self.files.get(path)
+            if cached is None or cached[0] != key:
+                cached = (key, load_mapping_data(path))
+            files[path] = cached
+        self.files = files
+
+    def find(self, options):
+        with self.lock:
+            self.refresh()
+            for path, (_, data) in self.files.items():
+                for item in data:
+                    if match_mapping(item["device_info"], options):
+                        return item, str(path.parent.name)
+        return None, None
+
+
+mapping_index = MappingIndex()
+
+
 def find_mapping(options):
-    for mapping in iter_mapping_paths():
-        data = load_mapping_data(mapping)
-        for item in data:
-            if match_mapping(item["device_info"], options):
-                job_id = str(Path(mapping).parent.name)
-                return item, job_id
-    return None, None
+    return mapping_index.find(options)
 
 
 def share_device_with_container(options):
@@ -75,54 +112,65 @@ def log_sharing_device(device, container_type, container):
 def pass_device_into_container_docker(
     container, container_id, node, links: list[str] | None = None, job_id=None
 ):
-    if links is None:
-        links = []
+    pass_devices_into_container_docker(
+        container, container_id, [(node, links or [])], job_id
+    )
 
-    try:
-        nodeinfo = os.stat(node)
+
+def pass_devices_into_container_docker(
+    container, container_id, nodes: list[tuple[str, list[str]]], job_id=None
+):
+    """
+    Allow the container to access the device nodes and create them, with
+    their links, in a single "docker exec".
+    """
+    devices = []
+    commands = []
+    for node, links in nodes:
+        try:
+            nodeinfo = os.stat(node)
+        except FileNotFoundError as exc:
+            logger.warning(
+                f"Cannot share {node} with docker container {container}: {exc.filename} not found"
+            )
+            continue
         major = os.major(nodeinfo.st_rdev)
         minor = os.minor(nodeinfo.st_rdev)
         nodetype = "b" if stat.S_ISBLK(nodeinfo.st_mode) else "c"
+        devices.append(Device(major, minor))
+
+        nodedir = shlex.quote(os.path.dirname(node))
+        uid = nodeinfo.st_uid
+        gid = nodeinfo.st_gid
+        mode = "%o" % (0o777 & nodeinfo.st_mode)
+        quoted = shlex.quote(node)
+        commands.append(
+            f"mkdir -p {nodedir} && mknod {quoted} {nodetype} {major} {minor} && chown {uid}:{gid} {quoted} && chmod {mode} {quoted}"
+        )
+        for link in links:
+            linkdir = shlex.quote(os.path.dirname(link))
+            commands.append(
+                f"mkdir -p {linkdir} && ln -f -s {quoted} {shlex.quote(link)}"
+            )
+
+    if not devices:
+        return
 
+    try:
         state = Path(JOBS_DIR) / job_id / (container_id + ".devices")
         device_filter = DeviceFilter(container_id, state)
-        device_filter.add(Device(major, minor))
+        for device in devices:
+            device_filter.add(device)
         device_filter.apply()
         device_filter.save(state)
-
     except FileNotFoundError as exc:
         logger.warning(
-            f"Cannot share {node} with docker container {container}: {exc.filename} not found"
+            f"Cannot share devices with docker container {container}: {exc.filename} not found"
         )
         return
 
     # it's ok to fail; container might have already exited at this point.
-    nodedir = os.path.dirname(node)
-    uid = nodeinfo.st_uid
-    gid = nodeinfo.st_gid
-    mode = "%o" % (0o777 & nodeinfo.st_mode)
-    subprocess.call(
-        [
-            "docker",
-            "exec",
-            container,
-            "sh",
-            "-c",
-            f"mkdir -p {nodedir} && mknod {node} {nodetype} {major} {minor} && chown {uid}:{gid} {node} && chmod {mode} {node}",
-        ]
-    )
-
-    for link in links:
-        subprocess.call(
-            [
-                "docker",
-                "exec",
-                container,
-                "sh",
-                "-c",
-                f"mkdir -p {os.path.dirname(link)} && ln -f -s {node} {link}",
-            ]
-        )
+    subprocess.call(["docker", "exec", container, "sh", "-c", "; ".join(commands)])
 
 
 def share_device_with_container_docker(container, node, job_id=None):
@@ -138,12 +186,8 @@ def share_device_with_container_docker(container, node, job_id=None):
         return
 
     device = pyudev.Devices.from_device_file(context, node)
-    pass_device_into_container_docker(
-        container, container_id, node, device.device_links, job_id
-    )
-
+    nodes = [(node, list(device.device_links))]
     for child in device.children:
         if child.device_node:
-            pass_device_into_container_docker(
-                container, container_id, child.device_node, child.device_links, job_id
-            )
+            nodes.append((child.device_node, list(child.device_links)))
+    pass_devices_into_container_docker(container, container_id, nodes, job_id)
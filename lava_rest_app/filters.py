@@ -376,6 +376,8 @@ class MetadataFilterMixin:
             "has_keys",
         )
     )
+    # JSON field holding the metadata and prefix of the query parameters
+    METADATA_FIELD = "metadata"
     METADATA_PREFIX = "metadata__"
 
     def filter_queryset(self, queryset):
@@ -385,9 +387,10 @@ class MetadataFilterMixin:
     def filter_metadata(self, queryset):
         """
         Turn "metadata__<key>[__<lookup>]" query parameters into lookups on the
-        TestJob.metadata JSON field. django-filter cannot declare filters for
-        keys that are only known at request time, so they are handled here.
+        metadata JSON field. django-filter cannot declare filters for keys that
+        are only known at request time, so they are handled here.
         """
+        field = self.METADATA_FIELD
         for suffix, values in self._metadata_params():
             for value in values:
                 if suffix in self.METADATA_DICT_LOOKUPS:
@@ -395,7 +398,7 @@ class MetadataFilterMixin:
                     if suffix == "contains":
                         queryset = self._filter_contains(queryset, value)
                         continue
-                    queryset = queryset.filter(**{f"metadata__{suffix}": value})
+                    queryset = queryset.filter(**{f"{field}__{suffix}": value})
                     continue
 
                 key, _, lookup = suffix.rpartition("__")
@@ -408,7 +411,7 @@ class MetadataFilterMixin:
                     )
                     continue
                 value = self._metadata_value(lookup, value)
-                queryset = queryset.filter(**{f"metadata__{key}__{lookup}": value})
+                queryset = queryset.filter(**{f"{field}__{key}__{lookup}": value})
         return queryset
 
     @classmethod
@@ -417,8 +420,8 @@ class MetadataFilterMixin:
         # the extracted key cannot. It is a PostgreSQL feature: other backends
         # raise NotSupportedError, so they compare the keys instead.
         if connections[queryset.db].vendor == "postgresql":
-            return queryset.filter(metadata__contains=data)
-        return queryset.filter(**cls._contains_lookups(data))
+            return queryset.filter(**{f"{cls.METADATA_FIELD}__contains": data})
+        return queryset.filter(**cls._contains_lookups(data, cls.METADATA_FIELD))
 
     @classmethod
     def _contains_lookups(cls, data, prefix="metadata"):
@@ -454,8 +457,8 @@ class MetadataFilterMixin:
                 raise APIValidationError("Missing metadata key in %r" % param)
             yield suffix, [value for value in values if value != ""]
 
-    @staticmethod
-    def _metadata_dict_value(lookup, value):
+    @classmethod
+    def _metadata_dict_value(cls, lookup, value):
         if lookup == "contains":
             try:
                 data = json.loads(value)
@@ -463,7 +466,8 @@ class MetadataFilterMixin:
                 data = None
             if not isinstance(data, dict):
                 raise APIValidationError(
-                    "metadata__contains expects a JSON object, got %r" % value
+                    "%scontains expects a JSON object, got %r"
+                    % (cls.METADATA_PREFIX, value)
                 )
             return data
         if lookup == "has_key":
@@ -634,7 +638,11 @@ class TestSetFilter(filters.FilterSet):
         }
 
 
-class TestCaseFilter(filters.FilterSet):
+class TestCaseFilter(MetadataFilterMixin, filters.FilterSet):
+    # "metadata__*" filters on the YAML string
+    METADATA_FIELD = "metadata_json"
+    METADATA_PREFIX = "metadata_json__"
+
     result = CharFilter(method="filter_result")
     suite = RelatedFilter(
         "TestSuiteFilter", field_name="suite", queryset=TestSuite.objects.all()
@@ -50,7 +50,7 @@ from lava_results_app.utils import (
     get_testcases_with_limit,
     testcase_export_fields,
 )
-from lava_scheduler_app.dbutils import testjob_submission
+from lava_scheduler_app.dbutils import testjob_bulk_submission, testjob_submission
 from lava_scheduler_app.environment import DEVICES_JINJA_ENV
 from lava_scheduler_app.logutils import logs_instance
 from lava_scheduler_app.models import (
@@ -121,6 +121,11 @@ class TestJobViewSet(viewsets.ModelViewSet):
 
     * `/jobs/`
 
+    You can submit a list of jobs, created in a single transaction, via POST
+    request on:
+
+    * `/jobs/bulk/`
+
     You can validate the given job definition against the schema validator
     via POST request on:
 
@@ -345,6 +350,49 @@ class TestJobViewSet(viewsets.ModelViewSet):
             status=status.HTTP_201_CREATED,
         )
 
+    @action(methods=("post",), detail=False, suffix="bulk")
+    def bulk(self, request, **kwargs):
+        definitions = request.data.get("definitions", None)
+        if not definitions:
+            raise ValidationError({"definitions": "Test job definitions are required."})
+        if not isinstance(definitions, list) or not all(
+            isinstance(definition, str) for definition in definitions
+        ):
+            raise ValidationError(
+                {"definitions": "Test job definitions should be a list of strings."}
+            )
+
+        try:
+            jobs = testjob_bulk_submission(definitions, self.request.user)
+        except SubmissionException as exc:
+            return Response(
+                {"message": "Problem with submitted job data: %s" % exc},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except (ValueError, KeyError, yaml.YAMLError) as exc:
+            return Response(
+                {"message": "job submission failed: %s." % exc},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except (Device.DoesNotExist, DeviceType.DoesNotExist):
+            return Response(
+                {"message": "Specified device or device type not found."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except DevicesUnavailableException as exc:
+            return Response(
+                {"message": "Devices unavailable: %s" % exc},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        job_ids = [
+            [j.sub_id for j in job] if isinstance(job, list) else job.id for job in jobs
+        ]
+        return Response(
+            {"message": "job(s) successfully submitted", "job_ids": job_ids},
+            status=status.HTTP_201_CREATED,
+        )
+
     @action(detail=True, suffix="csv")
     def csv(self, request, **kwargs):
         limit = request.query_params.get("limit", None)
@@ -14,6 +14,7 @@ from urllib.parse import quote
 from lava_common.version import __version__
 from lava_common.yaml import yaml_safe_dump, yaml_safe_load
 from lava_results_app.models import TestCase, TestSet, TestSuite
+from lava_results_app.utils import metadata_to_json
 
 
 def _check_for_testset(result_dict, suite):
@@ -103,6 +104,7 @@ def map_scanned_results(results, job, starttc, endtc, meta_filename):
     if "extra" in results:
         results["extra"] = meta_filename
 
+    metadata_json = metadata_to_json(results)
     metadata = yaml_safe_dump(results)
     if len(metadata) > 4096:  # bug 2471 - test_length unit test
         msg = "[%d] Result metadata is too long. %s" % (job.id, metadata)
@@ -116,15 +118,18 @@ def map_scanned_results(results, job, starttc, endtc, meta_filename):
         }
         if "error_type" in results:
             stripped_results["error_type"] = results["error_type"]
+        metadata_json = metadata_to_json(stripped_results)
         metadata = yaml_safe_dump(stripped_results)
         if len(metadata) > 4096:
             metadata = ""
+            metadata_json = None
         # Try to keep partial error msg
         elif "error_msg" in results:
             stripped_results["error_msg"] = results["error_msg"][:256]
             stripped_results_str = yaml_safe_dump(stripped_results)
             if len(stripped_results_str) < 4096:
                 metadata = stripped_results_str
+                metadata_json = metadata_to_json(stripped_results)
 
     suite, _ = TestSuite.objects.get_or_create(name=results["definition"], job=job)
     testset = _check_for_testset(results, suite)
@@ -153,6 +158,7 @@ def map_scanned_results(results, job, starttc, endtc, meta_filename):
             suite=suite,
             test_set=testset,
             metadata=metadata,
+            metadata_json=metadata_json,
             measurement=measurement,
             units=units,
             result=result_val,
@@ -186,6 +192,7 @@ def map_scanned_results(results, job, starttc, endtc, meta_filename):
                 test_set=testset,
                 result=TestCase.RESULT_MAP[result],
                 metadata=metadata,
+                metadata_json=metadata_json,
                 measurement=measurement,
                 units=units,
                 start_log_line=starttc,
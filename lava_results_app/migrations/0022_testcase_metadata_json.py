@@ -0,0 +1,32 @@
+# Copyright (C) 2026 Linaro Limited
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+from django.db import migrations, models
+
+
+def rebuild_testcase_query_views(apps, schema_editor):
+    # The materialized views of the test case queries do not have the new
+    # column: rebuild them on the next refresh.
+    Query = apps.get_model("lava_results_app", "Query")
+    Query.objects.filter(
+        is_live=False,
+        content_type__app_label="lava_results_app",
+        content_type__model="testcase",
+    ).update(is_changed=True)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("lava_results_app", "0021_testcase_testcases_with_job_errors_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="testcase",
+            name="metadata_json",
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(
+            rebuild_testcase_query_views, migrations.RunPython.noop, elidable=True
+        ),
+    ]
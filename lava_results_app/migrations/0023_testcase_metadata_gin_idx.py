@@ -0,0 +1,49 @@
+# Copyright (C) 2026 Linaro Limited
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class AddIndexConcurrentlyIfSupported(AddIndexConcurrently):
+    """
+    CREATE INDEX CONCURRENTLY is specific to PostgreSQL. Other backends, used
+    by some development setups, create the index the usual way. They also
+    ignore the GIN index type and create a regular index instead.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return migrations.AddIndex.database_forwards(
+                self, app_label, schema_editor, from_state, to_state
+            )
+        return super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return migrations.AddIndex.database_backwards(
+                self, app_label, schema_editor, from_state, to_state
+            )
+        return super().database_backwards(
+            app_label, schema_editor, from_state, to_state
+        )
+
+
+class Migration(migrations.Migration):
+    # lava_results_app_testcase is the largest table of most instances. Build
+    # the index concurrently so that the results are still saved while the
+    # migration runs. CREATE INDEX CONCURRENTLY cannot run inside a
+    # transaction.
+    atomic = False
+
+    dependencies = [
+        ("lava_results_app", "0022_testcase_metadata_json"),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyIfSupported(
+            model_name="testcase",
+            index=GinIndex(fields=["metadata_json"], name="testcase_metadata_gin_idx"),
+        ),
+    ]
@@ -26,6 +26,7 @@ from django.conf import settings
 from django.contrib.auth.models import Group, User
 from django.contrib.contenttypes import fields
 from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.indexes import GinIndex
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import connection, models, transaction
 from django.db.models import Count, Lookup, Q
@@ -317,6 +318,7 @@ class TestCase(models.Model, Queryable):
                 ),
                 name="testcases_with_job_errors_idx",
             ),
+            GinIndex(name="testcase_metadata_gin_idx", fields=("metadata_json",)),
         )
         constraints = (
             models.UniqueConstraint(
@@ -400,6 +402,12 @@ class TestCase(models.Model, Queryable):
         verbose_name=gettext_lazy("Action meta data as a YAML string"),
     )
 
+    # The same metadata as a dictionary, so that the test cases can be
+    # filtered on metadata keys by the database. Test cases created before
+    # this column was added are filled by
+    # "lava-server manage jobs backfill-testcase-metadata".
+    metadata_json = models.JSONField(null=True, blank=True, editable=False)
+
     suite = models.ForeignKey(TestSuite, on_delete=models.CASCADE)
 
     # Store start and end of the TestCase in the log file
@@ -421,6 +429,8 @@ class TestCase(models.Model, Queryable):
 
     @property
     def action_metadata(self):
+        if self.metadata_json is not None:
+            return self.metadata_json
         if not self.metadata:
             return None
         try:
@@ -740,6 +750,19 @@ class Query(models.Model):
                 filters[filter_key_name] = condition.field
                 filters[filter_key_value] = condition.value
 
+            elif QueryCondition.is_metadata_field(
+                condition.table.model_class(), condition.field
+            ):
+                # Conditions on a test case metadata key are run by the
+                # database on the JSON column. Nested keys are separated by
+                # dots: "metadata.extra.size".
+                key = condition.field[len(QueryCondition.METADATA_FIELD_PREFIX) :]
+                key = key.replace(".", "__")
+                filter_key = "metadata_json"
+                if condition.table != content_type:
+                    filter_key = f"{relation_string}__{filter_key}"
+                filters[f"{filter_key}__{key}__{condition.operator}"] = condition.value
+
             else:
                 if condition.table == content_type:
                     filter_key = condition.field
@@ -1021,6 +1044,10 @@ class QueryCondition(models.Model):
         NamedTestAttribute: [],
     }
 
+    # Test case conditions can also apply to a metadata key, using
+    # "metadata.<key>" as field name.
+    METADATA_FIELD_PREFIX = "metadata."
+
     query = models.ForeignKey(Query, on_delete=models.CASCADE)
 
     field = models.CharField(max_length=50, verbose_name="Field name")
@@ -1104,6 +1131,14 @@ class QueryCondition(models.Model):
 
         return condition_choices
 
+    @classmethod
+    def is_metadata_field(cls, model, field):
+        return (
+            model == TestCase
+            and field.startswith(cls.METADATA_FIELD_PREFIX)
+            and len(field) > len(cls.METADATA_FIELD_PREFIX)
+        )
+
     @classmethod
     def get_similar_job_content_types(cls):
         # Create a dict with all available content types.
@@ -6,6 +6,7 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 
 import contextlib
+import json
 import logging
 import os
 
@@ -30,6 +31,20 @@ def help_max_length(max_length):
     )
 
 
+def metadata_to_json(data):
+    """
+    Convert the test case metadata to a value that can be stored in a JSON
+    column. YAML types without a JSON equivalent, like dates, are stored as
+    strings. Return None when the metadata cannot be converted.
+    """
+    if not isinstance(data, dict):
+        return None
+    try:
+        return json.loads(json.dumps(data, default=str, allow_nan=False))
+    except (TypeError, ValueError):
+        return None
+
+
 class StreamEcho:
     def write(self, value):
         return value
@@ -96,7 +96,10 @@ class QueryConditionForm(forms.ModelForm):
             field_choices = QueryCondition.FIELD_CHOICES[
                 form_data["table"].model_class()
             ]
-            if field_choices:
+            # Test case metadata keys are free form
+            if field_choices and not QueryCondition.is_metadata_field(
+                form_data["table"].model_class(), form_data["field"]
+            ):
                 if form_data["field"] not in field_choices:
                     self.add_error(
                         "field",
@@ -21,6 +21,7 @@ from lava_results_app.models import TestCase
 from lava_scheduler_app.dbutils import (
     active_device_types,
     device_type_summary,
+    testjob_bulk_submission,
     testjob_submission,
 )
 from lava_scheduler_app.models import (
@@ -117,6 +118,50 @@ class SchedulerAPI(ExposedV2API):
         else:
             return job.id
 
+    def submit_jobs(self, definitions):
+        """
+        Name
+        ----
+        `submit_jobs` (`definitions`)
+
+        Description
+        -----------
+        Submit the given list of job definitions, in LAVA job JSON or YAML
+        format, as new jobs to LAVA scheduler. The jobs are created in a single
+        transaction: if any definition is invalid, no job is created.
+
+        Arguments
+        ---------
+        `definitions`: array
+            List of job JSON or YAML strings.
+
+        Return value
+        ------------
+        This function returns an XML-RPC array with, for each definition and in
+        the same order, the id of the newly created job. For multinode jobs,
+        the element is the list of created job IDs.
+        """
+        self._authenticate()
+        if not isinstance(definitions, list) or not all(
+            isinstance(definition, str) for definition in definitions
+        ):
+            raise xmlrpc.client.Fault(400, "definitions should be a list of strings")
+        try:
+            jobs = testjob_bulk_submission(definitions, self.user)
+        except SubmissionException as exc:
+            raise xmlrpc.client.Fault(400, "Problem with submitted job data: %s" % exc)
+        except ValueError as exc:
+            raise xmlrpc.client.Fault(400, "Decoding job submission failed: %s." % exc)
+        except yaml.YAMLError as exc:
+            raise xmlrpc.client.Fault(400, "Invalid job definition: %s." % exc)
+        except (Device.DoesNotExist, DeviceType.DoesNotExist):
+            raise xmlrpc.client.Fault(404, "Specified device or device type not found.")
+        except DevicesUnavailableException as exc:
+            raise xmlrpc.client.Fault(400, "Device unavailable: %s" % str(exc))
+        return [
+            [j.sub_id for j in job] if isinstance(job, list) else job.id for job in jobs
+        ]
+
     def resubmit_job(self, job_id):
         """
         Name
@@ -493,6 +493,33 @@ class SchedulerJobsAPI(ExposedV2API):
         cls = SchedulerAPI(self._context)
         return cls.submit_job(definition)
 
+    def submit_bulk(self, definitions):
+        """
+        Name
+        ----
+        `scheduler.jobs.submit_bulk` (`definitions`)
+
+        Description
+        -----------
+        Submit the given list of job data, in LAVA job JSON or YAML format, as
+        new jobs to LAVA scheduler. The jobs are created in a single
+        transaction: if any definition is invalid, no job is created.
+
+        Arguments
+        ---------
+        `definitions`: array
+            List of job JSON or YAML strings.
+
+        Return value
+        ------------
+        This function returns an XML-RPC array with, for each definition and in
+        the same order, the newly created job's id, provided the user is
+        authenticated with an username and token. For multinode jobs, the
+        element is the list of created job IDs.
+        """
+        cls = SchedulerAPI(self._context)
+        return cls.submit_jobs(definitions)
+
     def validate(self, definition, strict=False):
         """
         Name
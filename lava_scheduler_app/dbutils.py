@@ -17,7 +17,8 @@ from django.contrib.auth.models import User
 from django.contrib.sites.models import Site
 from django.core.exceptions import ImproperlyConfigured, ValidationError
 from django.core.validators import validate_email
-from django.db.models import Count, Q
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Value
 from jinja2 import TemplateError as JinjaTemplateError
 
 from lava_common.decorators import nottest
@@ -53,6 +54,29 @@ def testjob_submission(job_definition, user, original_job=None):
     return job
 
 
+@nottest
+def testjob_bulk_submission(job_definitions, user):
+    """
+    Bulk submission frontend for YAML
+    :param job_definitions: list of strings of the job submissions
+    :param user: user attempting the submission
+    :return: for each definition, a job or a list of jobs
+    :raises: same as testjob_submission. When an exception is raised, no
+        job is created.
+    """
+    # Check every definition before touching the database
+    for job_definition in job_definitions:
+        validate_job(job_definition)
+    jobs = TestJob.bulk_from_yaml_and_user(job_definitions, user)
+
+    # Multinode jobs are not bulk created and already sent their events
+    from lava_scheduler_app.signals import testjob_bulk_created_handler
+
+    bulk_created = [job for job in jobs if not isinstance(job, list)]
+    transaction.on_commit(lambda: testjob_bulk_created_handler(user, bulk_created))
+    return jobs
+
+
 def device_summary():
     device_stats = (
         Device.objects.filter(~Q(health=Device.HEALTH_RETIRED))
@@ -92,12 +116,14 @@ def device_summary():
 
 
 def device_type_summary(user):
-    devices = (
-        Device.objects.filter(
-            ~Q(health=Device.HEALTH_RETIRED),
-            Q(device_type__in=DeviceType.objects.visible_by_user(user)),
+    devices = Device.objects.filter(~Q(health=Device.HEALTH_RETIRED))
+    # Without user, summarize every device type
+    if user is not None:
+        devices = devices.filter(
+            device_type__in=DeviceType.objects.visible_by_user(user)
         )
-        .only("state", "health", "device_type", "hostname")
+    devices = (
+        devices.only("state", "health", "device_type", "hostname")
         .values("device_type")
         .annotate(
             idle=Count(
@@ -133,6 +159,42 @@ def device_type_summary(user):
     return devices
 
 
+def lab_state(user=None):
+    """
+    Summary of the devices, device types and workers exported by the
+    prometheus view.
+    """
+    (device_stats, running_jobs_count) = device_summary()
+    device_types = device_type_summary(user).annotate(
+        queued_jobs=Subquery(
+            TestJob.objects.filter(
+                Q(state=TestJob.STATE_SUBMITTED),
+                Q(requested_device_type=OuterRef("device_type")),
+            )
+            .annotate(dummy_group_by=Value(1))  # Disable GROUP BY
+            .values("dummy_group_by")
+            .annotate(queued_jobs=Count("*"))
+            .values("queued_jobs"),
+            output_field=IntegerField(),
+        ),
+    )
+    worker_stats = Worker.objects.exclude(health=Worker.HEALTH_RETIRED).aggregate(
+        num_not_retired=Count("pk"),
+        num_online=Count("pk", filter=Q(state=Worker.STATE_ONLINE)),
+        num_offline=Count("pk", filter=Q(state=Worker.STATE_OFFLINE)),
+        num_maintenance=Count("pk", filter=Q(health=Worker.HEALTH_MAINTENANCE)),
+        num_active=Count("pk", filter=Q(health=Worker.HEALTH_ACTIVE)),
+    )
+    return {
+        "devices": device_stats,
+        "running_jobs": running_jobs_count,
+        "device_types": [
+            {**dt, "queued_jobs": dt["queued_jobs"] or 0} for dt in device_types
+        ],
+        "workers": worker_stats,
+    }
+
+
 def active_device_types():
     """
     Filter the available device types to exclude
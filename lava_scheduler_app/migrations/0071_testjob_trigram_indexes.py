@@ -0,0 +1,50 @@
+# Copyright (C) 2026 Linaro Limited
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class RunSQLIfPostgreSQL(migrations.RunSQL):
+    """
+    Trigram indexes are specific to PostgreSQL. Other backends, used by some
+    development setups, do not get them.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+def trigram_index(name, expression):
+    return RunSQLIfPostgreSQL(
+        sql=f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+        f"ON lava_scheduler_app_testjob USING gin (({expression}) gin_trgm_ops)",
+        reverse_sql=f"DROP INDEX CONCURRENTLY IF EXISTS {name}",
+    )
+
+
+class Migration(migrations.Migration):
+    # The job tables search the id, sub_id and description columns with
+    # "LIKE '%term%'" (the __contains lookup). Only trigram indexes can be used
+    # for such queries. As for testjob_metadata_gin_index, the indexes are
+    # built concurrently to not block job submission.
+    #
+    # The indexes are not declared in TestJob.Meta: the operator class does
+    # not exist on other database backends.
+    atomic = False
+
+    dependencies = [
+        ("lava_scheduler_app", "0070_increase_tag_name_max_length"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        trigram_index("testjob_id_trgm_index", "id::text"),
+        trigram_index("testjob_sub_id_trgm_index", "sub_id"),
+        trigram_index("testjob_description_trgm_index", "description"),
+    ]
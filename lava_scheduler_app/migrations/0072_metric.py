@@ -0,0 +1,40 @@
+# Copyright (C) 2026 Linaro Limited
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("lava_scheduler_app", "0071_testjob_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Metric",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=200)),
+                ("labels", models.TextField(default="{}")),
+                ("kind", models.CharField(max_length=20)),
+                ("value", models.JSONField(default=dict)),
+                ("updated", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="metric",
+            constraint=models.UniqueConstraint(
+                fields=("name", "labels"),
+                name="lava_scheduler_app_metric_name_and_labels_uniq",
+            ),
+        ),
+    ]
@@ -1251,7 +1251,28 @@ def extract_job_metadata(job_data):
     return {str(key): _normalize_metadata_value(val) for key, val in metadata.items()}
 
 
-def _create_pipeline_job(
+def _get_viewing_groups(user, param, group_cache=None):
+    """
+    Return the groups allowed to view a private job.
+    group_cache, when given, is shared between calls to avoid querying the
+    same groups again.
+    """
+    if group_cache is None:
+        group_cache = {}
+    if isinstance(param, str):
+        if user.username not in group_cache:
+            group_cache[user.username] = Group.objects.get_or_create(
+                name=user.username
+            )[0]
+        return [group_cache[user.username]]
+
+    names = tuple(param["group"])
+    if names not in group_cache:
+        group_cache[names] = list(Group.objects.filter(name__in=names))
+    return group_cache[names]
+
+
+def _prepare_pipeline_job(
     job_data,
     user,
     taglist,
@@ -1261,7 +1282,12 @@ def _create_pipeline_job(
     target_group=None,
     orig=None,
     health_check=False,
+    group_cache=None,
 ):
+    """
+    Build the TestJob without saving it.
+    :return: a tuple (job, tags, viewing groups) or None
+    """
     if not isinstance(job_data, dict):
         # programming error
         raise RuntimeError("Invalid job data %s" % job_data)
@@ -1303,11 +1329,10 @@ def _create_pipeline_job(
         if param == "public":
             is_public = True
         else:
-            group, _ = Group.objects.get_or_create(name=user.username)
-            viewing_groups = [group]
+            viewing_groups = _get_viewing_groups(user, param, group_cache)
     elif isinstance(param, dict):
         if "group" in param:
-            viewing_groups = list(Group.objects.filter(name__in=param["group"]))
+            viewing_groups = _get_viewing_groups(user, param, group_cache)
             if not viewing_groups:
                 raise SubmissionException(
                     "No known groups were found in the visibility list."
@@ -1322,22 +1347,26 @@ def _create_pipeline_job(
     if "timeouts" in job_data and "queue" in job_data["timeouts"]:
         queue_timeout = Timeout.parse(job_data["timeouts"]["queue"])
 
+    job = TestJob(
+        definition=yaml_safe_dump(job_data),
+        metadata=extract_job_metadata(job_data),
+        original_definition=orig,
+        submitter=user,
+        requested_device_type=device_type,
+        requested_device=device,
+        requested_worker=worker,
+        target_group=target_group,
+        description=job_data["job_name"],
+        health_check=health_check,
+        priority=priority,
+        is_public=is_public,
+        queue_timeout=queue_timeout,
+    )
+    return job, taglist, viewing_groups
+
+
+def _save_pipeline_job(job, taglist, viewing_groups):
     with transaction.atomic():
-        job = TestJob(
-            definition=yaml_safe_dump(job_data),
-            metadata=extract_job_metadata(job_data),
-            original_definition=orig,
-            submitter=user,
-            requested_device_type=device_type,
-            requested_device=device,
-            requested_worker=worker,
-            target_group=target_group,
-            description=job_data["job_name"],
-            health_check=health_check,
-            priority=priority,
-            is_public=is_public,
-            queue_timeout=queue_timeout,
-        )
         job.save()
 
         # need a valid job (with a primary_key) before tags and groups can be
@@ -1348,6 +1377,62 @@ def _create_pipeline_job(
     return job
 
 
+def _bulk_save_pipeline_jobs(prepared):
+    """
+    Save the jobs returned by _prepare_pipeline_job with one query per table.
+    The post_save signals are not sent.
+    """
+    with transaction.atomic():
+        jobs = TestJob.objects.bulk_create([job for job, _, _ in prepared])
+
+        # bulk_create sets the primary keys (PostgreSQL and SQLite)
+        TagThrough = TestJob.tags.through
+        TagThrough.objects.bulk_create(
+            [
+                TagThrough(testjob_id=job.id, tag_id=tag.id)
+                for job, taglist, _ in prepared
+                for tag in taglist
+            ]
+        )
+        GroupThrough = TestJob.viewing_groups.through
+        GroupThrough.objects.bulk_create(
+            [
+                GroupThrough(testjob_id=job.id, group_id=group.id)
+                for job, _, viewing_groups in prepared
+                for group in viewing_groups
+            ]
+        )
+
+    return jobs
+
+
+def _create_pipeline_job(
+    job_data,
+    user,
+    taglist,
+    device=None,
+    worker=None,
+    device_type=None,
+    target_group=None,
+    orig=None,
+    health_check=False,
+):
+    prepared = _prepare_pipeline_job(
+        job_data,
+        user,
+        taglist,
+        device=device,
+        worker=worker,
+        device_type=device_type,
+        target_group=target_group,
+        orig=orig,
+        health_check=health_check,
+    )
+    if prepared is None:
+        return None
+    return _save_pipeline_job(*prepared)
+
+
 def _pipeline_protocols(job_data, user, yaml_data=None):
     """
     Handle supported pipeline protocols
@@ -1532,6 +1617,9 @@ class TestJob(models.Model):
                 ),  # HACK: refers to TestJob.STATE_FINISHED
             ),
             GinIndex(name="testjob_metadata_gin_index", fields=("metadata",)),
+            # The trigram indexes on id, sub_id and description, used by the
+            # job tables searches, are created by migration 0071 on
+            # PostgreSQL only.
         )
         constraints = (
             models.UniqueConstraint(
@@ -2060,6 +2148,48 @@ class TestJob(models.Model):
             # explicitly a list, not a QuerySet.
             return job_list
         # singlenode only
+        return _save_pipeline_job(
+            *cls._prepare_singlenode(job_data, user, yaml_data, original_job)
+        )
+
+    @classmethod
+    def bulk_from_yaml_and_user(cls, definitions, user):
+        """
+        Runs the submission checks on a list of job definitions and creates
+        all the jobs in a single transaction: if any definition is rejected,
+        no job is created.
+        Singlenode jobs are inserted with bulk_create, so the post_save
+        signals are not sent for them.
+
+        :return: a list with, for each definition, the same value as
+        from_yaml_and_user
+        """
+        ret = []
+        prepared = []
+        group_cache = {}
+        with transaction.atomic():
+            for yaml_data in definitions:
+                job_data = yaml_safe_load(yaml_data)
+                if "visibility" not in job_data:
+                    raise SubmissionException("Job visibility must be specified.")
+
+                job_list = _pipeline_protocols(job_data, user, yaml_data)
+                if job_list:
+                    ret.append(job_list)
+                    continue
+                prepared.append(
+                    cls._prepare_singlenode(
+                        job_data, user, yaml_data, group_cache=group_cache
+                    )
+                )
+                ret.append(prepared[-1][0])
+            _bulk_save_pipeline_jobs(prepared)
+        return ret
+
+    @classmethod
+    def _prepare_singlenode(
+        cls, job_data, user, yaml_data, original_job=None, group_cache=None
+    ):
         device_type = _get_device_type(user, job_data["device_type"])
         device, worker, allow = _get_requested_devices(
             user,
@@ -2087,7 +2217,7 @@ class TestJob(models.Model):
 
             job_data.setdefault("metadata", {}).setdefault("job.original", job_url)
 
-        return _create_pipeline_job(
+        return _prepare_pipeline_job(
             job_data,
             user,
             taglist,
@@ -2095,6 +2225,7 @@ class TestJob(models.Model):
             worker=worker,
             device_type=device_type,
             orig=yaml_data,
+            group_cache=group_cache,
         )
 
     def can_view(self, user):
@@ -2217,12 +2348,23 @@ class TestJob(models.Model):
 
         # Results.
         if results:
+            from lava_results_app.models import TestCase
+
+            # Fetch every test case in one query instead of one per suite
+            test_cases = {}
+            for test_case in (
+                TestCase.objects.filter(suite__job=self)
+                .select_related("suite")
+                .order_by("id")
+            ):
+                test_cases.setdefault(test_case.suite_id, []).append(
+                    export_testcase(test_case)
+                )
             data["results"] = {}
-            for test_suite in self.testsuite_set.all():
-                yaml_list = []
-                for test_case in test_suite.testcase_set.all():
-                    yaml_list.append(export_testcase(test_case))
-                data["results"][test_suite.name] = yaml_safe_dump(yaml_list)
+            for test_suite in self.testsuite_set.all().order_by("id"):
+                data["results"][test_suite.name] = yaml_safe_dump(
+                    test_cases.get(test_suite.id, [])
+                )
 
         return data
 
@@ -2691,33 +2833,58 @@ class NotificationCallback(models.Model):
             "Callback URL host '%s' is not in CALLBACK_ALLOWED_HOSTS" % hostname
         )
 
-    def invoke_callback(self):
-        logger = logging.getLogger("lava-scheduler")
-        data = None
+    @property
+    def needs_output(self):
+        return self.dataset in [NotificationCallback.LOGS, NotificationCallback.ALL]
 
-        if self.method != NotificationCallback.GET:
-            output = self.dataset in [
-                NotificationCallback.LOGS,
-                NotificationCallback.ALL,
-            ]
-            results = self.dataset in [
-                NotificationCallback.RESULTS,
-                NotificationCallback.ALL,
-            ]
-            data = self.notification.test_job.create_job_data(
-                output=output, results=results
-            )
-            # store callback_data for later retrieval & triage
-            job_data_file = os.path.join(
-                self.notification.test_job.output_dir, "job_data.gz"
+    @property
+    def needs_results(self):
+        return self.dataset in [
+            NotificationCallback.RESULTS,
+            NotificationCallback.ALL,
+        ]
+
+    def prepare_data(self, job_data=None):
+        """
+        Return the data to send, according to the dataset.
+
+        job_data is the result of TestJob.create_job_data() shared by the
+        callbacks of the same notification. When given, it should contain the
+        logs and the results if any of the callbacks requires them.
+        """
+        if self.method == NotificationCallback.GET:
+            return None
+
+        job = self.notification.test_job
+        if job_data is None:
+            data = job.create_job_data(
+                output=self.needs_output, results=self.needs_results
             )
-            if data:
-                # allow for jobs cancelled in submitted state
-                utils.mkdir(self.notification.test_job.output_dir)
-                # only write the file once
-                if not os.path.exists(job_data_file):
-                    with gzip.open(job_data_file, "wt") as output:
-                        json_dump(data, output)
+        else:
+            data = dict(job_data)
+            if not self.needs_output:
+                data.pop("log", None)
+            if not self.needs_results:
+                data.pop("results", None)
+
+        # store callback_data for later retrieval & triage
+        job_data_file = os.path.join(job.output_dir, "job_data.gz")
+        if data:
+            # allow for jobs cancelled in submitted state
+            utils.mkdir(job.output_dir)
+            # only write the file once
+            if not os.path.exists(job_data_file):
+                with gzip.open(job_data_file, "wt") as output:
+                    json_dump(data, output)
+        return data
+
+    def send_request(self, data, session=None):
+        """
+        Send the request to the callback url. This function does not access
+        the database and can be called from a thread.
+        """
+        logger = logging.getLogger("lava-scheduler")
+        client = requests if session is None else session
         try:
             self._validate_callback_url(self.url)
             logger.info("Sending request to callback url %s" % self.url)
@@ -2726,18 +2893,18 @@ class NotificationCallback(models.Model):
                 headers[self.header] = self.token
 
             if self.method == NotificationCallback.GET:
-                ret = requests.get(
+                ret = client.get(
                     self.url, headers=headers, timeout=settings.CALLBACK_TIMEOUT
                 )
             elif self.content_type == NotificationCallback.JSON:
-                ret = requests.post(
+                ret = client.post(
                     self.url,
                     json=data,
                     headers=headers,
                     timeout=settings.CALLBACK_TIMEOUT,
                 )
             else:
-                ret = requests.post(
+                ret = client.post(
                     self.url,
                     data=data,
                     headers=headers,
@@ -2748,6 +2915,9 @@ class NotificationCallback(models.Model):
         except Exception as ex:
             logger.warning(f"Problem sending request to {self.url}: {ex}")
 
+    def invoke_callback(self, job_data=None, session=None):
+        self.send_request(self.prepare_data(job_data), session)
+
 
 @nottest
 class TestJobUser(models.Model):
@@ -2868,3 +3038,29 @@ class RemoteArtifactsAuth(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class Metric(models.Model):
+    """
+    Totals of the internal metrics recorded by the lava-server,
+    lava-scheduler and lava-publisher processes.
+    See lava_server.metrics.
+    """
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=("name", "labels"),
+                name="lava_scheduler_app_metric_name_and_labels_uniq",
+            ),
+        )
+
+    name = models.CharField(max_length=200)
+    # Labels as a canonical JSON object
+    labels = models.TextField(default="{}")
+    kind = models.CharField(max_length=20)
+    value = models.JSONField(default=dict)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}{self.labels}"
@@ -7,14 +7,18 @@
 import contextlib
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 
+import requests
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
-from django.core.mail import send_mail
+from django.core.mail import get_connection, send_mail
 from django.db import IntegrityError
 from django.db.models import Q
 from django.urls import reverse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from lava_results_app.models import Query, TestCase, TestSuite
 from lava_scheduler_app import dbutils, utils
@@ -270,72 +274,130 @@ def get_recipient_args(recipient):
     return user_data
 
 
+def create_callback_session(pool_size):
+    """
+    Return a http session, shared by the callbacks of a notification, that
+    retries failed requests a bounded number of times.
+    """
+    retries = Retry(
+        total=settings.CALLBACK_RETRIES,
+        backoff_factor=1,
+        status_forcelist=(429, 502, 503, 504),
+        allowed_methods=None,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        max_retries=retries, pool_connections=pool_size, pool_maxsize=pool_size
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def invoke_callbacks(callbacks):
+    if not callbacks:
+        return
+    # Build the job data once, with everything needed by the callbacks, and
+    # share it between them.
+    job_data = None
+    if any(c.method != NotificationCallback.GET for c in callbacks):
+        job = callbacks[0].notification.test_job
+        job_data = job.create_job_data(
+            output=any(c.needs_output for c in callbacks),
+            results=any(c.needs_results for c in callbacks),
+        )
+    # Every database access happens here, the threads only send the requests
+    requests_data = [(c, c.prepare_data(job_data)) for c in callbacks]
+
+    workers = min(len(callbacks), settings.CALLBACK_WORKERS)
+    with (
+        create_callback_session(workers) as session,
+        ThreadPoolExecutor(max_workers=workers) as executor,
+    ):
+        for callback, data in requests_data:
+            executor.submit(callback.send_request, data, session)
+
+
 def send_notifications(job):
     logger = logging.getLogger("lava-scheduler")
     notification = job.notification
     # Prep template args.
     kwargs = get_notification_args(job)
     # Process notification callback.
-    for callback in notification.notificationcallback_set.all():
-        callback.invoke_callback()
-
-    for recipient in notification.notificationrecipient_set.all():
-        if recipient.method == NotificationRecipient.EMAIL:
-            if recipient.status == NotificationRecipient.NOT_SENT:
-                try:
-                    logger.info(
-                        "[%d] sending email notification to %s",
-                        job.id,
-                        recipient.email_address,
-                    )
-                    title = f"LAVA notification for Test Job {job.id} {job.description[:200]}"
-                    kwargs["user"] = get_recipient_args(recipient)
-                    body = create_notification_body(notification.template, **kwargs)
-                    result = send_mail(
-                        title, body, settings.SERVER_EMAIL, [recipient.email_address]
-                    )
-                    if result:
-                        recipient.status = NotificationRecipient.SENT
-                        recipient.save()
-                except Exception as exc:
-                    logger.exception(exc)
-                    logger.warning(
-                        "[%d] failed to send email notification to %s",
-                        job.id,
-                        recipient.email_address,
-                    )
-        else:  # IRC method
-            if recipient.status == NotificationRecipient.NOT_SENT:
-                if recipient.irc_server_name:
-                    logger.info(
-                        "[%d] sending IRC notification to %s on %s",
-                        job.id,
-                        recipient.irc_handle_name,
-                        recipient.irc_server_name,
-                    )
+    invoke_callbacks(list(notification.notificationcallback_set.all()))
+
+    # Emails are sent through a single SMTP connection, opened on demand
+    connection = None
+    try:
+        for recipient in notification.notificationrecipient_set.all():
+            if recipient.method == NotificationRecipient.EMAIL:
+                if recipient.status == NotificationRecipient.NOT_SENT:
                     try:
-                        irc_message = create_irc_notification(job)
-                        utils.send_irc_notification(
-                            Notification.DEFAULT_IRC_HANDLE,
-                            recipient=recipient.irc_handle_name,
-                            message=irc_message,
-                            server=recipient.irc_server_name,
-                        )
-                        recipient.status = NotificationRecipient.SENT
-                        recipient.save()
                         logger.info(
-                            "[%d] IRC notification sent to %s",
+                            "[%d] sending email notification to %s",
                             job.id,
-                            recipient.irc_handle_name,
+                            recipient.email_address,
+                        )
+                        title = f"LAVA notification for Test Job {job.id} {job.description[:200]}"
+                        kwargs["user"] = get_recipient_args(recipient)
+                        body = create_notification_body(notification.template, **kwargs)
+                        if connection is None:
+                            connection = get_connection()
+                            connection.open()
+                        result = send_mail(
+                            title,
+                            body,
+                            settings.SERVER_EMAIL,
+                            [recipient.email_address],
+                            connection=connection,
                         )
-                    # FIXME: this bare except should be constrained
-                    except Exception as e:
+                        if result:
+                            recipient.status = NotificationRecipient.SENT
+                            recipient.save()
+                    except Exception as exc:
+                        logger.exception(exc)
                         logger.warning(
-                            "[%d] IRC notification not sent. Reason: %s - %s",
+                            "[%d] failed to send email notification to %s",
                             job.id,
-                            e.__class__.__name__,
-                            str(e),
+                            recipient.email_address,
                         )
+            else:  # IRC method
+                if recipient.status == NotificationRecipient.NOT_SENT:
+                    if recipient.irc_server_name:
+                        logger.info(
+                            "[%d] sending IRC notification to %s on %s",
+                            job.id,
+                            recipient.irc_handle_name,
+                            recipient.irc_server_name,
+                        )
+                        try:
+                            irc_message = create_irc_notification(job)
+                            utils.send_irc_notification(
+                                Notification.DEFAULT_IRC_HANDLE,
+                                recipient=recipient.irc_handle_name,
+                                message=irc_message,
+                                server=recipient.irc_server_name,
+                            )
+                            recipient.status = NotificationRecipient.SENT
+                            recipient.save()
+                            logger.info(
+                                "[%d] IRC notification sent to %s",
+                                job.id,
+                                recipient.irc_handle_name,
+                            )
+                        # FIXME: this bare except should be constrained
+                        except Exception as e:
+                            logger.warning(
+                                "[%d] IRC notification not sent. Reason: %s - %s",
+                                job.id,
+                                e.__class__.__name__,
+                                str(e),
+                            )
+
+    finally:
+        if connection is not None:
+            connection.close()
 
 
 def notification_criteria(job_id, criteria, state, health, old_health):
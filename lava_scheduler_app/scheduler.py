@@ -30,6 +30,11 @@ from lava_scheduler_app.models import (
     Worker,
     _create_pipeline_job,
 )
+from lava_server.metrics import (
+    SCHEDULER_JOBS_TOTAL,
+    SCHEDULER_PHASE_SECONDS,
+    SCHEDULER_QUEUE_SECONDS,
+)
 
 LOGGER_NAME = "lava-scheduler"
 LOGGER = logging.getLogger(LOGGER_NAME)
@@ -89,9 +94,12 @@ def check_queue_timeout():
 
 def schedule(workers):
     workers_limit = worker_summary(workers)
-    available_devices = schedule_health_checks(workers_limit)
-    schedule_jobs(available_devices, workers_limit)
-    check_queue_timeout()
+    with SCHEDULER_PHASE_SECONDS.time(phase="health_checks"):
+        available_devices = schedule_health_checks(workers_limit)
+    with SCHEDULER_PHASE_SECONDS.time(phase="jobs"):
+        schedule_jobs(available_devices, workers_limit)
+    with SCHEDULER_PHASE_SECONDS.time(phase="queue_timeout"):
+        check_queue_timeout()
 
 
 def schedule_health_checks(workers_limit):
@@ -238,6 +246,7 @@ def schedule_health_check(device, definition):
     )
     fields = job.go_state_scheduled(device)
     job.save(update_fields=fields)
+    SCHEDULER_JOBS_TOTAL.inc(kind="health_check")
 
 
 def schedule_jobs(available_devices, workers_limit):
@@ -350,6 +359,10 @@ def schedule_jobs_for_device(device, print_header):
             else:
                 fields = job.go_state_scheduled(device)
             job.save(update_fields=fields)
+            SCHEDULER_JOBS_TOTAL.inc(kind="job")
+            SCHEDULER_QUEUE_SECONDS.observe(
+                (timezone.now() - job.submit_time).total_seconds()
+            )
             return job.id
 
     return None
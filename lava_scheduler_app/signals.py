@@ -124,6 +124,32 @@ def testjob_notifications(sender, **kwargs):
     async_send_notifications.delay(job.id, job.state, job.health, job._old_health)
 
 
+def testjob_event_data(instance):
+    data = {
+        "health": instance.get_health_display(),
+        "state": instance.get_state_display(),
+        "job": instance.id,
+        "description": instance.description,
+        "priority": instance.priority,
+        "submit_time": instance.submit_time.isoformat(),
+        "submitter": str(instance.submitter),
+        "health_check": instance.health_check,
+    }
+    if instance.is_multinode:
+        data["sub_id"] = instance.sub_id
+    if instance.actual_device:
+        data["device"] = instance.actual_device.hostname
+        if instance.actual_device.worker_host:
+            data["worker"] = instance.actual_device.worker_host.hostname
+    if instance.requested_device_type:
+        data["device_type"] = instance.requested_device_type.name
+    if instance.start_time:
+        data["start_time"] = instance.start_time.isoformat()
+    if instance.end_time:
+        data["end_time"] = instance.end_time.isoformat()
+    return data
+
+
 @log_exception
 def testjob_post_handler(sender, **kwargs):
     # Called only when a Device is saved into the database
@@ -141,32 +167,19 @@ def testjob_post_handler(sender, **kwargs):
         instance._old_health = instance.health
         instance._old_state = instance.state
 
-        # Create the message
-        data = {
-            "health": instance.get_health_display(),
-            "state": instance.get_state_display(),
-            "job": instance.id,
-            "description": instance.description,
-            "priority": instance.priority,
-            "submit_time": instance.submit_time.isoformat(),
-            "submitter": str(instance.submitter),
-            "health_check": instance.health_check,
-        }
-        if instance.is_multinode:
-            data["sub_id"] = instance.sub_id
-        if instance.actual_device:
-            data["device"] = instance.actual_device.hostname
-            if instance.actual_device.worker_host:
-                data["worker"] = instance.actual_device.worker_host.hostname
-        if instance.requested_device_type:
-            data["device_type"] = instance.requested_device_type.name
-        if instance.start_time:
-            data["start_time"] = instance.start_time.isoformat()
-        if instance.end_time:
-            data["end_time"] = instance.end_time.isoformat()
-
         # Send the event
-        send_event(".testjob", str(instance.submitter), data)
+        send_event(".testjob", str(instance.submitter), testjob_event_data(instance))
+
+
+@log_exception
+def testjob_bulk_created_handler(user, jobs):
+    # Called after TestJob.bulk_from_yaml_and_user as bulk_create does not
+    # send post_save: send the events that testjob_post_handler would send.
+    if not settings.EVENT_NOTIFICATION:
+        return
+
+    for job in jobs:
+        send_event(".testjob", str(job.submitter), testjob_event_data(job))
 
 
 @log_exception
@@ -26,6 +26,9 @@ def async_send_notifications(
     except TestJob.DoesNotExist:
         return
 
+    # Avoid parsing the definition of jobs without notifications
+    if "notify" not in job.definition:
+        return
     job_def = yaml_safe_load(job.definition)
     if "notify" in job_def:
         if notification_criteria(
@@ -126,11 +126,17 @@ from lava_scheduler_app.tables_jobs import (
     QueuedJobsTable,
 )
 from lava_scheduler_app.utils import get_user_ip, is_ip_allowed
+from lava_server import metrics
 from lava_server.bread_crumbs import BreadCrumb, BreadCrumbTrail
 from lava_server.compat import djt2_paginator_class, is_ajax
 from lava_server.dbutils import YamlField, annotate_int_field_verbose
 from lava_server.files import File
-from lava_server.lavatable import LavaView
+from lava_server.lavatable import (
+    CachedCountPaginator,
+    KeysetPaginator,
+    LavaRequestConfig,
+    LavaView,
+)
 from lava_server.views import index as lava_index
 
 if TYPE_CHECKING:
@@ -138,7 +144,9 @@ if TYPE_CHECKING:
 
 
 def request_config(request, paginate):
-    return RequestConfig(request, paginate={**paginate, **djt2_paginator_class()})
+    return LavaRequestConfig(
+        request, paginate={**paginate, "paginator_class": KeysetPaginator}
+    )
 
 
 # The only functions which need to go in this file are those directly
@@ -575,7 +583,10 @@ def failure_report(request):
 def device_list(request):
     data = DeviceTableView(request, model=Device, table_class=DeviceTable)
     ptable = DeviceTable(data.get_table_data(), request=request)
-    RequestConfig(request, paginate={"per_page": ptable.length}).configure(ptable)
+    RequestConfig(
+        request,
+        paginate={"per_page": ptable.length, "paginator_class": CachedCountPaginator},
+    ).configure(ptable)
     return render(
         request,
         "lava_scheduler_app/alldevices.html",
@@ -591,7 +602,10 @@ def device_list(request):
 def active_device_list(request):
     data = ActiveDeviceView(request, model=Device, table_class=DeviceTable)
     ptable = DeviceTable(data.get_table_data(), request=request)
-    RequestConfig(request, paginate={"per_page": ptable.length}).configure(ptable)
+    RequestConfig(
+        request,
+        paginate={"per_page": ptable.length, "paginator_class": CachedCountPaginator},
+    ).configure(ptable)
     return render(
         request,
         "lava_scheduler_app/activedevices.html",
@@ -616,7 +630,10 @@ class OnlineDeviceView(DeviceTableView):
 def online_device_list(request):
     data = OnlineDeviceView(request, model=Device, table_class=DeviceTable)
     ptable = DeviceTable(data.get_table_data(), request=request)
-    RequestConfig(request, paginate={"per_page": ptable.length}).configure(ptable)
+    RequestConfig(
+        request,
+        paginate={"per_page": ptable.length, "paginator_class": CachedCountPaginator},
+    ).configure(ptable)
     return render(
         request,
         "lava_scheduler_app/onlinedevices.html",
@@ -681,7 +698,10 @@ class MyDeviceView(DeviceTableView):
 def mydevice_list(request):
     data = MyDeviceView(request, model=Device, table_class=DeviceTable)
     ptable = DeviceTable(data.get_table_data(), request=request)
-    RequestConfig(request, paginate={"per_page": ptable.length}).configure(ptable)
+    RequestConfig(
+        request,
+        paginate={"per_page": ptable.length, "paginator_class": CachedCountPaginator},
+    ).configure(ptable)
     return render(
         request,
         "lava_scheduler_app/mydevices.html",
@@ -776,7 +796,10 @@ class DTDeviceView(DeviceTableView):
 def maintenance_devices(request):
     data = MaintenanceDeviceView(request, model=Device, table_class=DeviceTable)
     ptable = DeviceTable(data.get_table_data(), request=request)
-    RequestConfig(request, paginate={"per_page": ptable.length}).configure(ptable)
+    RequestConfig(
+        request,
+        paginate={"per_page": ptable.length, "paginator_class": CachedCountPaginator},
+    ).configure(ptable)
     return render(
         request,
         "lava_scheduler_app/maintenance_devices.html",
@@ -950,7 +973,13 @@ def device_type_detail(request, pk):
         request=request,
         prefix=prefix,
     )
-    config = RequestConfig(request, paginate={"per_page": devices_ptable.length})
+    config = RequestConfig(
+        request,
+        paginate={
+            "per_page": devices_ptable.length,
+            "paginator_class": CachedCountPaginator,
+        },
+    )
     config.configure(devices_ptable)
 
     prefix = "jobs_"
@@ -1352,6 +1381,12 @@ def internal_v1_jobs_logs(request, pk):
     except ValueError:
         return JsonResponse({"error": "Invalid 'index'"}, status=400)
 
+    with metrics.LOGS_INGEST_SECONDS.time():
+        line_count = save_job_logs(job, lines, line_idx)
+    return JsonResponse({"line_count": line_count})
+
+
+def save_job_logs(job, lines, line_idx):
     # TODO: leaky logutils abstraction
     path = Path(job.output_dir)
     path.mkdir(mode=0o755, parents=True, exist_ok=True)
@@ -1364,6 +1399,7 @@ def internal_v1_jobs_logs(request, pk):
     #       of lines that where actually parsed !!
     test_cases = []
     line_count = 0
+    last_dt = None
     for line_dict, line_string in zip(yaml_safe_load(lines), lines.splitlines(True)):
         # skip lines that where already saved to disk
         duplicated = False
@@ -1426,6 +1462,7 @@ def internal_v1_jobs_logs(request, pk):
                 if count == 0:
                     test_cases.append(new_test_case)
         line_count += 1
+        last_dt = line_dict.get("dt")
 
     # Save the new test cases
     try:
@@ -1435,7 +1472,18 @@ def internal_v1_jobs_logs(request, pk):
             with contextlib.suppress(DatabaseError, ValueError):
                 tc.save()
 
-    return JsonResponse({"line_count": line_count})
+    metrics.LOGS_INGEST_LINES_TOTAL.inc(line_count)
+    metrics.LOGS_INGEST_BYTES_TOTAL.inc(len(lines.encode("utf-8")))
+    if isinstance(last_dt, str):
+        with contextlib.suppress(ValueError):
+            last_dt = datetime.datetime.fromisoformat(last_dt)
+    if isinstance(last_dt, datetime.datetime):
+        if last_dt.tzinfo is None:
+            last_dt = last_dt.replace(tzinfo=datetime.UTC)
+        metrics.LOGS_INGEST_LAG_SECONDS.observe(
+            max((timezone.now() - last_dt).total_seconds(), 0)
+        )
+    return line_count
 
 
 @require_http_methods(["GET", "POST"])
@@ -6,21 +6,263 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 from __future__ import annotations
 
-from datetime import timedelta
+import base64
+import binascii
+import hashlib
+import json
+from datetime import date, time, timedelta
 from typing import TYPE_CHECKING
 
 import django_tables2 as tables
 from django.conf import settings
-from django.db.models import Q
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist
+from django.core.paginator import Page, Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
 from django.utils import timezone
+from django_tables2.paginators import LazyPaginator
+from django_tables2.rows import BoundRows
 
 if TYPE_CHECKING:
     from collections.abc import Iterator
-    from typing import ClassVar
+    from typing import Any, ClassVar
 
     from django.http import HttpRequest
 
 
+def cached_count(queryset: QuerySet) -> int:
+    """
+    Return the number of rows of the queryset, cached for
+    TABLE_COUNT_CACHE_TIMEOUT seconds.
+
+    On PostgreSQL, when the planner expects more than
+    TABLE_COUNT_ESTIMATE_THRESHOLD rows, the estimate is returned instead of
+    running a COUNT(*) over millions of rows.
+    """
+    queryset = queryset.order_by()
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    key = "lavatable-count-%s" % (
+        hashlib.sha256(repr((queryset.db, sql, params)).encode()).hexdigest()
+    )
+    count = cache.get(key)
+    if count is None:
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = int(plan[0]["Plan"]["Plan Rows"])
+            if estimate > settings.TABLE_COUNT_ESTIMATE_THRESHOLD:
+                count = estimate
+        if count is None:
+            count = queryset.count()
+        cache.set(key, count, settings.TABLE_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator using cached_count() instead of running COUNT(*) on each
+    request.
+    """
+
+    @property
+    def count(self) -> int:
+        data = getattr(self.object_list, "data", None)
+        queryset = getattr(data, "data", None)
+        if isinstance(queryset, QuerySet):
+            return cached_count(queryset)
+        return len(self.object_list)
+
+
+class KeysetPage(Page):
+    def __init__(
+        self,
+        object_list,
+        number: int,
+        paginator: Paginator,
+        next_cursor: str | None = None,
+        previous_cursor: str | None = None,
+    ):
+        super().__init__(object_list, number, paginator)
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+
+class KeysetPaginator(LazyPaginator):
+    """
+    Paginator seeking to the rows that follow (or precede) a cursor instead of
+    skipping rows with OFFSET: deep pages are as fast as the first one.
+
+    The cursor holds the ordering values of the last (or first) row of the
+    current page. The primary key is appended to the ordering to make it
+    total. Querysets ordered by a relation, an expression or a nullable field
+    (SQL comparisons never match NULL, so seeking would skip these rows) and
+    pages requested without a cursor (except the first one) fall back to the
+    offset pagination of LazyPaginator.
+    """
+
+    has_cached_count = True
+
+    def __init__(self, object_list, per_page, cursor: str | None = None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cursor = cursor
+
+    @property
+    def count(self) -> int:
+        queryset = self._queryset()
+        if queryset is None:
+            return len(self.object_list)
+        return cached_count(queryset)
+
+    def _queryset(self) -> QuerySet | None:
+        queryset = getattr(getattr(self.object_list, "data", None), "data", None)
+        if isinstance(queryset, QuerySet):
+            return queryset
+        return None
+
+    @staticmethod
+    def _ordering(queryset: QuerySet) -> list[tuple[str, bool]] | None:
+        opts = queryset.model._meta
+        ordering = []
+        for item in queryset.query.order_by or opts.ordering:
+            if not isinstance(item, str) or item == "?":
+                return None
+            name = item.lstrip("-")
+            try:
+                field = opts.pk if name == "pk" else opts.get_field(name)
+            except FieldDoesNotExist:
+                return None
+            if field.is_relation or not field.concrete or field.null:
+                return None
+            ordering.append((field.attname, item.startswith("-")))
+            if field.unique:
+                return ordering
+        ordering.append((opts.pk.attname, ordering[-1][1] if ordering else False))
+        return ordering
+
+    @staticmethod
+    def _encode(
+        ordering: list[tuple[str, bool]], record: Any, forward: bool
+    ) -> str | None:
+        values = []
+        for name, _ in ordering:
+            value = record[name] if isinstance(record, dict) else getattr(record, name)
+            if value is None:
+                return None
+            if isinstance(value, (date, time)):
+                value = value.isoformat()
+            values.append(value)
+        data = json.dumps(
+            {"ordering": ordering, "values": values, "forward": forward}, default=str
+        )
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    @staticmethod
+    def _decode(
+        ordering: list[tuple[str, bool]], cursor: str | None
+    ) -> dict[str, Any] | None:
+        if not cursor:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, UnicodeError, ValueError):
+            return None
+        # The cursor was built for another ordering, for instance before the
+        # user sorted the table by another column.
+        if not isinstance(data, dict) or data.get("ordering") != [
+            list(item) for item in ordering
+        ]:
+            return None
+        if len(data.get("values", [])) != len(ordering):
+            return None
+        return data
+
+    @staticmethod
+    def _seek(ordering: list[tuple[str, bool]], values: list, forward: bool) -> Q:
+        # (a, b) > (x, y) is written (a > x) OR (a = x AND b > y), with the
+        # comparison reversed for descending fields.
+        q = Q()
+        for index, (name, descending) in enumerate(ordering):
+            lookup = "lt" if descending == forward else "gt"
+            q |= Q(
+                **{n: v for (n, _), v in zip(ordering[:index], values)},
+                **{f"{name}__{lookup}": values[index]},
+            )
+        return q
+
+    def page(self, number):
+        number = self.validate_number(number or 1)
+        queryset = self._queryset()
+        ordering = None if queryset is None else self._ordering(queryset)
+        if ordering is None:
+            return super().page(number)
+        # Use the same total ordering for the offset pagination
+        queryset = queryset.order_by(
+            *[("-" if descending else "") + name for name, descending in ordering]
+        )
+        self.object_list.data.data = queryset
+        cursor = self._decode(ordering, self.cursor)
+        if cursor is None and number != 1:
+            return super().page(number)
+
+        forward = True
+        if cursor is not None:
+            forward = bool(cursor["forward"])
+            queryset = queryset.filter(self._seek(ordering, cursor["values"], forward))
+            if not forward:
+                queryset = queryset.reverse()
+
+        records = list(queryset[: self.per_page + 1])
+        has_more = len(records) > self.per_page
+        records = records[: self.per_page]
+        if not forward:
+            records.reverse()
+        if not records:
+            return super().page(number)
+
+        has_next = has_more if forward else True
+        self._num_pages = number + 1 if has_next else number
+        if not has_next:
+            self._final_num_pages = number
+        # When going back to the first page, use the offset pagination
+        previous_cursor = None
+        if number > 2:
+            previous_cursor = self._encode(ordering, records[0], False)
+        next_cursor = None
+        if has_next:
+            next_cursor = self._encode(ordering, records[-1], True)
+        rows = BoundRows(
+            data=records,
+            table=self.object_list.table,
+            pinned_data=self.object_list.pinned_data,
+        )
+        return KeysetPage(list(rows), number, self, next_cursor, previous_cursor)
+
+
+class LavaRequestConfig(tables.RequestConfig):
+    """
+    RequestConfig passing the cursor of the request to the KeysetPaginator.
+    """
+
+    def configure(self, table):
+        if (
+            hasattr(self.paginate, "items")
+            and self.paginate.get("paginator_class") is KeysetPaginator
+        ):
+            self.paginate = {
+                **self.paginate,
+                "cursor": self.request.GET.get(f"{table.prefix}cursor"),
+            }
+        return super().configure(table)
+
+
 class LavaView(tables.SingleTableView):
     def __init__(self, request: HttpRequest, **kwargs):
         super().__init__(**kwargs)
@@ -112,6 +354,10 @@ class LavaTable(tables.Table):
         self.empty_text = "No data available in table"
         self.prefix = prefix
 
+    @property
+    def prefixed_cursor_field(self) -> str:
+        return f"{self.prefix}cursor"
+
     @classmethod
     def has_searches(cls) -> bool:
         return any((cls.Meta.searches, cls.Meta.queries, cls.Meta.times))
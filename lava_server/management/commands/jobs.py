@@ -8,11 +8,14 @@ from __future__ import annotations
 import contextlib
 import datetime
 import lzma
+import multiprocessing
+import os
 import pathlib
 import re
 import time
 from argparse import BooleanOptionalAction
-from shutil import chown, rmtree
+from concurrent.futures import ProcessPoolExecutor
+from shutil import chown, copyfileobj, rmtree
 
 import voluptuous
 import yaml
@@ -26,6 +29,8 @@ from django.utils import timezone
 
 from lava_common.schemas import validate
 from lava_common.yaml import yaml_safe_load
+from lava_results_app.models import TestCase
+from lava_results_app.utils import metadata_to_json
 from lava_scheduler_app.models import TestJob, extract_job_metadata
 
 
@@ -35,6 +40,91 @@ def _create_output_size(base, size):
         chown(str(base / "output.yaml.size"), "lavaserver", "lavaserver")
 
 
+def _compress_logs(output_dir, preset):
+    """
+    Compress output.yaml into output.yaml.xz without loading it in memory.
+
+    This function is called in worker processes and should not access the
+    database. Return the uncompressed size and an error message, if any.
+    """
+    base = pathlib.Path(output_dir)
+    tmp = base / "output.yaml.xz.tmp"
+    try:
+        with (
+            (base / "output.yaml").open("rb") as f_in,
+            lzma.open(str(tmp), "wb", preset=preset) as f_out,
+        ):
+            copyfileobj(f_in, f_out, 1024 * 1024)
+            size = f_in.tell()
+        # Save the uncompressed size for later use
+        _create_output_size(base, size)
+        with contextlib.suppress(PermissionError):
+            chown(str(tmp), "lavaserver", "lavaserver")
+        # Only expose complete archives and then remove the original file
+        tmp.replace(base / "output.yaml.xz")
+        (base / "output.yaml").unlink()
+    except OSError as exc:
+        with contextlib.suppress(OSError):
+            tmp.unlink()
+        return 0, str(exc)
+    return size, None
+
+
+def _chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Checkpoint:
+    """
+    Store the id of the last processed job, so that an interrupted run can be
+    resumed where it stopped.
+    """
+
+    def __init__(self, path):
+        self.path = pathlib.Path(path) if path else None
+
+    def load(self):
+        if self.path is None or not self.path.exists():
+            return None
+        try:
+            return int(self.path.read_text(encoding="utf-8"))
+        except ValueError:
+            raise CommandError(f"Invalid checkpoint file {str(self.path)!r}")
+
+    def save(self, job_id):
+        if self.path is None:
+            return
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(str(job_id), encoding="utf-8")
+        tmp.replace(self.path)
+
+
+class RateLimiter:
+    """
+    Limit the average I/O throughput to rate bytes per second.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.start = time.monotonic()
+        self.total = 0
+
+    def consume(self, amount):
+        if not self.rate:
+            return
+        self.total += amount
+        delay = self.total / self.rate - (time.monotonic() - self.start)
+        if delay > 0:
+            time.sleep(delay)
+
+
 class Command(BaseCommand):
     help = "Manage jobs"
 
@@ -135,6 +225,25 @@ class Command(BaseCommand):
             action=BooleanOptionalAction,
             default=True,
         )
+        rm.add_argument(
+            "--batch-size",
+            default=100,
+            type=int,
+            help="Number of jobs to remove per query",
+        )
+        rm.add_argument(
+            "--checkpoint",
+            default=None,
+            type=str,
+            help="File storing the progress. When the file exists, the "
+            "removal resumes after the last processed job.",
+        )
+        rm.add_argument(
+            "--io-limit",
+            default=None,
+            type=int,
+            help="Limit the size of the logs removed to this many bytes per second",
+        )
 
         valid = sub.add_parser(
             "validate",
@@ -196,6 +305,37 @@ class Command(BaseCommand):
             help="Be nice with the system by sleeping regularly",
         )
 
+        backfill_tc = sub.add_parser(
+            "backfill-testcase-metadata",
+            help="Set TestCase.metadata_json from the YAML metadata for test "
+            "cases recorded before the column was added. Test cases that "
+            "already have structured metadata are left untouched.",
+        )
+        backfill_tc.add_argument(
+            "--batch-size",
+            default=1000,
+            type=int,
+            help="Number of test cases to update per query",
+        )
+        backfill_tc.add_argument(
+            "--start-id", default=None, type=int, help="First test case id to consider"
+        )
+        backfill_tc.add_argument(
+            "--end-id", default=None, type=int, help="Last test case id to consider"
+        )
+        backfill_tc.add_argument(
+            "--dry-run",
+            default=False,
+            action="store_true",
+            help="Do not update the database, simulate the output",
+        )
+        backfill_tc.add_argument(
+            "--slow",
+            default=False,
+            action="store_true",
+            help="Be nice with the system by sleeping regularly",
+        )
+
         comp = sub.add_parser("compress", help="Compress the corresponding job logs")
         comp.add_argument(
             "--newer-than",
@@ -228,6 +368,32 @@ class Command(BaseCommand):
             action="store_true",
             help="Be nice with the system by sleeping regularly",
         )
+        comp.add_argument(
+            "--jobs",
+            default=1,
+            type=int,
+            help="Number of processes compressing the logs in parallel",
+        )
+        comp.add_argument(
+            "--preset",
+            default=lzma.PRESET_DEFAULT,
+            type=int,
+            choices=range(10),
+            help="xz compression preset, from 0 (fastest) to 9 (smallest)",
+        )
+        comp.add_argument(
+            "--checkpoint",
+            default=None,
+            type=str,
+            help="File storing the progress. When the file exists, the "
+            "compression resumes after the last processed job.",
+        )
+        comp.add_argument(
+            "--io-limit",
+            default=None,
+            type=int,
+            help="Limit the size of the logs compressed to this many bytes per second",
+        )
 
     def handle(self, *_, **options):
         """forward to the right sub-handler"""
@@ -246,6 +412,9 @@ class Command(BaseCommand):
                 options["slow"],
                 options["logs_only"],
                 options["skip_favorite"],
+                options["batch_size"],
+                options["checkpoint"],
+                options["io_limit"],
             )
         elif options["sub_command"] == "fail":
             self.handle_fail(options["job_id"])
@@ -264,6 +433,14 @@ class Command(BaseCommand):
                 options["dry_run"],
                 options["slow"],
             )
+        elif options["sub_command"] == "backfill-testcase-metadata":
+            self.handle_backfill_testcase_metadata(
+                options["batch_size"],
+                options["start_id"],
+                options["end_id"],
+                options["dry_run"],
+                options["slow"],
+            )
         elif options["sub_command"] == "compress":
             self.handle_compress(
                 options["older_than"],
@@ -271,6 +448,10 @@ class Command(BaseCommand):
                 options["submitter"],
                 options["dry_run"],
                 options["slow"],
+                options["jobs"],
+                options["preset"],
+                options["checkpoint"],
+                options["io_limit"],
             )
 
     def handle_fail(self, job_id):
@@ -320,10 +501,21 @@ class Command(BaseCommand):
             )
 
     def handle_rm(
-        self, older_than, submitter, simulate, slow, logs_only, skip_favorite: bool
+        self,
+        older_than,
+        submitter,
+        simulate,
+        slow,
+        logs_only,
+        skip_favorite: bool,
+        batch_size=100,
+        checkpoint=None,
+        io_limit=None,
     ):
         if not older_than and not submitter:
             raise CommandError("You should specify at least one filtering option")
+        if batch_size < 1:
+            raise CommandError("batch-size should be at least 1")
 
         jobs = TestJob.objects.all().order_by("id")
         jobs = jobs.filter(state=TestJob.STATE_FINISHED)
@@ -353,34 +545,55 @@ class Command(BaseCommand):
         if skip_favorite:
             jobs = jobs.exclude(testjobuser__is_favorite=True)
 
+        checkpoint = Checkpoint(checkpoint)
+        if (last_id := checkpoint.load()) is not None:
+            self.stdout.write(f"Resuming after job {last_id}")
+            jobs = jobs.filter(id__gt=last_id)
+
         self.stdout.write(f"Removing {jobs.count()} jobs:")
 
         media_root = pathlib.Path(settings.MEDIA_ROOT)
+        limiter = RateLimiter(io_limit)
         jobs = jobs.values("id", "end_time", "submit_time")
-        index = None
-        for index, job_data in enumerate(jobs.iterator(chunk_size=100)):
-            job = TestJob(**job_data)
-            self.stdout.write(f"* {job.id} ({job.end_time}): {job.output_dir}")
-            try:
-                if not simulate:
-                    rmtree(job.output_dir)
-                    # delete parents directories (if empty)
-                    with contextlib.suppress(OSError, ValueError):
-                        for parent in pathlib.Path(job.output_dir).parents:
-                            parent.relative_to(media_root)
-                            if parent == media_root:
-                                break
-                            parent.rmdir()
-                            self.stdout.write(f"  -> rmdir {parent}")
-            except OSError as exc:
-                self.stderr.write(f"  -> Unable to remove the directory: {exc}")
-
-            if not simulate and not logs_only:
-                job.delete()
-
-            if slow and index and index % 100 == 99:
-                self.stdout.write("sleeping 2s...")
-                time.sleep(2)
+        index = 0
+        for chunk in _chunked(jobs.iterator(chunk_size=batch_size), batch_size):
+            for job_data in chunk:
+                job = TestJob(**job_data)
+                self.stdout.write(f"* {job.id} ({job.end_time}): {job.output_dir}")
+                try:
+                    if not simulate:
+                        limiter.consume(self._logs_size(job.output_dir))
+                        rmtree(job.output_dir)
+                        # delete parents directories (if empty)
+                        with contextlib.suppress(OSError, ValueError):
+                            for parent in pathlib.Path(job.output_dir).parents:
+                                parent.relative_to(media_root)
+                                if parent == media_root:
+                                    break
+                                parent.rmdir()
+                                self.stdout.write(f"  -> rmdir {parent}")
+                except OSError as exc:
+                    self.stderr.write(f"  -> Unable to remove the directory: {exc}")
+
+                if slow and index and index % 100 == 99:
+                    self.stdout.write("sleeping 2s...")
+                    time.sleep(2)
+                index += 1
+
+            # Remove the rows, and the cascading results, one chunk at a time
+            if not simulate:
+                if not logs_only:
+                    TestJob.objects.filter(
+                        id__in=[job_data["id"] for job_data in chunk]
+                    ).delete()
+                checkpoint.save(chunk[-1]["id"])
+
+    def _logs_size(self, output_dir):
+        size = 0
+        for name in ("output.yaml", "output.yaml.xz"):
+            with contextlib.suppress(OSError):
+                size += os.stat(os.path.join(output_dir, name)).st_size
+        return size
 
     def handle_backfill_metadata(self, batch_size, start_id, end_id, simulate, slow):
         if batch_size < 1:
@@ -412,18 +625,62 @@ class Command(BaseCommand):
             batch.append(job)
             updated += 1
             if len(batch) >= batch_size:
-                self._flush_metadata(batch, simulate, slow)
+                self._flush_metadata(TestJob, "metadata", batch, simulate, slow)
                 batch = []
 
-        self._flush_metadata(batch, simulate, slow)
+        self._flush_metadata(TestJob, "metadata", batch, simulate, slow)
         self.stdout.write(f"-> {scanned} jobs scanned, {updated} updated")
 
-    def _flush_metadata(self, jobs, simulate, slow):
-        if not jobs:
+    def handle_backfill_testcase_metadata(
+        self, batch_size, start_id, end_id, simulate, slow
+    ):
+        if batch_size < 1:
+            raise CommandError("batch-size should be at least 1")
+
+        testcases = (
+            TestCase.objects.filter(metadata_json__isnull=True)
+            .exclude(metadata__isnull=True)
+            .exclude(metadata="")
+        )
+        if start_id is not None:
+            testcases = testcases.filter(id__gte=start_id)
+        if end_id is not None:
+            testcases = testcases.filter(id__lte=end_id)
+        testcases = testcases.only("id", "metadata").order_by("id")
+
+        self.stdout.write("Backfilling test case metadata:")
+        batch = []
+        scanned = updated = 0
+        for scanned, testcase in enumerate(
+            testcases.iterator(chunk_size=batch_size), start=1
+        ):
+            try:
+                data = yaml_safe_load(testcase.metadata)
+            except yaml.YAMLError as exc:
+                self.stderr.write(
+                    f"* {testcase.id}: unable to parse the metadata: {exc}"
+                )
+                continue
+            metadata = metadata_to_json(data)
+            if metadata is None:
+                continue
+
+            testcase.metadata_json = metadata
+            batch.append(testcase)
+            updated += 1
+            if len(batch) >= batch_size:
+                self._flush_metadata(TestCase, "metadata_json", batch, simulate, slow)
+                batch = []
+
+        self._flush_metadata(TestCase, "metadata_json", batch, simulate, slow)
+        self.stdout.write(f"-> {scanned} test cases scanned, {updated} updated")
+
+    def _flush_metadata(self, model, field, objects, simulate, slow):
+        if not objects:
             return
-        self.stdout.write(f"* {jobs[0].id} .. {jobs[-1].id}")
+        self.stdout.write(f"* {objects[0].id} .. {objects[-1].id}")
         if not simulate:
-            TestJob.objects.bulk_update(jobs, ["metadata"])
+            model.objects.bulk_update(objects, [field])
         if slow:
             self.stdout.write("sleeping 2s...")
             time.sleep(2)
@@ -484,9 +741,22 @@ class Command(BaseCommand):
                 mail_admins("Invalid jobs", body)
             raise CommandError("Some jobs are invalid")
 
-    def handle_compress(self, older_than, newer_than, submitter, simulate, slow):
+    def handle_compress(
+        self,
+        older_than,
+        newer_than,
+        submitter,
+        simulate,
+        slow,
+        processes=1,
+        preset=lzma.PRESET_DEFAULT,
+        checkpoint=None,
+        io_limit=None,
+    ):
         if not older_than and not newer_than and not submitter:
             raise CommandError("You should specify at least one filtering option")
+        if processes < 1:
+            raise CommandError("jobs should be at least 1")
 
         jobs = TestJob.objects.all().order_by("id").filter(state=TestJob.STATE_FINISHED)
         if older_than is not None:
@@ -520,49 +790,78 @@ class Command(BaseCommand):
                 raise CommandError(f"Unable to find submitter {submitter!r}")
             jobs = jobs.filter(submitter=user)
 
+        checkpoint = Checkpoint(checkpoint)
+        if (last_id := checkpoint.load()) is not None:
+            self.stdout.write(f"Resuming after job {last_id}")
+            jobs = jobs.filter(id__gt=last_id)
+
         # Only job.id, job.end_time, job.output_dir are used
         # job.output_dir uses job.submit_time
         jobs = jobs.values("pk", "end_time", "submit_time")
-        # Loop on all jobs
-        index = -1
-        for index, job_data in enumerate(jobs.iterator(chunk_size=100)):
-            job = TestJob(**job_data)
-            base = pathlib.Path(job.output_dir)
-            if not (base / "output.yaml").exists():
-                if (base / "output.yaml.size").exists():
-                    self.stdout.write(
-                        f"* {job.id} ({job.end_time}): {job.output_dir} [SKIP]"
-                    )
-                elif (base / "output.yaml.xz").exists():
-                    self.stdout.write(
-                        f"* {job.id} ({job.end_time}): {job.output_dir} "
-                        "[create size file]"
-                    )
-                    if not simulate:
-                        with contextlib.suppress(FileNotFoundError):
-                            with lzma.open(str(base / "output.yaml.xz"), "rb") as f_in:
-                                _create_output_size(base, f_in.seek(0, 2))
-                continue
 
-            self.stdout.write(f"* {job.id} ({job.end_time}): {job.output_dir}")
-            try:
-                if not simulate:
-                    # Read the logs
-                    data = (base / "output.yaml").read_bytes()
-                    # Save the uncompressed size for later use
-                    _create_output_size(base, len(data))
-                    # Compresse the logs
-                    with lzma.open(str(base / "output.yaml.xz"), "wb") as f_out:
-                        f_out.write(data)
-                    with contextlib.suppress(PermissionError):
-                        chown(str(base / "output.yaml.xz"), "lavaserver", "lavaserver")
-                    # Remove the original file
-                    (base / "output.yaml").unlink()
-            except OSError as exc:
-                self.stderr.write(f"  -> Unable to compress the logs: {exc}")
-
-            if slow and index % 100 == 99:
-                self.stdout.write("sleeping 2s...")
-                time.sleep(2)
+        executor = None
+        mapper = map
+        if processes > 1 and not simulate:
+            # The workers are forked: Django is already set up and they never
+            # use the inherited database connection. With the forkserver or
+            # spawn start methods (the default from Python 3.14), the workers
+            # would import this module before Django is ready.
+            executor = ProcessPoolExecutor(
+                max_workers=processes, mp_context=multiprocessing.get_context("fork")
+            )
+            mapper = executor.map
+
+        limiter = RateLimiter(io_limit)
+        index = -1
+        try:
+            for chunk in _chunked(jobs.iterator(chunk_size=100), 100):
+                to_compress = []
+                for job_data in chunk:
+                    index += 1
+                    job = TestJob(**job_data)
+                    base = pathlib.Path(job.output_dir)
+                    if not (base / "output.yaml").exists():
+                        if (base / "output.yaml.size").exists():
+                            self.stdout.write(
+                                f"* {job.id} ({job.end_time}): {job.output_dir} [SKIP]"
+                            )
+                        elif (base / "output.yaml.xz").exists():
+                            self.stdout.write(
+                                f"* {job.id} ({job.end_time}): {job.output_dir} "
+                                "[create size file]"
+                            )
+                            if not simulate:
+                                with contextlib.suppress(FileNotFoundError):
+                                    with lzma.open(
+                                        str(base / "output.yaml.xz"), "rb"
+                                    ) as f_in:
+                                        _create_output_size(base, f_in.seek(0, 2))
+                        continue
+
+                    self.stdout.write(f"* {job.id} ({job.end_time}): {job.output_dir}")
+                    to_compress.append(job)
+
+                    if slow and index % 100 == 99:
+                        self.stdout.write("sleeping 2s...")
+                        time.sleep(2)
+
+                if simulate:
+                    continue
+
+                results = mapper(
+                    _compress_logs,
+                    [job.output_dir for job in to_compress],
+                    [preset] * len(to_compress),
+                )
+                for job, (size, error) in zip(to_compress, results):
+                    if error is not None:
+                        self.stderr.write(
+                            f"  -> Unable to compress the logs of {job.id}: {error}"
+                        )
+                    limiter.consume(size)
+                checkpoint.save(chunk[-1]["pk"])
+        finally:
+            if executor is not None:
+                executor.shutdown()
 
         self.stdout.write(f"Compressed {index + 1} jobs.")
@@ -9,6 +9,7 @@ import base64
 import contextlib
 import json
 import signal
+import time
 import weakref
 from dataclasses import dataclass
 from typing import Any
@@ -25,6 +26,7 @@ from django.utils.crypto import constant_time_compare
 
 from lava_common.version import __version__
 from lava_scheduler_app.models import Device, TestJob, Worker
+from lava_server import metrics
 from lava_server.cmdutils import LAVADaemonCommand
 from linaro_django_xmlrpc.models import AuthToken
 
@@ -99,6 +101,7 @@ async def zmq_proxy(app):
 
         async def forward_event(msg):
             logger.debug("[PROXY] Forwarding: %s", msg)
+            start = time.monotonic()
             data = [s.decode("utf-8") for s in msg]
             futures = [
                 pub.send_multipart(msg),
@@ -177,6 +180,11 @@ async def zmq_proxy(app):
                             futures.append(ws.socket.send_json(data))
 
             await asyncio.gather(*futures)
+            kind = topic.rsplit(".", 1)[-1]
+            metrics.PUBLISHER_EVENTS_TOTAL.inc(topic=kind)
+            metrics.PUBLISHER_FANOUT_SECONDS.observe(
+                time.monotonic() - start, topic=kind
+            )
 
         exit = False
         try:
@@ -242,6 +250,11 @@ async def zmq_proxy(app):
             interval = interval * 2
 
 
+def update_websockets_metric(app, kind):
+    count = sum(1 for ws in set(app["websockets"]) if ws.kind == kind)
+    metrics.PUBLISHER_WEBSOCKETS.set(count, kind=kind)
+
+
 async def websocket_handler(request):
     logger = request.app["logger"]
 
@@ -298,6 +311,7 @@ async def websocket_handler(request):
 
     obj = Websocket(kind=kind, name=name, socket=ws)
     request.app["websockets"].add(obj)
+    update_websockets_metric(request.app, kind)
 
     try:
         async for msg in ws:
@@ -305,6 +319,7 @@ async def websocket_handler(request):
                 logger.exception(ws.exception())
     finally:
         request.app["websockets"].discard(obj)
+        update_websockets_metric(request.app, kind)
 
     if obj.name:
         logger.info(
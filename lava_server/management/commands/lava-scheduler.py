@@ -6,6 +6,7 @@
 
 import contextlib
 import datetime
+import math
 import signal
 import time
 from json import JSONDecodeError
@@ -18,8 +19,10 @@ from django.db.utils import InterfaceError, OperationalError
 from django.utils import timezone
 
 from lava_common.version import __version__
+from lava_scheduler_app.dbutils import lab_state
 from lava_scheduler_app.models import Worker
 from lava_scheduler_app.scheduler import LOGGER_NAME, schedule
+from lava_server import metrics
 from lava_server.cmdutils import LAVADaemonCommand
 
 #############
@@ -145,7 +148,15 @@ class Command(LAVADaemonCommand):
 
         return should_schedule
 
+    def update_lab_state(self) -> None:
+        # Saved for the prometheus view, refreshed before it gets too old
+        if time.monotonic() - self.lab_state_update < metrics.LAB_STATE_MAX_AGE / 2:
+            return
+        metrics.set_lab_state(lab_state())
+        self.lab_state_update = time.monotonic()
+
     def main_loop(self) -> None:
+        self.lab_state_update = -math.inf
         while True:
             begin = time.monotonic()
             try:
@@ -154,7 +165,10 @@ class Command(LAVADaemonCommand):
                     workers = self.check_workers()
 
                 # Schedule jobs
-                schedule(workers)
+                with metrics.SCHEDULER_PASS_SECONDS.time():
+                    schedule(workers)
+
+                self.update_lab_state()
 
                 # Wait for events
                 should_schedule = False
@@ -0,0 +1,334 @@
+# Copyright (C) 2026 Linaro Limited
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+"""
+Internal metrics of the lava-server, lava-scheduler and lava-publisher hot
+paths.
+
+Each process records the observations in memory. Every
+METRICS_FLUSH_INTERVAL seconds, a background thread adds the increments to the
+totals kept in the database, so the totals of every process can be exported
+by the prometheus view of any lava-server process.
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from typing import Any
+
+LOGGER = logging.getLogger("lava-server")
+
+# Upper bounds of the histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Name of the row holding the lab state
+LAB_STATE = "lab_state"
+# Older lab states are computed again by the prometheus view
+LAB_STATE_MAX_AGE = 60
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.families: dict[str, Family] = {}
+        # Increments not yet added to the database
+        # {(name, labels): (kind, value)}
+        self.pending: dict[tuple[str, str], tuple[str, dict[str, Any]]] = {}
+        self.pid = os.getpid()
+        self.thread: threading.Thread | None = None
+
+    def register(self, family: Family) -> None:
+        self.families[family.name] = family
+
+    def add(self, name: str, kind: str, labels: str, value: dict[str, Any]) -> None:
+        with self.lock:
+            if self.pid != os.getpid():
+                # Forked: the increments belong to the parent
+                self.pid = os.getpid()
+                self.pending = {}
+                self.thread = None
+            key = (name, labels)
+            if key in self.pending:
+                value = merge(kind, self.pending[key][1], value)
+            self.pending[key] = (kind, value)
+            if self.thread is None and settings.METRICS_FLUSH_INTERVAL:
+                self.thread = threading.Thread(
+                    target=self.run,
+                    args=(settings.METRICS_FLUSH_INTERVAL,),
+                    name="metrics",
+                    daemon=True,
+                )
+                self.thread.start()
+                atexit.register(self.flush)
+
+    def run(self, interval: float) -> None:
+        while True:
+            time.sleep(interval)
+            self.flush()
+            # Do not keep a database connection for this thread
+            connection.close()
+
+    def flush(self) -> None:
+        """
+        Add the pending increments to the totals
+        """
+        from lava_scheduler_app.models import Metric
+
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        if not pending:
+            return
+        try:
+            with transaction.atomic():
+                # Lock the rows in a consistent order
+                for (name, labels), (kind, value) in sorted(pending.items()):
+                    metric, created = Metric.objects.select_for_update().get_or_create(
+                        name=name,
+                        labels=labels,
+                        defaults={"kind": kind, "value": value},
+                    )
+                    if not created:
+                        metric.kind = kind
+                        metric.value = merge(kind, metric.value, value)
+                        metric.save(update_fields=["kind", "value", "updated"])
+        except DatabaseError as exc:
+            LOGGER.warning("Unable to save the metrics: %s", exc)
+            # Keep the increments for the next flush
+            with self.lock:
+                for key, (kind, value) in pending.items():
+                    if key in self.pending:
+                        value = merge(kind, value, self.pending[key][1])
+                    self.pending[key] = (kind, value)
+
+    def collect(self) -> dict[tuple[str, str], tuple[str, dict[str, Any]]]:
+        """
+        Return the totals, including the pending increments of this process
+        """
+        from lava_scheduler_app.models import Metric
+
+        totals = {
+            (m.name, m.labels): (m.kind, m.value)
+            for m in Metric.objects.exclude(name=LAB_STATE)
+        }
+        with self.lock:
+            for key, (kind, value) in self.pending.items():
+                if key in totals:
+                    value = merge(kind, totals[key][1], value)
+                totals[key] = (kind, value)
+        return totals
+
+    def render(self) -> str:
+        """
+        Return the totals in the Prometheus text format
+        """
+        samples: dict[str, list[tuple[dict[str, str], dict[str, Any]]]] = {}
+        kinds = {}
+        for (name, labels), (kind, value) in sorted(self.collect().items()):
+            samples.setdefault(name, []).append((json.loads(labels), value))
+            kinds[name] = kind
+
+        data = ""
+        for name, values in samples.items():
+            family = self.families.get(name)
+            if family is not None:
+                data += f"# HELP {name} {family.documentation}\n"
+            data += f"# TYPE {name} {kinds[name]}\n"
+            for labels, value in values:
+                if kinds[name] == "histogram":
+                    buckets = self.families[name].buckets if family else ()
+                    for bound, count in zip(buckets, value["buckets"]):
+                        bucket_labels = {**labels, "le": format_value(bound)}
+                        data += f"{name}_bucket{format_labels(bucket_labels)} {count}\n"
+                    inf_labels = {**labels, "le": "+Inf"}
+                    data += (
+                        f"{name}_bucket{format_labels(inf_labels)} {value['count']}\n"
+                    )
+                    data += f"{name}_sum{format_labels(labels)} {format_value(value['sum'])}\n"
+                    data += f"{name}_count{format_labels(labels)} {value['count']}\n"
+                else:
+                    data += f"{name}{format_labels(labels)} {format_value(value['value'])}\n"
+        return data
+
+
+REGISTRY = Registry()
+
+
+def merge(kind: str, total: dict[str, Any], value: dict[str, Any]) -> dict[str, Any]:
+    if kind == "counter":
+        return {"value": total.get("value", 0) + value["value"]}
+    if kind == "histogram":
+        if len(total.get("buckets", [])) != len(value["buckets"]):
+            # The buckets were changed: start again
+            return value
+        return {
+            "buckets": [a + b for a, b in zip(total["buckets"], value["buckets"])],
+            "sum": total["sum"] + value["sum"],
+            "count": total["count"] + value["count"],
+        }
+    # Gauges keep the last value
+    return value
+
+
+def format_value(value: float) -> str:
+    if isinstance(value, float) and math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    items = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+        items.append(f'{key}="{value}"')
+    return "{" + ",".join(items) + "}"
+
+
+class Family:
+    kind = ""
+
+    def __init__(
+        self, name: str, documentation: str, registry: Registry = REGISTRY
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.registry = registry
+        registry.register(self)
+
+    def add(self, value: dict[str, Any], labels: dict[str, str]) -> None:
+        self.registry.add(
+            self.name, self.kind, json.dumps(labels, sort_keys=True), value
+        )
+
+
+class Counter(Family):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        self.add({"value": amount}, labels)
+
+
+class Gauge(Family):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        self.add({"value": value}, labels)
+
+
+class Histogram(Family):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        registry: Registry = REGISTRY,
+    ) -> None:
+        super().__init__(name, documentation, registry)
+        self.buckets = buckets
+
+    def observe(self, value: float, **labels: str) -> None:
+        self.add(
+            {
+                "buckets": [int(value <= bound) for bound in self.buckets],
+                "sum": value,
+                "count": 1,
+            },
+            labels,
+        )
+
+    @contextlib.contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - start, **labels)
+
+
+def set_lab_state(state: dict[str, Any]) -> None:
+    """
+    Save the lab state computed by lava-scheduler
+    """
+    from lava_scheduler_app.models import Metric
+
+    Metric.objects.update_or_create(
+        name=LAB_STATE, labels="{}", defaults={"kind": "state", "value": state}
+    )
+
+
+def get_lab_state(max_age: float) -> dict[str, Any] | None:
+    """
+    Return the lab state if updated in the last max_age seconds
+    """
+    from lava_scheduler_app.models import Metric
+
+    with contextlib.suppress(Metric.DoesNotExist):
+        metric = Metric.objects.get(name=LAB_STATE, labels="{}")
+        if (timezone.now() - metric.updated).total_seconds() <= max_age:
+            return metric.value
+    return None
+
+
+###########
+# Metrics #
+###########
+
+SCHEDULER_PASS_SECONDS = Histogram(
+    "lava_scheduler_pass_seconds", "Duration of the scheduler passes"
+)
+SCHEDULER_PHASE_SECONDS = Histogram(
+    "lava_scheduler_phase_seconds", "Duration of each phase of the scheduler passes"
+)
+SCHEDULER_JOBS_TOTAL = Counter(
+    "lava_scheduler_jobs_total", "Number of jobs and health checks scheduled"
+)
+SCHEDULER_QUEUE_SECONDS = Histogram(
+    "lava_scheduler_queue_seconds",
+    "Time spent by the jobs in the queue before being scheduled",
+    buckets=(1, 10, 60, 300, 900, 1800, 3600, 4 * 3600, 12 * 3600, 24 * 3600),
+)
+
+LOGS_INGEST_SECONDS = Histogram(
+    "lava_logs_ingest_seconds", "Duration of the log ingest requests"
+)
+LOGS_INGEST_LAG_SECONDS = Histogram(
+    "lava_logs_ingest_lag_seconds",
+    "Delay between the dispatcher logging the last line of a batch and the "
+    "server saving it",
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+LOGS_INGEST_LINES_TOTAL = Counter(
+    "lava_logs_ingest_lines_total", "Number of log lines received"
+)
+LOGS_INGEST_BYTES_TOTAL = Counter(
+    "lava_logs_ingest_bytes_total", "Size of the log lines received"
+)
+
+PUBLISHER_EVENTS_TOTAL = Counter(
+    "lava_publisher_events_total", "Number of events forwarded by lava-publisher"
+)
+PUBLISHER_FANOUT_SECONDS = Histogram(
+    "lava_publisher_fanout_seconds",
+    "Time to forward an event to the subscribers and websockets",
+)
+PUBLISHER_WEBSOCKETS = Gauge(
+    "lava_publisher_websockets", "Number of websockets connected to lava-publisher"
+)
@@ -183,6 +183,10 @@ MOUNT_POINT = ""
 # resolved.
 TESTCASE_COUNT_LIMIT = 10000
 
+# Interval, in seconds, between two saves of the internal metrics of each
+# process. Set to 0 to only keep the metrics in memory.
+METRICS_FLUSH_INTERVAL = 10
+
 # Branding support
 BRANDING_ALT = "LAVA Software logo"
 BRANDING_ICON = "lava_server/images/logo.png"
@@ -241,6 +245,13 @@ ALLOW_ADMIN_DELETE = True
 # Default callback http timeout in seconds
 CALLBACK_TIMEOUT = 5
 
+# Number of retries for callbacks failing with a connection error or a 429,
+# 502, 503 or 504 status code
+CALLBACK_RETRIES = 3
+
+# Maximum number of callbacks of a notification sent concurrently
+CALLBACK_WORKERS = 8
+
 # Default statement timeout in milliseconds
 STATEMENT_TIMEOUT = 30000
 
@@ -253,6 +264,13 @@ HEALTH_FREQUENCY_HOURS = 24
 # Default length value for all tables
 DEFAULT_TABLE_LENGTH = 25
 
+# Number of seconds the total number of rows of a table is cached for
+TABLE_COUNT_CACHE_TIMEOUT = 300
+
+# Above this number of rows, as estimated by the PostgreSQL planner, tables
+# display the estimate instead of running COUNT(*)
+TABLE_COUNT_ESTIMATE_THRESHOLD = 100000
+
 # Extra context variables when validating the job definition schema
 EXTRA_CONTEXT_VARIABLES = []
 
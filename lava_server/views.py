@@ -11,7 +11,6 @@ from django import forms
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.core.exceptions import PermissionDenied
-from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Value
 from django.http import (
     HttpResponse,
     HttpResponseBadRequest,
@@ -27,8 +26,9 @@ from django.utils.translation import gettext_lazy
 from django.views.decorators.csrf import requires_csrf_token
 from django.views.decorators.http import require_POST
 
-from lava_scheduler_app.dbutils import device_summary, device_type_summary
-from lava_scheduler_app.models import ExtendedUser, RemoteArtifactsAuth, TestJob, Worker
+from lava_scheduler_app.dbutils import lab_state
+from lava_scheduler_app.models import DeviceType, ExtendedUser, RemoteArtifactsAuth
+from lava_server import metrics
 from lava_server.bread_crumbs import BreadCrumb, BreadCrumbTrail
 from linaro_django_xmlrpc.models import AuthToken
 
@@ -76,17 +76,29 @@ def prometheus(request):
             return HttpResponseBadRequest("Unknown user")
         request.user = user
 
-    data = ""
+    # The lab state is maintained by lava-scheduler
+    state = metrics.get_lab_state(metrics.LAB_STATE_MAX_AGE)
+    if state is None:
+        state = lab_state(request.user)
+    else:
+        visible = set(
+            DeviceType.objects.visible_by_user(request.user).values_list(
+                "name", flat=True
+            )
+        )
+        state["device_types"] = [
+            dt for dt in state["device_types"] if dt["device_type"] in visible
+        ]
 
-    (device_stats, running_jobs_count) = device_summary()
-    data += f"""# TYPE devices_online counter
+    device_stats = state["devices"]
+    data = f"""# TYPE devices_online counter
 devices_online {device_stats["num_online"]}
 # TYPE devices_not_retired counter
 devices_not_retired {device_stats["num_not_retired"]}
 # TYPE devices_running counter
 devices_running {device_stats["active_devices"]}
 # TYPE jobs_running counter
-jobs_running {running_jobs_count}
+jobs_running {state["running_jobs"]}
 # TYPE devices_health_check_total counter
 devices_health_check_total {device_stats["health_checks_total"]}
 # TYPE devices_health_check_complete counter
@@ -94,35 +106,16 @@ devices_health_check_complete {device_stats["health_checks_complete"]}
 """
 
     # Device-types
-    dts = device_type_summary(request.user).annotate(
-        queued_jobs=Subquery(
-            TestJob.objects.filter(
-                Q(state=TestJob.STATE_SUBMITTED),
-                Q(requested_device_type=OuterRef("device_type")),
-            )
-            .annotate(dummy_group_by=Value(1))  # Disable GROUP BY
-            .values("dummy_group_by")
-            .annotate(queued_jobs=Count("*"))
-            .values("queued_jobs"),
-            output_field=IntegerField(),
-        ),
-    )
     data += "# TYPE device_type counter"
-    for dt in dts:
+    for dt in state["device_types"]:
         data += f"""
 device_type{{name="{dt["device_type"]}",state="idle"}} {dt["idle"]}
 device_type{{name="{dt["device_type"]}",state="busy"}} {dt["busy"]}
 device_type{{name="{dt["device_type"]}",state="offline"}} {dt["offline"]}
 device_type{{name="{dt["device_type"]}",state="maintenance"}} {dt["maintenance"]}
-device_type{{name="{dt["device_type"]}",state="queue"}} {dt["queued_jobs"] or 0}"""
-
-    worker_stats = Worker.objects.exclude(health=Worker.HEALTH_RETIRED).aggregate(
-        num_not_retired=Count("pk"),
-        num_online=Count("pk", filter=Q(state=Worker.STATE_ONLINE)),
-        num_offline=Count("pk", filter=Q(state=Worker.STATE_OFFLINE)),
-        num_maintenance=Count("pk", filter=Q(health=Worker.HEALTH_MAINTENANCE)),
-        num_active=Count("pk", filter=Q(health=Worker.HEALTH_ACTIVE)),
-    )
+device_type{{name="{dt["device_type"]}",state="queue"}} {dt["queued_jobs"]}"""
+
+    worker_stats = state["workers"]
     data += f"""
 # TYPE workers_not_retired counter
 workers_not_retired {worker_stats["num_not_retired"]}
@@ -136,6 +129,9 @@ workers_maintenance {worker_stats["num_maintenance"]}
 workers_active {worker_stats["num_active"]}
 """
 
+    # Latency and throughput of lava-server, lava-scheduler and lava-publisher
+    data += metrics.REGISTRY.render()
+
     return HttpResponse(data, content_type="text/plain; version=0.0.4")
 
 
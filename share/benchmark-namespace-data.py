@@ -0,0 +1,150 @@
+#!/usr/bin/python3
+#
+# Copyright (C) 2026 Linaro Limited
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import argparse
+import copy
+import json
+import pathlib
+import sys
+import time
+
+from jinja2 import FileSystemLoader
+
+from lava_common.jinja import create_device_templates_env
+from lava_common.yaml import yaml_safe_dump, yaml_safe_load
+from lava_dispatcher import action
+from lava_dispatcher.device import NewDevice
+from lava_dispatcher.parser import JobParser
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+DEFAULT_DEVICE = ROOT / "tests" / "lava_scheduler_app" / "devices" / "kvm01.jinja2"
+DEFAULT_JOB = ROOT / "tests" / "lava_dispatcher" / "sample_jobs" / "kvm.yaml"
+TEMPLATES = [
+    ROOT / "etc" / "dispatcher-config" / "device-types",
+    ROOT / "tests" / "lava_scheduler_app" / "devices",
+]
+
+
+def create_job(device, definition):
+    job_dict = yaml_safe_load(definition.read_text(encoding="utf-8"))
+    env = create_device_templates_env(loader=FileSystemLoader(TEMPLATES))
+    template = env.from_string(device.read_text(encoding="utf-8"))
+    device_dict = yaml_safe_load(template.render(**job_dict.get("context", {})))
+    return JobParser().parse(
+        yaml_safe_dump(job_dict), NewDevice(device_dict), 0, None, None
+    )
+
+
+def all_actions(pipeline):
+    for act in pipeline.actions:
+        yield act
+        if act.pipeline is not None:
+            yield from all_actions(act.pipeline)
+
+
+def fill_namespace_data(act):
+    # Mimic the data set by the deploy actions of a multi images job
+    for index in range(10):
+        image = "image-%d" % index
+        url = "https://example.com/builds/%d/%s.img.xz" % (index, image)
+        act.set_namespace_data("download-action", image, "file", url[:-3])
+        act.set_namespace_data("download-action", image, "url", url)
+        act.set_namespace_data(
+            "download-action",
+            image,
+            "params",
+            {"url": url, "compression": "xz", "sha256sum": "0" * 64},
+        )
+    act.set_namespace_data(
+        "test",
+        "results",
+        "overlays",
+        [{"name": "smoke-%d" % i, "path": "lava/%d" % i} for i in range(20)],
+    )
+
+
+def lookups(job, actions):
+    calls = []
+    for act in actions:
+        namespace = act.parameters["namespace"]
+        for name, labels in job.context.get(namespace, {}).items():
+            for label, keys in labels.items():
+                for key in keys:
+                    calls.append((act, name, label, key))
+    return calls
+
+
+def run(calls, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for act, name, label, key in calls:
+            act.get_namespace_data(name, label, key)
+    elapsed = time.perf_counter() - start
+    count = len(calls) * rounds
+    return {"lookups": count, "seconds": elapsed, "per_second": count / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the namespace data lookups of a job pipeline"
+    )
+    parser.add_argument(
+        "--device",
+        type=pathlib.Path,
+        default=DEFAULT_DEVICE,
+        help="device dictionary template (default to kvm01)",
+    )
+    parser.add_argument(
+        "--job",
+        type=pathlib.Path,
+        default=DEFAULT_JOB,
+        help="job definition (default to the kvm sample job)",
+    )
+    parser.add_argument(
+        "--rounds", type=int, default=20, help="look up every value n times"
+    )
+    parser.add_argument(
+        "--json", action="store_true", default=False, help="print results as json"
+    )
+    options = parser.parse_args()
+
+    job = create_job(options.device, options.job)
+    actions = [
+        act for act in all_actions(job.pipeline) if act.parameters.get("namespace")
+    ]
+    if actions:
+        fill_namespace_data(actions[0])
+    calls = lookups(job, actions)
+    if not calls:
+        print("No namespace data found")
+        return 1
+
+    copy_namespace_value = action._copy_namespace_value
+    action._copy_namespace_value = copy.deepcopy
+    try:
+        deepcopy = run(calls, options.rounds)
+    finally:
+        action._copy_namespace_value = copy_namespace_value
+    results = {"deepcopy": deepcopy, "current": run(calls, options.rounds)}
+
+    if options.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print("%d actions" % len(actions))
+        for name, result in results.items():
+            print(
+                "%-8s %8d lookups in %7.3fs: %10.1f/s"
+                % (name, result["lookups"], result["seconds"], result["per_second"])
+            )
+        print(
+            "speedup  %.1fx"
+            % (results["current"]["per_second"] / results["deepcopy"]["per_second"])
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+#
+# Copyright (C) 2026 Linaro Limited
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import argparse
+import json
+import pathlib
+import sys
+import time
+
+import voluptuous as v
+import yaml
+
+from lava_common import schemas
+
+DEFAULT_CORPUS = (
+    pathlib.Path(__file__).resolve().parent.parent
+    / "tests"
+    / "lava_dispatcher"
+    / "sample_jobs"
+)
+
+
+def load_corpus(paths):
+    definitions = []
+    for path in paths:
+        files = sorted(path.rglob("*.yaml")) if path.is_dir() else [path]
+        for f in files:
+            try:
+                data = yaml.safe_load(f.read_text(encoding="utf-8"))
+            except yaml.YAMLError:
+                continue
+            if not isinstance(data, dict) or "actions" not in data:
+                continue
+            # Only keep the valid definitions: invalid ones stop at the first
+            # error and would skew the measure.
+            try:
+                schemas.validate(data, strict=False)
+            except v.Invalid:
+                continue
+            definitions.append(data)
+    return definitions
+
+
+def clear_caches():
+    schemas.job_schema.cache_clear()
+    schemas.action_schema.cache_clear()
+
+
+def run(definitions, rounds, cold):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for data in definitions:
+            if cold:
+                # Mimic the previous behavior: build every schema for each
+                # validation.
+                clear_caches()
+            schemas.validate(data, strict=False)
+    elapsed = time.perf_counter() - start
+    count = len(definitions) * rounds
+    return {"definitions": count, "seconds": elapsed, "per_second": count / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the job schema validation throughput"
+    )
+    parser.add_argument(
+        "paths",
+        type=pathlib.Path,
+        nargs="*",
+        default=[DEFAULT_CORPUS],
+        help="job definitions or directories (default to the sample jobs)",
+    )
+    parser.add_argument(
+        "--rounds", type=int, default=10, help="validate the corpus n times"
+    )
+    parser.add_argument(
+        "--json", action="store_true", default=False, help="print results as json"
+    )
+    options = parser.parse_args()
+
+    definitions = load_corpus(options.paths)
+    if not definitions:
+        print("No valid job definitions found")
+        return 1
+
+    results = {
+        "cold": run(definitions, options.rounds, cold=True),
+        "memoized": run(definitions, options.rounds, cold=False),
+    }
+    if options.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for name, result in results.items():
+            print(
+                "%-9s %6d definitions in %7.3fs: %8.1f/s"
+                % (name, result["definitions"], result["seconds"], result["per_second"])
+            )
+        print(
+            "speedup   %.1fx"
+            % (results["memoized"]["per_second"] / results["cold"]["per_second"])
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
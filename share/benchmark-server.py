@@ -0,0 +1,480 @@
+#!/usr/bin/python3
+#
+# Copyright (C) 2026 Linaro Limited
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import argparse
+import contextlib
+import datetime
+import json
+import logging
+import os
+import pathlib
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import unittest.mock
+
+import django
+
+BENCHMARKS = [
+    "schedule_jobs",
+    "jobs_logs",
+    "map_scanned_results",
+    "logs_filesystem",
+    "dump",
+]
+
+DEFINITION = """job_name: benchmark
+visibility: public
+timeouts:
+  job:
+    minutes: 10
+  action:
+    minutes: 5
+actions: []
+"""
+
+SECRETS = {"token-0123456789", "password"}
+
+
+def setup_django(workdir):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "lava_server.settings.dev")
+    from django.conf import settings
+
+    # Device dictionaries and job outputs of the synthetic lab
+    settings.DEVICES_PATH = str(workdir / "devices")
+    settings.MEDIA_ROOT = str(workdir / "media")
+    # Do not keep every query in memory
+    settings.DEBUG = False
+    settings.METRICS_FLUSH_INTERVAL = 0
+    django.setup()
+    # The scheduler logs every decision
+    logging.disable(logging.WARNING)
+
+
+class Lab:
+    """
+    Synthetic lab created in the test database
+    """
+
+    def __init__(self, options, workdir):
+        from django.contrib.auth.models import User
+
+        from lava_scheduler_app.models import Device, DeviceType, Tag, TestJob, Worker
+
+        rng = random.Random(options.seed)
+        self.user = User.objects.create(username="benchmark")
+        self.workers = Worker.objects.bulk_create(
+            Worker(
+                hostname=f"worker-{i:03d}",
+                state=Worker.STATE_ONLINE,
+                health=Worker.HEALTH_ACTIVE,
+            )
+            for i in range(options.workers)
+        )
+        device_types = DeviceType.objects.bulk_create(
+            DeviceType(name=f"dt-{i:03d}", disable_health_check=True)
+            for i in range(options.device_types)
+        )
+        tags = Tag.objects.bulk_create(Tag(name=f"tag-{i}") for i in range(10))
+
+        (workdir / "devices").mkdir()
+        devices = []
+        for i in range(options.devices):
+            hostname = f"device-{i:05d}"
+            (workdir / "devices" / f"{hostname}.jinja2").write_text(
+                "{% extends 'qemu.jinja2' %}\n", encoding="utf-8"
+            )
+            devices.append(
+                Device(
+                    hostname=hostname,
+                    device_type=rng.choice(device_types),
+                    worker_host=rng.choice(self.workers),
+                    state=Device.STATE_IDLE,
+                    health=Device.HEALTH_GOOD,
+                )
+            )
+        devices = Device.objects.bulk_create(devices, batch_size=1000)
+        Device.tags.through.objects.bulk_create(
+            (
+                Device.tags.through(device_id=device.pk, tag_id=tag.pk)
+                for device in devices
+                for tag in rng.sample(tags, rng.randint(0, 2))
+            ),
+            batch_size=5000,
+        )
+
+        jobs = TestJob.objects.bulk_create(
+            (
+                TestJob(
+                    submitter=self.user,
+                    requested_device_type=rng.choice(device_types),
+                    priority=rng.randint(0, 100),
+                    definition=DEFINITION,
+                    original_definition=DEFINITION,
+                )
+                for _ in range(options.jobs)
+            ),
+            batch_size=5000,
+        )
+        # One job out of ten requires a tag
+        TestJob.tags.through.objects.bulk_create(
+            (
+                TestJob.tags.through(testjob_id=job.pk, tag_id=rng.choice(tags).pk)
+                for job in jobs
+                if rng.random() < 0.1
+            ),
+            batch_size=5000,
+        )
+
+    def new_job(self):
+        from lava_scheduler_app.models import TestJob
+
+        return TestJob.objects.create(
+            submitter=self.user,
+            definition=DEFINITION,
+            original_definition=DEFINITION,
+            state=TestJob.STATE_RUNNING,
+        )
+
+
+def log_lines(count, rng):
+    """
+    Log lines as sent by lava-run: one result every 20 lines
+    """
+    now = datetime.datetime.now(datetime.UTC)
+    for i in range(count):
+        data = {"dt": (now + datetime.timedelta(milliseconds=i)).isoformat()}
+        if i % 20 == 19:
+            data["lvl"] = "results"
+            data["msg"] = {
+                "definition": "0_benchmark",
+                "case": f"case-{i}",
+                "result": rng.choice(["pass", "fail", "skip"]),
+                "measurement": rng.random(),
+                "units": "s",
+            }
+        else:
+            data["lvl"] = rng.choice(["debug", "info", "target"])
+            data["msg"] = f"line {i}: " + "x" * rng.randint(10, 200)
+        yield data
+
+
+def bench_schedule_jobs(lab, options, rng):
+    from django.db import connection, transaction
+
+    from lava_scheduler_app import scheduler
+    from lava_scheduler_app.models import TestJob
+
+    workers = [w.hostname for w in lab.workers]
+    patcher = contextlib.nullcontext()
+    if connection.vendor != "postgresql":
+        # The multinode transition relies on DISTINCT ON and the lab does not
+        # have any multinode job.
+        patcher = unittest.mock.patch.object(scheduler, "transition_multinode_jobs")
+    # Every round starts from the same lab
+    with patcher, transaction.atomic():
+        workers_limit = scheduler.worker_summary(workers)
+        available_devices = scheduler.schedule_health_checks(workers_limit)
+        start = time.perf_counter()
+        scheduler.schedule_jobs(available_devices, workers_limit)
+        duration = time.perf_counter() - start
+        count = TestJob.objects.filter(state=TestJob.STATE_SCHEDULED).count()
+        transaction.set_rollback(True)
+    return count, duration
+
+
+def bench_jobs_logs(lab, options, rng):
+    from django.test import Client
+    from django.urls import reverse
+
+    from lava_common.log import dump
+
+    job = lab.new_job()
+    client = Client()
+    url = reverse("lava.scheduler.internal.v1.jobs.logs", args=[job.id])
+    lines = [dump(data) for data in log_lines(options.log_lines, rng)]
+    batches = [
+        (index, "- " + "\n- ".join(lines[index : index + options.log_batch]))
+        for index in range(0, len(lines), options.log_batch)
+    ]
+
+    start = time.perf_counter()
+    for index, batch in batches:
+        ret = client.post(
+            url, {"lines": batch, "index": index}, HTTP_LAVA_TOKEN=job.token
+        )
+        if ret.status_code != 200:
+            raise RuntimeError(f"ingest failed: {ret.status_code} {ret.content!r}")
+    return len(lines), time.perf_counter() - start
+
+
+def bench_map_scanned_results(lab, options, rng):
+    from lava_results_app.dbutils import map_scanned_results
+
+    job = lab.new_job()
+    results = [
+        data["msg"]
+        for data in log_lines(options.results * 20, rng)
+        if data["lvl"] == "results"
+    ]
+
+    start = time.perf_counter()
+    for result in results:
+        map_scanned_results(result, job, None, None, None)
+    return len(results), time.perf_counter() - start
+
+
+def bench_logs_filesystem_write(lab, options, rng):
+    from lava_common.log import dump
+    from lava_scheduler_app.logutils import LogsFilesystem
+
+    logs = LogsFilesystem()
+    job = lab.new_job()
+    lab.logs_job = job
+    path = pathlib.Path(job.output_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    lines = [
+        f"- {dump(data)}\n".encode() for data in log_lines(options.log_lines * 10, rng)
+    ]
+
+    start = time.perf_counter()
+    with (
+        (path / logs.log_filename).open("ab") as output,
+        (path / logs.index_filename).open("ab") as index,
+    ):
+        for line in lines:
+            logs.write(job, line, output, index)
+    return len(lines), time.perf_counter() - start
+
+
+def bench_logs_filesystem_read(lab, options, rng):
+    from lava_scheduler_app.logutils import LogsFilesystem
+
+    logs = LogsFilesystem()
+    start = time.perf_counter()
+    size = len(logs.read(lab.logs_job))
+    return size, time.perf_counter() - start
+
+
+def bench_logs_filesystem_read_range(lab, options, rng):
+    from lava_scheduler_app.logutils import LogsFilesystem
+
+    logs = LogsFilesystem()
+    count = logs.line_count(lab.logs_job)
+    ranges = [(start, start + 100) for start in rng.choices(range(count), k=1000)]
+
+    start = time.perf_counter()
+    for begin, end in ranges:
+        logs.read(lab.logs_job, begin, end)
+    return len(ranges), time.perf_counter() - start
+
+
+def bench_dump(lab, options, rng):
+    from lava_common.log import dump
+
+    data = list(log_lines(options.log_lines * 10, rng))
+    start = time.perf_counter()
+    for d in data:
+        dump(d, SECRETS)
+    return len(data), time.perf_counter() - start
+
+
+class NullHandler:
+    def emit(self, record):
+        pass
+
+    def close(self):
+        pass
+
+
+def bench_yaml_logger(lab, options, rng):
+    from lava_common.log import YAMLLogger
+
+    logger = YAMLLogger()
+    logger.handlers.append(NullHandler())
+    logger.secrets_mask = set(SECRETS)
+    data = list(log_lines(options.log_lines * 10, rng))
+    start = time.perf_counter()
+    for d in data:
+        logger.log_message(d["lvl"], d["msg"])
+    return len(data), time.perf_counter() - start
+
+
+# Measures of each benchmark, in order
+MEASURES = {
+    "schedule_jobs": [("schedule_jobs", "jobs", bench_schedule_jobs)],
+    "jobs_logs": [("jobs_logs", "lines", bench_jobs_logs)],
+    "map_scanned_results": [
+        ("map_scanned_results", "results", bench_map_scanned_results)
+    ],
+    "logs_filesystem": [
+        ("logs_filesystem_write", "lines", bench_logs_filesystem_write),
+        ("logs_filesystem_read", "bytes", bench_logs_filesystem_read),
+        ("logs_filesystem_read_range", "ranges", bench_logs_filesystem_read_range),
+    ],
+    "dump": [
+        ("dump", "lines", bench_dump),
+        ("yaml_logger", "lines", bench_yaml_logger),
+    ],
+}
+
+
+def run(options, workdir):
+    from django.db import connection
+
+    start = time.perf_counter()
+    lab = Lab(options, workdir)
+    results = {
+        "lab": {
+            "devices": options.devices,
+            "device_types": options.device_types,
+            "jobs": options.jobs,
+            "workers": options.workers,
+            "seed": options.seed,
+            "setup_seconds": time.perf_counter() - start,
+        },
+        "environment": {
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+        },
+        "rounds": options.rounds,
+        "benchmarks": {},
+    }
+
+    for name in options.benchmarks:
+        for measure, unit, func in MEASURES[name]:
+            # Same inputs for every run with the same seed
+            rng = random.Random(f"{options.seed}-{measure}")
+            durations = []
+            for _ in range(options.rounds):
+                count, duration = func(lab, options, rng)
+                durations.append(duration)
+            median = statistics.median(durations)
+            results["benchmarks"][measure] = {
+                "unit": unit,
+                "count": count,
+                "min": min(durations),
+                "median": median,
+                "max": max(durations),
+                "per_second": count / median if median else None,
+            }
+    return results
+
+
+def print_results(results, reference):
+    for name, result in results["benchmarks"].items():
+        line = "%-27s %9d %-7s median %8.4fs (min %8.4fs, max %8.4fs)" % (
+            name,
+            result["count"],
+            result["unit"],
+            result["median"],
+            result["min"],
+            result["max"],
+        )
+        # Compare the throughput: the sizes of the runs might differ
+        previous = (reference or {}).get("benchmarks", {}).get(name, {})
+        if result["per_second"] and previous.get("per_second"):
+            line += " %+7.1f%%" % (
+                (result["per_second"] / previous["per_second"] - 1) * 100
+            )
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the server hot paths against a synthetic lab"
+    )
+    parser.add_argument(
+        "--devices", type=int, default=5000, help="number of devices (default 5000)"
+    )
+    parser.add_argument(
+        "--device-types",
+        type=int,
+        default=200,
+        help="number of device types (default 200)",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=100000, help="number of queued jobs (default 100k)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=100, help="number of workers (default 100)"
+    )
+    parser.add_argument(
+        "--log-lines",
+        type=int,
+        default=10000,
+        help="number of log lines sent to the log ingest (default 10000)",
+    )
+    parser.add_argument(
+        "--log-batch",
+        type=int,
+        default=1000,
+        help="number of log lines per ingest request (default 1000)",
+    )
+    parser.add_argument(
+        "--results",
+        type=int,
+        default=5000,
+        help="number of results given to map_scanned_results (default 5000)",
+    )
+    parser.add_argument(
+        "--rounds", type=int, default=3, help="run each measure n times"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed of the lab")
+    parser.add_argument(
+        "--benchmark",
+        dest="benchmarks",
+        action="append",
+        choices=BENCHMARKS,
+        help="only run the given benchmarks (default to all)",
+    )
+    parser.add_argument(
+        "--json", action="store_true", default=False, help="print results as json"
+    )
+    parser.add_argument(
+        "--output", type=pathlib.Path, default=None, help="save the results as json"
+    )
+    parser.add_argument(
+        "--compare",
+        type=pathlib.Path,
+        default=None,
+        help="compare with the results saved by a previous run",
+    )
+    options = parser.parse_args()
+    if options.benchmarks is None:
+        options.benchmarks = BENCHMARKS
+
+    reference = None
+    if options.compare is not None:
+        reference = json.loads(options.compare.read_text(encoding="utf-8"))
+
+    with tempfile.TemporaryDirectory(prefix="lava-benchmark-") as tmpdir:
+        workdir = pathlib.Path(tmpdir)
+        setup_django(workdir)
+        from django.db import connection
+
+        # Never touch the data of the configured database
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            results = run(options, workdir)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    if options.output is not None:
+        options.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if options.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results, reference)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
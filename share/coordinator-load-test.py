@@ -0,0 +1,230 @@
+#!/usr/bin/python3
+#
+# Copyright (C) 2026 Linaro Limited
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import socket
+import statistics
+import sys
+import time
+import uuid
+
+from lava.coordinator import LavaCoordinator
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = 0
+
+    def add(self, request, latency):
+        self.latencies.setdefault(request, []).append(latency)
+
+    def summary(self):
+        ret = {}
+        for request, latencies in sorted(self.latencies.items()):
+            latencies.sort()
+            ret[request] = {
+                "count": len(latencies),
+                "mean": statistics.mean(latencies),
+                "p50": latencies[len(latencies) // 2],
+                "p99": latencies[int(len(latencies) * 0.99)],
+                "max": latencies[-1],
+            }
+        return ret
+
+
+async def request(options, stats, message):
+    """
+    Send one request using the lava-coordinator wire protocol
+    """
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection(options.host, options.port)
+    try:
+        data = json.dumps(message).encode("utf-8")
+        writer.write(b"%08X" % len(data) + data)
+        writer.write_eof()
+        count = int(await reader.readexactly(8), 16)
+        response = json.loads(await reader.readexactly(count))
+    finally:
+        writer.close()
+    stats.add(message["request"], time.perf_counter() - start)
+    return response
+
+
+async def poll(options, stats, message):
+    """
+    Poll the coordinator like lava-dispatcher does
+    """
+    while True:
+        response = await request(options, stats, message)
+        if response["response"] != "wait":
+            return response
+        await asyncio.sleep(options.poll_delay)
+
+
+class Persistent:
+    """
+    Send every request of a node over a single connection. The coordinator
+    holds the requests until they can be answered: no need to poll.
+    """
+
+    def __init__(self, options, stats):
+        self.options = options
+        self.stats = stats
+        self.reader = self.writer = None
+
+    async def request(self, message):
+        start = time.perf_counter()
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.options.host, self.options.port
+            )
+        data = json.dumps({**message, "persistent": True}).encode("utf-8")
+        self.writer.write(b"%08X" % len(data) + data)
+        while True:
+            count = int(await self.reader.readexactly(8), 16)
+            response = json.loads(await self.reader.readexactly(count))
+            if response["response"] != "wait":
+                break
+            # The coordinator regularly answers "wait": ask again
+            self.writer.write(b"%08X" % len(data) + data)
+        self.stats.add(message["request"], time.perf_counter() - start)
+        return response
+
+    poll = request
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class Polling:
+    def __init__(self, options, stats):
+        self.options = options
+        self.stats = stats
+
+    async def request(self, message):
+        return await request(self.options, self.stats, message)
+
+    async def poll(self, message):
+        return await poll(self.options, self.stats, message)
+
+    def close(self):
+        pass
+
+
+async def node(options, stats, group, index):
+    base = {
+        "group_name": group,
+        "group_size": options.group_size,
+        "client_name": f"{group}.{index}",
+        "hostname": "localhost",
+        "role": "server" if index == 0 else "client",
+    }
+    client = (Persistent if options.persistent else Polling)(options, stats)
+    try:
+        await client.poll({**base, "request": "group_data"})
+        await client.request(
+            {**base, "request": "lava_send", "messageID": "ready", "message": None}
+        )
+        await client.poll({**base, "request": "lava_wait_all", "messageID": "ready"})
+        for sync in range(options.syncs):
+            await client.poll({**base, "request": "lava_sync", "messageID": str(sync)})
+        await client.request({**base, "request": "clear_group"})
+    except (OSError, ValueError, asyncio.IncompleteReadError):
+        stats.errors += 1
+    finally:
+        client.close()
+
+
+async def run(options):
+    stats = Stats()
+    groups = [str(uuid.uuid4()) for _ in range(options.groups)]
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            node(options, stats, group, index)
+            for group in groups
+            for index in range(options.group_size)
+        )
+    )
+    duration = time.perf_counter() - start
+    return {
+        "persistent": options.persistent,
+        "groups": options.groups,
+        "group_size": options.group_size,
+        "syncs": options.syncs,
+        "duration": duration,
+        "groups_per_second": options.groups / duration,
+        "errors": stats.errors,
+        "requests": stats.summary(),
+    }
+
+
+def coordinator(port):
+    LavaCoordinator("localhost", port, 4096).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Simulate multinode groups against a lava-coordinator"
+    )
+    parser.add_argument(
+        "--host", default="127.0.0.1", help="coordinator to test (default to local)"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=None,
+        help="coordinator port (default to a new local coordinator)",
+    )
+    parser.add_argument("--groups", type=int, default=200, help="number of groups")
+    parser.add_argument(
+        "--group-size", type=int, default=2, help="number of nodes per group"
+    )
+    parser.add_argument(
+        "--syncs", type=int, default=5, help="number of lava-sync per node"
+    )
+    parser.add_argument(
+        "--poll-delay", type=float, default=0.1, help="delay between two polls"
+    )
+    parser.add_argument(
+        "--persistent",
+        action="store_true",
+        default=False,
+        help="use one persistent connection per node instead of polling",
+    )
+    options = parser.parse_args()
+
+    proc = None
+    if options.port is None:
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            options.port = sock.getsockname()[1]
+        proc = multiprocessing.Process(
+            target=coordinator, args=(options.port,), daemon=True
+        )
+        proc.start()
+        # Wait for the coordinator to listen
+        for _ in range(50):
+            with socket.socket() as sock:
+                if sock.connect_ex((options.host, options.port)) == 0:
+                    break
+            time.sleep(0.1)
+
+    try:
+        print(json.dumps(asyncio.run(run(options)), indent=2))
+    finally:
+        if proc is not None:
+            proc.terminate()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
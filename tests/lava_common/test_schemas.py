@@ -0,0 +1,60 @@
+# Copyright (C) 2026 Linaro Limited
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import pytest
+from voluptuous import Invalid
+
+from lava_common import schemas
+from lava_common.schemas import device
+from lava_common.schemas.test import testdef
+
+JOB = {
+    "job_name": "job",
+    "device_type": "qemu",
+    "visibility": "public",
+    "timeouts": {"job": {"minutes": 10}},
+    "actions": [{"boot": {"method": "qemu", "media": "tmpfs", "prompts": ["#"]}}],
+}
+
+
+def test_schemas_are_memoized():
+    schemas.job_schema.cache_clear()
+    schemas.action_schema.cache_clear()
+
+    schemas.validate(JOB, strict=False)
+    schemas.validate(JOB, strict=False)
+    assert schemas.job_schema.cache_info().misses == 1
+    assert schemas.job_schema.cache_info().hits == 1
+    assert schemas.action_schema.cache_info().misses == 1
+    assert schemas.action_schema.cache_info().hits == 1
+
+    # Each set of parameters has its own schema
+    assert schemas.job_schema(True, ()) is not schemas.job_schema(False, ())
+    assert schemas.job_schema(True, ("var",)) is not schemas.job_schema(True, ())
+    schemas.validate(JOB, strict=False, extra_context_variables=["var"])
+    assert schemas.job_schema.cache_info().currsize == 4
+
+    assert device.device_schema() is device.device_schema()
+    assert testdef.testdef_schema() is testdef.testdef_schema()
+
+
+def test_extra_context_variables():
+    job = dict(JOB, context={"var": 1})
+    with pytest.raises(Invalid):
+        schemas.validate(job)
+    schemas.validate(job, extra_context_variables=["var"])
+
+
+def test_unknown_action():
+    job = dict(JOB, actions=[{"boot": {"method": "unknown"}}])
+    for _ in range(2):
+        with pytest.raises(Invalid, match="unknown action type"):
+            schemas.validate(job)
+    assert schemas.action_schema("boot.unknown", True) is None
+
+    # Names from the job definitions cannot grow the cache without limit
+    maxsize = schemas.action_schema.cache_info().maxsize
+    for index in range(maxsize + 10):
+        schemas.action_schema("boot.unknown-%d" % index, True)
+    assert schemas.action_schema.cache_info().currsize == maxsize
@@ -0,0 +1,193 @@
+# Copyright (C) 2026 Linaro Limited
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import asyncio
+import contextlib
+import json
+import uuid
+
+import pytest
+
+from lava.coordinator import LavaCoordinator
+
+
+async def request(port, message):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    data = json.dumps(message).encode("utf-8")
+    writer.write(b"%08X" % len(data) + data)
+    writer.write_eof()
+    count = int(await reader.readexactly(8), 16)
+    response = json.loads(await reader.readexactly(count))
+    writer.close()
+    await writer.wait_closed()
+    return response
+
+
+async def poll(port, message):
+    while (response := await request(port, message))["response"] == "wait":
+        await asyncio.sleep(0.01)
+    return response
+
+
+@contextlib.asynccontextmanager
+async def start_coordinator(wakeup_timeout=20):
+    coordinator = LavaCoordinator("localhost", 0, 4096)
+    coordinator.timeout = 1
+    coordinator.wakeup_timeout = wakeup_timeout
+    server = await coordinator.start("127.0.0.1")
+    async with server:
+        yield server.sockets[0].getsockname()[1]
+
+
+def node(group, index):
+    return {
+        "group_name": group,
+        "group_size": 2,
+        "client_name": f"{group}.{index}",
+        "hostname": "localhost",
+        "role": "server" if index == 0 else "client",
+    }
+
+
+@pytest.mark.asyncio
+async def test_concurrent_groups():
+    async def run(group, index):
+        base = node(group, index)
+        response = await poll(coordinator, {**base, "request": "group_data"})
+        assert response["response"] == "group_data"
+        assert response["roles"] == {f"{group}.0": "server", f"{group}.1": "client"}
+        if index == 0:
+            message = {
+                "request": "lava_send",
+                "messageID": "ready",
+                "message": {"a": 1},
+            }
+            assert (await request(coordinator, {**base, **message}))[
+                "response"
+            ] == "ack"
+        else:
+            message = {"request": "lava_wait", "messageID": "ready"}
+            response = await poll(coordinator, {**base, **message})
+            assert response["message"] == {f"{group}.0": {"a": 1}}
+        message = {"request": "lava_sync", "messageID": "sync"}
+        assert (await poll(coordinator, {**base, **message}))["response"] == "ack"
+        message = {"request": "clear_group"}
+        assert (await request(coordinator, {**base, **message}))["response"] == "ack"
+
+    async with start_coordinator() as coordinator:
+        # Stalled clients do not block the other ones
+        _, stalled = await asyncio.open_connection("127.0.0.1", coordinator)
+        stalled.write(b"0000")
+
+        groups = [str(uuid.uuid4()) for _ in range(10)]
+        await asyncio.wait_for(
+            asyncio.gather(
+                *(run(group, index) for group in groups for index in (0, 1))
+            ),
+            timeout=10,
+        )
+        assert not any(group in LavaCoordinator.all_groups for group in groups)
+        stalled.close()
+
+
+@pytest.mark.asyncio
+async def test_invalid_requests():
+    async with start_coordinator() as coordinator:
+        for data in (b"nothex!!", b"00000004abcd"):
+            reader, writer = await asyncio.open_connection("127.0.0.1", coordinator)
+            writer.write(data)
+            writer.write_eof()
+            # The connection is closed without response
+            assert await reader.read() == b""
+            writer.close()
+
+        assert (await request(coordinator, {}))["response"] == "nack"
+
+
+class PersistentClient:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    async def request(self, message):
+        data = json.dumps({**message, "persistent": True}).encode("utf-8")
+        self.writer.write(b"%08X" % len(data) + data)
+        count = int(await self.reader.readexactly(8), 16)
+        return json.loads(await self.reader.readexactly(count))
+
+
+@contextlib.asynccontextmanager
+async def persistent_client(port):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        yield PersistentClient(reader, writer)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_persistent_connection():
+    group = str(uuid.uuid4())
+    server, client = node(group, 0), node(group, 1)
+    async with (
+        start_coordinator() as coordinator,
+        persistent_client(coordinator) as conn0,
+        persistent_client(coordinator) as conn1,
+    ):
+        # The first node is woken up when the group is complete
+        task = asyncio.create_task(conn0.request({**server, "request": "group_data"}))
+        await asyncio.sleep(0.1)
+        assert not task.done()
+        response = await conn1.request({**client, "request": "group_data"})
+        assert response["response"] == "group_data"
+        assert response["persistent"] is True
+        assert (await asyncio.wait_for(task, 1))["response"] == "group_data"
+
+        # lava_wait is woken up by lava_send
+        message = {"request": "lava_wait", "messageID": "ready"}
+        task = asyncio.create_task(conn1.request({**client, **message}))
+        await asyncio.sleep(0.1)
+        assert not task.done()
+        message = {"request": "lava_send", "messageID": "ready", "message": {"a": 1}}
+        assert (await conn0.request({**server, **message}))["response"] == "ack"
+        response = await asyncio.wait_for(task, 1)
+        assert response["message"] == {f"{group}.0": {"a": 1}}
+
+        # Barriers can be reused
+        for _ in range(3):
+            message = {"request": "lava_sync", "messageID": "sync"}
+            responses = await asyncio.wait_for(
+                asyncio.gather(
+                    conn0.request({**server, **message}),
+                    conn1.request({**client, **message}),
+                ),
+                1,
+            )
+            assert [r["response"] for r in responses] == ["ack", "ack"]
+
+        # Clients polling the coordinator also wake up the persistent ones
+        task = asyncio.create_task(conn0.request({**server, **message}))
+        await asyncio.sleep(0.1)
+        assert (await poll(coordinator, {**client, **message}))["response"] == "ack"
+        assert (await asyncio.wait_for(task, 1))["response"] == "ack"
+
+        for conn, base in ((conn0, server), (conn1, client)):
+            response = await conn.request({**base, "request": "clear_group"})
+            assert response["response"] == "ack"
+        assert group not in LavaCoordinator.all_groups
+
+
+@pytest.mark.asyncio
+async def test_persistent_connection_timeout():
+    group = str(uuid.uuid4())
+    async with (
+        start_coordinator(wakeup_timeout=0.1) as coordinator,
+        persistent_client(coordinator) as conn,
+    ):
+        message = {**node(group, 0), "request": "lava_sync", "messageID": "s"}
+        # Held requests are answered with "wait" after some time
+        assert (await conn.request(message))["response"] == "wait"
+        assert (await conn.request(message))["response"] == "wait"
+        del LavaCoordinator.all_groups[group]
@@ -5,11 +5,17 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 from __future__ import annotations
 
+import threading
 from unittest.mock import MagicMock, patch
 from unittest.mock import call as mock_call
 
 from lava_common.exceptions import JobError
-from lava_dispatcher.actions.deploy.apply_overlay import AppendOverlays
+from lava_dispatcher.action import Pipeline
+from lava_dispatcher.actions.deploy.apply_overlay import (
+    AppendOverlays,
+    ApplyOverlaySparseImage,
+    wait_for_overlays,
+)
 
 from ...test_basic import LavaDispatcherTestCase
 
@@ -415,10 +421,11 @@ class TestApplyOverlay(LavaDispatcherTestCase):
                 }
             }
         }
-        action.run_cmd = MagicMock()
-
         with (
             patch("guestfs.GuestFS") as guestfs_mock,
+            patch(
+                "lava_dispatcher.actions.deploy.apply_overlay.SparseImage"
+            ) as sparse_mock,
             patch(
                 "lava_dispatcher.actions.deploy.apply_overlay.os.replace"
             ) as replace_mock,
@@ -439,24 +446,14 @@ class TestApplyOverlay(LavaDispatcherTestCase):
         guestfs_mock().tar_in.assert_called_once_with(
             str(tmp_dir_path / "modules.tar"), "/lib", compress=None
         )
+        sparse_mock.assert_called_once_with(f"{tmp_dir_path}/rootfs.ext4")
         self.assertEqual(
-            action.run_cmd.mock_calls,
+            sparse_mock().mock_calls,
             [
-                mock_call(
-                    [
-                        "/usr/bin/simg2img",
-                        f"{tmp_dir_path}/rootfs.ext4",
-                        f"{tmp_dir_path}/rootfs.ext4.non-sparse",
-                    ],
-                    error_msg=f"simg2img failed for {tmp_dir_path}/rootfs.ext4",
-                ),
-                mock_call(
-                    [
-                        "/usr/bin/img2simg",
-                        f"{tmp_dir_path}/rootfs.ext4",
-                        f"{tmp_dir_path}/rootfs.ext4.sparse",
-                    ],
-                    error_msg=f"img2simg failed for {tmp_dir_path}/rootfs.ext4",
+                mock_call.unsparse(f"{tmp_dir_path}/rootfs.ext4.non-sparse"),
+                mock_call.resparse(
+                    f"{tmp_dir_path}/rootfs.ext4",
+                    f"{tmp_dir_path}/rootfs.ext4.sparse",
                 ),
             ],
         )
@@ -477,14 +474,14 @@ class TestApplyOverlay(LavaDispatcherTestCase):
             action_logs,
             [
                 ("INFO", "Modifying %r", [f"{tmp_dir_path}/rootfs.ext4"]),
-                ("DEBUG", "Calling simg2img on %r", [f"{tmp_dir_path}/rootfs.ext4"]),
+                ("DEBUG", "Expanding sparse image %r", [f"{tmp_dir_path}/rootfs.ext4"]),
                 ("DEBUG", "Overlays:", []),
                 (
                     "DEBUG",
                     "- %s: %r to %r",
                     ["rootfs.modules", f"{tmp_dir_path}/modules.tar", "/lib"],
                 ),
-                ("DEBUG", "Calling img2simg on %r", [f"{tmp_dir_path}/rootfs.ext4"]),
+                ("DEBUG", "Building sparse image %r", [f"{tmp_dir_path}/rootfs.ext4"]),
             ],
         )
 
@@ -620,3 +617,84 @@ class TestApplyOverlay(LavaDispatcherTestCase):
                 ),
             ],
         )
+
+
+class TestApplyOverlayImageBackground(LavaDispatcherTestCase):
+    def setUp(self):
+        super().setUp()
+        self.job = self.create_simple_job()
+        self.job.pipeline = Pipeline(job=self.job, parameters={"namespace": "common"})
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.applied = []
+
+        def apply(action, image, overlay_file):
+            self.started.set()
+            self.assertTrue(self.release.wait(10))
+            if image == "broken.img":
+                raise JobError("Image is not an Android sparse image: broken.img")
+            self.applied.append((image, overlay_file))
+
+        self.actions = {}
+        for image_key in ("boot", "system", "vendor"):
+            action = ApplyOverlaySparseImage(self.job, image_key, background=True)
+            self.job.pipeline.add_action(action)
+            action.set_namespace_data(
+                action="download-action",
+                label=image_key,
+                key="file",
+                value=f"{image_key}.img",
+            )
+            self.actions[image_key] = action
+        self.actions["system"].set_namespace_data(
+            action="compress-overlay", label="output", key="file", value="overlay.tar"
+        )
+        patcher = patch.object(ApplyOverlaySparseImage, "apply", new=apply)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_background(self):
+        # Nothing to do without overlay
+        self.job.pipeline.actions[0].parameters = {"namespace": "other"}
+        self.actions["boot"].run(None, None)
+        self.assertIsNone(self.actions["boot"].future)
+
+        action = self.actions["system"]
+        action.run(None, None)
+        self.assertTrue(self.started.wait(10))
+        # The pipeline continues while the overlay is applied
+        self.assertFalse(action.future.done())
+        self.assertEqual(self.applied, [])
+        # Other images and other namespaces are not waited for
+        wait_for_overlays(action, "vendor")
+        wait_for_overlays(self.actions["boot"])
+        self.assertIsNotNone(action.future)
+
+        self.release.set()
+        wait_for_overlays(action, "system")
+        self.assertIsNone(action.future)
+        self.assertEqual(self.applied, [("system.img", "overlay.tar")])
+
+    def test_background_error(self):
+        action = self.actions["system"]
+        action.set_namespace_data(
+            action="download-action", label="system", key="file", value="broken.img"
+        )
+        self.release.set()
+        action.run(None, None)
+        with self.assertRaisesRegex(JobError, "not an Android sparse image"):
+            wait_for_overlays(action)
+        # Only raised once
+        wait_for_overlays(action)
+
+    def test_background_cleanup(self):
+        action = self.actions["system"]
+        action.set_namespace_data(
+            action="download-action", label="system", key="file", value="broken.img"
+        )
+        action.run(None, None)
+        self.assertTrue(self.started.wait(10))
+        self.release.set()
+        # The cleanup waits for the thread and ignores its errors
+        action.cleanup(None)
+        self.assertIsNone(action.future)
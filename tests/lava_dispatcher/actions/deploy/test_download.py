@@ -801,6 +801,157 @@ class TestDowload(LavaDispatcherTestCase):
             },
         )
 
+    def test_http_download_run_base_image(self):
+        tmp_dir_path = self.create_temporary_directory()
+        store = tmp_dir_path / "base-images"
+
+        def create_action(reader):
+            job = self.create_simple_job(
+                job_parameters={"dispatcher": {"qemu_base_image_dir": str(store)}}
+            )
+            action = HttpDownloadAction(
+                job, "rootfs", str(tmp_dir_path), urlparse("https://example.com/rootfs")
+            )
+            action.url = urlparse("https://example.com/rootfs")
+            action.parameters = {
+                "to": "tmpfs",
+                "images": {
+                    "rootfs": {
+                        "url": "https://example.com/rootfs",
+                        "image_arg": "-drive format=raw,file={rootfs}",
+                        "sha256sum": "936a185caaa266bb9cbe981e9e05cb78cd732b0b3280eb944412bb6f8f8f07af",
+                    }
+                },
+                "namespace": "common",
+            }
+            action.params = action.parameters["images"]["rootfs"]
+            action.reader = reader
+            action.fname = str(tmp_dir_path / "rootfs/rootfs")
+            return action
+
+        def reader():
+            yield b"hello"
+            yield b"world"
+
+        # Downloaded, verified and moved to the store
+        action = create_action(reader)
+        action.run(None, 4212)
+        base_image = action.get_namespace_data(
+            action="download-action", label="rootfs", key="base_image"
+        )
+        self.assertTrue(base_image.startswith(str(store)))
+        self.assertEqual(
+            action.get_namespace_data(
+                action="download-action", label="rootfs", key="file"
+            ),
+            base_image,
+        )
+        self.assertEqual(Path(base_image).read_text(), "helloworld")
+        self.assertEqual(os.stat(base_image).st_mode & 0o777, 0o444)
+        self.assertFalse((tmp_dir_path / "rootfs/rootfs").exists())
+        action.cleanup(None)
+        self.assertTrue(Path(base_image).exists())
+
+        # Not downloaded again
+        def failing_reader():
+            raise AssertionError("should not be called")
+            yield b""
+
+        action = create_action(failing_reader)
+        action.run(None, 4212)
+        self.assertEqual(
+            action.get_namespace_data(
+                action="download-action", label="rootfs", key="file"
+            ),
+            base_image,
+        )
+        self.assertEqual(action.results["base_image"], base_image)
+
+        # Images written by the job are not shared
+        action = create_action(reader)
+        action.params["image_arg"] = "-hda {rootfs}"
+        action.run(None, 4212)
+        self.assertEqual(
+            action.get_namespace_data(
+                action="download-action", label="rootfs", key="file"
+            ),
+            str(tmp_dir_path / "rootfs/rootfs"),
+        )
+
+    def test_http_download_run_artifact_store(self):
+        tmp_dir_path = self.create_temporary_directory()
+        store = tmp_dir_path / "artifacts"
+        sha256sum = "936a185caaa266bb9cbe981e9e05cb78cd732b0b3280eb944412bb6f8f8f07af"
+
+        def create_action(job_dir, reader, key="kernel", sha256=sha256sum):
+            job = self.create_simple_job(
+                job_parameters={"dispatcher": {"artifact_store_dir": str(store)}}
+            )
+            action = HttpDownloadAction(
+                job, key, str(job_dir), urlparse("https://example.com/Image")
+            )
+            action.url = urlparse("https://example.com/Image")
+            action.parameters = {
+                "to": "tftp",
+                key: {"url": "https://example.com/Image", "sha256sum": sha256},
+                "namespace": "common",
+            }
+            action.set_namespace_data(
+                action="tftp-deploy", label="tftp", key="suffix", value="1/tftp"
+            )
+            action.params = action.parameters[key]
+            action.reader = reader
+            action.fname = str(job_dir / key / "Image")
+            return action
+
+        def reader():
+            yield b"hello"
+            yield b"world"
+
+        def failing_reader():
+            raise AssertionError("should not be called")
+            yield b""
+
+        # Downloaded, verified and stored
+        action = create_action(tmp_dir_path / "job1", reader)
+        action.run(None, 4212)
+        kernel1 = tmp_dir_path / "job1/kernel/Image"
+        self.assertEqual(kernel1.read_text(), "helloworld")
+        self.assertEqual(os.stat(kernel1).st_nlink, 2)
+        self.assertEqual(action.results["sha256sum"], sha256sum)
+
+        # Not downloaded again
+        action = create_action(tmp_dir_path / "job2", failing_reader)
+        action.run(None, 4212)
+        kernel2 = tmp_dir_path / "job2/kernel/Image"
+        self.assertTrue(os.path.samefile(kernel1, kernel2))
+        self.assertEqual(
+            action.get_namespace_data(
+                action="download-action", label="file", key="kernel"
+            ),
+            "1/tftp/kernel/Image",
+        )
+        self.assertEqual(
+            action.get_namespace_data(
+                action="download-action", label="kernel", key="sha256"
+            ),
+            sha256sum,
+        )
+        action.cleanup(None)
+        self.assertFalse(kernel2.exists())
+        self.assertEqual(os.stat(kernel1).st_nlink, 2)
+
+        # Files modified by the job are not shared
+        action = create_action(tmp_dir_path / "job3", reader, key="preseed")
+        action.run(None, 4212)
+        self.assertEqual(os.stat(tmp_dir_path / "job3/preseed/Image").st_nlink, 1)
+
+        # Checksum mismatch: not stored
+        action = create_action(tmp_dir_path / "job4", reader, key="dtb", sha256="0")
+        with self.assertRaises(JobError):
+            action.run(None, 4212)
+        self.assertEqual(os.stat(tmp_dir_path / "job4/dtb/Image").st_nlink, 1)
+
     def test_predownloaded_job_validation(self):
         factory = Factory()
         factory.validate_job_strict = True
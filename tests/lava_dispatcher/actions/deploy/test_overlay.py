@@ -17,6 +17,7 @@ from lava_dispatcher.actions.deploy.overlay import (
     CreateOverlay,
     OverlayAction,
 )
+from lava_dispatcher.utils.shell import which
 from tests.lava_dispatcher.test_basic import Factory
 
 from ...test_basic import LavaDispatcherTestCase
@@ -191,6 +192,19 @@ class TestCompressOverlay(LavaDispatcherTestCase):
         self.assertTrue(members["./root"].isdir())
         self.assertTrue(members["./root/bar"].isfile())
 
+    def test_compress_overlay_pigz(self) -> None:
+        # pigz writes the same gzip format: use gzip as a stand-in.
+        with patch(
+            "lava_dispatcher.actions.deploy.overlay.shutil.which",
+            return_value=which("gzip"),
+        ):
+            members = self._run_compress_overlay("/lava-12345")
+
+        self.assertTrue(members["lava-12345"].isdir())
+        self.assertTrue(members["lava-12345/foo"].isfile())
+        self.assertTrue(members["./root"].isdir())
+        self.assertTrue(members["./root/bar"].isfile())
+
     def test_compress_overlay_nested_results_dir(self) -> None:
         # When lava_test_results_dir is overridden to a nested path, the whole
         # path (minus the leading "/") must be preserved in the archive instead
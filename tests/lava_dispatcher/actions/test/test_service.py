@@ -282,7 +282,7 @@ class TestTestServiceAction(LavaDispatcherTestCase):
         ):
             git_instance_mock = MagicMock()
             git_instance_mock.clone.return_value = None  # Simulate failure
-            GitHelper_mock.return_value = git_instance_mock
+            GitHelper_mock.from_config.return_value = git_instance_mock
 
             with self.assertRaisesRegex(
                 InfrastructureError,
@@ -303,12 +303,14 @@ class TestTestServiceAction(LavaDispatcherTestCase):
         ):
             git_instance_mock = MagicMock()
             git_instance_mock.clone.return_value = "commitid"
-            GitHelper_mock.return_value = git_instance_mock
+            GitHelper_mock.from_config.return_value = git_instance_mock
 
             srv2.run(None, 420)
 
-        GitHelper_mock.assert_called_once_with(
-            "https://example.com/org/srv2.git", srv2.logger
+        GitHelper_mock.from_config.assert_called_once_with(
+            "https://example.com/org/srv2.git",
+            srv2.logger,
+            srv2.job.parameters.get("dispatcher"),
         )
 
         git_instance_mock.clone.assert_called_once_with(
@@ -12,7 +12,7 @@ from time import monotonic as time_monotonic
 from unittest.mock import patch
 
 from lava_common.exceptions import JobError
-from lava_dispatcher.action import Action
+from lava_dispatcher.action import Action, CommandLogger
 
 from .test_basic import LavaDispatcherTestCase
 
@@ -107,6 +107,56 @@ class TestActionRunCmd(LavaDispatcherTestCase):
             ("ERROR", "Unable to run: %r", [["THIS_COMMAND_does_NOT_exist"]]),
         )
 
+    def test_output_is_streamed(self) -> None:
+        logged = []
+
+        def log_message(level, message, *args):
+            logged.append((args, time_monotonic()))
+
+        start = time_monotonic()
+        with patch.object(self.action.logger, "log_message", log_message):
+            self.action.run_cmd(["sh", "-c", "echo first; sleep 1; echo second"])
+
+        lines = {
+            args[0]: when for args, when in logged if args and isinstance(args[0], str)
+        }
+        # Logged while the command is still running
+        self.assertLess(lines["first"] - start, 0.9)
+        self.assertGreater(lines["second"] - start, 0.9)
+
+
+class TestCommandLogger(LavaDispatcherTestCase):
+    def test_long_lines(self) -> None:
+        action = Action(self.create_job_mock())
+        cmd_logger = CommandLogger(action.logger)
+        with self.collect_lava_logs(action) as logs:
+            # A progress bar without any new line
+            for _ in range(3):
+                cmd_logger.write("#" * 3000 + "\r")
+            self.assertLessEqual(len(cmd_logger.line), CommandLogger.MAX_LINE_LENGTH)
+            cmd_logger.flush(force=True)
+
+        self.assertEqual(
+            "".join(args[0] for _, _, args in logs), ("#" * 3000 + "\r") * 3
+        )
+        self.assertEqual(len(logs), 3)
+
+    def test_rate_limit(self) -> None:
+        action = Action(self.create_job_mock())
+        cmd_logger = CommandLogger(action.logger)
+        with (
+            patch.object(CommandLogger, "RATE_BURST", 10),
+            self.collect_lava_logs(action) as logs,
+        ):
+            cmd_logger.tokens = 10
+            cmd_logger.write("line\n" * 100)
+            cmd_logger.flush(force=True)
+
+        self.assertEqual(len(logs), 11)
+        self.assertEqual(
+            logs[-1], ("WARNING", "%d lines of output were not logged", [90])
+        )
+
 
 class TestParsedCommand(LavaDispatcherTestCase):
     def setUp(self) -> None:
@@ -132,3 +182,16 @@ class TestParsedCommand(LavaDispatcherTestCase):
             ["sh", "-c", "echo $FOOBAR"], env={"FOOBAR": "test"}
         )
         self.assertEqual(output, "test\n")
+
+    def test_timeout(self) -> None:
+        self.action.timeout.duration = 0.5
+        start = time_monotonic()
+        with self.assertRaises(JobError):
+            self.action.parsed_command(["sh", "-c", "echo started; sleep 10"])
+        self.assertLess(time_monotonic() - start, 5)
+        self.assertEqual("started", self.action.results["output"])
+
+    def test_newlines(self) -> None:
+        self.assertEqual(
+            "a\nb\nc\n", self.action.parsed_command(["printf", r"a\r\nb\rc\n"])
+        )
@@ -38,6 +38,7 @@ from lava_dispatcher.action import Action, Pipeline
 from lava_dispatcher.device import NewDevice
 from lava_dispatcher.job import Job
 from lava_dispatcher.parser import JobParser
+from lava_dispatcher.utils import profiling
 
 if TYPE_CHECKING:
     from collections.abc import Callable
@@ -522,6 +523,36 @@ class TestPipeline(LavaDispatcherTestCase):
             test_action.get_namespace_data("common", "unknown", "simple"), 1
         )
 
+    def test_namespace_data_copy(self):
+        job = self.create_simple_job()
+        test_action = Action(job)
+        test_action.parameters = {"namespace": "common"}
+        url = "https://example.com/image.img"
+        value = {"images": [{"url": url}], "shared": ("a", 1), "nested": ([1],)}
+        test_action.set_namespace_data("common", "ns", "dict", value)
+        test_action.set_namespace_data("common", "ns", "url", url)
+
+        # Immutable values are not copied
+        self.assertIs(test_action.get_namespace_data("common", "ns", "url"), url)
+        data = test_action.get_namespace_data("common", "ns", "dict")
+        self.assertEqual(data, value)
+        self.assertIs(data["shared"], value["shared"])
+        self.assertIs(data["images"][0]["url"], url)
+
+        # Modifying the copy does not alter the stored value
+        data["images"][0]["url"] = "changed"
+        data["images"].append({})
+        data["nested"][0].append(2)
+        self.assertEqual(
+            test_action.get_namespace_data("common", "ns", "dict"),
+            {"images": [{"url": url}], "shared": ("a", 1), "nested": ([1],)},
+        )
+        # Unless asking for the reference
+        reference = test_action.get_namespace_data(
+            "common", "ns", "dict", deepcopy=False
+        )
+        self.assertIs(reference, value)
+
 
 class TestFakeActions(LavaDispatcherTestCase):
     class KeepConnection(Action):
@@ -580,6 +611,70 @@ class TestFakeActions(LavaDispatcherTestCase):
         with pipe.job.timeout(None, None) as max_end_time:
             self.assertIsNot(conn, pipe.run_actions(conn, max_end_time))
 
+    def test_profiling(self):
+        class RunCommand(Action):
+            name = "run-command"
+
+            def run(self, connection, max_end_time):
+                self.run_cmd(["sleep", "0.1"])
+                profiling.add("downloaded_bytes", 1024)
+
+        class Deploy(Action):
+            name = "deploy"
+
+            def populate(self, parameters):
+                self.pipeline = Pipeline(parent=self, job=self.job)
+                self.pipeline.add_action(RunCommand(self.job))
+                self.pipeline.add_action(TestPipeline.FakeAction(self.job))
+
+        job = self.create_simple_job(
+            job_parameters={"dispatcher": {"action_profiling": True}}
+        )
+        job.pipeline = Pipeline(job=job)
+        deploy = Deploy(job)
+        job.pipeline.add_action(deploy)
+        deploy.populate({})
+        job.pipeline.add_action(TestFakeActions.KeepConnection(job))
+
+        results = []
+        with patch.object(job.logger, "results", side_effect=results.append):
+            job.run()
+        self.assertIsNone(profiling.current())
+
+        cases = {result["case"]: result for result in results}
+        self.assertEqual(
+            list(cases),
+            ["run-command", "fake-action", "deploy", "keep-connection", "profile"],
+        )
+        command = cases["run-command"]["extra"]["profile"]
+        self.assertGreaterEqual(command["subprocess_time"], 0.1)
+        self.assertEqual(command["downloaded_bytes"], 1024)
+        self.assertEqual(command["expect_time"], 0)
+        # The counters of an action include the counters of its sub-actions
+        profile = cases["deploy"]["extra"]["profile"]
+        self.assertGreaterEqual(profile["duration"], 0.11)
+        self.assertEqual(profile["subprocess_time"], command["subprocess_time"])
+        self.assertEqual(profile["downloaded_bytes"], 1024)
+
+        summary = cases["profile"]
+        self.assertEqual(
+            [(a["level"], a["name"]) for a in summary["extra"]["actions"]],
+            [("1", "deploy"), ("2", "keep-connection")],
+        )
+        self.assertEqual(summary["extra"]["total"]["downloaded_bytes"], 1024)
+        self.assertEqual(
+            [(a["level"], a["name"]) for a in summary["extra"]["slowest"]],
+            [("1.1", "run-command"), ("1.2", "fake-action"), ("2", "keep-connection")],
+        )
+
+        # Disabled by default
+        job = self.create_simple_job()
+        job.pipeline = Pipeline(job=job)
+        job.pipeline.add_action(TestFakeActions.KeepConnection(job))
+        with patch.object(job.logger, "results") as results_mock:
+            job.run()
+        results_mock.assert_not_called()
+
 
 class TestStrategySelector(LavaDispatcherTestCase):
     """
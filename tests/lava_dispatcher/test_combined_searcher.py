@@ -0,0 +1,115 @@
+# Copyright (C) 2026 Linaro Limited
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import re
+
+import pexpect
+import pytest
+from pexpect.expect import searcher_re
+
+from lava_dispatcher.shell import CombinedSearcher
+
+PATTERNS = [
+    "<LAVA_TEST_RUNNER EXIT>",
+    "<LAVA_TEST_RUNNER INSTALL_FAIL>",
+    pexpect.EOF,
+    pexpect.TIMEOUT,
+    r"<LAVA_SIGNAL_(\S+) ([^>]+)>",
+    r"<LAVA_MULTI_NODE> <LAVA_(\S+) ([^>]+)>",
+    re.compile(r"^(?P<test_case_id>[\w.-]+):\s+(?P<result>pass|fail|skip)$", re.M),
+]
+
+
+def compile_patterns(patterns):
+    return [
+        p
+        if p in (pexpect.EOF, pexpect.TIMEOUT) or isinstance(p, re.Pattern)
+        # Same as pexpect.spawn.compile_pattern_list
+        else re.compile(p, re.DOTALL)
+        for p in patterns
+    ]
+
+
+def search(searcher, buffer, searchwindowsize=None):
+    index = searcher.search(buffer, len(buffer), searchwindowsize)
+    if index < 0:
+        return index
+    match = searcher.match
+    return (
+        index,
+        searcher.start,
+        searcher.end,
+        match.group(),
+        match.groups(),
+        match.groupdict(),
+    )
+
+
+@pytest.mark.parametrize(
+    "buffer",
+    [
+        "",
+        "nothing to see here\n",
+        "<LAVA_TEST_RUNNER EXIT>",
+        "kernel\n<LAVA_SIGNAL_STARTRUN 0_smoke 1234>\nsmoke: pass\n",
+        "before\nsmoke: pass\n<LAVA_SIGNAL_ENDRUN 0_smoke 1234>",
+        "<LAVA_MULTI_NODE> <LAVA_SEND sync>",
+        "case-1: fail\ncase-2: pass\n<LAVA_TEST_RUNNER EXIT>",
+        "<LAVA_SIGNAL_TESTCASE TEST_CASE_ID=a RESULT=pass><LAVA_TEST_RUNNER EXIT>",
+    ],
+)
+@pytest.mark.parametrize("searchwindowsize", [None, 20])
+def test_same_result_as_searcher_re(buffer, searchwindowsize):
+    patterns = compile_patterns(PATTERNS)
+    searcher = CombinedSearcher(patterns)
+    # The LAVA patterns are combined, the test case one is not
+    assert [[index for index, _ in members] for _, members in searcher.groups] == [
+        [6],
+        [0, 1, 4, 5],
+    ]
+    assert searcher.eof_index == 2
+    assert searcher.timeout_index == 3
+    assert search(searcher, buffer, searchwindowsize) == search(
+        searcher_re(patterns), buffer, searchwindowsize
+    )
+
+
+def test_priority():
+    # Both patterns match at the same position: the first one wins
+    patterns = compile_patterns([r"abc", r"ab(c)"])
+    assert search(CombinedSearcher(patterns), "xabc")[0] == 0
+    patterns = compile_patterns([r"ab(c)", r"abc"])
+    assert search(CombinedSearcher(patterns), "xabc")[:5] == (0, 1, 4, "abc", ("c",))
+    # The leftmost match wins
+    patterns = compile_patterns([r"b", r"a"])
+    assert search(CombinedSearcher(patterns), "ab")[0] == 1
+
+
+@pytest.mark.parametrize(
+    "pattern,combined",
+    [
+        (r"(a)\1", False),
+        (r"(?i)abc", False),
+        (r"^abc", False),
+        (r"a(?P<y>b)c", True),
+        # Named groups can't be duplicated in the alternation
+        (r"x(?P<x>a)", False),
+    ],
+)
+def test_separate_patterns(pattern, combined):
+    patterns = compile_patterns([pattern, r"<(?P<x>EXIT)>", r"<START>"])
+    searcher = CombinedSearcher(patterns)
+    assert (len(searcher.groups) == 1) is combined
+    for buffer in ("xaa <EXIT>", "xABC", "xab", "abc", "<EXIT>", "xa<START>"):
+        assert search(searcher, buffer) == search(searcher_re(patterns), buffer)
+
+
+def test_expect_loop():
+    child = pexpect.spawn(
+        "echo", ["result: pass", "<LAVA_TEST_RUNNER EXIT>"], encoding="utf-8"
+    )
+    searcher = CombinedSearcher(child.compile_pattern_list(PATTERNS))
+    assert child.expect_loop(searcher, timeout=5) == 0
+    assert child.before == "result: pass "
+    assert child.expect_loop(searcher, timeout=5) == 2
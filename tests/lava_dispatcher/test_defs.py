@@ -12,7 +12,7 @@ import shutil
 import stat
 import tempfile
 import unittest
-from unittest.mock import call, patch
+from unittest.mock import MagicMock, call, patch
 
 import pexpect
 
@@ -818,3 +818,53 @@ class TestUrlRepoAction(LavaDispatcherTestCase):
     def test_strip_components_from_parameters(self):
         action = self.make_action({"strip-components": 1})
         self.assertEqual(action.strip_components, 1)
+
+
+class TestGitRepoActionCache(LavaDispatcherTestCase):
+    def make_action(self, cache_dir, overlay_path, revision):
+        job = self.create_simple_job(
+            job_parameters={"dispatcher": {"overlay_cache_dir": cache_dir}}
+        )
+        action = GitRepoAction(job)
+        action.uuid = "1_smoke"
+        action.parameters = {
+            "repository": "https://example.com/test-definitions.git",
+            "path": "smoke.yaml",
+            "name": "smoke",
+            "test_name": "1_smoke",
+            "revision": revision,
+            "namespace": "common",
+        }
+        action.set_namespace_data(
+            action="uuid", label="overlay_path", key="1_smoke", value=overlay_path
+        )
+        action.vcs = MagicMock()
+
+        def clone(dest_path, **kwargs):
+            os.makedirs(dest_path)
+            with open(os.path.join(dest_path, "smoke.yaml"), "w") as testdef:
+                testdef.write("metadata:\n  name: smoke\n")
+            return kwargs["revision"] or "b" * 40
+
+        action.vcs.clone.side_effect = clone
+        return action
+
+    def test_pinned_revision(self):
+        with tempfile.TemporaryDirectory() as tmp_dir, patch.object(RepoAction, "run"):
+            revision = "a" * 40
+            first = self.make_action(tmp_dir, f"{tmp_dir}/first", revision)
+            first.run(None, None)
+            first.vcs.clone.assert_called_once()
+
+            second = self.make_action(tmp_dir, f"{tmp_dir}/second", revision)
+            second.run(None, None)
+            second.vcs.clone.assert_not_called()
+            self.assertTrue(os.path.exists(f"{tmp_dir}/second/smoke.yaml"))
+            self.assertEqual(second.results["commit"], revision)
+
+    def test_unpinned_revision(self):
+        with tempfile.TemporaryDirectory() as tmp_dir, patch.object(RepoAction, "run"):
+            for name in ("first", "second"):
+                action = self.make_action(tmp_dir, f"{tmp_dir}/{name}", "master")
+                action.run(None, None)
+                action.vcs.clone.assert_called_once()
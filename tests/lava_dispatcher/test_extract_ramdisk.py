@@ -4,12 +4,15 @@
 #
 # SPDX-License-Identifier: GPL-2.0-or-later
 
+import gzip
 import os
 from unittest.mock import MagicMock, patch
 
 from lava_common.constants import RAMDISK_FNAME
 from lava_dispatcher.actions.deploy.apply_overlay import ExtractRamdisk
+from lava_dispatcher.utils.cache import ArtifactStore
 from tests.lava_dispatcher.test_basic import LavaDispatcherTestCase
+from tests.utils import DummyLogger
 
 
 class TestExtractRamdisk(LavaDispatcherTestCase):
@@ -65,3 +68,32 @@ class TestExtractRamdisk(LavaDispatcherTestCase):
         directory, archive = self.extract(compression=None)
         self.assertNotEqual(directory, archive)
         self.assertEqual(RAMDISK_FNAME, os.path.basename(archive))
+
+    def test_stored_ramdisk(self):
+        # A ramdisk shared through the artifact store is hardlinked into the
+        # job directory: it should be neither altered nor rejected by gunzip.
+        workdir = self.create_temporary_directory()
+        content = gzip.compress(b"not really a cpio")
+        downloaded = workdir / "rootfs.cpio.gz"
+        downloaded.write_bytes(content)
+        store = ArtifactStore(str(workdir / "store"), DummyLogger())
+        key = store.key("artifact", "0" * 64, None)
+        store.store(key, str(downloaded))
+        self.assertGreater(downloaded.stat().st_nlink, 1)
+
+        job = self.create_simple_job()
+        action = ExtractRamdisk(job)
+        action.parameters = {"ramdisk": {"compression": "gz"}}
+        uncpio = MagicMock()
+        with (
+            patch.object(action, "get_namespace_data", return_value=str(downloaded)),
+            patch.object(action, "set_namespace_data"),
+            patch("lava_dispatcher.actions.deploy.apply_overlay.uncpio", uncpio),
+        ):
+            action.run(MagicMock(), None)
+
+        part = uncpio.call_args.args[0]
+        with open(part, "rb") as f_in:
+            self.assertEqual(f_in.read(), b"not really a cpio")
+        with open(store.artifact(key), "rb") as f_in:
+            self.assertEqual(f_in.read(), content)
@@ -146,12 +146,13 @@ class TestDockerDriver(unittest.TestCase):
     @patch("lava_common.device_mappings.get_mapping_path")
     @patch("lava_dispatcher.action.Action.run_cmd")
     @patch("subprocess.check_call")
+    @patch("subprocess.check_output", return_value="true\n")
     @patch(
         "lava_dispatcher.utils.containers.get_udev_devices",
         return_value=["/dev/foo/bar"],
     )
     def test_run_fastboot(
-        self, get_udev_devices, check_call, run_cmd, get_mapping_path
+        self, get_udev_devices, check_output, check_call, run_cmd, get_mapping_path
     ):
         get_mapping_path.return_value = Path("/tmp/usbmap.yaml")  # FIXME
         self.action.maybe_copy_to_container("/path/to/image.img")
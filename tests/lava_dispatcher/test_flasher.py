@@ -4,9 +4,8 @@
 #
 # SPDX-License-Identifier: GPL-2.0-or-later
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
-import pexpect
 import pytest
 
 from lava_common.exceptions import InfrastructureError
@@ -58,22 +57,15 @@ class TestFlasher(LavaDispatcherTestCase):
         self.assertFalse(action.errors)
 
         # Run the action
-        proc_mock = MagicMock()
-        proc_mock.wait.return_value = 0
-        proc_mock.proc.wait.return_value = 0
         with patch(
-            "lava_dispatcher.action.PexpectPopenSpawn", return_value=proc_mock
-        ) as mock_spawn:
+            "lava_dispatcher.action.Action._run_streaming", return_value=(0, "")
+        ) as run_streaming:
             action.run(None, 10)
 
-        proc_mock.expect.assert_called_with(pexpect.EOF)
-        self.assertEqual(mock_spawn.call_count, 2)
+        self.assertEqual(run_streaming.call_count, 2)
 
-        for i, call in enumerate(mock_spawn.mock_calls):
-            self.assertEqual(call.kwargs["cmd"], commands[i])
-            self.assertEqual(call.kwargs["encoding"], "utf-8")
-            self.assertEqual(call.kwargs["codec_errors"], "replace")
-            self.assertEqual(call.kwargs["searchwindowsize"], 10)
+        for i, call in enumerate(run_streaming.mock_calls):
+            self.assertEqual(call.args[0], commands[i])
             self.assertIsNone(call.kwargs["env"])
 
         # Test InfrastructureError is raised on flashing failure.
@@ -5,14 +5,19 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 from __future__ import annotations
 
+import asyncio
 import os
+import time
+from contextlib import contextmanager
 from json import dumps as json_dumps
 from json import loads as json_loads
 from random import randint
 from socket import socket
+from threading import Thread
 from typing import Any
 from unittest.mock import Mock
 
+from lava.coordinator import LavaCoordinator
 from lava_common.exceptions import InfrastructureError, JobError
 from lava_common.timeout import Timeout
 from lava_common.yaml import yaml_safe_dump, yaml_safe_load
@@ -371,3 +376,104 @@ class TestMultinodeProtocol(LavaDispatcherTestCase):
             json_loads(protocol.request_send("test_id")),
             test_message,
         )
+
+
+class OldCoordinator(LavaCoordinator):
+    """
+    Coordinator without support for persistent connections
+    """
+
+    async def _read_request(self, reader, peer, persistent):
+        json_data = await super()._read_request(reader, peer, persistent)
+        if json_data is not None:
+            json_data.pop("persistent", None)
+        return json_data
+
+
+class TestMultinodeProtocolCoordinator(LavaDispatcherTestCase):
+    @contextmanager
+    def coordinator(self, cls=LavaCoordinator):
+        loop = asyncio.new_event_loop()
+        server = loop.run_until_complete(cls("localhost", 0, 4096).start("127.0.0.1"))
+        thread = Thread(target=loop.run_forever)
+        thread.start()
+        try:
+            yield server.sockets[0].getsockname()[1]
+        finally:
+
+            async def stop():
+                server.close()
+                await server.wait_closed()
+                # Let the coordinator notice that the clients disconnected
+                tasks = asyncio.all_tasks() - {asyncio.current_task()}
+                if tasks:
+                    await asyncio.wait(tasks, timeout=5)
+
+            asyncio.run_coroutine_threadsafe(stop(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+    def run_nodes(self, port):
+        group = str(randint(0, 2**31))
+        protocols = []
+        for role in ("server", "client"):
+            protocol = MultinodeProtocol(
+                {
+                    "protocols": {
+                        MultinodeProtocol.name: {
+                            "target_group": group,
+                            "role": role,
+                            "group_size": 2,
+                        }
+                    }
+                },
+                f"{group}.{role}",
+                DummyLogger(),
+            )
+            protocol.debug_setup()
+            protocol.settings.update(
+                {"port": port, "poll_delay": 1, "persistent": True}
+            )
+            protocol.poll_timeout.duration = 30
+            protocols.append(protocol)
+
+        replies = {}
+
+        def run(protocol):
+            protocol.initialise_group()
+            if protocol.parameters["protocols"][protocol.name]["role"] == "server":
+                protocol.request_send("ready", {"a": "1"})
+            else:
+                replies["wait"] = json_loads(protocol.request_wait("ready"))
+            replies[protocol.job_id] = json_loads(protocol.request_sync("sync"))
+            protocol.finalise_protocol()
+
+        threads = [Thread(target=run, args=(p,)) for p in protocols]
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(replies["wait"]["message"], {f"{group}.server": {"a": "1"}})
+        for protocol in protocols:
+            self.assertEqual(replies[protocol.job_id]["response"], "ack")
+            self.assertIsNone(protocol.persistent_sock)
+        self.assertNotIn(group, LavaCoordinator.all_groups)
+        return protocols, elapsed
+
+    def test_persistent_connection(self) -> None:
+        with self.coordinator() as port:
+            protocols, elapsed = self.run_nodes(port)
+        for protocol in protocols:
+            self.assertTrue(protocol.settings["persistent"])
+        # Nodes are woken up by the coordinator instead of sleeping poll_delay
+        self.assertLess(elapsed, protocols[0].settings["poll_delay"])
+
+    def test_persistent_connection_fallback(self) -> None:
+        with self.coordinator(OldCoordinator) as port:
+            protocols, _ = self.run_nodes(port)
+        for protocol in protocols:
+            self.assertFalse(protocol.settings["persistent"])
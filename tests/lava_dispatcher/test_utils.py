@@ -209,6 +209,111 @@ def test_no_history(setup, tmp_path):
     assert not (tmp_path / "git.clone1" / ".git").exists()
 
 
+def test_mirror_clone(setup, tmp_path):
+    git = vcs.GitHelper("git", DummyLogger(), mirror_dir=str(tmp_path / "mirror"))
+    assert git.clone("git.clone1") == "fc4a64b4403f8741641b1eada653bc4d63c77179"
+    assert len(list((tmp_path / "mirror").glob("*.git"))) == 1
+    # The clone is independent from the mirror and points at the repository
+    assert not (
+        tmp_path / "git.clone1" / ".git" / "objects" / "info" / "alternates"
+    ).exists()
+    assert (
+        subprocess.check_output(  # nosec - unit test support.
+            ["git", "-C", "git.clone1", "remote", "get-url", "origin"], text=True
+        ).strip()
+        == "git"
+    )
+    assert (
+        git.clone("git.clone2", branch="testing")
+        == "778f7fdd95dec665e593541706f2fc5817910f3f"
+    )
+    assert (
+        git.clone("git.clone3", shallow=True)
+        == "fc4a64b4403f8741641b1eada653bc4d63c77179"
+    )
+    assert (tmp_path / "git.clone3" / ".git" / "shallow").exists()
+    # Relative submodule urls are resolved against the repository url
+    git = vcs.GitHelper(
+        str(tmp_path / "git"), DummyLogger(), mirror_dir=str(tmp_path / "mirror")
+    )
+    assert (
+        git.clone("git.clone4", recursive=True)
+        == "fc4a64b4403f8741641b1eada653bc4d63c77179"
+    )
+    assert (tmp_path / "git.clone4" / "submodule" / "submodule.txt").exists()
+
+
+def test_mirror_known_revision_offline(setup, tmp_path, mocker):
+    mocker.patch("lava_dispatcher.utils.decorator.time.sleep")
+    git = vcs.GitHelper("git", DummyLogger(), mirror_dir=str(tmp_path / "mirror"))
+    assert git.clone("git.clone1") == "fc4a64b4403f8741641b1eada653bc4d63c77179"
+
+    # Known revisions are served from the mirror without any fetch
+    (tmp_path / "git").rename(tmp_path / "git.moved")
+    assert (
+        git.clone("git.clone2", revision="2f83e6d8189025e356a9563b8d78bdc8e2e9a3ed")
+        == "2f83e6d8189025e356a9563b8d78bdc8e2e9a3ed"
+    )
+    # Unknown revisions require a fetch
+    with pytest.raises(InfrastructureError):
+        git.clone("git.clone3", revision="0" * 40)
+
+
+def test_mirror_interval(setup, tmp_path):
+    git = vcs.GitHelper(
+        "git", DummyLogger(), mirror_dir=str(tmp_path / "mirror"), mirror_interval=3600
+    )
+    assert git.clone("git.clone1") == "fc4a64b4403f8741641b1eada653bc4d63c77179"
+
+    subprocess.check_output(  # nosec - unit test support.
+        ["git", "-C", "git", "commit", "--allow-empty", "-m", "New commit"],
+        env={
+            "GIT_AUTHOR_NAME": "Foo Bar",
+            "GIT_AUTHOR_EMAIL": "foo@example.com",
+            "GIT_COMMITTER_NAME": "Foo Bar",
+            "GIT_COMMITTER_EMAIL": "foo@example.com",
+        },
+    )
+    head = subprocess.check_output(  # nosec - unit test support.
+        ["git", "-C", "git", "rev-parse", "HEAD"], text=True
+    ).strip()
+
+    # The mirror was fetched recently
+    assert git.clone("git.clone2") == "fc4a64b4403f8741641b1eada653bc4d63c77179"
+    # Unless the mirror is out of date
+    git.mirror_interval = 0
+    assert git.clone("git.clone3") == head
+
+
+def test_mirror_moved_branch(setup, tmp_path):
+    git = vcs.GitHelper(
+        "git", DummyLogger(), mirror_dir=str(tmp_path / "mirror"), mirror_interval=3600
+    )
+    branch = subprocess.check_output(  # nosec - unit test support.
+        ["git", "-C", "git", "rev-parse", "--abbrev-ref", "HEAD"], text=True
+    ).strip()
+    assert (
+        git.clone("git.clone1", revision=branch)
+        == "fc4a64b4403f8741641b1eada653bc4d63c77179"
+    )
+
+    subprocess.check_output(  # nosec - unit test support.
+        ["git", "-C", "git", "commit", "--allow-empty", "-m", "New commit"],
+        env={
+            "GIT_AUTHOR_NAME": "Foo Bar",
+            "GIT_AUTHOR_EMAIL": "foo@example.com",
+            "GIT_COMMITTER_NAME": "Foo Bar",
+            "GIT_COMMITTER_EMAIL": "foo@example.com",
+        },
+    )
+    head = subprocess.check_output(  # nosec - unit test support.
+        ["git", "-C", "git", "rev-parse", "HEAD"], text=True
+    ).strip()
+
+    # Named revisions are always fetched, whatever the mirror interval
+    assert git.clone("git.clone2", revision=branch) == head
+
+
 ALLOWED = ["commands", "deploy", "test"]
 
 
@@ -0,0 +1,75 @@
+# Copyright (C) 2026 Linaro Limited
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import time
+
+import pytest
+
+from lava_dispatcher.zygote import Zygote
+
+LAVA_RUN = """
+import os
+import sys
+
+
+def main():
+    print("pgid=%d" % (os.getpgid(0) == os.getpid()))
+    print("args=%s" % " ".join(sys.argv[1:]))
+    print("env=%s" % os.environ.get("LAVA_TEST"))
+    print("error", file=sys.stderr)
+    return 0
+"""
+
+
+def wait_for(path, lines):
+    for _ in range(100):
+        if path.exists() and len(path.read_text().splitlines()) >= lines:
+            return path.read_text()
+        time.sleep(0.1)
+    raise AssertionError(f"{path} not written")
+
+
+@pytest.fixture
+def zygote(tmp_path):
+    lava_run = tmp_path / "lava-run"
+    lava_run.write_text(LAVA_RUN)
+    zygote = Zygote(str(lava_run))
+    zygote.start()
+    yield zygote
+    zygote.stop()
+
+
+def test_spawn(tmp_path, zygote):
+    for index in range(2):
+        with (
+            (tmp_path / f"stdout-{index}").open("w") as stdout,
+            (tmp_path / f"stderr-{index}").open("w") as stderr,
+        ):
+            pid = zygote.spawn(
+                ["lava-run", "--job-id", str(index)],
+                {"LAVA_TEST": "ok"},
+                stdout,
+                stderr,
+            )
+        assert pid > 0
+        assert pid != zygote.proc.pid
+
+        # The job runs in its own process group with the given arguments,
+        # environment and outputs.
+        assert wait_for(tmp_path / f"stdout-{index}", 3) == (
+            f"pgid=1\nargs=--job-id {index}\nenv=ok\n"
+        )
+        assert wait_for(tmp_path / f"stderr-{index}", 1) == "error\n"
+
+
+def test_spawn_restart(tmp_path, zygote):
+    zygote.proc.kill()
+    zygote.proc.wait()
+    with (tmp_path / "stdout").open("w") as stdout:
+        with pytest.raises(OSError, match="zygote failure"):
+            zygote.spawn(["lava-run"], {}, stdout, stdout)
+        assert zygote.sock is None
+        # A new zygote is started on the next job
+        assert zygote.spawn(["lava-run"], {"LAVA_TEST": "ok"}, stdout, stdout) > 0
+    assert "env=ok" in wait_for(tmp_path / "stdout", 4)
@@ -0,0 +1,270 @@
+# Copyright (C) 2026 Linaro Limited
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import errno
+import os
+import subprocess
+
+import pytest
+
+from lava_common.exceptions import InfrastructureError
+from lava_dispatcher.utils.cache import ArtifactStore, BaseImageStore, LayerCache
+from tests.utils import DummyLogger
+
+
+def test_from_config(tmp_path):
+    assert LayerCache.from_config(None, DummyLogger()) is None
+    assert LayerCache.from_config({}, DummyLogger()) is None
+    cache = LayerCache.from_config({"overlay_cache_dir": str(tmp_path)}, DummyLogger())
+    assert cache.path == str(tmp_path)
+
+
+def test_key():
+    assert LayerCache.key("git", "url", "rev") == LayerCache.key("git", "url", "rev")
+    assert LayerCache.key("git", "url", "rev") != LayerCache.key("git", "urlrev")
+    assert LayerCache.key("git", True) != LayerCache.key("git", False)
+
+
+def test_store_and_extract(tmp_path):
+    cache = LayerCache(str(tmp_path / "cache"), DummyLogger())
+    src = tmp_path / "src"
+    (src / "sub").mkdir(parents=True)
+    (src / "sub" / "data.txt").write_text("data")
+    (src / "run.sh").write_text("#!/bin/sh\n")
+    (src / "run.sh").chmod(0o755)
+
+    key = cache.key("git", "https://example.com/repo.git", "0" * 40)
+    assert not cache.extract(key, str(tmp_path / "miss"))
+    assert not (tmp_path / "miss").exists()
+
+    cache.store(key, str(src))
+    assert (tmp_path / "cache" / key[:2] / f"{key}.tar").exists()
+    # No temporary file left behind
+    assert len(list((tmp_path / "cache" / key[:2]).iterdir())) == 1
+
+    dest = tmp_path / "dest"
+    assert cache.extract(key, str(dest))
+    assert (dest / "sub" / "data.txt").read_text() == "data"
+    assert (dest / "run.sh").stat().st_mode & 0o777 == 0o755
+
+
+def test_extract_corrupted(tmp_path):
+    cache = LayerCache(str(tmp_path / "cache"), DummyLogger())
+    key = cache.key("corrupted")
+    layer = tmp_path / "cache" / key[:2] / f"{key}.tar"
+    layer.parent.mkdir(parents=True)
+    layer.write_text("not a tarball")
+
+    assert not cache.extract(key, str(tmp_path / "dest"))
+    assert not layer.exists()
+
+
+def test_base_image_from_config(tmp_path):
+    assert BaseImageStore.from_config({}, DummyLogger()) is None
+    store = BaseImageStore.from_config(
+        {"qemu_base_image_dir": str(tmp_path), "qemu_base_image_quota": 2},
+        DummyLogger(),
+    )
+    assert store.path == str(tmp_path)
+    assert store.quota == 2 * 1024 * 1024
+
+
+def test_base_image_arg():
+    image_arg = BaseImageStore.image_arg
+    assert (
+        image_arg("-drive format=raw,file={rootfs}", "rootfs")
+        == "-drive format=qcow2,file={rootfs}"
+    )
+    assert (
+        image_arg("-drive if=none,file={hd},id=hd0,format=raw -device virtio", "hd")
+        == "-drive if=none,file={hd},id=hd0,format=qcow2 -device virtio"
+    )
+    # Without format, qemu probes the format of the image
+    assert image_arg("-drive if=none,file={hd},id=hd0", "hd") is None
+    assert image_arg("-drive format=ext4,file={rootfs}", "rootfs") is None
+    assert image_arg("-drive format=raw,file={rootfs}", "disk") is None
+    assert image_arg("-hda {rootfs}", "rootfs") is None
+
+
+@pytest.fixture
+def unpin():
+    BaseImageStore.unpin()
+    yield
+    BaseImageStore.unpin()
+
+
+def test_base_image_store(tmp_path, unpin):
+    store = BaseImageStore(str(tmp_path / "store"), DummyLogger(), quota=10)
+    key1 = store.key("qemu", "1" * 64, "xz")
+    assert store.lookup(key1) is None
+
+    src = tmp_path / "rootfs.img"
+    src.write_text("x" * 6)
+    image1 = store.store(key1, str(src))
+    assert image1 == store.image(key1)
+    assert not src.exists()
+    assert os.stat(image1).st_mode & 0o777 == 0o444
+    # No temporary file left behind
+    assert len(os.listdir(os.path.dirname(image1))) == 1
+    assert store.lookup(key1) == image1
+
+    # Over quota, but image1 is used by this job
+    os.utime(image1, (0, 0))
+    key2 = store.key("qemu", "2" * 64, "xz")
+    src.write_text("y" * 6)
+    image2 = store.store(key2, str(src))
+    assert os.path.exists(image1)
+
+    # Once the job is over, the least recently used image is evicted
+    BaseImageStore.unpin()
+    os.utime(image1, (0, 0))
+    key4 = store.key("qemu", "4" * 64, "xz")
+    src.write_text("w" * 4)
+    image4 = store.store(key4, str(src))
+    assert store.lookup(key1) is None
+    assert store.lookup(key4) == image4
+    # image2 is still used by this job
+    assert store.lookup(key2) == image2
+
+    # Larger than the quota: kept until the next image is stored
+    BaseImageStore.unpin()
+    key3 = store.key("qemu", "3" * 64, None)
+    src.write_text("z" * 20)
+    assert store.store(key3, str(src)) == store.image(key3)
+    BaseImageStore.unpin()
+    assert store.lookup(key2) is None
+    assert store.lookup(key4) is None
+    assert store.lookup(key3) == store.image(key3)
+
+
+def test_base_image_store_failure(mocker, tmp_path, unpin):
+    store = BaseImageStore(str(tmp_path / "store"), DummyLogger(), quota=10)
+    key = store.key("qemu", "1" * 64, "xz")
+    src = tmp_path / "rootfs.img"
+    src.write_text("x" * 6)
+
+    mocker.patch("os.replace", side_effect=OSError(errno.EXDEV, "error"))
+    assert store.store(key, str(src)) is None
+    # The download is left in place for the job
+    assert src.read_text() == "x" * 6
+    assert os.listdir(os.path.dirname(store.image(key))) == []
+    assert BaseImageStore._pinned == {}
+
+
+def test_base_image_store_concurrent_evict(mocker, tmp_path, unpin):
+    store = BaseImageStore(str(tmp_path / "store"), DummyLogger(), quota=1)
+    other = BaseImageStore(str(tmp_path / "store"), DummyLogger(), quota=1)
+    key = store.key("qemu", "1" * 64, "xz")
+    src = tmp_path / "rootfs.img"
+    src.write_text("x" * 6)
+
+    replace = os.replace
+
+    def replace_and_evict(tmp_image, image):
+        replace(tmp_image, image)
+        # Another job evicting right after the image is published
+        other.evict(keep="")
+
+    mocker.patch("os.replace", side_effect=replace_and_evict)
+    image = store.store(key, str(src))
+    assert image == store.image(key)
+    assert os.path.exists(image)
+
+
+def test_base_image_overlay(mocker, tmp_path):
+    run = mocker.patch("subprocess.run")
+    BaseImageStore.overlay("/store/base.img", str(tmp_path / "rootfs.qcow2"))
+    run.assert_called_once_with(
+        [
+            "qemu-img",
+            "create",
+            "-f",
+            "qcow2",
+            "-F",
+            "raw",
+            "-b",
+            "/store/base.img",
+            str(tmp_path / "rootfs.qcow2"),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    run.side_effect = subprocess.CalledProcessError(
+        1, "qemu-img", stderr="No such file"
+    )
+    with pytest.raises(InfrastructureError, match="No such file"):
+        BaseImageStore.overlay("/store/base.img", str(tmp_path / "rootfs.qcow2"))
+
+
+def test_artifact_from_config(tmp_path):
+    assert ArtifactStore.from_config(None, DummyLogger()) is None
+    store = ArtifactStore.from_config(
+        {"artifact_store_dir": str(tmp_path), "artifact_store_quota": 3},
+        DummyLogger(),
+    )
+    assert store.path == str(tmp_path)
+    assert store.quota == 3 * 1024 * 1024
+
+
+def test_artifact_store(tmp_path):
+    store = ArtifactStore(str(tmp_path / "store"), DummyLogger(), quota=10)
+    job1 = tmp_path / "job1"
+    job1.mkdir()
+    key1 = store.key("artifact", "1" * 64, None)
+    assert not store.link(key1, str(job1 / "kernel"))
+    assert not (job1 / "kernel").exists()
+
+    # Stored as a hardlink of the downloaded file
+    (job1 / "kernel").write_text("x" * 6)
+    store.store(key1, str(job1 / "kernel"))
+    artifact1 = store.artifact(key1)
+    assert os.path.samefile(artifact1, job1 / "kernel")
+    assert os.stat(artifact1).st_mode & 0o777 == 0o444
+    assert os.stat(artifact1).st_nlink == 2
+    assert os.listdir(os.path.dirname(artifact1)) == [key1]
+
+    # Shared with the next job
+    job2 = tmp_path / "job2"
+    job2.mkdir()
+    (job2 / "kernel").write_text("x" * 6)
+    store.store(key1, str(job2 / "kernel"))
+    assert os.stat(artifact1).st_nlink == 3
+    job3 = tmp_path / "job3"
+    job3.mkdir()
+    assert store.link(key1, str(job3 / "kernel"))
+    assert os.stat(artifact1).st_nlink == 4
+    assert (job3 / "kernel").read_text() == "x" * 6
+
+    # Over quota: the artifacts used by a job are kept
+    key2 = store.key("artifact", "2" * 64, "xz")
+    (job1 / "dtb").write_text("y" * 6)
+    store.store(key2, str(job1 / "dtb"))
+    assert os.path.exists(artifact1)
+    assert os.path.exists(store.artifact(key2))
+
+    # Until the jobs are done
+    for job in (job1, job2, job3):
+        (job / "kernel").unlink()
+    os.utime(artifact1, (0, 0))
+    key3 = store.key("artifact", "3" * 64, None)
+    (job2 / "ramdisk").write_text("z" * 2)
+    store.store(key3, str(job2 / "ramdisk"))
+    assert not os.path.exists(artifact1)
+    assert os.path.exists(store.artifact(key2))
+    assert os.path.exists(store.artifact(key3))
+
+
+def test_artifact_store_copy(mocker, tmp_path):
+    # Store and job directory on different filesystems
+    mocker.patch("os.link", side_effect=OSError(errno.EXDEV, "Invalid link"))
+    store = ArtifactStore(str(tmp_path / "store"), DummyLogger())
+    key = store.key("artifact", "1" * 64, None)
+    (tmp_path / "kernel").write_text("kernel")
+    store.store(key, str(tmp_path / "kernel"))
+    assert (tmp_path / "kernel").read_text() == "kernel"
+    assert not os.path.samefile(store.artifact(key), tmp_path / "kernel")
+    assert store.link(key, str(tmp_path / "kernel2"))
+    assert (tmp_path / "kernel2").read_text() == "kernel"
@@ -5,16 +5,82 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 from __future__ import annotations
 
+import os
 import subprocess
+import sys
+import threading
+import time
 from unittest.mock import ANY, call, patch
 
 import pytest
 
 from lava_dispatcher.action import Action
-from lava_dispatcher.utils.docker import DockerLogin, DockerRun
+from lava_dispatcher.utils import docker as docker_utils
+from lava_dispatcher.utils.docker import (
+    DockerContainer,
+    DockerLogin,
+    DockerRun,
+    get_docker_pool,
+)
 
 from ..test_basic import LavaDispatcherTestCase
 
+# Fake docker client: containers are files in $FAKE_DOCKER, "exec" runs the
+# command on the host and every call is appended to $FAKE_DOCKER/calls.
+FAKE_DOCKER = """\
+import os, sys, time
+state = os.environ["FAKE_DOCKER"]
+args = sys.argv[1:]
+with open(os.path.join(state, "calls"), "a") as f:
+    f.write(" ".join(args[:2]) + "\\n")
+options = {a.split("=")[0]: a.split("=", 1)[-1] for a in args if "=" in a}
+if args[0] == "events":
+    name = args[args.index("--filter") + 1].split("=", 1)[1]
+    while not os.path.exists(os.path.join(state, name)):
+        time.sleep(0.05)
+    print("start", flush=True)
+    time.sleep(60)
+elif args[0] == "inspect":
+    if not os.path.exists(os.path.join(state, args[-1])):
+        sys.exit(1)
+    print("true")
+elif args[0] == "run":
+    open(os.path.join(state, options["--name"]), "w").close()
+elif args[0] == "exec":
+    os.execvp(args[2], args[2:])
+"""
+
+
+class FakeDocker:
+    def __init__(self, state):
+        self.state = state
+
+    def calls(self):
+        return (self.state / "calls").read_text().splitlines()
+
+
+@pytest.fixture(autouse=True)
+def docker_pool(mocker):
+    pool = docker_utils.DockerPool()
+    mocker.patch("lava_dispatcher.utils.docker.get_docker_pool", return_value=pool)
+    mocker.patch("lava_dispatcher.utils.containers.get_docker_pool", return_value=pool)
+    return pool
+
+
+@pytest.fixture
+def fake_docker(tmp_path, monkeypatch):
+    bindir = tmp_path / "bin"
+    bindir.mkdir()
+    state = tmp_path / "state"
+    state.mkdir()
+    docker = bindir / "docker"
+    docker.write_text(f"#!{sys.executable}\n" + FAKE_DOCKER)
+    docker.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bindir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_DOCKER", str(state))
+
+    return FakeDocker(state)
+
 
 @pytest.fixture
 def run():
@@ -270,24 +336,137 @@ def test_wait(mocker):
     docker = DockerRun("myimage")
     docker.name("foobar")
 
+    # "docker events" is not available
+    mocker.patch.object(DockerRun, "_wait_event", return_value=False)
     sleep = mocker.patch("time.sleep")
     inspect = mocker.patch(
-        "subprocess.check_call",
+        "subprocess.check_output",
         side_effect=[
             subprocess.CalledProcessError(
-                1, ["docker", "inspect", "--format=.", "foobar"]
+                1, ["docker", "inspect", "--format={{.State.Running}}", "foobar"]
             ),
-            None,
+            # Created but not started yet
+            "false\n",
+            "true\n",
         ],
     )
     docker.wait()
     call = mocker.call(
-        ["docker", "inspect", mocker.ANY, "foobar"],
-        stdout=subprocess.DEVNULL,
+        ["docker", "inspect", "--format={{.State.Running}}", "foobar"],
         stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    inspect.assert_has_calls([call, call, call])
+    assert sleep.call_count == 2
+
+
+def test_wait_event(fake_docker):
+    docker = DockerRun("myimage")
+    docker.name("foobar")
+
+    thread = threading.Thread(target=docker.wait)
+    thread.start()
+    thread.join(0.5)
+    assert thread.is_alive()
+    (fake_docker.state / "foobar-lava").touch()
+    thread.join(0.5)
+    assert thread.is_alive()
+
+    start = time.monotonic()
+    (fake_docker.state / "foobar").touch()
+    thread.join(10)
+    assert not thread.is_alive()
+    assert time.monotonic() - start < 5
+    # Inspected once, then waiting for the events
+    assert fake_docker.calls() == [
+        "inspect --format={{.State.Running}}",
+        "events --since",
+    ]
+
+    # Already started
+    docker.wait()
+    assert fake_docker.calls()[-1] == "inspect --format={{.State.Running}}"
+
+
+def test_wait_file(fake_docker, tmp_path):
+    docker = DockerRun("myimage")
+    docker.name("foobar")
+    filename = tmp_path / "ttyUSB0"
+
+    timer = threading.Timer(0.3, filename.touch)
+    timer.start()
+    docker.wait_file(str(filename))
+    timer.join()
+    # A single "docker exec" waiting in the container
+    assert fake_docker.calls() == ["exec foobar"]
+
+    with pytest.raises(subprocess.CalledProcessError):
+        docker.wait_file(str(tmp_path / "ttyUSB1"), 0.2)
+
+
+def test_wait_file_fallback(mocker):
+    docker = DockerRun("myimage")
+    docker.name("foobar")
+    mocker.patch("time.sleep")
+    # The container is not running yet, then the file is missing once
+    check_call = mocker.patch(
+        "subprocess.check_call",
+        side_effect=[
+            subprocess.CalledProcessError(1, ["docker", "exec"]),
+            subprocess.CalledProcessError(1, ["docker", "exec"]),
+            None,
+        ],
     )
-    inspect.assert_has_calls([call, call])
-    sleep.assert_called_once()
+    docker.wait_file("/dev/ttyUSB0")
+    assert [c.args[0][2:] for c in check_call.call_args_list] == [
+        ["foobar", "sh", "-c", ANY, "sh", "/dev/ttyUSB0", "-1"],
+        ["foobar", "test", "-e", "/dev/ttyUSB0"],
+        ["foobar", "test", "-e", "/dev/ttyUSB0"],
+    ]
+
+
+def test_prepare_once(mocker, docker_pool):
+    mocker.patch("lava_dispatcher.utils.docker.DockerRun._check_image_arch")
+    action = mocker.MagicMock()
+    DockerRun("myimage").prepare(action)
+    DockerRun("myimage").prepare(action)
+    DockerRun("otherimage").prepare(action)
+    assert action.run_cmd.call_args_list == [
+        call(["docker", "pull", "myimage"], env=ANY),
+        call(["docker", "pull", "otherimage"], env=ANY),
+    ]
+
+
+def test_warm_containers(mocker, fake_docker, docker_pool):
+    from lava_dispatcher.utils.containers import DockerDriver
+
+    mocker.patch("lava_dispatcher.utils.containers.remove_device_container_mappings")
+    action = mocker.MagicMock()
+    action.containers = []
+    action.level = "1.2"
+    action.job.job_id = "42"
+    action.job.device = {"actions": {}}
+    action.job.parameters = {"dispatcher": {"docker_warm_containers": True}}
+    action.run_cmd.side_effect = lambda cmd, **kwargs: subprocess.check_call(cmd)
+    driver = DockerDriver(action, {"image": "myimage"})
+
+    driver.run(["true"])
+    driver.run(["true"])
+    assert [c for c in fake_docker.calls() if c.startswith("run")] == ["run --detach"]
+    assert len(action.containers) == 1
+    container = action.containers[0]
+    assert isinstance(container, DockerContainer)
+
+    # Removed from the pool once destroyed
+    container.destroy()
+    assert docker_pool.containers == {}
+
+    # Without the option, one container per command
+    action.job.parameters = {"dispatcher": {}}
+    driver.run(["true"])
+    driver.run(["true"])
+    assert len(action.containers) == 3
+    assert docker_pool.containers == {}
 
 
 def test_add_device_method_options():
@@ -526,6 +526,46 @@ class TestTarToDebugfsCommands(unittest.TestCase):
                 _tar_to_debugfs_commands(MagicMock(), tar_path, "/", extract_dir)
             self.assertIn("Path traversal", str(ctx.exception))
 
+    def test_compressed_tar(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for mode, compress in (("w:gz", None), ("w:gz", "gzip"), ("w:xz", "xz")):
+                tar_path = os.path.join(tmpdir, "test.tar.%s" % mode[2:])
+                with tarfile.open(tar_path, mode) as tar:
+                    for name in ("b/file", "a"):
+                        info = tarfile.TarInfo(name=name)
+                        info.size = 5
+                        tar.addfile(info, io.BytesIO(b"hello"))
+                extract_dir = os.path.join(tmpdir, "extract-%s" % compress)
+                os.makedirs(extract_dir)
+                commands = _tar_to_debugfs_commands(
+                    MagicMock(), tar_path, "/", extract_dir, compress=compress
+                )
+                writes = [c for c in commands if c.startswith("write ")]
+                self.assertEqual(
+                    writes,
+                    [
+                        f'write "{extract_dir}/a" "/a"',
+                        f'write "{extract_dir}/b/file" "/b/file"',
+                    ],
+                )
+                with open(os.path.join(extract_dir, "b", "file")) as f:
+                    self.assertEqual(f.read(), "hello")
+
+    def test_truncated_tar_raises_job_error(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tar_path = os.path.join(tmpdir, "test.tar.gz")
+            with tarfile.open(tar_path, "w:gz") as tar:
+                info = tarfile.TarInfo(name="file")
+                info.size = 1024 * 1024
+                tar.addfile(info, io.BytesIO(os.urandom(info.size)))
+            with open(tar_path, "r+b") as f:
+                f.truncate(os.path.getsize(tar_path) // 2)
+            extract_dir = os.path.join(tmpdir, "extract")
+            os.makedirs(extract_dir)
+            with self.assertRaises(JobError) as ctx:
+                _tar_to_debugfs_commands(MagicMock(), tar_path, "/", extract_dir)
+            self.assertIn("Failed to read tar", str(ctx.exception))
+
     def test_invalid_tar_raises_job_error(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             bad_tar = os.path.join(tmpdir, "bad.tar")
@@ -773,13 +813,27 @@ class TestInjectTar(unittest.TestCase):
 
     @patch("lava_dispatcher.utils.ext4._run_debugfs")
     @patch("lava_dispatcher.utils.ext4._ext4_free_bytes", return_value=100 * 4096)
-    @patch("lava_dispatcher.utils.ext4._tar_payload_bytes", return_value=500 * 4096)
-    def test_preflight_rejects_insufficient_space(
-        self, mock_payload, mock_free, mock_run
-    ):
-        with self.assertRaises(JobError) as ctx:
-            inject_tar(MagicMock(), "/tmp/image.ext4", "/tmp/overlay.tar", "/")
+    def test_preflight_rejects_insufficient_space(self, mock_free, mock_run):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tar_path = os.path.join(tmpdir, "overlay.tar.gz")
+            with tarfile.open(tar_path, "w:gz") as tar:
+                for name in ("small", "big", "last"):
+                    info = tarfile.TarInfo(name=name)
+                    info.size = 60 * 4096
+                    tar.addfile(info, io.BytesIO(b"\0" * info.size))
+            extracted = []
+
+            def makedirs(path, exist_ok):
+                extracted.append(path)
+
+            with (
+                self.assertRaises(JobError) as ctx,
+                patch("lava_dispatcher.utils.ext4.os.makedirs", side_effect=makedirs),
+            ):
+                inject_tar(MagicMock(), "/tmp/image.ext4", tar_path, "/")
         self.assertIn("Not enough free space", str(ctx.exception))
+        # Stopped before extracting the member that does not fit
+        self.assertEqual(len(extracted), 1)
         mock_run.assert_not_called()
 
     @patch("lava_dispatcher.utils.ext4._run_debugfs")
@@ -794,18 +848,18 @@ class TestInjectTar(unittest.TestCase):
 
     @patch("lava_dispatcher.utils.ext4._run_debugfs")
     @patch("lava_dispatcher.utils.ext4._tar_to_debugfs_commands")
+    @patch("lava_dispatcher.utils.ext4._ext4_free_bytes", return_value=4096)
     @patch("lava_dispatcher.utils.compression.decompress_file")
-    @patch("os.path.exists", return_value=False)
-    @patch("os.unlink")
-    def test_gzip_decompression(
-        self, mock_unlink, mock_exists, mock_decompress, mock_cmds, mock_run
-    ):
-        mock_decompress.return_value = "/tmp/overlay.tar"
+    def test_gzip_streamed(self, mock_decompress, mock_free, mock_cmds, mock_run):
         mock_cmds.return_value = ["mkdir /foo"]
-        inject_tar(
-            MagicMock(), "/tmp/image.ext4", "/tmp/overlay.tar.gz", "/", compress="gzip"
+        action = MagicMock()
+        inject_tar(action, "/tmp/image.ext4", "/tmp/overlay.tar.gz", "/", "gzip")
+        mock_decompress.assert_not_called()
+        args, kwargs = mock_cmds.call_args
+        self.assertEqual(
+            args[:2] + args[4:], (action, "/tmp/overlay.tar.gz", "/tmp/image.ext4")
         )
-        mock_decompress.assert_called_once_with("/tmp/overlay.tar.gz", "gz")
+        self.assertEqual(kwargs, {"compress": "gzip", "free_bytes": 4096})
 
     def test_unsupported_compression(self):
         with self.assertRaises(JobError) as ctx:
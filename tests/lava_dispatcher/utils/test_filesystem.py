@@ -1,34 +1,68 @@
 # Copyright (C) 2026 Linaro Limited
 #
 # SPDX-License-Identifier: GPL-2.0-or-later
+import io
 import os
+import sys
 import tarfile
 import tempfile
 import unittest
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
-from lava_dispatcher.utils.filesystem import copy_in_overlay, prepare_guestfs
+from lava_common.exceptions import JobError
+from lava_dispatcher.utils.filesystem import (
+    copy_in_overlay,
+    copy_overlay_to_sparse_fs,
+    prepare_guestfs,
+)
 
 
 class TestOverlayBackendDeployParam(unittest.TestCase):
     @patch("lava_dispatcher.utils.ext4.inject_tar")
-    @patch(
-        "lava_dispatcher.utils.filesystem.decompress_file",
-        return_value="/tmp/overlay.tar",
-    )
-    @patch("lava_dispatcher.utils.filesystem.os.path.exists", return_value=False)
     @patch(
         "lava_dispatcher.utils.filesystem._resolve_backend", return_value="e2fsprogs"
     )
-    def test_copy_in_overlay_passes_deploy_parameters(
-        self, mock_resolve, mock_exists, mock_decompress, mock_inject
-    ):
+    def test_copy_in_overlay_passes_deploy_parameters(self, mock_resolve, mock_inject):
         action = MagicMock()
         action.parameters = {"overlay_backend": "e2fsprogs"}
         copy_in_overlay(action, "/tmp/img.ext4", None, "/tmp/overlay.tar.gz")
         mock_resolve.assert_called_once_with(action.parameters)
-        mock_inject.assert_called_once_with(action, "/tmp/img.ext4", "/tmp/overlay.tar")
+        # The compressed overlay is injected without decompressing it first
+        mock_inject.assert_called_once_with(
+            action, "/tmp/img.ext4", "/tmp/overlay.tar.gz"
+        )
+
+
+class TestCopyOverlayToSparseFsGuestfs(unittest.TestCase):
+    def _copy(self, bavail):
+        guestfs = MagicMock()
+        guest = guestfs.GuestFS.return_value
+        guest.list_devices.return_value = ["/dev/sda"]
+        guest.statvfs.return_value = {"bavail": bavail, "bsize": 4096}
+        action = MagicMock()
+        action.parameters = {"overlay_backend": "guestfs"}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            overlay = os.path.join(tmpdir, "overlay.tar.gz")
+            with tarfile.open(overlay, "w:gz") as tar:
+                info = tarfile.TarInfo(name="lava-1/run.sh")
+                info.size = 5000
+                tar.addfile(info, io.BytesIO(b"\0" * info.size))
+            with patch.dict(sys.modules, {"guestfs": guestfs}):
+                copy_overlay_to_sparse_fs(action, "/tmp/system.ext4", overlay)
+            # Not decompressed on disk
+            self.assertEqual(os.listdir(tmpdir), ["overlay.tar.gz"])
+        return guest, overlay
+
+    def test_tar_in_compressed(self):
+        guest, overlay = self._copy(bavail=2)
+        guest.tar_in.assert_called_once_with(overlay, "/", compress="gzip")
+        guest.umount.assert_called_once_with("/dev/sda")
+        guest.df.assert_not_called()
+
+    def test_not_enough_space(self):
+        with self.assertRaisesRegex(JobError, "Not enough free space"):
+            self._copy(bavail=1)
 
 
 class TestPrepareGuestfs(unittest.TestCase):
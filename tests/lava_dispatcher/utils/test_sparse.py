@@ -0,0 +1,200 @@
+# Copyright (C) 2026 Linaro Limited
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from lava_common.exceptions import JobError
+from lava_dispatcher.utils.sparse import (
+    CHUNK_HEADER,
+    CHUNK_TYPE_CRC32,
+    CHUNK_TYPE_DONT_CARE,
+    CHUNK_TYPE_FILL,
+    CHUNK_TYPE_RAW,
+    FILE_HEADER,
+    SPARSE_HEADER_MAGIC,
+    SparseImage,
+    is_sparse,
+)
+
+BLOCK_SIZE = 4096
+# Blocks that are not fill patterns
+BLOCK_A = bytes(range(256)) * 16
+BLOCK_B = bytes(reversed(range(256))) * 16
+BLOCK_C = bytes(i * 7 % 256 for i in range(BLOCK_SIZE))
+
+
+def sparse_fixture(path, chunks, block_size=BLOCK_SIZE):
+    """
+    Write a sparse image made of the given (kind, blocks, payload) chunks
+    """
+    total_blocks = sum(blocks for kind, blocks, _ in chunks if kind != CHUNK_TYPE_CRC32)
+    with open(path, "wb") as f_out:
+        f_out.write(
+            FILE_HEADER.pack(
+                SPARSE_HEADER_MAGIC,
+                1,
+                0,
+                FILE_HEADER.size,
+                CHUNK_HEADER.size,
+                block_size,
+                total_blocks,
+                len(chunks),
+                0,
+            )
+        )
+        for kind, blocks, payload in chunks:
+            f_out.write(
+                CHUNK_HEADER.pack(kind, 0, blocks, CHUNK_HEADER.size + len(payload))
+            )
+            f_out.write(payload)
+    return str(path)
+
+
+@pytest.fixture
+def image(tmp_path):
+    return sparse_fixture(
+        tmp_path / "system.img",
+        [
+            (CHUNK_TYPE_RAW, 2, BLOCK_A + BLOCK_B),
+            (CHUNK_TYPE_CRC32, 0, b"\x12\x34\x56\x78"),
+            (CHUNK_TYPE_DONT_CARE, 100, b""),
+            (CHUNK_TYPE_FILL, 3, b"\xde\xad\xbe\xef"),
+            (CHUNK_TYPE_FILL, 50, b"\0\0\0\0"),
+            (CHUNK_TYPE_RAW, 1, BLOCK_C),
+        ],
+    )
+
+
+def expected_raw():
+    return (
+        BLOCK_A
+        + BLOCK_B
+        + b"\0" * 100 * BLOCK_SIZE
+        + b"\xde\xad\xbe\xef" * 3 * (BLOCK_SIZE // 4)
+        + b"\0" * 50 * BLOCK_SIZE
+        + BLOCK_C
+    )
+
+
+def test_parse(image, tmp_path):
+    assert is_sparse(image)
+    sparse = SparseImage(image)
+    assert sparse.block_size == BLOCK_SIZE
+    assert sparse.total_blocks == 156
+    assert [(c.kind, c.block, c.blocks) for c in sparse.chunks] == [
+        (CHUNK_TYPE_RAW, 0, 2),
+        (CHUNK_TYPE_DONT_CARE, 2, 100),
+        (CHUNK_TYPE_FILL, 102, 3),
+        (CHUNK_TYPE_FILL, 105, 50),
+        (CHUNK_TYPE_RAW, 155, 1),
+    ]
+    assert sparse.zero_fills() == [(105, 155)]
+
+    raw = tmp_path / "raw.img"
+    raw.write_bytes(b"\0" * BLOCK_SIZE)
+    assert not is_sparse(str(raw))
+    with pytest.raises(JobError, match="not an Android sparse image"):
+        SparseImage(str(raw))
+
+    with pytest.raises(JobError, match="Unknown chunk type 0x1234"):
+        SparseImage(sparse_fixture(tmp_path / "bad.img", [(0x1234, 1, b"")]))
+
+    truncated = tmp_path / "truncated.img"
+    truncated.write_bytes(Path(image).read_bytes()[: FILE_HEADER.size + 4])
+    with pytest.raises(JobError, match="Truncated sparse image"):
+        SparseImage(str(truncated))
+
+
+def test_unsparse(image, tmp_path):
+    raw = tmp_path / "system.raw"
+    SparseImage(image).unsparse(str(raw))
+    assert raw.read_bytes() == expected_raw()
+    # Zero filled and "don't care" chunks are holes
+    assert raw.stat().st_blocks * 512 < 20 * BLOCK_SIZE
+
+
+def test_resparse(image, tmp_path):
+    sparse = SparseImage(image)
+    raw = tmp_path / "system.raw"
+    sparse.unsparse(str(raw))
+    # Write into the "don't care" and zero filled chunks
+    with open(raw, "r+b") as f_out:
+        f_out.seek(10 * BLOCK_SIZE)
+        f_out.write(b"d" * BLOCK_SIZE)
+        f_out.seek(120 * BLOCK_SIZE)
+        f_out.write(b"e" * BLOCK_SIZE)
+
+    dest = tmp_path / "new.img"
+    sparse.resparse(str(raw), str(dest))
+    new = SparseImage(str(dest))
+    assert [(c.kind, c.block, c.blocks, c.fill) for c in new.chunks] == [
+        (CHUNK_TYPE_RAW, 0, 2, b""),
+        (CHUNK_TYPE_DONT_CARE, 2, 8, b""),
+        (CHUNK_TYPE_FILL, 10, 1, b"dddd"),
+        (CHUNK_TYPE_DONT_CARE, 11, 91, b""),
+        (CHUNK_TYPE_FILL, 102, 3, b"\xde\xad\xbe\xef"),
+        (CHUNK_TYPE_FILL, 105, 15, b"\0\0\0\0"),
+        (CHUNK_TYPE_FILL, 120, 1, b"eeee"),
+        (CHUNK_TYPE_FILL, 121, 34, b"\0\0\0\0"),
+        (CHUNK_TYPE_RAW, 155, 1, b""),
+    ]
+
+    # Round trip
+    expected = bytearray(expected_raw())
+    expected[10 * BLOCK_SIZE : 11 * BLOCK_SIZE] = b"d" * BLOCK_SIZE
+    expected[120 * BLOCK_SIZE : 121 * BLOCK_SIZE] = b"e" * BLOCK_SIZE
+    again = tmp_path / "again.raw"
+    new.unsparse(str(again))
+    assert again.read_bytes() == bytes(expected)
+
+    if shutil.which("simg2img"):
+        simg = tmp_path / "simg.raw"
+        subprocess.run(["simg2img", str(dest), str(simg)], check=True)
+        assert simg.read_bytes() == bytes(expected)
+
+
+@pytest.mark.skipif(
+    not shutil.which("mke2fs") or not shutil.which("debugfs"),
+    reason="e2fsprogs not installed",
+)
+def test_ext4_round_trip(tmp_path):
+    # Build a sparse ext4 image
+    fs = tmp_path / "fs.raw"
+    subprocess.run(
+        ["mke2fs", "-q", "-F", "-t", "ext4", "-b", str(BLOCK_SIZE), str(fs), "8M"],
+        check=True,
+    )
+    template = SparseImage(
+        sparse_fixture(tmp_path / "empty.img", [(CHUNK_TYPE_DONT_CARE, 2048, b"")])
+    )
+    image = tmp_path / "system.img"
+    template.resparse(str(fs), str(image))
+
+    # Expand, write a file and build the sparse image again
+    sparse = SparseImage(str(image))
+    raw = tmp_path / "system.raw"
+    sparse.unsparse(str(raw))
+    hello = tmp_path / "hello.txt"
+    hello.write_text("hello world\n")
+    subprocess.run(
+        ["debugfs", "-w", "-R", f"write {hello} hello.txt", str(raw)],
+        check=True,
+        capture_output=True,
+    )
+    sparse.resparse(str(raw), str(image))
+
+    result = tmp_path / "result.raw"
+    SparseImage(str(image)).unsparse(str(result))
+    assert result.read_bytes() == raw.read_bytes()
+    output = subprocess.run(
+        ["debugfs", "-R", "cat /hello.txt", str(result)],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    assert output.stdout == "hello world\n"
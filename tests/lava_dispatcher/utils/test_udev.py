@@ -0,0 +1,141 @@
+# Copyright (C) 2026 Linaro Limited
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from lava_dispatcher.utils.udev import (
+    UdevIndex,
+    get_udev_devices,
+    wait_udev_changed_event,
+    wait_udev_event,
+)
+
+
+class Attributes:
+    def asstring(self, name):
+        raise KeyError(name)
+
+
+class Device:
+    def __init__(self, name, subsystem="usb", devtype=None, action=None, **props):
+        self.sys_path = f"/sys/devices/{name}"
+        self.subsystem = subsystem
+        self.device_type = devtype
+        self.action = action
+        self.device_node = f"/dev/{name}"
+        self.device_links = [f"/dev/serial/by-id/{name}"]
+        self.children = []
+        self.properties = dict(props, DEVNAME=self.device_node)
+        if action:
+            self.properties["ACTION"] = action
+        self.attributes = Attributes()
+
+
+class Context:
+    sys_path = "/sys"
+
+    def __init__(self, devices):
+        self.devices = devices
+        self.enumerations = 0
+
+    def list_devices(self):
+        self.enumerations += 1
+        return list(self.devices)
+
+
+@pytest.fixture
+def index(mocker):
+    context = Context(
+        [
+            Device("board1", ID_SERIAL_SHORT="1234", ID_VENDOR_ID="18d1"),
+            Device("board2", ID_VENDOR_ID="0525", ID_MODEL_ID="a4a7"),
+            Device("sda1", subsystem="block", ID_FS_LABEL="V2M_MPS2"),
+            Device("null", subsystem="mem"),
+        ]
+    )
+    index = UdevIndex(context)
+    mocker.patch("lava_dispatcher.utils.udev.get_udev_index", return_value=index)
+    return index
+
+
+def test_get_udev_devices(index):
+    device_info = [
+        {"board_id": "1234", "usb_vendor_id": "18d1"},
+        {"usb_vendor_id": "0525", "usb_product_id": "a4a7"},
+        {"fs_label": "V2M_MPS2"},
+    ]
+    assert sorted(get_udev_devices(device_info=device_info)) == [
+        "/dev/board1",
+        "/dev/board2",
+        "/dev/sda1",
+        "/dev/serial/by-id/board1",
+        "/dev/serial/by-id/board2",
+        "/dev/serial/by-id/sda1",
+    ]
+    # Devices are enumerated once for all the entries
+    assert index.context.enumerations == 1
+
+    assert get_udev_devices(device_info=[{"board_id": "1234"}])
+    assert (
+        get_udev_devices(device_info=[{"board_id": "1234", "usb_vendor_id": "0"}]) == []
+    )
+    assert get_udev_devices(device_info=[{"board_id": "4321"}]) == []
+
+
+def test_get_udev_devices_monitored(index):
+    index.observers = [Mock()]
+    index.refresh()
+    for _ in range(3):
+        assert get_udev_devices(device_info=[{"board_id": "1234"}])
+    # The monitors keep the index current
+    assert index.context.enumerations == 1
+
+
+def test_index_events(index):
+    index.refresh()
+    device = Device("board3", action="add", ID_SERIAL_SHORT="5678")
+    index._event("udev", device)
+    assert index.find(serial="5678") == [device]
+
+    # Kernel events do not drop the properties set by udev
+    index._event("kernel", Device("board3", action="change"))
+    assert index.find(serial="5678") == [device]
+    assert index.devices[device.sys_path][1]["ACTION"] == "change"
+
+    index._event("udev", Device("board3", action="remove"))
+    assert index.find(serial="5678") == []
+    assert index.by_serial.keys() == {"1234"}
+
+
+def test_wait_udev_event(index):
+    index.observers = [Mock()]
+    index.refresh()
+    # Already plugged-in
+    wait_udev_event(match_dict={"ID_SERIAL_SHORT": "1234"})
+
+    def add(*events):
+        for event in events:
+            index._event("udev", event)
+
+    for wait, action in ((wait_udev_event, "add"), (wait_udev_changed_event, "change")):
+        thread = threading.Thread(
+            target=wait,
+            kwargs={"match_dict": {"ID_SERIAL_SHORT": "5678"}, "subsystem": "tty"},
+        )
+        thread.start()
+        # Wait for the thread to block on the index
+        while not index.changed._waiters:
+            thread.join(0.01)
+        add(
+            Device("other", subsystem="tty", action=action, ID_SERIAL_SHORT="0"),
+            Device("usb", subsystem="usb", action=action, ID_SERIAL_SHORT="5678"),
+        )
+        thread.join(0.1)
+        assert thread.is_alive()
+        add(Device("tty", subsystem="tty", action=action, ID_SERIAL_SHORT="5678"))
+        thread.join(5)
+        assert not thread.is_alive()
@@ -8,10 +8,14 @@ from pathlib import Path
 
 import pytest
 
-from lava_common.device_mappings import add_device_container_mapping, load_mapping_data
+from lava_common.device_mappings import (
+    add_device_container_mapping,
+    load_mapping_data,
+    remove_device_container_mappings,
+)
 from lava_common.exceptions import InfrastructureError
 from lava_common.yaml import yaml_safe_load
-from lava_dispatcher_host.utils import share_device_with_container
+from lava_dispatcher_host.utils import MappingIndex, share_device_with_container
 
 
 @pytest.fixture(autouse=True)
@@ -66,7 +70,7 @@ def device_links(pyudev):
 
 @pytest.fixture
 def pass_device_docker(mocker):
-    return mocker.patch("lava_dispatcher_host.utils.pass_device_into_container_docker")
+    return mocker.patch("lava_dispatcher_host.utils.pass_devices_into_container_docker")
 
 
 def test_simple_share_device_with_container(mocker, pass_device_docker, device_links):
@@ -77,7 +81,7 @@ def test_simple_share_device_with_container(mocker, pass_device_docker, device_l
     add_device_container_mapping("1", {"serial_number": "1234567890"}, "mycontainer")
     share_device_with_container(Namespace(device="foo/bar", serial_number="1234567890"))
     pass_device_docker.assert_called_once_with(
-        "mycontainer", "/dev/foo/bar", "/dev/foo/bar", device_links, "1"
+        "mycontainer", "/dev/foo/bar", [("/dev/foo/bar", list(device_links))], "1"
     )
 
 
@@ -108,7 +112,7 @@ def test_mapping_with_serial_number_but_called_with_vendor_product_id_too(
     )
 
     pass_device_docker.assert_called_once_with(
-        "mycontainer", "/dev/foo/bar", "/dev/foo/bar", device_links, "1"
+        "mycontainer", "/dev/foo/bar", [("/dev/foo/bar", list(device_links))], "1"
     )
 
 
@@ -122,7 +126,7 @@ def test_two_concurrent_jobs(mocker, pass_device_docker, device_links):
     share_device_with_container(Namespace(device="baz/qux", serial_number="9876543210"))
 
     pass_device_docker.assert_called_once_with(
-        "container2", "/dev/baz/qux", "/dev/baz/qux", device_links, "2"
+        "container2", "/dev/baz/qux", [("/dev/baz/qux", list(device_links))], "2"
     )
 
 
@@ -151,7 +155,10 @@ def test_map_by_vendor_id_and_product_id(mocker, pass_device_docker, device_link
         )
     )
     pass_device_docker.assert_called_once_with(
-        "container1", "/dev/bus/usb/001/099", "/dev/bus/usb/001/099", device_links, "1"
+        "container1",
+        "/dev/bus/usb/001/099",
+        [("/dev/bus/usb/001/099", list(device_links))],
+        "1",
     )
 
 
@@ -282,6 +289,29 @@ def test_mapping_for_new_container_overrides_previous_mapping(tmp_path):
     assert data[0]["container"] == "mycontainer2"
 
 
+def test_mapping_index(mocker):
+    load = mocker.patch(
+        "lava_dispatcher_host.utils.load_mapping_data", wraps=load_mapping_data
+    )
+    index = MappingIndex()
+    options = Namespace(device="foo/bar", serial_number="1234567890")
+    add_device_container_mapping("1", {"serial_number": "1234567890"}, "mycontainer")
+    assert index.find(options)[0]["container"] == "mycontainer"
+    assert index.find(options) == index.find(options)
+    # Parsed once
+    assert load.call_count == 1
+
+    # Registering another container
+    add_device_container_mapping("1", {"serial_number": "1234567890"}, "other")
+    assert index.find(options)[0]["container"] == "other"
+    assert load.call_count == 2
+
+    # Unregistering
+    remove_device_container_mappings("1")
+    assert index.find(options) == (None, None)
+    assert index.files == {}
+
+
 class TestLoadMapping:
     @pytest.fixture
     def mapping(self, tmp_path):
@@ -5,9 +5,14 @@
 #
 # SPDX-License-Identifier: GPL-2.0-or-later
 
+import asyncio
+import json
+import os
+import threading
+
 import pytest
 
-from lava_dispatcher_host.server import CommandHandler, ShareCommand
+from lava_dispatcher_host.server import CommandHandler, ServerWrapper, ShareCommand
 
 
 @pytest.fixture
@@ -23,3 +28,52 @@ class TestCommandHandler:
         options = share_device_with_container.call_args[0][0]
         assert options.device == "/dev/foobar"
         assert options.serial == "0123456789"
+
+
+class TestServerWrapper:
+    def test_concurrent_requests(self, mocker, tmp_path):
+        mocker.patch(
+            "lava_dispatcher_host.server.find_mapping",
+            side_effect=lambda options: ({"container": options.container}, "1"),
+        )
+        release = threading.Event()
+        handled = []
+
+        def handle(self, command):
+            if command.options.device == "blocked":
+                release.wait(10)
+            handled.append(command.options.device)
+
+        mocker.patch.object(CommandHandler, "handle", handle)
+        server = ServerWrapper(str(tmp_path / "socket"))
+
+        async def request(data):
+            reader, writer = await asyncio.open_unix_connection(server.socket)
+            writer.write(json.dumps(data).encode())
+            writer.write_eof()
+            response = json.loads(await reader.read())
+            writer.close()
+            return response["result"]
+
+        async def scenario():
+            task = asyncio.create_task(server.start())
+            while not os.path.exists(server.socket):
+                await asyncio.sleep(0.01)
+            first = asyncio.create_task(
+                request({"device": "blocked", "container": "a"})
+            )
+            await asyncio.sleep(0.1)
+            second = asyncio.create_task(request({"device": "after", "container": "a"}))
+            await asyncio.sleep(0.1)
+            # Another container is not blocked
+            assert await request({"device": "other", "container": "b"}) == "OK"
+            assert handled == ["other"]
+            release.set()
+            assert await first == "OK"
+            assert await second == "OK"
+            task.cancel()
+
+        asyncio.run(scenario())
+        # The requests for the same container are handled in order
+        assert handled == ["other", "blocked", "after"]
+        assert server.locks == {}
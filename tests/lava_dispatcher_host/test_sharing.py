@@ -67,13 +67,38 @@ class TestDocker:
         link = "/dev/ttyUSB1"
         pyudev.Devices.from_device_file.return_value.device_links = [link]
         share_device_with_container_docker("container", dev, "1")
-        call.assert_called_with(
+        # The node and its links are created with a single "docker exec"
+        call.assert_called_once_with(
             [
                 "docker",
                 "exec",
                 "container",
                 "sh",
                 "-c",
+                f"mkdir -p /dev/bus/usb/001 && mknod {dev} c 189 2 && chown 999:999 {dev} && chmod 664 {dev}; "
                 f"mkdir -p /dev && ln -f -s {dev} {link}",
             ]
         )
+
+    def test_children(self, check_output, call, mocker, pyudev):
+        check_output.return_value = "123456"  # get container_id
+        mocker.patch("lava_dispatcher_host.open", mocker.mock_open())
+        device_filter = mocker.patch("lava_dispatcher_host.utils.DeviceFilter")
+        dev = "/dev/bus/usb/001/001"
+        device = pyudev.Devices.from_device_file.return_value
+        device.device_links = []
+        children = []
+        for i in range(3):
+            child = mocker.Mock(device_node=f"/dev/ttyUSB{i}", device_links=[])
+            children.append(child)
+        children.append(mocker.Mock(device_node=None))
+        device.children = children
+
+        share_device_with_container_docker("container", dev, "1")
+        # One device filter update and one "docker exec" for all the nodes
+        assert device_filter.return_value.add.call_count == 4
+        device_filter.return_value.apply.assert_called_once()
+        call.assert_called_once()
+        script = call.call_args[0][0][-1]
+        assert script.count("mknod") == 4
+        assert "mknod /dev/ttyUSB2 c 189 2" in script
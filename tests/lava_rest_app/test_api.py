@@ -1633,6 +1633,41 @@ ok 2 bar
         assert response.status_code == 201  # nosec - unit test support
         assert TestJob.objects.count() == 3  # nosec - unit test support
 
+    def test_submit_bulk(self):
+        response = self.userclient.post(
+            reverse("api-root", args=[self.version]) + "jobs/bulk/",
+            {"definitions": [EXAMPLE_WORKING_JOB, EXAMPLE_WORKING_JOB]},
+            format="json",
+        )
+        assert response.status_code == 201  # nosec - unit test support
+        job_ids = json.loads(response.content)["job_ids"]
+        assert len(job_ids) == 2  # nosec - unit test support
+        assert job_ids[0] < job_ids[1]  # nosec - unit test support
+        assert TestJob.objects.count() == 4  # nosec - unit test support
+
+    def test_submit_bulk_unauthorized(self):
+        response = self.userclient.post(
+            reverse("api-root", args=[self.version]) + "jobs/bulk/",
+            {
+                "definitions": [
+                    EXAMPLE_WORKING_JOB,
+                    EXAMPLE_WORKING_JOB_RESTRICTED_DEVICE_TYPE,
+                ]
+            },
+            format="json",
+        )
+        assert response.status_code == 400  # nosec - unit test support
+        # No job is created
+        assert TestJob.objects.count() == 2  # nosec - unit test support
+
+    def test_submit_bulk_bad_request(self):
+        response = self.userclient.post(
+            reverse("api-root", args=[self.version]) + "jobs/bulk/",
+            {"definitions": EXAMPLE_WORKING_JOB},
+            format="json",
+        )
+        assert response.status_code == 400  # nosec - unit test support
+
     def test_resubmit_unauthorized(self):
         response = self.userclient.post(
             reverse("api-root", args=[self.version])
@@ -10,7 +10,9 @@ import django_filters.rest_framework as drf_filters
 import pytest
 from django.http import QueryDict
 
+from lava_rest_app import filters
 from lava_rest_app.filters import MetadataFilterMixin
+from lava_results_app.models import TestCase, TestSuite
 from lava_scheduler_app.models import TestJob, User
 
 
@@ -50,3 +52,33 @@ def test_metadata_filter_on_plain_filterset():
     assert qs("metadata__build_id__startswith=12").count() == 1
     assert qs("metadata__has_key=build_id").count() == 2
     assert qs('metadata__contains={"build_id": "5678"}').count() == 1
+
+
+@pytest.mark.django_db
+def test_testcase_metadata_filter():
+    user = User.objects.create_user("user")
+    job = TestJob.objects.create(submitter=user)
+    suite = TestSuite.objects.create(job=job, name="lava")
+    TestCase.objects.create(
+        suite=suite,
+        name="boot",
+        result=TestCase.RESULT_PASS,
+        metadata_json={"level": "1.3", "extra": {"n": 1}},
+    )
+    TestCase.objects.create(
+        suite=suite,
+        name="deploy",
+        result=TestCase.RESULT_PASS,
+        metadata_json={"level": "1.4"},
+    )
+    TestCase.objects.create(suite=suite, name="test", result=TestCase.RESULT_PASS)
+
+    def qs(query):
+        return filters.TestCaseFilter(
+            data=QueryDict(query), queryset=TestCase.objects.all()
+        ).qs
+
+    assert qs("metadata_json__level=1.3").count() == 1
+    assert qs("metadata_json__level__startswith=1.").count() == 2
+    assert qs("metadata_json__has_key=extra").count() == 1
+    assert qs('metadata_json__contains={"extra": {"n": 1}}').count() == 1
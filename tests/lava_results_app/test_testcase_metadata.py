@@ -0,0 +1,104 @@
+# Copyright (C) 2026 Linaro Limited
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+import pytest
+from django.contrib.contenttypes.models import ContentType
+
+from lava_common.yaml import yaml_safe_load
+from lava_results_app.dbutils import map_scanned_results
+from lava_results_app.models import Query, TestCase, TestSuite
+from lava_results_app.utils import metadata_to_json
+from lava_scheduler_app.models import TestJob, User
+
+
+@pytest.fixture
+def job():
+    user = User.objects.create_user("user")
+    return TestJob.objects.create(submitter=user, definition="job_name: test\n")
+
+
+def test_metadata_to_json():
+    assert metadata_to_json({"case": "boot", "extra": {"size": 1.5}}) == {
+        "case": "boot",
+        "extra": {"size": 1.5},
+    }
+    # Values that JSON cannot represent are stored as strings
+    assert metadata_to_json({"when": b"now"}) == {"when": "b'now'"}
+    assert metadata_to_json({"size": float("nan")}) is None
+    assert metadata_to_json("case: boot") is None
+    assert metadata_to_json(None) is None
+
+
+@pytest.mark.django_db
+def test_map_scanned_results(job):
+    results = {
+        "case": "test-overlay",
+        "definition": "lava",
+        "level": "1.3.3.2",
+        "result": "pass",
+        "duration": 0.5,
+    }
+    testcase = map_scanned_results(
+        results=results, job=job, starttc=None, endtc=None, meta_filename=None
+    )
+    testcase.save()
+    testcase.refresh_from_db()
+    assert testcase.metadata_json == results
+    assert testcase.action_metadata == results
+
+    # Metadata too long: both columns keep the same stripped results
+    testcase = map_scanned_results(
+        results={
+            "case": "long",
+            "definition": "lava",
+            "result": "fail",
+            "error_msg": "x" * 5000,
+        },
+        job=job,
+        starttc=None,
+        endtc=None,
+        meta_filename=None,
+    )
+    assert testcase.metadata_json == {
+        "case": "long",
+        "definition": "lava",
+        "result": "fail",
+        "error_msg": "x" * 256,
+    }
+    assert yaml_safe_load(testcase.metadata) == testcase.metadata_json
+
+
+@pytest.mark.django_db
+def test_query_metadata_conditions(job):
+    suite = TestSuite.objects.create(job=job, name="lava")
+    TestCase.objects.create(
+        suite=suite,
+        name="boot",
+        result=TestCase.RESULT_PASS,
+        metadata_json={"level": "1.3", "extra": {"board": "rpi4"}},
+    )
+    TestCase.objects.create(
+        suite=suite,
+        name="deploy",
+        result=TestCase.RESULT_PASS,
+        metadata_json={"level": "1.4"},
+    )
+    TestCase.objects.create(suite=suite, name="test", result=TestCase.RESULT_PASS)
+
+    def names(content_type, conditions):
+        content_type = ContentType.objects.get_for_model(content_type)
+        return [
+            result.name if content_type.model_class() == TestCase else result.id
+            for result in Query.get_queryset(
+                content_type,
+                Query.parse_conditions(content_type, conditions),
+                order_by=("id",),
+            )
+        ]
+
+    assert names(TestCase, "metadata.level__1.3") == ["boot"]
+    assert names(TestCase, "metadata.level__startswith__1.") == ["boot", "deploy"]
+    assert names(TestCase, "metadata.extra.board__rpi4") == ["boot"]
+    # Through the relations
+    assert names(TestJob, "testcase__metadata.level__exact__1.4") == [job.id]
+    assert names(TestJob, "testcase__metadata.level__exact__2") == []
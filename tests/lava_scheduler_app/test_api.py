@@ -83,6 +83,31 @@ class TestSchedulerAPI(TestCaseWithFactory):
         else:
             self.fail("fault not raised")
 
+    def test_submit_bulk(self):
+        user = self.factory.ensure_user("test", "e@mail.invalid", "test")
+        device_type = self.factory.make_device_type(name="qemu")
+        self.factory.make_device(device_type=device_type, hostname="qemu-1")
+        definition = self.factory.make_job_data_from_file("qemu.yaml")
+        server = self.server_proxy("test", "test")
+
+        job_ids = server.scheduler.jobs.submit_bulk([definition, definition])
+        self.assertEqual(
+            job_ids,
+            list(
+                TestJob.objects.filter(submitter=user)
+                .order_by("id")
+                .values_list("id", flat=True)
+            ),
+        )
+
+        try:
+            server.scheduler.jobs.submit_bulk([definition, "{}"])
+        except xmlrpc.client.Fault as f:
+            self.assertEqual(400, f.faultCode)
+        else:
+            self.fail("fault not raised")
+        self.assertEqual(TestJob.objects.count(), 2)
+
     def test_new_devices(self):
         user = self.factory.ensure_user("test", "e@mail.invalid", "test")
         user.save()
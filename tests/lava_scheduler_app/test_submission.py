@@ -9,13 +9,14 @@ import logging
 import os
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 from django.contrib.auth.models import Group, Permission, User
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from lava_common.yaml import yaml_safe_dump, yaml_safe_load
-from lava_scheduler_app.dbutils import testjob_submission
+from lava_scheduler_app import signals
+from lava_scheduler_app.dbutils import testjob_bulk_submission, testjob_submission
 from lava_scheduler_app.models import (
     Alias,
     Device,
@@ -26,7 +27,12 @@ from lava_scheduler_app.models import (
     Tag,
     TestJob,
 )
-from lava_scheduler_app.notifications import create_notification
+from lava_scheduler_app.notifications import (
+    create_notification,
+    invoke_callbacks,
+    send_notifications,
+)
+from lava_scheduler_app.schema import SubmissionException
 from linaro_django_xmlrpc.models import AuthToken
 
 # pylint gets confused with TestCase
@@ -321,6 +327,109 @@ class TestTestJobMetadata(TestCaseWithFactory):
         self.assertEqual(job.get_metadata_dict(), [{"build_id": "1234"}])
 
 
+class TestTestJobBulkSubmission(TestCaseWithFactory):
+    def setUp(self):
+        super().setUp()
+        self.factory.cleanup()
+        self.user = self.factory.make_user()
+        self.device_type = self.factory.make_device_type(name="qemu")
+        self.factory.make_device(
+            device_type=self.device_type,
+            hostname="qemu-1",
+            tags=[self.factory.ensure_tag("usb")],
+        )
+
+    def definition(self, **kw):
+        definition = yaml_safe_load(self.factory.make_job_data_from_file("qemu.yaml"))
+        definition.update(kw)
+        return yaml_safe_dump(definition)
+
+    def test_bulk_submission(self):
+        definitions = [
+            self.definition(job_name="job-1"),
+            self.definition(job_name="job-2", visibility="personal", tags=["usb"]),
+            self.definition(job_name="job-3", visibility="personal"),
+        ]
+        with patch(
+            "lava_scheduler_app.signals.testjob_bulk_created_handler"
+        ) as handler:
+            with self.captureOnCommitCallbacks(execute=True):
+                jobs = testjob_bulk_submission(definitions, self.user)
+
+        self.assertEqual([job.description for job in jobs], ["job-1", "job-2", "job-3"])
+        self.assertEqual(
+            [job.id for job in jobs],
+            list(TestJob.objects.order_by("id").values_list("id", flat=True)),
+        )
+        handler.assert_called_once_with(self.user, jobs)
+
+        job1, job2, job3 = (TestJob.objects.get(id=job.id) for job in jobs)
+        self.assertTrue(job1.is_public)
+        self.assertEqual(list(job1.viewing_groups.all()), [])
+        self.assertEqual(list(job1.tags.all()), [])
+        self.assertEqual(job1.state, TestJob.STATE_SUBMITTED)
+        self.assertEqual(job1.submitter, self.user)
+        self.assertFalse(job2.is_public)
+        self.assertEqual([t.name for t in job2.tags.all()], ["usb"])
+        self.assertEqual(
+            [g.name for g in job2.viewing_groups.all()], [self.user.username]
+        )
+        self.assertEqual(
+            [g.name for g in job3.viewing_groups.all()], [self.user.username]
+        )
+        self.assertEqual(yaml_safe_load(job3.original_definition)["job_name"], "job-3")
+
+    @override_settings(EVENT_NOTIFICATION=True)
+    def test_bulk_submission_events(self):
+        jobs = testjob_bulk_submission(
+            [self.definition(job_name="job-1"), self.definition(job_name="job-2")],
+            self.user,
+        )
+        # A job without a requested device type
+        jobs.append(
+            TestJob.objects.create(submitter=self.user, definition="job_name: job-3")
+        )
+        with patch("lava_scheduler_app.signals.send_event") as send_event:
+            signals.testjob_bulk_created_handler(self.user, jobs)
+        # The same events as the jobs created one by one
+        self.assertEqual(
+            [(c.args[0], c.args[1], c.args[2]["job"]) for c in send_event.mock_calls],
+            [(".testjob", self.user.username, job.id) for job in jobs],
+        )
+        self.assertEqual(send_event.mock_calls[0].args[2]["device_type"], "qemu")
+        self.assertNotIn("device_type", send_event.mock_calls[2].args[2])
+
+    def test_bulk_submission_multinode(self):
+        self.factory.make_device(device_type=self.device_type, hostname="qemu-2")
+        multinode = yaml_safe_load(
+            self.factory.make_job_data_from_file("kvm-multinode.yaml")
+        )
+        for role in multinode["protocols"]["lava-multinode"]["roles"].values():
+            role.pop("tags", None)
+        multinode.pop("notify", None)
+        jobs = testjob_bulk_submission(
+            [self.definition(), yaml_safe_dump(multinode)], self.user
+        )
+        self.assertIsInstance(jobs[0], TestJob)
+        self.assertEqual(len(jobs[1]), 2)
+        self.assertEqual(TestJob.objects.count(), 3)
+
+    def test_bulk_submission_is_atomic(self):
+        definitions = [
+            self.definition(job_name="job-1"),
+            self.definition(job_name="job-2", device_type="unknown"),
+        ]
+        with self.assertRaises(DevicesUnavailableException):
+            testjob_bulk_submission(definitions, self.user)
+        self.assertEqual(TestJob.objects.count(), 0)
+
+        with self.assertRaises(SubmissionException):
+            testjob_bulk_submission(
+                [self.definition(job_name="job-1"), "job_name: invalid"], self.user
+            )
+        self.assertEqual(TestJob.objects.count(), 0)
+
+
 class TestNotificationCreate(TestCaseWithFactory):
     JOB_DEFINITION_FILE = "qemu.yaml"
 
@@ -489,6 +598,84 @@ class TestNotificationPost(TestNotificationBase):
         )
 
 
+class TestNotificationBatch(TestNotificationBase):
+    JOB_DEFINITION_FILE = "qemu_callback_post.yaml"
+
+    def test_invoke_callbacks_share_job_data(self):
+        self.setup_notification_callback()
+        NotificationCallback.objects.create(
+            notification=self.job.notification,
+            url="https://example.com/foo/baz",
+            method=NotificationCallback.POST,
+            dataset=NotificationCallback.RESULTS,
+            content_type=NotificationCallback.JSON,
+        )
+        NotificationCallback.objects.create(
+            notification=self.job.notification,
+            url="https://example.com/foo/get",
+            method=NotificationCallback.GET,
+        )
+        callbacks = list(self.job.notification.notificationcallback_set.all())
+        self.assertEqual(len(callbacks), 3)
+
+        session = MagicMock()
+        with (
+            patch.object(
+                TestJob, "create_job_data", return_value={"id": 1, "results": {}}
+            ) as create_job_data,
+            patch(
+                "lava_scheduler_app.notifications.create_callback_session",
+                return_value=session,
+            ),
+        ):
+            invoke_callbacks(callbacks)
+
+        create_job_data.assert_called_once_with(output=False, results=True)
+        session = session.__enter__.return_value
+        self.assertEqual(session.post.call_count, 2)
+        session.get.assert_called_once()
+        posted = {
+            call.args[0]: call.kwargs.get("json", call.kwargs.get("data"))
+            for call in session.post.call_args_list
+        }
+        # Only the callbacks requiring the results receive them
+        self.assertEqual(posted["https://example.com/foo/bar"], {"id": 1})
+        self.assertEqual(
+            posted["https://example.com/foo/baz"], {"id": 1, "results": {}}
+        )
+
+    def test_send_notifications_single_smtp_connection(self):
+        notify = {
+            "recipients": [
+                {"to": {"method": "email", "email": "a@example.com"}},
+                {"to": {"method": "email", "email": "b@example.com"}},
+            ],
+            "criteria": {"status": "finished"},
+        }
+        create_notification(self.job, notify)
+        self.job.refresh_from_db()
+        setattr(self.job, "output_dir", self.job_temp_dir.name)
+
+        connection = MagicMock()
+        with (
+            patch(
+                "lava_scheduler_app.notifications.get_connection",
+                return_value=connection,
+            ) as get_connection,
+            patch(
+                "lava_scheduler_app.notifications.send_mail", return_value=1
+            ) as send_mail,
+        ):
+            send_notifications(self.job)
+
+        get_connection.assert_called_once_with()
+        connection.open.assert_called_once_with()
+        connection.close.assert_called_once_with()
+        self.assertEqual(send_mail.call_count, 2)
+        for call in send_mail.call_args_list:
+            self.assertIs(call.kwargs["connection"], connection)
+
+
 class TestNotificationCustomHeader(TestNotificationBase):
     JOB_DEFINITION_FILE = "qemu_callback_custom_header.yaml"
 
@@ -6,17 +6,26 @@
 
 import logging
 import sys
+from datetime import timedelta
 from uuid import uuid4
 
-from django.contrib.auth.models import AnonymousUser
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
 from django.http import HttpRequest
-from django.test import TestCase
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
 
 from lava_common.decorators import nottest
 from lava_scheduler_app.models import Device, DeviceType, TestJob
 from lava_scheduler_app.tables import DeviceTable, visible_jobs_with_custom_sort
 from lava_scheduler_app.tables_jobs import AllJobsTable
-from lava_server.lavatable import LavaTable, LavaView
+from lava_server.lavatable import (
+    KeysetPaginator,
+    LavaRequestConfig,
+    LavaTable,
+    LavaView,
+    cached_count,
+)
 
 LOGGER = logging.getLogger()
 LOGGER.level = logging.INFO  # change to DEBUG to see *all* output
@@ -207,3 +216,103 @@ class TestDeviceHealthTooltip(TestCase):
         result = self._render(d)
         self.assertIn("text-danger", result)
         self.assertNotIn("data-toggle", result)
+
+
+class TestKeysetPaginator(TestCase):
+    def setUp(self):
+        super().setUp()
+        user = User.objects.create(username="keyset")
+        device_type = DeviceType.objects.create(name="qemu")
+        self.jobs = [
+            TestJob.objects.create(
+                submitter=user,
+                requested_device_type=device_type,
+                description=f"job {i}",
+            )
+            for i in range(7)
+        ]
+        # Every job has the same submit_time: the primary key breaks ties
+        TestJob.objects.update(submit_time=timezone.now())
+        self.expected = sorted((job.id for job in self.jobs), reverse=True)
+
+    def paginate(self, page=1, cursor=None, order_by=None, queryset=None):
+        params = {"page": page}
+        if cursor:
+            params["cursor"] = cursor
+        if order_by:
+            params["sort"] = order_by
+        request = RequestFactory().get("/", params)
+        request.user = AnonymousUser()
+        if queryset is None:
+            queryset = TestJob.objects.order_by("-submit_time")
+        table = TestJobTable(queryset)
+        LavaRequestConfig(
+            request, paginate={"per_page": 3, "paginator_class": KeysetPaginator}
+        ).configure(table)
+        return table.page
+
+    def ids(self, page):
+        return [row.record.id for row in page.object_list]
+
+    def test_forward_and_backward(self):
+        page1 = self.paginate()
+        self.assertEqual(self.ids(page1), self.expected[0:3])
+        self.assertTrue(page1.has_next())
+        self.assertFalse(page1.has_previous())
+        self.assertIsNone(page1.previous_cursor)
+
+        page2 = self.paginate(2, page1.next_cursor)
+        self.assertEqual(self.ids(page2), self.expected[3:6])
+        # Going back to the first page does not need a cursor
+        self.assertIsNone(page2.previous_cursor)
+
+        page3 = self.paginate(3, page2.next_cursor)
+        self.assertEqual(self.ids(page3), self.expected[6:])
+        self.assertFalse(page3.has_next())
+        self.assertIsNone(page3.next_cursor)
+
+        page2 = self.paginate(2, page3.previous_cursor)
+        self.assertEqual(self.ids(page2), self.expected[3:6])
+        self.assertTrue(page2.has_next())
+
+    def test_offset_fallback(self):
+        # Without a cursor, or with an invalid one, use the page number
+        self.assertEqual(self.ids(self.paginate(2)), self.expected[3:6])
+        self.assertEqual(self.ids(self.paginate(2, "invalid")), self.expected[3:6])
+        # A cursor built for another ordering is ignored
+        cursor = self.paginate().next_cursor
+        page = self.paginate(2, cursor, order_by="id")
+        self.assertEqual(self.ids(page), sorted(job.id for job in self.jobs)[3:6])
+
+    def test_nullable_ordering(self):
+        # Seeking on a nullable column would skip the NULL rows
+        now = timezone.now()
+        for index, job in enumerate(self.jobs[:4]):
+            TestJob.objects.filter(pk=job.pk).update(
+                end_time=now - timedelta(minutes=index)
+            )
+        queryset = TestJob.objects.order_by("-end_time")
+        self.assertIsNone(KeysetPaginator._ordering(queryset))
+
+        page = self.paginate(queryset=queryset)
+        ids = self.ids(page)
+        while page.has_next():
+            page = self.paginate(
+                page.next_page_number(),
+                getattr(page, "next_cursor", None),
+                queryset=queryset,
+            )
+            ids.extend(self.ids(page))
+        self.assertEqual(sorted(ids), sorted(job.id for job in self.jobs))
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_cached_count(self):
+        cache.clear()
+        queryset = TestJob.objects.filter(description__contains="job")
+        self.assertEqual(cached_count(queryset), 7)
+        self.jobs[0].delete()
+        # The count is cached
+        self.assertEqual(cached_count(queryset), 7)
+        self.assertEqual(cached_count(TestJob.objects.filter(pk__in=[])), 0)
@@ -4,6 +4,7 @@
 #
 # SPDX-License-Identifier: GPL-2.0-or-later
 
+import lzma
 from datetime import timedelta
 from io import StringIO
 from pathlib import Path
@@ -12,7 +13,10 @@ import pytest
 from django.core.management import call_command
 from django.utils import timezone
 
+from lava_results_app.models import TestCase, TestSuite
 from lava_scheduler_app.models import TestJob, TestJobUser, User
+from lava_server.management.commands import jobs as jobs_command
+from lava_server.management.commands.jobs import RateLimiter
 
 
 @pytest.fixture
@@ -226,3 +230,127 @@ def test_jobs_backfill_metadata_id_range(jobs_without_metadata):
 
     old_job.refresh_from_db()
     assert old_job.metadata == {"build_id": "1234", "branch": "main"}
+
+
+@pytest.mark.django_db
+def test_jobs_backfill_testcase_metadata():
+    user = User.objects.create_user("submitter")
+    suite = TestSuite.objects.create(
+        job=TestJob.objects.create(submitter=user), name="lava"
+    )
+    old = TestCase.objects.create(
+        suite=suite,
+        name="old",
+        result=TestCase.RESULT_PASS,
+        metadata="case: old\nlevel: '1.2'\n",
+    )
+    current = TestCase.objects.create(
+        suite=suite,
+        name="current",
+        result=TestCase.RESULT_PASS,
+        metadata="case: current\n",
+        metadata_json={},
+    )
+    broken = TestCase.objects.create(
+        suite=suite, name="broken", result=TestCase.RESULT_PASS, metadata="{{ nope"
+    )
+    TestCase.objects.create(suite=suite, name="empty", result=TestCase.RESULT_PASS)
+
+    out = StringIO()
+    call_command(
+        "jobs", "backfill-testcase-metadata", "--dry-run", stdout=out, stderr=StringIO()
+    )
+    assert "2 test cases scanned, 1 updated" in out.getvalue()
+    old.refresh_from_db()
+    assert old.metadata_json is None
+
+    call_command(
+        "jobs", "backfill-testcase-metadata", stdout=StringIO(), stderr=StringIO()
+    )
+    old.refresh_from_db()
+    assert old.metadata_json == {"case": "old", "level": "1.2"}
+    current.refresh_from_db()
+    assert current.metadata_json == {}
+    broken.refresh_from_db()
+    assert broken.metadata_json is None
+
+
+@pytest.mark.django_db
+def test_jobs_rm_checkpoint(job1, job2, tmp_path):
+    checkpoint = tmp_path / "rm.checkpoint"
+    checkpoint.write_text(str(job1.id))
+
+    out = StringIO()
+    call_command(
+        "jobs",
+        "rm",
+        "--older-than",
+        "10d",
+        "--batch-size",
+        "1",
+        "--checkpoint",
+        str(checkpoint),
+        stdout=out,
+    )
+    assert f"Resuming after job {job1.id}" in out.getvalue()
+
+    assert TestJob.objects.filter(id=job1.id).exists()
+    assert Path(job1.output_dir).exists()
+    assert not TestJob.objects.filter(id=job2.id).exists()
+    assert not Path(job2.output_dir).exists()
+    assert checkpoint.read_text() == str(job2.id)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("processes", ["1", "2"])
+def test_jobs_compress(job1, job2, mocker, processes, tmp_path):
+    mocker.patch("lava_server.management.commands.jobs.chown")
+    executor = mocker.spy(jobs_command, "ProcessPoolExecutor")
+    checkpoint = tmp_path / "compress.checkpoint"
+
+    out = StringIO()
+    call_command(
+        "jobs",
+        "compress",
+        "--older-than",
+        "10d",
+        "--jobs",
+        processes,
+        "--checkpoint",
+        str(checkpoint),
+        stdout=out,
+    )
+    assert "Compressed 2 jobs." in out.getvalue()
+    if processes == "1":
+        executor.assert_not_called()
+    else:
+        # The workers are forked whatever the default start method is
+        mp_context = executor.call_args.kwargs["mp_context"]
+        assert mp_context.get_start_method() == "fork"
+
+    for job, log in ((job1, b"job1log"), (job2, b"job2log")):
+        base = Path(job.output_dir)
+        assert not (base / "output.yaml").exists()
+        assert not (base / "output.yaml.xz.tmp").exists()
+        assert lzma.decompress((base / "output.yaml.xz").read_bytes()) == log
+        assert (base / "output.yaml.size").read_text() == str(len(log))
+    assert checkpoint.read_text() == str(job2.id)
+
+
+def test_rate_limiter(mocker):
+    monotonic = mocker.patch(
+        "lava_server.management.commands.jobs.time.monotonic", return_value=10.0
+    )
+    sleep = mocker.patch("lava_server.management.commands.jobs.time.sleep")
+
+    RateLimiter(None).consume(10**9)
+    sleep.assert_not_called()
+
+    limiter = RateLimiter(100)
+    limiter.consume(50)
+    sleep.assert_called_once_with(0.5)
+
+    sleep.reset_mock()
+    monotonic.return_value = 12.0
+    limiter.consume(50)
+    sleep.assert_not_called()
@@ -0,0 +1,117 @@
+# Copyright (C) 2026 Linaro Limited
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import datetime
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from lava_scheduler_app.models import Device, DeviceType, Metric
+from lava_server import metrics
+
+
+@pytest.fixture
+def registry():
+    return metrics.Registry()
+
+
+@pytest.mark.django_db
+def test_registry(registry):
+    counter = metrics.Counter("test_total", "Counter", registry=registry)
+    gauge = metrics.Gauge("test_gauge", "Gauge", registry=registry)
+    histogram = metrics.Histogram(
+        "test_seconds", "Histogram", buckets=(1, 10), registry=registry
+    )
+
+    counter.inc(kind="job")
+    counter.inc(2, kind="job")
+    gauge.set(3)
+    histogram.observe(0.5)
+    histogram.observe(5)
+    registry.flush()
+    assert registry.pending == {}
+    assert Metric.objects.count() == 3
+
+    # Increments of another process are added to the totals
+    other = metrics.Registry()
+    metrics.Counter("test_total", "Counter", registry=other).inc(kind="job")
+    metrics.Gauge("test_gauge", "Gauge", registry=other).set(1)
+    other.flush()
+    histogram.observe(20)
+
+    assert registry.render() == (
+        "# HELP test_gauge Gauge\n"
+        "# TYPE test_gauge gauge\n"
+        "test_gauge 1\n"
+        "# HELP test_seconds Histogram\n"
+        "# TYPE test_seconds histogram\n"
+        'test_seconds_bucket{le="1"} 1\n'
+        'test_seconds_bucket{le="10"} 2\n'
+        'test_seconds_bucket{le="+Inf"} 3\n'
+        "test_seconds_sum 25.5\n"
+        "test_seconds_count 3\n"
+        "# HELP test_total Counter\n"
+        "# TYPE test_total counter\n"
+        'test_total{kind="job"} 4\n'
+    )
+
+
+@pytest.mark.django_db
+def test_prometheus(client):
+    dt = DeviceType.objects.create(name="qemu")
+    Device.objects.create(hostname="qemu-01", device_type=dt)
+    response = client.get(reverse("lava.prometheus"))
+    assert response.status_code == 200
+    assert 'device_type{name="qemu",state="queue"} 0' in response.content.decode()
+
+    # Use the lab state saved by lava-scheduler
+    metrics.set_lab_state(
+        {
+            "devices": {
+                "num_online": 1,
+                "num_not_retired": 2,
+                "active_devices": 3,
+                "health_checks_total": 4,
+                "health_checks_complete": 5,
+            },
+            "running_jobs": 6,
+            "device_types": [
+                {
+                    "device_type": "qemu",
+                    "idle": 1,
+                    "busy": 2,
+                    "offline": 3,
+                    "maintenance": 4,
+                    "queued_jobs": 5,
+                },
+                {
+                    "device_type": "hidden",
+                    "idle": 1,
+                    "busy": 2,
+                    "offline": 3,
+                    "maintenance": 4,
+                    "queued_jobs": 5,
+                },
+            ],
+            "workers": {
+                "num_not_retired": 1,
+                "num_online": 1,
+                "num_offline": 0,
+                "num_maintenance": 0,
+                "num_active": 1,
+            },
+        }
+    )
+    content = client.get(reverse("lava.prometheus")).content.decode()
+    assert "jobs_running 6\n" in content
+    assert 'device_type{name="qemu",state="queue"} 5' in content
+    assert 'name="hidden"' not in content
+
+    # Too old: computed again
+    Metric.objects.filter(name=metrics.LAB_STATE).update(
+        updated=timezone.now() - datetime.timedelta(hours=1)
+    )
+    content = client.get(reverse("lava.prometheus")).content.decode()
+    assert "jobs_running 0\n" in content
@@ -18,5 +18,6 @@ tests_settings["HEALTH_CHECKS_PATH"] = str(
     base_tests_path / "lava_scheduler_app/health-checks"
 )
 tests_settings["PASSWORD_HASHERS"] = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+tests_settings["METRICS_FLUSH_INTERVAL"] = 0
 
 globals().update(**tests_settings)